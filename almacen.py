@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Almacén persistente de ejecuciones y soluciones (SQLite embebido).
+
+Cada ejecución guarda el dataset, el hash de su snapshot compilado, los
+parámetros y métricas del motor y los slots de la solución como un arreglo
+(n, 2) int8 [dia, hora] en un BLOB: restaurar una solución es aplicar esos
+slots a los eventos del snapshot, sin volver a resolver.
+
+Las escrituras pasan por una cola y un hilo escritor que agrupa en una sola
+transacción todo lo pendiente (hasta tamano_lote filas). La base usa WAL, así
+que las lecturas no esperan a las escrituras y sobrevive a reinicios.
+"""
+
+import json
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+
+import numpy as np
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS ejecuciones (
+    id TEXT PRIMARY KEY,
+    dataset TEXT NOT NULL,
+    hash_datos TEXT,
+    fecha REAL NOT NULL,
+    motor TEXT,
+    algoritmo TEXT,
+    parametros TEXT,
+    conflictos_duros INTEGER,
+    penalizacion_blandas INTEGER,
+    calidad REAL,
+    iteraciones INTEGER,
+    tiempo_ejecucion REAL,
+    metricas TEXT,
+    num_eventos INTEGER,
+    slots BLOB
+);
+CREATE INDEX IF NOT EXISTS idx_ejecuciones_dataset_fecha ON ejecuciones (dataset, fecha DESC);
+CREATE INDEX IF NOT EXISTS idx_ejecuciones_dataset_calidad ON ejecuciones (dataset, calidad DESC, fecha DESC);
+CREATE INDEX IF NOT EXISTS idx_ejecuciones_fecha ON ejecuciones (fecha DESC);
+CREATE TABLE IF NOT EXISTS configuraciones (
+    dataset TEXT PRIMARY KEY,
+    hash_datos TEXT,
+    fecha REAL NOT NULL,
+    parametros TEXT NOT NULL,
+    costo REAL,
+    detalle TEXT
+);
+"""
+
+COLUMNAS = ('id', 'dataset', 'hash_datos', 'fecha', 'motor', 'algoritmo', 'parametros',
+            'conflictos_duros', 'penalizacion_blandas', 'calidad', 'iteraciones',
+            'tiempo_ejecucion', 'metricas', 'num_eventos', 'slots')
+COLUMNAS_RESUMEN = tuple(c for c in COLUMNAS if c != 'slots')
+
+# Mejor solución = menos conflictos duros, luego menos penalización blanda
+ORDEN = {
+    'fecha': 'fecha DESC',
+    'calidad': 'calidad DESC, conflictos_duros, penalizacion_blandas, fecha DESC',
+}
+
+
+def slots_a_blob(slots):
+    """Slots (n, 2) [dia, hora] -> bytes int8"""
+    return np.ascontiguousarray(slots, dtype=np.int8).tobytes()
+
+
+def blob_a_slots(blob):
+    """bytes int8 -> arreglo (n, 2) int32 [dia, hora]"""
+    return np.frombuffer(blob, dtype=np.int8).reshape(-1, 2).astype(np.int32)
+
+
+class AlmacenSoluciones:
+    """
+    Args:
+        ruta: Archivo SQLite (se crea si no existe)
+        tamano_lote: Máximo de filas por transacción del hilo escritor
+    """
+
+    def __init__(self, ruta, tamano_lote=64):
+        self.ruta = ruta
+        self.tamano_lote = tamano_lote
+        self._local = threading.local()
+        self._cola = queue.Queue()
+
+        conexion = self._conexion()
+        conexion.executescript(ESQUEMA)
+        conexion.commit()
+
+        self._escritor = threading.Thread(target=self._escribir, name='almacen-escritor', daemon=True)
+        self._escritor.start()
+
+    def _conexion(self):
+        """Una conexión por hilo (sqlite3 no comparte conexiones entre hilos)"""
+        conexion = getattr(self._local, 'conexion', None)
+        if conexion is None:
+            conexion = sqlite3.connect(self.ruta, timeout=30)
+            conexion.row_factory = sqlite3.Row
+            conexion.execute('PRAGMA journal_mode=WAL')
+            conexion.execute('PRAGMA synchronous=NORMAL')
+            self._local.conexion = conexion
+        return conexion
+
+    # ==================== ESCRITURA ====================
+
+    def guardar(self, dataset, slots, resultado, hash_datos=None, motor=None, algoritmo=None,
+                parametros=None, metricas=None):
+        """
+        Encola una ejecución y retorna su id de inmediato.
+
+        Args:
+            dataset: Nombre del dataset
+            slots: Arreglo (n, 2) [dia, hora] (se copia al encolar)
+            resultado: dict con conflictos_duros, penalizacion_blandas, calidad,
+                       iteraciones y tiempo_ejecucion
+        """
+        id_ejecucion = uuid.uuid4().hex
+        self._cola.put((
+            id_ejecucion, dataset, hash_datos, time.time(), motor, algoritmo,
+            json.dumps(parametros or {}, ensure_ascii=False),
+            int(resultado.get('conflictos_duros', 0)),
+            int(resultado.get('penalizacion_blandas', 0)),
+            float(resultado.get('calidad', 0.0)),
+            int(resultado.get('iteraciones', 0)),
+            float(resultado.get('tiempo_ejecucion', 0.0)),
+            json.dumps(metricas or {}, ensure_ascii=False),
+            len(slots),
+            sqlite3.Binary(slots_a_blob(slots))
+        ))
+        return id_ejecucion
+
+    def esperar(self):
+        """Bloquea hasta que todas las escrituras encoladas estén confirmadas"""
+        self._cola.join()
+
+    def _escribir(self):
+        conexion = self._conexion()
+        sql = f"INSERT INTO ejecuciones ({', '.join(COLUMNAS)}) VALUES ({', '.join('?' * len(COLUMNAS))})"
+        while True:
+            lote = [self._cola.get()]
+            while len(lote) < self.tamano_lote:
+                try:
+                    lote.append(self._cola.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with conexion:
+                    conexion.executemany(sql, lote)
+            except sqlite3.Error as e:
+                print(f"[ERROR] Almacén: no se pudieron guardar {len(lote)} ejecuciones: {e}")
+            finally:
+                for _ in lote:
+                    self._cola.task_done()
+
+    def guardar_configuracion(self, dataset, parametros, costo=None, hash_datos=None, detalle=None):
+        """
+        Guarda (reemplaza) la mejor configuración del motor para un dataset.
+        Es una escritura rara, así que se confirma de inmediato sin pasar por la cola.
+
+        Args:
+            parametros: dict {motor, max_iteraciones, tamano_tabu, parametros_motor}
+            costo: Costo medio de la configuración en el autoajuste
+            detalle: dict con el resumen del autoajuste
+        """
+        conexion = self._conexion()
+        with conexion:
+            conexion.execute(
+                "INSERT OR REPLACE INTO configuraciones (dataset, hash_datos, fecha, parametros, costo, detalle) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (dataset, hash_datos, time.time(), json.dumps(parametros, ensure_ascii=False),
+                 costo, json.dumps(detalle or {}, ensure_ascii=False))
+            )
+
+    # ==================== CONSULTAS ====================
+
+    def listar(self, dataset=None, desde=None, orden='fecha', limite=50, hash_datos=None):
+        """
+        Ejecuciones sin los slots, más recientes (orden='fecha') o mejores
+        (orden='calidad') primero.
+
+        Args:
+            desde: Marca de tiempo (epoch) mínima
+        """
+        if orden not in ORDEN:
+            raise ValueError(f"Orden desconocido: {orden} (opciones: {', '.join(ORDEN)})")
+        self.esperar()
+
+        condiciones, valores = [], []
+        for columna, operador, valor in (('dataset', '=', dataset), ('fecha', '>=', desde),
+                                         ('hash_datos', '=', hash_datos)):
+            if valor is not None:
+                condiciones.append(f"{columna} {operador} ?")
+                valores.append(valor)
+        donde = f"WHERE {' AND '.join(condiciones)}" if condiciones else ''
+
+        filas = self._conexion().execute(
+            f"SELECT {', '.join(COLUMNAS_RESUMEN)} FROM ejecuciones {donde} "
+            f"ORDER BY {ORDEN[orden]} LIMIT ?", valores + [int(limite)]
+        ).fetchall()
+        return [self._a_dict(f) for f in filas]
+
+    def mejor(self, dataset, desde=None, hash_datos=None):
+        """Mejor ejecución del dataset (opcionalmente desde una fecha) o None"""
+        filas = self.listar(dataset, desde, orden='calidad', limite=1, hash_datos=hash_datos)
+        return filas[0] if filas else None
+
+    def ultima(self, dataset, hash_datos=None):
+        """Ejecución más reciente del dataset o None"""
+        filas = self.listar(dataset, orden='fecha', limite=1, hash_datos=hash_datos)
+        return filas[0] if filas else None
+
+    def configuracion(self, dataset):
+        """Configuración autoajustada del dataset (con 'parametros' y 'detalle' decodificados) o None"""
+        fila = self._conexion().execute(
+            "SELECT dataset, hash_datos, fecha, parametros, costo, detalle FROM configuraciones WHERE dataset = ?",
+            (dataset,)
+        ).fetchone()
+        if fila is None:
+            return None
+        datos = self._a_dict(fila)
+        datos['detalle'] = json.loads(datos['detalle'] or '{}')
+        return datos
+
+    def obtener(self, id_ejecucion, con_slots=True):
+        """Ejecución por id (con 'slots' como arreglo (n, 2)) o None"""
+        self.esperar()
+        columnas = COLUMNAS if con_slots else COLUMNAS_RESUMEN
+        fila = self._conexion().execute(
+            f"SELECT {', '.join(columnas)} FROM ejecuciones WHERE id = ?", (id_ejecucion,)
+        ).fetchone()
+        return self._a_dict(fila) if fila is not None else None
+
+    def comparar(self, id_a, id_b):
+        """
+        Diferencias entre dos ejecuciones: métricas (b - a) y eventos que
+        cambiaron de slot (solo si son del mismo snapshot).
+        """
+        a, b = self.obtener(id_a), self.obtener(id_b)
+        if a is None or b is None:
+            return None
+
+        diferencias = {clave: b[clave] - a[clave] for clave in
+                       ('conflictos_duros', 'penalizacion_blandas', 'calidad', 'tiempo_ejecucion')}
+        comparacion = {
+            'a': {k: v for k, v in a.items() if k != 'slots'},
+            'b': {k: v for k, v in b.items() if k != 'slots'},
+            'diferencias': diferencias,
+            'mismo_snapshot': a['hash_datos'] == b['hash_datos'] and a['num_eventos'] == b['num_eventos'],
+            'eventos_movidos': None
+        }
+        if comparacion['mismo_snapshot']:
+            movidos = np.flatnonzero((a['slots'] != b['slots']).any(axis=1))
+            comparacion['eventos_movidos'] = int(len(movidos))
+            comparacion['indices_movidos'] = movidos.tolist()
+        return comparacion
+
+    def cerrar(self):
+        """Confirma lo pendiente y cierra la conexión del hilo actual"""
+        self.esperar()
+        conexion = getattr(self._local, 'conexion', None)
+        if conexion is not None:
+            conexion.close()
+            self._local.conexion = None
+
+    @staticmethod
+    def _a_dict(fila):
+        datos = dict(fila)
+        datos['fecha_iso'] = datetime.fromtimestamp(datos['fecha']).isoformat(timespec='seconds')
+        for clave in ('parametros', 'metricas'):
+            if clave in datos:
+                datos[clave] = json.loads(datos[clave] or '{}')
+        if 'slots' in datos:
+            datos['slots'] = blob_a_slots(datos['slots'])
+        return datos
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Análisis previo a la optimización: cotas inferiores y factibilidad.
+
+Con solo las cargas semanales de cada recurso (asignaciones x horas_semanales)
+se detecta en milisegundos lo que ningún motor puede arreglar:
+
+- Palomar: un profesor o grupo con más horas que los 70 slots de la semana
+  tiene al menos (carga - 70) conflictos duros en cualquier horario. El motor
+  cuenta por separado los de profesores y los de grupos, así que la suma sobre
+  todos los recursos es una cota inferior de sus conflictos duros; si es
+  mayor que cero el dataset es infactible.
+- Turno: un grupo con más horas que su ventana de turno
+  (datos_compilados.VENTANA_*) tendrá clases fuera de turno.
+- Profesores: más horas que max_horas, o que los slots que no marcó como no
+  deseados (preferencias_horarias), obliga a rebasar su carga o sus
+  preferencias.
+
+Turno y profesores son avisos: no entran en el costo del motor. La cota de la
+penalización blanda (huecos) es 0. Con establecer_cota_inferior() el motor se
+detiene en cuanto su mejor solución alcanza la cota, porque ya es óptima.
+
+Uso:
+    python analisis_previo.py data/datos_iti.json
+    python analisis_previo.py 'data/*.json'
+"""
+
+import argparse
+import glob
+import sys
+import time
+
+import numpy as np
+
+import datos_compilados
+from busqueda_tabu_numpy import NUM_SLOTS, calcular_calidad, es_grupo_vespertino
+
+
+def _cargas(ids, duraciones):
+    """Horas semanales por id de recurso (ids negativos no cuentan)"""
+    validos = ids >= 0
+    return np.bincount(ids[validos], weights=duraciones[validos]).astype(np.int64)
+
+
+def _hallazgo(tipo, recurso, restriccion, carga, capacidad, mensaje):
+    return {
+        'tipo': tipo,
+        'id': recurso['id'],
+        'nombre': recurso.get('nombre', str(recurso['id'])),
+        'restriccion': restriccion,
+        'carga': carga,
+        'capacidad': capacidad,
+        'exceso': carga - capacidad,
+        'mensaje': mensaje,
+    }
+
+
+def analizar(eventos, duraciones, profesores, grupos):
+    """
+    Cotas inferiores y comprobaciones de capacidad antes de optimizar.
+
+    Args:
+        eventos: Arreglo (n, 7) [id, materia_id, profesor_id, grupo_id, aula_id, dia, hora]
+        duraciones: Horas de cada evento (None = todos de 1 hora)
+        profesores, grupos: Listas del dataset
+
+    Returns:
+        dict con 'factible', 'cota_inferior' ({conflictos_duros,
+        penalizacion_blandas}), 'calidad_maxima', 'errores' (hacen
+        infactible el dataset), 'avisos', 'horas_totales' y 'tiempo'
+    """
+    inicio = time.perf_counter()
+    eventos = np.asarray(eventos)
+    duraciones = (np.ones(len(eventos), dtype=np.int64) if duraciones is None
+                  else np.asarray(duraciones, dtype=np.int64))
+    errores, avisos = [], []
+
+    carga_profesores = _cargas(eventos[:, 2].astype(np.int64), duraciones)
+    for p in profesores:
+        carga = int(carga_profesores[p['id']]) if 0 <= p['id'] < len(carga_profesores) else 0
+        if carga > NUM_SLOTS:
+            errores.append(_hallazgo('profesor', p, 'semana', carga, NUM_SLOTS,
+                                     f"{carga} horas asignadas y la semana tiene {NUM_SLOTS} slots"))
+            continue
+        if p.get('max_horas') and carga > p['max_horas']:
+            avisos.append(_hallazgo('profesor', p, 'max_horas', carga, p['max_horas'],
+                                    f"{carga} horas asignadas y su máximo es {p['max_horas']}"))
+        disponibles = NUM_SLOTS - len({s for s in p.get('preferencias_horarias', []) if 0 <= s < NUM_SLOTS})
+        if carga > disponibles:
+            avisos.append(_hallazgo('profesor', p, 'preferencias', carga, disponibles,
+                                    f"{carga} horas asignadas y solo {disponibles} slots deseados"))
+
+    carga_grupos = _cargas(eventos[:, 3].astype(np.int64), duraciones)
+    for g in grupos:
+        carga = int(carga_grupos[g['id']]) if 0 <= g['id'] < len(carga_grupos) else 0
+        if carga > NUM_SLOTS:
+            errores.append(_hallazgo('grupo', g, 'semana', carga, NUM_SLOTS,
+                                     f"{carga} horas asignadas y la semana tiene {NUM_SLOTS} slots"))
+            continue
+        vespertino = es_grupo_vespertino(g.get('nombre', ''))
+        hora_inicio, hora_fin = (datos_compilados.VENTANA_VESPERTINA if vespertino
+                                 else datos_compilados.VENTANA_MATUTINA)
+        capacidad = 5 * (hora_fin - hora_inicio + 1)
+        if carga > capacidad:
+            avisos.append(_hallazgo('grupo', g, 'turno', carga, capacidad,
+                                    f"{carga} horas asignadas y su turno "
+                                    f"{'vespertino' if vespertino else 'matutino'} tiene {capacidad}"))
+
+    cota = sum(e['exceso'] for e in errores)
+    return {
+        'factible': not errores,
+        'cota_inferior': {'conflictos_duros': cota, 'penalizacion_blandas': 0},
+        'calidad_maxima': calcular_calidad(cota, 0),
+        'errores': errores,
+        'avisos': avisos,
+        'num_eventos': len(eventos),
+        'horas_totales': int(duraciones.sum()),
+        'tiempo': time.perf_counter() - inicio,
+    }
+
+
+def analizar_problema(problema):
+    """analizar() sobre los eventos de un snapshot compilado (datos_compilados.ProblemaCompilado)"""
+    datos = problema.metadatos
+    return analizar(problema.eventos, problema.duraciones, datos.get('profesores', []), datos.get('grupos', []))
+
+
+# ==================== CLI ====================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Cotas inferiores y factibilidad de datasets antes de optimizar')
+    parser.add_argument('archivos', nargs='+', help="Datasets (rutas o patrones, ej. 'data/*.json')")
+    args = parser.parse_args(argv)
+
+    rutas = []
+    for patron in args.archivos:
+        coincidencias = sorted(glob.glob(patron)) if glob.has_magic(patron) else [patron]
+        rutas.extend(r for r in coincidencias if r not in rutas)
+    if not rutas:
+        print("[ERROR] Ningún archivo de datos coincide con los patrones indicados")
+        return 1
+
+    infactibles = 0
+    for ruta in rutas:
+        analisis = analizar_problema(datos_compilados.cargar_json(ruta))
+        if analisis['factible']:
+            estado = '[✓] factible'
+        else:
+            estado = f"[✗] infactible (al menos {analisis['cota_inferior']['conflictos_duros']} conflictos duros)"
+        print(f"{estado} {ruta}: {analisis['horas_totales']} horas en {analisis['num_eventos']} eventos "
+              f"({analisis['tiempo'] * 1000:.1f} ms)")
+        for hallazgo in analisis['errores']:
+            print(f"  ✗ {hallazgo['tipo']} {hallazgo['nombre']}: {hallazgo['mensaje']}")
+        for hallazgo in analisis['avisos']:
+            print(f"  ⚠ {hallazgo['tipo']} {hallazgo['nombre']}: {hallazgo['mensaje']}")
+        infactibles += not analisis['factible']
+    return 1 if infactibles else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Analítica de utilización de una solución para los tableros de la interfaz.
+
+Analitica se construye una vez por versión de la solución con agregaciones
+NumPy (bincount) sobre el arreglo de eventos del motor: por tipo de recurso
+una matriz recursos x 70 slots con las horas de clase de cada celda (más de
+una es un choque), la carga semanal frente al máximo de horas, la carga por
+día y el histograma de recursos por horas diarias. Una consulta solo
+serializa lo ya calculado.
+"""
+
+import numpy as np
+
+from busqueda_tabu_numpy import HORAS_DIA, NUM_SLOTS
+
+DIAS = 5
+
+# tipo de recurso -> columna de eventos_array
+COLUMNAS = {'profesores': 2, 'grupos': 3, 'aulas': 4}
+
+
+def _maximos(tipo, recursos, total):
+    """Horas semanales máximas por id (-1 = sin límite): max_horas de los profesores, 70 slots de un aula"""
+    maximo = np.full(total, -1, dtype=np.int32)
+    if tipo == 'aulas':
+        maximo[:] = NUM_SLOTS
+    elif tipo == 'profesores':
+        for r in recursos:
+            if 0 <= r['id'] < total and r.get('max_horas'):
+                maximo[r['id']] = r['max_horas']
+    return maximo
+
+
+class Analitica:
+    """
+    Utilización de una solución por tipo de recurso.
+
+    Args:
+        eventos: Arreglo (n, 7) [id, materia_id, profesor_id, grupo_id, aula_id, dia, hora],
+                 una fila por hora ocupada (busqueda_tabu_numpy.expandir_bloques)
+        profesores, grupos, aulas: Listas de recursos del dataset (dicts con 'id')
+        version: Versión de la solución analizada (para invalidar cachés)
+    """
+
+    def __init__(self, eventos, profesores, grupos, aulas, version=None):
+        self.version = version
+        eventos = np.asarray(eventos)
+        asignados = eventos[(eventos[:, 5] >= 0) & (eventos[:, 6] >= 0)]
+        slots = asignados[:, 5].astype(np.int64) * HORAS_DIA + asignados[:, 6]
+
+        # Horas de clase por slot (todas las vistas) para el mapa de calor
+        self.carga_slots = np.bincount(slots, minlength=NUM_SLOTS).astype(np.int32)
+
+        self.tipos = {}
+        for tipo, recursos in (('profesores', profesores), ('grupos', grupos), ('aulas', aulas)):
+            ids = asignados[:, COLUMNAS[tipo]].astype(np.int64)
+            validos = ids >= 0  # aula_id -1 = sin aula
+            # Ids fuera de la lista (datos inconsistentes) también se cuentan
+            total = max(max((r['id'] for r in recursos), default=-1) + 1,
+                        int(ids[validos].max()) + 1 if validos.any() else 0)
+
+            matriz = np.bincount(ids[validos] * NUM_SLOTS + slots[validos],
+                                 minlength=total * NUM_SLOTS).astype(np.int32).reshape(total, NUM_SLOTS)
+            por_dia = matriz.reshape(total, DIAS, HORAS_DIA).sum(axis=2)
+            # histograma[d, h] = recursos con h horas el día d
+            histograma = np.zeros((DIAS, HORAS_DIA + 1), dtype=np.int32)
+            for d in range(DIAS):
+                histograma[d] = np.bincount(np.minimum(por_dia[:, d], HORAS_DIA), minlength=HORAS_DIA + 1)
+
+            self.tipos[tipo] = {
+                'matriz': matriz,
+                'horas': matriz.sum(axis=1),
+                'maximo': _maximos(tipo, recursos, total),
+                'por_dia': por_dia,
+                'histograma_dia': histograma,
+                'choques': int((matriz > 1).sum()),
+            }
+
+    @property
+    def nbytes(self):
+        return self.carga_slots.nbytes + sum(arr.nbytes for datos in self.tipos.values()
+                                             for arr in datos.values() if isinstance(arr, np.ndarray))
+
+    def resumen(self, tipo, matriz=True):
+        """
+        Utilización de un tipo de recurso (listas indexadas por id).
+
+        Returns:
+            dict con horas_semanales, max_horas (None = sin límite),
+            porcentaje, sobrecargados, por_dia (recursos x 5),
+            histograma_dia (5 x 15), choques y, si matriz, la matriz
+            recursos x 70 slots (slot = dia * 14 + hora)
+        """
+        if tipo not in self.tipos:
+            raise ValueError(f"Tipo de recurso desconocido: {tipo} (opciones: {', '.join(self.tipos)})")
+        datos = self.tipos[tipo]
+        horas, maximo = datos['horas'], datos['maximo']
+        con_limite = maximo > 0
+        porcentaje = np.zeros(len(horas))
+        porcentaje[con_limite] = np.round(100.0 * horas[con_limite] / maximo[con_limite], 1)
+
+        resumen = {
+            'horas_semanales': horas.tolist(),
+            'max_horas': [int(m) if m > 0 else None for m in maximo.tolist()],
+            'porcentaje': [p if c else None for p, c in zip(porcentaje.tolist(), con_limite.tolist())],
+            'sobrecargados': np.flatnonzero(con_limite & (horas > maximo)).tolist(),
+            'por_dia': datos['por_dia'].tolist(),
+            'histograma_dia': datos['histograma_dia'].tolist(),
+            'choques': datos['choques'],
+        }
+        if matriz:
+            resumen['matriz'] = datos['matriz'].tolist()
+        return resumen
+
+    def como_dict(self, tipos=None, matriz=True):
+        """Analítica completa (o de los tipos pedidos) lista para JSON"""
+        tipos = list(self.tipos) if tipos is None else tipos
+        carga = self.carga_slots.reshape(DIAS, HORAS_DIA)
+        return {
+            'version': self.version,
+            'dias': DIAS,
+            'horas_dia': HORAS_DIA,
+            'carga_slots': carga.tolist(),
+            'carga_dias': carga.sum(axis=1).tolist(),
+            **{tipo: self.resumen(tipo, matriz) for tipo in tipos},
+        }
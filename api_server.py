@@ -4,76 +4,176 @@ API Server para el Sistema de Horarios ITI
 Conecta la interfaz web con el motor de optimización Cython
 """
 
-from flask import Flask, jsonify, request, send_from_directory, Response
+from flask import Flask, jsonify, request, send_from_directory, Response, g, stream_with_context
 from flask_cors import CORS
+import functools
 import json
 import os
 import sys
 import time
 import threading
+from datetime import datetime
 import queue
 
+import numpy as np
+
 # Agregar el directorio de módulos Cython al path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+from metricas import HistogramaLatencias, metricas_motor, combinar_familias
+import datos_compilados
+import grafo_conflictos
+import exportacion
+import disponibilidad
+import analitica
+import asignacion_aulas
+import analisis_previo
+import registro_datasets
+from descomposicion import OptimizadorDescompuesto
+from busqueda_tabu_numpy import (eventos_a_arreglo, arreglo_a_eventos, calcular_calidad, duraciones_de,
+                                 expandir_bloques, cargar_checkpoint, HORAS_DIA, NUM_SLOTS)
+from almacen import AlmacenSoluciones
+
 # Intentar importar el módulo Cython compilado
 try:
-    from cython_modules.busqueda_tabu import BusquedaTabu
+    from cython_modules.busqueda_tabu import MOTORES as ALGORITMOS
     CYTHON_DISPONIBLE = True
     print("✓ Módulo Cython cargado correctamente")
 except ImportError as e:
     CYTHON_DISPONIBLE = False
     print(f"⚠ Módulo Cython no disponible: {e}")
     print("  Ejecuta: python setup.py build_ext --inplace")
+    print("  Usando el motor NumPy (misma API, sin compilador)")
+    from busqueda_tabu_numpy import MOTORES as ALGORITMOS
+
+# Nombre del motor activo (para respuestas y métricas)
+MOTOR = 'Cython' if CYTHON_DISPONIBLE else 'NumPy'
 
 app = Flask(__name__, static_folder='web')
 CORS(app)
 
-# Estado global del sistema
-estado = {
-    'profesores': [],
-    'materias': [],
-    'grupos': [],
-    'aulas': [],
-    'asignaciones': {},
-    'eventos': [],
-    'solucion': None,
-    'optimizando': False,
-    'progreso': 0,
-    'log_messages': []
-}
+DIRECTORIO_DATOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+# Historial de ejecuciones y soluciones (sobrevive a reinicios del servidor)
+almacen = AlmacenSoluciones(os.environ.get('HORARIOS_ALMACEN',
+                                           os.path.join(DIRECTORIO_DATOS, 'horarios.sqlite3')))
+
+# Checkpoints de las optimizaciones en curso (uno por dataset): si el servidor
+# se reinicia a mitad de una corrida, POST /api/reanudar la continúa
+DIRECTORIO_CHECKPOINTS = os.environ.get('HORARIOS_CHECKPOINTS', os.path.join(DIRECTORIO_DATOS, 'checkpoints'))
+INTERVALO_CHECKPOINT = int(os.environ.get('HORARIOS_INTERVALO_CHECKPOINT', 1000))
+
+# Parámetros de /api/optimizar cuando ni la solicitud ni autoajuste.py los fijan
+PARAMETROS_PREDETERMINADOS = {'motor': 'tabu', 'max_iteraciones': 1000, 'tamano_tabu': 20, 'parametros_motor': {}}
+
+
+def aplicar_solucion_guardada(estado, ejecucion):
+    """
+    Aplica a los eventos del snapshot los slots de una ejecución del almacén.
+    Retorna False si la ejecución es de otra versión de los datos.
+    """
+    problema = estado['problema']
+    if (problema is None or ejecucion['hash_datos'] != problema.hash
+            or ejecucion['num_eventos'] != len(problema.eventos)):
+        return False
+    
+    eventos_array = np.array(problema.eventos)
+    eventos_array[:, 5:7] = ejecucion['slots']
+    estado['eventos_array'] = eventos_array
+    # El almacén guarda solo los slots: las aulas se vuelven a asignar
+    aulas = asignar_aulas(estado, problema.duraciones)
+    estado['eventos'] = arreglo_a_eventos(eventos_array, problema.duraciones)
+    estado['solucion'] = {
+        'conflictos_duros': ejecucion['conflictos_duros'],
+        'penalizacion_blandas': ejecucion['penalizacion_blandas'],
+        'calidad': ejecucion['calidad'],
+        'iteraciones': ejecucion['iteraciones'],
+        'tiempo_ejecucion': ejecucion['tiempo_ejecucion'],
+        'optimizado_con': ejecucion['motor'],
+        'algoritmo': ejecucion['algoritmo'],
+        'ejecucion_id': ejecucion['id'],
+        'fecha': ejecucion['fecha_iso'],
+        'aulas': aulas
+    }
+    estado['version_solucion'] += 1
+    return True
+
+
+def asignar_aulas(estado, duraciones, dias=None):
+    """
+    Asigna en eventos_array aulas sin choques para los horarios actuales
+    (asignacion_aulas; los motores no mueven aulas). Con 'dias' solo se
+    reasignan esos días. Retorna el resumen.
+    """
+    resultado = asignacion_aulas.asignar_aulas(estado['eventos_array'], duraciones, estado['materias'],
+                                               estado['grupos'], estado['aulas'], dias=dias)
+    estado['eventos_array'][:, 4] = resultado['aula_id']
+    if resultado['sin_aula']:
+        print(f"⚠ {len(resultado['sin_aula'])} eventos de '{estado['nombre']}' sin aula disponible")
+    return {
+        'sin_aula': resultado['sin_aula'],
+        'cambios': resultado['cambios'],
+        'tiempo': resultado['tiempo']
+    }
+
+
+def ruta_checkpoint(estado):
+    """Checkpoint de la optimización en curso (o interrumpida) del dataset"""
+    return os.path.join(DIRECTORIO_CHECKPOINTS, f"{estado['nombre']}.ckpt")
+
+
+def restaurar_ultima_solucion(estado):
+    """Al cargar un dataset recupera su última solución guardada (si coincide con los datos)"""
+    ultima = almacen.ultima(estado['nombre'], hash_datos=estado['problema'].hash)
+    if ultima is not None and aplicar_solucion_guardada(estado, almacen.obtener(ultima['id'])):
+        print(f"✓ Solución restaurada para '{estado['nombre']}' ({ultima['fecha_iso']}, "
+              f"calidad {ultima['calidad']:.1f}%)")
+    if os.path.exists(ruta_checkpoint(estado)):
+        print(f"⚠ Optimización interrumpida de '{estado['nombre']}': POST /api/datasets/"
+              f"{estado['nombre']}/reanudar la continúa")
+
+
+# Datasets con nombre (data/<nombre>.json), cada uno con su propio estado y motor.
+# Las rutas /api/... sin nombre usan el dataset predeterminado.
+registro = registro_datasets.RegistroDatasets(
+    directorio=DIRECTORIO_DATOS,
+    memoria_maxima=int(float(os.environ.get('HORARIOS_MEMORIA_MB', 512)) * 2**20),
+    predeterminado=os.environ.get('HORARIOS_DATASET', 'datos_iti_usuario'),
+    al_cargar=restaurar_ultima_solucion
+)
 
 # Cola para mensajes de progreso (para SSE)
 progress_queue = queue.Queue()
 
-# Instancia del optimizador Cython
-optimizador = None
+# Métricas del servidor (expuestas en /api/metrics)
+latencias = HistogramaLatencias()
+optimizaciones = {'total': 0, 'fallidas': 0}
 
 
-def cargar_datos():
-    """Carga los datos desde el archivo JSON"""
-    global estado
-    ruta_json = os.path.join(os.path.dirname(__file__), 'data', 'datos_iti_usuario.json')
-    
+def cargar_datos(estado):
+    """Recarga los datos del dataset desde su JSON"""
     try:
-        with open(ruta_json, 'r', encoding='utf-8') as f:
-            datos = json.load(f)
-            estado['profesores'] = datos.get('profesores', [])
-            estado['materias'] = datos.get('materias', [])
-            estado['grupos'] = datos.get('grupos', [])
-            estado['aulas'] = datos.get('aulas', [])
-            estado['asignaciones'] = datos.get('asignaciones', {})
-            print(f"✓ Datos cargados: {len(estado['profesores'])} profesores, "
-                  f"{len(estado['materias'])} materias, {len(estado['grupos'])} grupos")
-            return True
+        # El snapshot se recompila solo si el JSON cambió
+        registro_datasets.cargar_estado(estado)
+        print(f"✓ Datos cargados ({estado['nombre']}): {len(estado['profesores'])} profesores, "
+              f"{len(estado['materias'])} materias, {len(estado['grupos'])} grupos")
+        return True
     except Exception as e:
         print(f"✗ Error cargando datos: {e}")
         return False
 
 
-def generar_eventos_iniciales():
+def generar_eventos_iniciales(estado):
     """Genera los eventos basados en las asignaciones"""
-    global estado
+    # Con snapshot compilado los eventos ya están precalculados
+    if estado['problema'] is not None:
+        eventos = estado['problema'].eventos_como_dicts()
+        estado['eventos'] = eventos
+        estado['eventos_array'] = np.array(estado['problema'].eventos)
+        estado['version_solucion'] += 1
+        print(f"✓ Generados {len(eventos)} eventos")
+        return eventos
+    
     eventos = []
     evento_id = 0
     
@@ -88,27 +188,140 @@ def generar_eventos_iniciales():
             if not materia:
                 continue
             
-            horas_semanales = materia.get('horas_semanales', 4)
-            
-            # Crear un evento por cada hora semanal
-            for h in range(horas_semanales):
+            # Crear un evento por sesión (una hora o un bloque de horas_bloque horas)
+            for duracion in datos_compilados.bloques_materia(materia):
                 eventos.append({
                     'id': evento_id,
                     'materia_id': materia_id,
                     'profesor_id': profesor_id,
                     'grupo_id': grupo_id,
                     'aula_id': grupo_id % max(1, len(estado['aulas'])),
+                    'duracion': duracion,
                     'slot': {'dia': -1, 'hora': -1}  # Sin asignar
                 })
                 evento_id += 1
     
     estado['eventos'] = eventos
+    estado['eventos_array'] = None
+    estado['version_solucion'] += 1
     print(f"✓ Generados {len(eventos)} eventos")
     return eventos
 
 
+# ==================== MÉTRICAS ====================
+
+@app.before_request
+def iniciar_cronometro():
+    g.inicio_peticion = time.perf_counter()
+
+
+@app.after_request
+def registrar_latencia(response):
+    inicio = getattr(g, 'inicio_peticion', None)
+    if inicio is not None:
+        # Agrupar por plantilla de ruta para no crear una serie por URL
+        ruta = request.url_rule.rule if request.url_rule else 'sin_ruta'
+        latencias.observar(request.method, ruta, response.status_code, time.perf_counter() - inicio)
+    return response
+
+
+@app.route('/api/metrics', methods=['GET'])
+def api_metrics():
+    """Métricas del servidor y del motor en formato de texto de Prometheus"""
+    lineas = latencias.formato_prometheus('horarios_http_request_duration_seconds')
+    
+    lineas.append("# HELP horarios_optimizaciones_total Optimizaciones solicitadas.")
+    lineas.append("# TYPE horarios_optimizaciones_total counter")
+    lineas.append(f"horarios_optimizaciones_total {optimizaciones['total']}")
+    lineas.append("# HELP horarios_optimizaciones_fallidas_total Optimizaciones terminadas con error.")
+    lineas.append("# TYPE horarios_optimizaciones_fallidas_total counter")
+    lineas.append(f"horarios_optimizaciones_fallidas_total {optimizaciones['fallidas']}")
+    
+    cargados = registro.cargados()
+    lineas.append("# HELP horarios_optimizando Optimizaciones en curso.")
+    lineas.append("# TYPE horarios_optimizando gauge")
+    lineas.append(f"horarios_optimizando {sum(1 for e in cargados if e['optimizando'])}")
+    lineas.append("# HELP horarios_datasets_cargados Datasets cargados en memoria.")
+    lineas.append("# TYPE horarios_datasets_cargados gauge")
+    lineas.append(f"horarios_datasets_cargados {len(cargados)}")
+    lineas.append("# HELP horarios_datasets_memoria_bytes Memoria estimada de los datasets cargados.")
+    lineas.append("# TYPE horarios_datasets_memoria_bytes gauge")
+    lineas.append(f"horarios_datasets_memoria_bytes {registro.memoria_total()}")
+    lineas.append("# HELP horarios_datasets_desalojos_total Datasets desalojados por el presupuesto de memoria.")
+    lineas.append("# TYPE horarios_datasets_desalojos_total counter")
+    lineas.append(f"horarios_datasets_desalojos_total {registro.desalojos}")
+    
+    lineas.extend(combinar_familias([
+        metricas_motor(e['optimizador'].get_metricas(),
+                       etiquetas=f'motor="{MOTOR}",dataset="{e["nombre"]}"')
+        for e in cargados if e['optimizador'] is not None
+    ]))
+    
+    return Response("\n".join(lineas) + "\n", mimetype='text/plain; version=0.0.4')
+
+
 # ==================== RUTAS API ====================
 
+def ruta_dataset(regla, **opciones):
+    """
+    Registra una vista en /api<regla> (dataset predeterminado) y en
+    /api/datasets/<nombre><regla>. La vista recibe el estado del dataset
+    como primer argumento; un nombre desconocido responde 404.
+    """
+    def decorador(vista):
+        @functools.wraps(vista)
+        def envoltura(*args, nombre=None, **kwargs):
+            try:
+                estado = registro.obtener(nombre)
+            except KeyError:
+                return jsonify({'success': False, 'message': f'Dataset desconocido: {nombre}'}), 404
+            return vista(estado, *args, **kwargs)
+        
+        app.add_url_rule(f'/api{regla}', view_func=envoltura, **opciones)
+        app.add_url_rule(f'/api/datasets/<nombre>{regla}', view_func=envoltura, **opciones)
+        return envoltura
+    return decorador
+
+
+def optimizacion_exclusiva(vista):
+    """
+    Ejecuta la vista con el dataset marcado como optimizando (409 si ya hay una
+    optimización en curso). La comprobación y la marca se hacen bajo el bloqueo
+    del dataset antes de cualquier otro trabajo: dos corridas a la vez
+    escribirían sobre el mismo eventos_array.
+    """
+    @functools.wraps(vista)
+    def envoltura(estado, *args, **kwargs):
+        with estado['bloqueo']:
+            if estado['optimizando']:
+                return jsonify({
+                    'success': False,
+                    'message': f"Ya hay una optimización en curso para {estado['nombre']}"
+                }), 409
+            estado['optimizando'] = True
+        try:
+            return vista(estado, *args, **kwargs)
+        finally:
+            estado['optimizando'] = False
+    return envoltura
+
+
+def edicion_exclusiva(vista):
+    """
+    Ejecuta la vista bajo el bloqueo del dataset (409 si está optimizando).
+    optimizacion_exclusiva toma el mismo bloqueo para marcar el inicio de una
+    corrida, así que el motor y la edición nunca escriben a la vez el mismo
+    eventos_array; datasets distintos se editan en paralelo.
+    """
+    @functools.wraps(vista)
+    def envoltura(estado, *args, **kwargs):
+        with estado['bloqueo']:
+            if estado['optimizando']:
+                return jsonify({'success': False, 'message': 'Hay una optimización en curso'}), 409
+            return vista(estado, *args, **kwargs)
+    return envoltura
+
+
 @app.route('/')
 def index():
     """Sirve la página principal"""
@@ -127,10 +340,46 @@ def data_files(path):
     return send_from_directory('data', path)
 
 
-@app.route('/api/estado', methods=['GET'])
-def obtener_estado():
+@app.route('/api/datasets', methods=['GET'])
+def api_datasets():
+    """Datasets disponibles y cuáles están cargados en memoria"""
+    return jsonify({
+        'datasets': registro.resumen(),
+        'memoria_estimada': registro.memoria_total(),
+        'memoria_maxima': registro.memoria_maxima
+    })
+
+
+@app.route('/api/datasets', methods=['POST'])
+def api_subir_dataset():
+    """Registra un dataset nuevo: {nombre, datos} con el formato de data/*.json"""
+    data = request.get_json() or {}
+    datos = data.get('datos')
+    if not isinstance(datos, dict):
+        return jsonify({'success': False, 'message': "Falta 'datos' (objeto con profesores, materias...)"}), 400
+    try:
+        registro.registrar(data.get('nombre'), datos)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except FileExistsError:
+        return jsonify({'success': False, 'message': f"Ya existe el dataset {data.get('nombre')}"}), 409
+    return jsonify({'success': True, 'nombre': data['nombre'],
+                    'url': f"/api/datasets/{data['nombre']}"}), 201
+
+
+@app.route('/api/datasets/<nombre>', methods=['DELETE'])
+def api_descargar_dataset(nombre):
+    """Saca un dataset de memoria (el archivo se conserva)"""
+    if registro.descargar(nombre):
+        return jsonify({'success': True})
+    return jsonify({'success': False, 'message': f'{nombre} no está cargado o está optimizando'}), 409
+
+
+@ruta_dataset('/estado', methods=['GET'])
+def obtener_estado(estado):
     """Retorna el estado actual del sistema"""
     return jsonify({
+        'dataset': estado['nombre'],
         'profesores': estado['profesores'],
         'materias': estado['materias'],
         'grupos': estado['grupos'],
@@ -138,22 +387,23 @@ def obtener_estado():
         'asignaciones': estado['asignaciones'],
         'eventos': estado['eventos'],
         'solucion': estado['solucion'],
+        'parametros': configuracion_ajustada(estado),
         'cython_disponible': CYTHON_DISPONIBLE
     })
 
 
-@app.route('/api/cargar_datos', methods=['POST'])
-def api_cargar_datos():
+@ruta_dataset('/cargar_datos', methods=['POST'])
+def api_cargar_datos(estado):
     """Recarga los datos desde el JSON"""
-    if cargar_datos():
+    if cargar_datos(estado):
         return jsonify({'success': True, 'message': 'Datos cargados correctamente'})
     return jsonify({'success': False, 'message': 'Error al cargar datos'}), 500
 
 
-@app.route('/api/generar_eventos', methods=['POST'])
-def api_generar_eventos():
+@ruta_dataset('/generar_eventos', methods=['POST'])
+def api_generar_eventos(estado):
     """Genera los eventos iniciales"""
-    eventos = generar_eventos_iniciales()
+    eventos = generar_eventos_iniciales(estado)
     return jsonify({
         'success': True,
         'num_eventos': len(eventos),
@@ -161,27 +411,79 @@ def api_generar_eventos():
     })
 
 
-@app.route('/api/optimizar', methods=['POST'])
-def api_optimizar():
+def configuracion_ajustada(estado):
+    """Parámetros por defecto del motor: los de autoajuste.py para el dataset o los fijos"""
+    parametros = dict(PARAMETROS_PREDETERMINADOS)
+    guardada = almacen.configuracion(estado['nombre'])
+    if guardada is not None:
+        parametros.update(guardada['parametros'])
+    return parametros
+
+
+@ruta_dataset('/autoajuste', methods=['GET'])
+def api_autoajuste(estado):
+    """Configuración autoajustada del dataset (python autoajuste.py data/<dataset>.json)"""
+    guardada = almacen.configuracion(estado['nombre'])
+    return jsonify({
+        'dataset': estado['nombre'],
+        'autoajustada': guardada is not None,
+        'parametros': configuracion_ajustada(estado),
+        'fecha': guardada['fecha_iso'] if guardada else None,
+        'costo': guardada['costo'] if guardada else None,
+        'mismo_snapshot': (guardada is not None and estado['problema'] is not None
+                           and guardada['hash_datos'] == estado['problema'].hash)
+    })
+
+
+@ruta_dataset('/optimizar', methods=['POST'])
+@optimizacion_exclusiva
+def api_optimizar(estado):
     """
-    Ejecuta el algoritmo de Búsqueda Tabú con Cython
+    Ejecuta la optimización (Cython, o NumPy si no está compilado).
+    'motor' elige el algoritmo: tabu (por defecto), recocido o aceptacion_tardia;
+    'parametros_motor' se pasa al constructor (ej. temperatura_inicial, enfriamiento).
+    Con 'descomponer' cada componente grupo-profesor independiente se resuelve
+    por separado en 'procesos' procesos (descomposicion.OptimizadorDescompuesto).
+    Los datos infactibles (analisis_previo) se rechazan con 422 salvo con
+    'permitir_infactible'; el motor se detiene al alcanzar la cota inferior.
     """
-    global optimizador, estado
-    
     # Parámetros de la solicitud
     data = request.get_json() or {}
-    max_iter = data.get('max_iteraciones', 1000)
-    tamano_tabu = data.get('tamano_tabu', 20)
+    # Lo que no venga en la solicitud sale de la configuración autoajustada del dataset
+    # (si la solicitud pide otro motor, los valores ajustados no aplican)
+    ajuste = configuracion_ajustada(estado)
+    algoritmo = data.get('motor', ajuste['motor'])
+    if algoritmo != ajuste['motor']:
+        ajuste = PARAMETROS_PREDETERMINADOS
+    max_iter = data.get('max_iteraciones', ajuste['max_iteraciones'])
+    tamano_tabu = data.get('tamano_tabu', ajuste['tamano_tabu'])
+    parametros_motor = data.get('parametros_motor') or ajuste['parametros_motor']
+    descomponer = bool(data.get('descomponer', False))
+    parametros = {'max_iteraciones': max_iter, 'tamano_tabu': tamano_tabu,
+                  'descomponer': descomponer, 'parametros_motor': parametros_motor}
     
-    print(f"[DEBUG] Parámetros recibidos: max_iter={max_iter}, tamano_tabu={tamano_tabu}")
+    print(f"[DEBUG] Parámetros recibidos: max_iter={max_iter}, tamano_tabu={tamano_tabu}, motor={algoritmo}")
     
-    estado['optimizando'] = True
-    estado['progreso'] = 0
-    estado['log_messages'] = []
+    if algoritmo not in ALGORITMOS:
+        return jsonify({
+            'success': False,
+            'message': f"Motor desconocido: {algoritmo} (opciones: {', '.join(ALGORITMOS)})"
+        }), 400
+    
+    try:
+        if descomponer:
+            nuevo_optimizador = OptimizadorDescompuesto(max_iter=max_iter, tamano_tabu=tamano_tabu,
+                                                        motor=algoritmo, procesos=data.get('procesos'),
+                                                        **parametros_motor)
+        else:
+            nuevo_optimizador = ALGORITMOS[algoritmo](max_iter=max_iter, tamano_tabu=tamano_tabu,
+                                                      **parametros_motor)
+    except (TypeError, ValueError) as e:
+        return jsonify({'success': False, 'message': f'Parámetros inválidos para {algoritmo}: {e}'}), 400
     
     # Verificar que hay eventos
     if not estado['eventos']:
-        generar_eventos_iniciales()
+        generar_eventos_iniciales(estado)
     
     if not estado['eventos']:
         return jsonify({
@@ -189,127 +491,268 @@ def api_optimizar():
             'message': 'No hay eventos para optimizar'
         }), 400
     
-    if CYTHON_DISPONIBLE:
-        # ========== OPTIMIZACIÓN CON CYTHON ==========
-        try:
-            print(f"[INFO] Iniciando optimización Cython con {len(estado['eventos'])} eventos...")
-            
-            # Crear instancia del optimizador
-            optimizador = BusquedaTabu(
-                max_iter=max_iter,
-                tamano_tabu=tamano_tabu
+    # Cotas y factibilidad en milisegundos, antes de gastar las iteraciones
+    analisis = analizar_estado(estado)
+    for hallazgo in analisis['errores']:
+        print(f"⚠ {estado['nombre']}: {hallazgo['tipo']} {hallazgo['nombre']}: {hallazgo['mensaje']}")
+    if not analisis['factible'] and not data.get('permitir_infactible'):
+        return jsonify({
+            'success': False,
+            'message': (f"Datos infactibles: al menos {analisis['cota_inferior']['conflictos_duros']} "
+                        f"conflictos duros en cualquier horario ({len(analisis['errores'])} recursos "
+                        f"con más horas que la semana)"),
+            'analisis_previo': analisis
+        }), 422
+    
+    optimizaciones['total'] += 1
+    
+    estado['progreso'] = 0
+    estado['log_messages'] = []
+    
+    # ========== OPTIMIZACIÓN (Cython o, sin compilador, NumPy) ==========
+    try:
+        print(f"[INFO] Iniciando optimización {MOTOR} ({algoritmo}) con {len(estado['eventos'])} eventos...")
+        
+        optimizador = estado['optimizador'] = nuevo_optimizador
+        
+        # Inicializar con los datos incluyendo info de grupos (turno matutino/vespertino).
+        # Si ya hay un arreglo de eventos el motor trabaja directamente sobre él.
+        if estado['eventos_array'] is not None:
+            optimizador.inicializar_arreglo(
+                estado['eventos_array'],
+                len(estado['profesores']),
+                len(estado['grupos']),
+                len(estado['aulas']),
+                estado['grupos'],
+                duraciones_de(estado['eventos'])
             )
-            
-            # Inicializar con los datos incluyendo info de grupos
+        else:
             optimizador.inicializar(
                 eventos=estado['eventos'],
                 num_profesores=len(estado['profesores']),
                 num_grupos=len(estado['grupos']),
                 num_aulas=len(estado['aulas']),
-                grupos_info=estado['grupos']  # Para determinar turno matutino/vespertino
-            )
-            
-            # Callbacks para logging
-            def callback_progreso(prog, sol):
-                estado['progreso'] = prog
-                estado['log_messages'].append(
-                    f"[Iter {int(prog * max_iter / 100)}] Conflictos: {sol.get('conflictos_duros', 0)}, "
-                    f"Calidad: {sol.get('calidad', 0):.1f}%"
-                )
-            
-            def callback_log(msg):
-                estado['log_messages'].append(msg)
-                print(msg)
-            
-            # Ejecutar optimización con callbacks y grupos info
-            resultado = optimizador.optimizar(
-                datos_adicionales={},
-                callback_progreso=callback_progreso,
-                callback_log=callback_log,
                 grupos_info=estado['grupos']
             )
-            
-            estado['optimizando'] = False
-            estado['progreso'] = 100
-            
-            # Actualizar eventos con la solución
-            eventos_optimizados = optimizador.obtener_eventos()
-            estado['eventos'] = eventos_optimizados
-            
-            # Guardar solución
-            estado['solucion'] = {
-                'conflictos_duros': resultado['conflictos_duros'],
-                'penalizacion_blandas': resultado['penalizacion_blandas'],
-                'calidad': resultado['calidad'],
-                'iteraciones': resultado.get('iteraciones', max_iter),
-                'tiempo_ejecucion': resultado.get('tiempo_ejecucion', 0),
-                'optimizado_con': 'Cython'
-            }
-            
-            print(f"[INFO] Optimización completada: {resultado['conflictos_duros']} conflictos, "
-                  f"{resultado['calidad']:.1f}% calidad")
-            
-            return jsonify({
-                'success': True,
-                'eventos': eventos_optimizados,
-                'solucion': estado['solucion'],
-                'motor': 'Cython'
+        
+        # Cota inferior y checkpoint periódico (el motor por componentes no los admite)
+        if not descomponer:
+            optimizador.establecer_cota_inferior(analisis['cota_inferior']['conflictos_duros'],
+                                                 analisis['cota_inferior']['penalizacion_blandas'])
+        if not descomponer and INTERVALO_CHECKPOINT > 0:
+            os.makedirs(DIRECTORIO_CHECKPOINTS, exist_ok=True)
+            optimizador.activar_checkpoints(ruta_checkpoint(estado), INTERVALO_CHECKPOINT, {
+                'dataset': estado['nombre'],
+                'hash_datos': estado['problema'].hash if estado['problema'] is not None else None,
+                'algoritmo': algoritmo,
+                'parametros': parametros,
             })
-            
-        except Exception as e:
-            print(f"[ERROR] Error en optimización Cython: {e}")
-            import traceback
-            traceback.print_exc()
-            return jsonify({
-                'success': False,
-                'message': f'Error en Cython: {str(e)}'
-            }), 500
-    else:
-        # ========== FALLBACK: OPTIMIZACIÓN PYTHON ==========
-        print("[WARN] Usando optimización Python (Cython no disponible)")
         
-        resultado = optimizar_python(
-            estado['eventos'],
-            estado['profesores'],
-            estado['grupos'],
-            max_iter,
-            tamano_tabu
-        )
+        callback_progreso, callback_log = callbacks_optimizacion(estado, max_iter)
         
-        estado['eventos'] = resultado['eventos']
-        estado['solucion'] = {
-            'conflictos_duros': resultado['conflictos_duros'],
-            'penalizacion_blandas': resultado['penalizacion_blandas'],
-            'calidad': resultado['calidad'],
-            'iteraciones': max_iter,
-            'optimizado_con': 'Python (fallback)'
-        }
+        # Ejecutar optimización con callbacks y grupos info
+        resultado = optimizador.optimizar(
+            datos_adicionales={},
+            callback_progreso=callback_progreso,
+            callback_log=callback_log,
+            grupos_info=estado['grupos']
+        )
         
-        estado['optimizando'] = False
-        estado['progreso'] = 100
+        respuesta = publicar_resultado(estado, optimizador, resultado, algoritmo, parametros,
+                                       componentes=len(resultado['componentes']) if descomponer else 1)
+        respuesta['analisis_previo'] = analisis
+        return jsonify(respuesta)
         
+    except Exception as e:
+        optimizaciones['fallidas'] += 1
+        print(f"[ERROR] Error en optimización {MOTOR}: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'message': f'Error en {MOTOR}: {str(e)}'
+        }), 500
+
+
+def callbacks_optimizacion(estado, max_iter):
+    """Callbacks de progreso y de log que publican en el estado del dataset"""
+    def callback_progreso(prog, sol):
+        estado['progreso'] = prog
+        estado['log_messages'].append(
+            f"[Iter {int(prog * max_iter / 100)}] Conflictos: {sol.get('conflictos_duros', 0)}, "
+            f"Calidad: {sol.get('calidad', 0):.1f}%"
+        )
+    
+    def callback_log(msg):
+        estado['log_messages'].append(msg)
+        print(msg)
+    
+    return callback_progreso, callback_log
+
+
+def publicar_resultado(estado, optimizador, resultado, algoritmo, parametros, componentes=1):
+    """
+    Publica la solución del motor en el estado del dataset, la registra en el
+    almacén y borra el checkpoint de la corrida. Retorna la respuesta de la API.
+    El dataset sigue marcado como optimizando hasta que la vista termina
+    (optimizacion_exclusiva): antes de eso el estado está a medio publicar.
+    """
+    estado['progreso'] = 100
+    
+    # Actualizar eventos con la solución y sus aulas
+    estado['eventos_array'] = optimizador.obtener_arreglo()
+    duraciones = optimizador.obtener_duraciones()
+    aulas = asignar_aulas(estado, duraciones)
+    eventos_optimizados = arreglo_a_eventos(estado['eventos_array'], duraciones)
+    estado['eventos'] = eventos_optimizados
+    estado['version_solucion'] += 1
+    
+    # Guardar solución
+    estado['solucion'] = {
+        'conflictos_duros': resultado['conflictos_duros'],
+        'penalizacion_blandas': resultado['penalizacion_blandas'],
+        'calidad': resultado['calidad'],
+        'iteraciones': resultado.get('iteraciones', parametros['max_iteraciones']),
+        'tiempo_ejecucion': resultado.get('tiempo_ejecucion', 0),
+        'optimizado_con': MOTOR,
+        'algoritmo': algoritmo,
+        'componentes': componentes,
+        'aulas': aulas
+    }
+    
+    # Registrar la ejecución en el almacén (escritura en segundo plano)
+    estado['solucion']['ejecucion_id'] = almacen.guardar(
+        estado['nombre'], estado['eventos_array'][:, 5:7], estado['solucion'],
+        hash_datos=estado['problema'].hash if estado['problema'] is not None else None,
+        motor=MOTOR, algoritmo=algoritmo, parametros=parametros,
+        metricas=optimizador.get_metricas()
+    )
+    
+    # La corrida terminó: su checkpoint ya no hace falta
+    if os.path.exists(ruta_checkpoint(estado)):
+        os.remove(ruta_checkpoint(estado))
+    
+    print(f"[INFO] Optimización completada: {resultado['conflictos_duros']} conflictos, "
+          f"{resultado['calidad']:.1f}% calidad")
+    
+    return {
+        'success': True,
+        'eventos': eventos_optimizados,
+        'solucion': estado['solucion'],
+        'motor': MOTOR,
+        'algoritmo': algoritmo,
+    }
+
+
+def analizar_estado(estado):
+    """Análisis previo (analisis_previo.analizar) de los eventos actuales del dataset"""
+    if not estado['eventos'] and estado['problema'] is not None:
+        return analisis_previo.analizar_problema(estado['problema'])
+    # Durante una optimización el motor modifica eventos_array en sitio
+    eventos = estado['eventos_array']
+    if eventos is None or estado['optimizando']:
+        eventos = eventos_a_arreglo(estado['eventos'])
+    return analisis_previo.analizar(eventos, duraciones_de(estado['eventos']),
+                                    estado['profesores'], estado['grupos'])
+
+
+@ruta_dataset('/analisis_previo', methods=['GET'])
+def api_analisis_previo(estado):
+    """Cotas inferiores, factibilidad y avisos de capacidad de los datos actuales (sin optimizar)"""
+    return jsonify({'success': True, **analizar_estado(estado)})
+
+
+@ruta_dataset('/reanudar', methods=['POST'])
+@optimizacion_exclusiva
+def api_reanudar(estado):
+    """
+    Continúa desde su último checkpoint una optimización interrumpida (por
+    ejemplo, por un reinicio del servidor). Responde como /optimizar.
+    """
+    ruta = ruta_checkpoint(estado)
+    if not os.path.exists(ruta):
+        return jsonify({
+            'success': False,
+            'message': f"No hay una optimización interrumpida de {estado['nombre']}"
+        }), 404
+    
+    try:
+        optimizador = cargar_checkpoint(ruta)
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'Checkpoint ilegible ({ruta}): {e}'}), 409
+    
+    metadatos = optimizador.metadatos_checkpoint or {}
+    hash_datos = estado['problema'].hash if estado['problema'] is not None else None
+    if metadatos.get('hash_datos') != hash_datos:
+        return jsonify({
+            'success': False,
+            'message': 'El checkpoint es de otra versión de los datos'
+        }), 409
+    
+    algoritmo = metadatos['algoritmo']
+    parametros = metadatos['parametros']
+    
+    optimizaciones['total'] += 1
+    estado['progreso'] = 0
+    estado['log_messages'] = []
+    
+    try:
+        print(f"[INFO] Reanudando optimización {MOTOR} ({algoritmo}) de {estado['nombre']}...")
+        estado['optimizador'] = optimizador
+        callback_progreso, callback_log = callbacks_optimizacion(estado, parametros['max_iteraciones'])
+        resultado = optimizador.reanudar(callback_progreso=callback_progreso, callback_log=callback_log)
+        return jsonify(publicar_resultado(estado, optimizador, resultado, algoritmo, parametros))
+    
+    except Exception as e:
+        optimizaciones['fallidas'] += 1
+        print(f"[ERROR] Error al reanudar la optimización {MOTOR}: {e}")
+        import traceback
+        traceback.print_exc()
         return jsonify({
-            'success': True,
-            'eventos': resultado['eventos'],
-            'solucion': estado['solucion'],
-            'motor': 'Python'
-        })
+            'success': False,
+            'message': f'Error en {MOTOR}: {str(e)}'
+        }), 500
 
 
-@app.route('/api/progreso', methods=['GET'])
-def api_progreso():
+@ruta_dataset('/asignar_aulas', methods=['POST'])
+@edicion_exclusiva
+def api_asignar_aulas(estado):
+    """
+    Vuelve a asignar aulas sin choques a los horarios actuales (por ejemplo,
+    después de mover eventos a mano). Reporta los eventos que quedaron sin aula.
+    """
+    if not estado['eventos']:
+        return jsonify({'success': False, 'message': 'No hay eventos generados'}), 400
+    
+    if estado['eventos_array'] is None:
+        estado['eventos_array'] = eventos_a_arreglo(estado['eventos'])
+    duraciones = duraciones_de(estado['eventos'])
+    aulas = asignar_aulas(estado, duraciones)
+    estado['eventos'] = arreglo_a_eventos(estado['eventos_array'], duraciones)
+    if estado['solucion'] is not None:
+        estado['solucion']['aulas'] = aulas
+    estado['version_solucion'] += 1
+    
+    return jsonify({'success': True, 'eventos': estado['eventos'], 'aulas': aulas})
+
+
+@ruta_dataset('/progreso', methods=['GET'])
+def api_progreso(estado):
     """Retorna el estado actual del progreso de optimización"""
     return jsonify({
         'optimizando': estado['optimizando'],
         'progreso': estado['progreso'],
         'log': estado['log_messages'][-20:] if estado['log_messages'] else [],
-        'solucion': estado['solucion']
+        'solucion': estado['solucion'],
+        'reanudable': not estado['optimizando'] and os.path.exists(ruta_checkpoint(estado))
     })
 
 
 def optimizar_python(eventos, profesores, grupos, max_iter, tamano_tabu):
     """
-    Optimización de fallback en Python puro
+    Asignación constructiva greedy en Python puro.
+    Ya no se usa como fallback del servidor (ver busqueda_tabu_numpy);
+    se conserva como referencia en benchmarks/benchmark_motores.py
     """
     import random
     
@@ -387,20 +830,397 @@ def optimizar_python(eventos, profesores, grupos, max_iter, tamano_tabu):
     }
 
 
-@app.route('/api/horario/<int:grupo_id>', methods=['GET'])
-def obtener_horario_grupo(grupo_id):
+@ruta_dataset('/grafo', methods=['GET'])
+def api_grafo(estado):
+    """
+    Grafo de conflictos precalculado (lista de aristas + CSR con grados y choques).
+    Parámetros: vista=materias|recursos, grupo, profesor, semestre
+    """
+    vista = request.args.get('vista', 'materias')
+    filtros = (request.args.get('grupo', type=int),
+               request.args.get('profesor', type=int),
+               request.args.get('semestre', type=int))
+    
+    if vista not in grafo_conflictos.VISTAS:
+        return jsonify({'success': False, 'message': f'Vista desconocida: {vista}'}), 400
+    
+    cache_grafo = estado['cache_grafo']
+    if cache_grafo['version'] != estado['version_solucion']:
+        cache_grafo['version'] = estado['version_solucion']
+        cache_grafo['entradas'] = {}
+    
+    clave = (vista,) + filtros
+    grafo = cache_grafo['entradas'].get(clave)
+    if grafo is None:
+        # Durante una optimización el motor modifica eventos_array en sitio
+        eventos = estado['eventos_array']
+        if eventos is None or estado['optimizando']:
+            eventos = eventos_a_arreglo(estado['eventos'])
+        # Una fila por hora ocupada: los bloques de varias horas cuentan cada hora
+        eventos = expandir_bloques(eventos, duraciones_de(estado['eventos']))
+        grafo = grafo_conflictos.construir_grafo(
+            eventos, estado['profesores'], estado['materias'], estado['grupos'],
+            vista, *filtros
+        )
+        grafo['version'] = estado['version_solucion']
+        cache_grafo['entradas'][clave] = grafo
+    
+    return jsonify(grafo)
+
+
+@ruta_dataset('/disponibilidad', methods=['GET'])
+def api_disponibilidad(estado):
+    """
+    Horas libres en común para un conjunto de recursos, de menor a mayor impacto en huecos de los grupos.
+    Parámetros: profesor, grupo, aula (repetibles), duracion, dias=0,2,4, hora_min, hora_max, limite
+    """
+    try:
+        conjunto = {}
+        for tipo, parametro in (('profesores', 'profesor'), ('grupos', 'grupo'), ('aulas', 'aula')):
+            ids = [int(i) for i in request.args.getlist(parametro)]
+            desconocidos = set(ids) - {r['id'] for r in estado[tipo]}
+            if desconocidos:
+                raise ValueError(f"Id de {parametro} desconocido: {', '.join(map(str, sorted(desconocidos)))}")
+            conjunto[tipo] = ids
+        if not any(conjunto.values()):
+            raise ValueError('Indica al menos un profesor, grupo o aula')
+        dias = request.args.get('dias')
+        opciones = {
+            'duracion': request.args.get('duracion', 1, type=int),
+            'dias': [int(d) for d in dias.split(',')] if dias else None,
+            'hora_min': request.args.get('hora_min', 0, type=int),
+            'hora_max': request.args.get('hora_max', disponibilidad.HORAS_DIA - 1, type=int),
+            'limite': request.args.get('limite', type=int)
+        }
+
+        indice = estado['disponibilidad']
+        if indice is None or indice.version != estado['version_solucion']:
+            # Durante una optimización el motor modifica eventos_array en sitio
+            eventos = estado['eventos_array']
+            if eventos is None or estado['optimizando']:
+                eventos = eventos_a_arreglo(estado['eventos'])
+            eventos = expandir_bloques(eventos, duraciones_de(estado['eventos']))
+            tamano = lambda tipo: max((r['id'] for r in estado[tipo]), default=-1) + 1
+            indice = disponibilidad.Disponibilidad(
+                eventos, tamano('profesores'), tamano('grupos'), tamano('aulas'),
+                version=estado['version_solucion']
+            )
+            estado['disponibilidad'] = indice
+
+        libres = indice.libres(**conjunto, **opciones)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    return jsonify({
+        'success': True,
+        'version': indice.version,
+        'total': len(libres),
+        'libres': libres
+    })
+
+
+@ruta_dataset('/analitica', methods=['GET'])
+def api_analitica(estado):
+    """
+    Utilización de la solución: carga por slot y, por tipo de recurso, horas
+    semanales frente al máximo, carga diaria, histograma y matriz recurso x slot.
+    Parámetros: tipo (repetible: profesores, grupos, aulas), matrices=0 para omitir las matrices
+    """
+    tipos = request.args.getlist('tipo') or None
+    desconocidos = set(tipos or ()) - set(analitica.COLUMNAS)
+    if desconocidos:
+        return jsonify({'success': False,
+                        'message': f"Tipo desconocido: {', '.join(sorted(desconocidos))}"}), 400
+
+    resumen = estado['analitica']
+    if resumen is None or resumen.version != estado['version_solucion']:
+        # Durante una optimización el motor modifica eventos_array en sitio
+        eventos = estado['eventos_array']
+        if eventos is None or estado['optimizando']:
+            eventos = eventos_a_arreglo(estado['eventos'])
+        eventos = expandir_bloques(eventos, duraciones_de(estado['eventos']))
+        resumen = analitica.Analitica(
+            eventos, estado['profesores'], estado['grupos'], estado['aulas'],
+            version=estado['version_solucion']
+        )
+        estado['analitica'] = resumen
+
+    return jsonify({'success': True,
+                    **resumen.como_dict(tipos, matriz=request.args.get('matrices', '1') != '0')})
+
+
+# ==================== HISTORIAL DE SOLUCIONES ====================
+
+def _fecha_minima():
+    """Filtro temporal de la petición: ?dias=N o ?desde=AAAA-MM-DD[THH:MM]"""
+    if request.args.get('dias') is not None:
+        return time.time() - float(request.args['dias']) * 86400
+    if request.args.get('desde'):
+        return datetime.fromisoformat(request.args['desde']).timestamp()
+    return None
+
+
+@ruta_dataset('/soluciones', methods=['GET'])
+def api_soluciones(estado):
+    """
+    Ejecuciones guardadas del dataset (sin slots).
+    Parámetros: orden=fecha|calidad, limite, dias o desde
+    """
+    try:
+        ejecuciones = almacen.listar(estado['nombre'], _fecha_minima(),
+                                     orden=request.args.get('orden', 'fecha'),
+                                     limite=request.args.get('limite', 50, type=int))
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    return jsonify({'dataset': estado['nombre'], 'ejecuciones': ejecuciones})
+
+
+@ruta_dataset('/soluciones/mejor', methods=['GET'])
+def api_mejor_solucion(estado):
+    """Mejor ejecución del dataset (ej. ?dias=30 para el último mes)"""
+    try:
+        mejor = almacen.mejor(estado['nombre'], _fecha_minima())
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    if mejor is None:
+        return jsonify({'success': False, 'message': 'No hay soluciones guardadas'}), 404
+    return jsonify(mejor)
+
+
+@ruta_dataset('/soluciones/comparar', methods=['GET'])
+def api_comparar_soluciones(estado):
+    """Compara dos ejecuciones: ?a=<id>&b=<id>"""
+    comparacion = almacen.comparar(request.args.get('a'), request.args.get('b'))
+    if comparacion is None or {comparacion['a']['dataset'], comparacion['b']['dataset']} != {estado['nombre']}:
+        return jsonify({'success': False, 'message': 'Ejecución no encontrada'}), 404
+    return jsonify(comparacion)
+
+
+@ruta_dataset('/soluciones/<id_ejecucion>', methods=['GET'])
+def api_solucion(estado, id_ejecucion):
+    """Detalle de una ejecución (sin slots)"""
+    ejecucion = almacen.obtener(id_ejecucion, con_slots=False)
+    if ejecucion is None or ejecucion['dataset'] != estado['nombre']:
+        return jsonify({'success': False, 'message': 'Ejecución no encontrada'}), 404
+    return jsonify(ejecucion)
+
+
+@ruta_dataset('/soluciones/<id_ejecucion>/restaurar', methods=['POST'])
+@edicion_exclusiva
+def api_restaurar_solucion(estado, id_ejecucion):
+    """Vuelve a poner una solución guardada como la actual, sin re-optimizar"""
+    ejecucion = almacen.obtener(id_ejecucion)
+    if ejecucion is None or ejecucion['dataset'] != estado['nombre']:
+        return jsonify({'success': False, 'message': 'Ejecución no encontrada'}), 404
+    if not aplicar_solucion_guardada(estado, ejecucion):
+        return jsonify({
+            'success': False,
+            'message': 'La ejecución corresponde a otra versión de los datos'
+        }), 409
+    return jsonify({'success': True, 'eventos': estado['eventos'], 'solucion': estado['solucion']})
+
+
+# ==================== EDICIÓN INTERACTIVA ====================
+
+def motor_edicion(estado):
+    """
+    Motor de edición del dataset, con la ocupación de la solución actual.
+
+    Trabaja sobre estado['eventos_array'] sin copiarlo y se reconstruye solo
+    cuando la solución cambió por otra vía (optimizar, restaurar, recargar).
+    """
+    edicion = estado['edicion']
+    if edicion is not None and edicion['version'] == estado['version_solucion'] \
+            and edicion['arreglo'] is estado['eventos_array']:
+        return edicion
+
+    if estado['eventos_array'] is None:
+        estado['eventos_array'] = eventos_a_arreglo(estado['eventos'])
+    motor = ALGORITMOS['tabu'](1, 1, 0)
+    motor.inicializar_arreglo(estado['eventos_array'], len(estado['profesores']),
+                              len(estado['grupos']), len(estado['aulas']), estado['grupos'],
+                              duraciones_de(estado['eventos']))
+    # El motor puede haber convertido el arreglo (dtype u orden): usar el suyo
+    estado['eventos_array'] = motor.obtener_arreglo()
+    estadisticas = motor.get_estadisticas()
+    edicion = estado['edicion'] = {
+        'motor': motor,
+        'arreglo': estado['eventos_array'],
+        'version': estado['version_solucion'],
+        'conflictos_duros': estadisticas['conflictos_duros'],
+        'penalizacion_blandas': estadisticas['conflictos_blandos']
+    }
+    return edicion
+
+
+def leer_movimientos(estado, data):
+    """
+    Movimientos de la petición -> (ids de evento, filas de eventos_array, slots).
+    Cada movimiento es {"evento": id, "dia": d, "hora": h} o {"evento": id, "slot": s}.
+
+    Raises:
+        ValueError: formato inválido, destino fuera de rango o evento inexistente
+    """
+    movimientos = data.get('movimientos')
+    if not isinstance(movimientos, list) or not movimientos:
+        raise ValueError("Se esperaba 'movimientos': [{evento, dia, hora}, ...]")
+    try:
+        ids = np.array([int(m['evento']) for m in movimientos], dtype=np.int64)
+        destinos = [(None, None, int(m['slot'])) if 'slot' in m else (int(m['dia']), int(m['hora']), None)
+                    for m in movimientos]
+    except (KeyError, TypeError, ValueError, OverflowError):
+        raise ValueError("Cada movimiento necesita 'evento' y 'dia'/'hora' (o 'slot') enteros")
+
+    # Rango antes de convertir: el motor usa int32 y un valor fuera de rango se evaluaría como otro slot
+    dias = NUM_SLOTS // HORAS_DIA
+    for dia, hora, slot in destinos:
+        if slot is not None and not 0 <= slot < NUM_SLOTS:
+            raise ValueError(f"Slot fuera de rango: {slot} (0-{NUM_SLOTS - 1})")
+        if dia is not None and not 0 <= dia < dias:
+            raise ValueError(f"Día fuera de rango: {dia} (0-{dias - 1})")
+        if hora is not None and not 0 <= hora < HORAS_DIA:
+            raise ValueError(f"Hora fuera de rango: {hora} (0-{HORAS_DIA - 1})")
+    slots = np.array([slot if slot is not None else dia * HORAS_DIA + hora for dia, hora, slot in destinos],
+                     dtype=np.int64)
+
+    # Los eventos se identifican por id; normalmente id == fila
+    columna_ids = estado['eventos_array'][:, 0]
+    directos = (ids >= 0) & (ids < len(columna_ids))
+    filas = np.where(directos, ids, 0)
+    if not (directos & (columna_ids[filas] == ids)).all():
+        orden = np.argsort(columna_ids, kind='stable')
+        posiciones = np.minimum(np.searchsorted(columna_ids, ids, sorter=orden), len(orden) - 1)
+        filas = orden[posiciones]
+        faltantes = ids[columna_ids[filas] != ids]
+        if len(faltantes):
+            raise ValueError(f"Evento inexistente: {int(faltantes[0])}")
+    return ids, filas, slots
+
+
+@ruta_dataset('/movimientos/evaluar', methods=['POST'])
+@edicion_exclusiva
+def api_evaluar_movimientos(estado):
+    """
+    Evalúa un lote de movimientos candidatos sin aplicarlos: para cada uno, el
+    cambio en conflictos duros y huecos respecto a la solución actual.
+    Cuerpo: {"movimientos": [{"evento": id, "dia": d, "hora": h}, ...]}
+    """
+    if not estado['eventos']:
+        return jsonify({'success': False, 'message': 'No hay eventos'}), 400
+
+    try:
+        edicion = motor_edicion(estado)
+        ids, filas, slots = leer_movimientos(estado, request.get_json() or {})
+        delta_conf, delta_blandos = edicion['motor'].evaluar_movimientos(filas, slots)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    conflictos = edicion['conflictos_duros'] + delta_conf.astype(np.int64)
+    blandos = edicion['penalizacion_blandas'] + delta_blandos.astype(np.int64)
+    return jsonify({
+        'success': True,
+        'version': estado['version_solucion'],
+        'conflictos_duros': edicion['conflictos_duros'],
+        'penalizacion_blandas': edicion['penalizacion_blandas'],
+        'resultados': [{
+            'evento': int(ids[k]),
+            'dia': int(slots[k] // 14),
+            'hora': int(slots[k] % 14),
+            'delta_conflictos': int(delta_conf[k]),
+            'delta_blandas': int(delta_blandos[k]),
+            'conflictos_duros': int(conflictos[k]),
+            'penalizacion_blandas': int(blandos[k]),
+            'calidad': calcular_calidad(conflictos[k], blandos[k])
+        } for k in range(len(ids))]
+    })
+
+
+@ruta_dataset('/movimientos/aplicar', methods=['POST'])
+@edicion_exclusiva
+def api_aplicar_movimientos(estado):
+    """
+    Aplica movimientos en orden con actualización incremental de la ocupación.
+    Las aulas de los días tocados se vuelven a asignar y la solución editada se
+    guarda en el almacén (algoritmo 'edicion'), así sobrevive a un reinicio.
+    Cuerpo: {"movimientos": [...], "version": n (opcional: 409 si la solución cambió)}
+    """
+    data = request.get_json() or {}
+    if not estado['eventos']:
+        return jsonify({'success': False, 'message': 'No hay eventos'}), 400
+
+    if data.get('version') is not None and data['version'] != estado['version_solucion']:
+        return jsonify({
+            'success': False,
+            'message': 'La solución cambió desde la evaluación',
+            'version': estado['version_solucion']
+        }), 409
+    try:
+        edicion = motor_edicion(estado)
+        ids, filas, slots = leer_movimientos(estado, data)
+        # Validar el lote completo antes de mover nada
+        edicion['motor'].evaluar_movimientos(filas, slots)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    # Días de origen y de destino: ahí cambian las aulas libres
+    arreglo = estado['eventos_array']
+    dias = {int(d) for d in arreglo[filas, 5] if d >= 0} | {int(d) for d in slots // 14}
+    
+    aplicados = []
+    for evento_id, fila, slot in zip(ids.tolist(), filas.tolist(), slots.tolist()):
+        delta_conf, delta_blandos = edicion['motor'].aplicar_movimiento(fila, slot)
+        edicion['conflictos_duros'] += delta_conf
+        edicion['penalizacion_blandas'] += delta_blandos
+        estado['eventos'][fila]['slot'] = {'dia': slot // 14, 'hora': slot % 14}
+        aplicados.append({'evento': evento_id, 'dia': slot // 14, 'hora': slot % 14,
+                          'delta_conflictos': int(delta_conf), 'delta_blandas': int(delta_blandos)})
+
+    duraciones = duraciones_de(estado['eventos'])
+    aulas = asignar_aulas(estado, duraciones, dias)
+    for fila in np.flatnonzero(np.isin(arreglo[:, 5], list(dias))).tolist():
+        estado['eventos'][fila]['aula_id'] = int(arreglo[fila, 4])
+
+    estado['version_solucion'] += 1
+    edicion['version'] = estado['version_solucion']
+
+    solucion = estado['solucion'] = dict(estado['solucion'] or {})
+    solucion.update({
+        'conflictos_duros': edicion['conflictos_duros'],
+        'penalizacion_blandas': edicion['penalizacion_blandas'],
+        'calidad': calcular_calidad(edicion['conflictos_duros'], edicion['penalizacion_blandas']),
+        'aulas': aulas,
+        'editado': True
+    })
+    # Sin guardar, recargar el dataset restauraría la solución previa a la edición
+    solucion['ejecucion_id'] = almacen.guardar(
+        estado['nombre'], arreglo[:, 5:7],
+        {**solucion, 'iteraciones': 0, 'tiempo_ejecucion': 0},
+        hash_datos=estado['problema'].hash if estado['problema'] is not None else None,
+        motor=MOTOR, algoritmo='edicion',
+        parametros={'movimientos': aplicados, 'base': solucion.get('ejecucion_id')}
+    )
+    return jsonify({
+        'success': True,
+        'version': estado['version_solucion'],
+        'aplicados': aplicados,
+        'solucion': solucion
+    })
+
+
+@ruta_dataset('/horario/<int:grupo_id>', methods=['GET'])
+def obtener_horario_grupo(estado, grupo_id):
     """Obtiene el horario de un grupo específico"""
     eventos_grupo = [e for e in estado['eventos'] if e['grupo_id'] == grupo_id and e['slot']['dia'] >= 0]
     
-    # Organizar por día y hora
+    # Organizar por día y hora (un bloque ocupa todas sus horas)
     horario = {}
     for e in eventos_grupo:
-        key = f"{e['slot']['dia']}-{e['slot']['hora']}"
-        horario[key] = {
-            'materia_id': e['materia_id'],
-            'profesor_id': e['profesor_id'],
-            'aula_id': e['aula_id']
-        }
+        for hora in range(e['slot']['hora'], e['slot']['hora'] + e.get('duracion', 1)):
+            horario[f"{e['slot']['dia']}-{hora}"] = {
+                'materia_id': e['materia_id'],
+                'profesor_id': e['profesor_id'],
+                'aula_id': e['aula_id']
+            }
     
     return jsonify({
         'grupo_id': grupo_id,
@@ -409,8 +1229,8 @@ def obtener_horario_grupo(grupo_id):
     })
 
 
-@app.route('/api/exportar', methods=['GET'])
-def exportar_solucion():
+@ruta_dataset('/exportar', methods=['GET'])
+def exportar_solucion(estado):
     """Exporta la solución actual en JSON"""
     return jsonify({
         'profesores': estado['profesores'],
@@ -421,11 +1241,54 @@ def exportar_solucion():
         'solucion': estado['solucion'],
         'metadata': {
             'version': '1.0',
-            'generado_con': 'Sistema Horarios ITI - Cython'
+            'dataset': estado['nombre'],
+            'generado_con': f'Sistema Horarios ITI - {MOTOR}'
         }
     })
 
 
+@ruta_dataset('/exportar/<vista>/<formato>', methods=['GET'])
+def exportar_horarios(estado, vista, formato):
+    """
+    Horarios por grupo, profesor o aula en CSV, iCalendar o XLSX, enviados por partes.
+    Ruta: /exportar/<grupos|profesores|aulas>/<csv|ics|xlsx>
+    Parámetros: id (repetible; por defecto todos), inicio=AAAA-MM-DD y semanas (solo ics)
+    """
+    if vista not in exportacion.VISTAS or formato not in exportacion.FORMATOS:
+        return jsonify({
+            'success': False,
+            'message': f"Exportación desconocida: {vista}/{formato} "
+                       f"(vistas: {', '.join(exportacion.VISTAS)}; formatos: {', '.join(exportacion.FORMATOS)})"
+        }), 400
+
+    opciones = {}
+    try:
+        ids = [int(i) for i in request.args.getlist('id')] or None
+        if formato == 'ics':
+            if request.args.get('inicio'):
+                opciones['inicio'] = datetime.strptime(request.args['inicio'], '%Y-%m-%d').date()
+            opciones['semanas'] = request.args.get('semanas', exportacion.SEMANAS_PREDETERMINADAS, type=int)
+            opciones['dominio'] = f"{estado['nombre']}.horarios-iti"
+            opciones['version'] = estado['version_solucion']
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    # Copia de los eventos: la respuesta se sigue enviando aunque empiece otra optimización
+    if estado['eventos_array'] is not None and not estado['optimizando']:
+        eventos = np.array(estado['eventos_array'])
+    else:
+        eventos = eventos_a_arreglo(estado['eventos'])
+    eventos = expandir_bloques(eventos, duraciones_de(estado['eventos']))
+    nombres = exportacion.Nombres(estado['profesores'], estado['materias'], estado['grupos'], estado['aulas'])
+
+    tipo, extension = exportacion.FORMATOS[formato]
+    generador = exportacion.GENERADORES[formato](eventos, nombres, vista, ids, **opciones)
+    nombre_archivo = f"horarios_{estado['nombre']}_{vista}.{extension}"
+    return Response(stream_with_context(generador), mimetype=tipo, headers={
+        'Content-Disposition': f'attachment; filename="{nombre_archivo}"'
+    })
+
+
 # ==================== INICIALIZACIÓN ====================
 
 if __name__ == '__main__':
@@ -438,13 +1301,14 @@ if __name__ == '__main__':
     print("  Sistema de Horarios ITI - API Server")
     print("=" * 60)
     
-    # Cargar datos iniciales
-    cargar_datos()
+    # Cargar el dataset predeterminado (los demás se cargan al pedirlos)
+    registro.obtener()
     
     # Iniciar servidor
     print(f"\n🚀 Servidor iniciado en http://localhost:{port}")
     print(f"   Interfaz web: http://localhost:{port}")
     print(f"   API: http://localhost:{port}/api/estado")
+    print(f"   Datasets: http://localhost:{port}/api/datasets (presupuesto: {registro.memoria_maxima / 2**20:.0f} MB)")
     print("\nPresiona Ctrl+C para detener\n")
     
     app.run(host='0.0.0.0', port=port, debug=True)
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Asignación de aulas posterior a la optimización (emparejamiento por slot).
+
+Los motores solo mueven eventos en el tiempo; el aula inicial es ingenua
+(grupo_id % aulas o la primera con capacidad) y no sabe qué más hay en esa
+aula a esa hora. asignar_aulas() resuelve, para cada uno de los 70 slots, un
+emparejamiento bipartito de costo mínimo (método húngaro) entre los eventos
+que empiezan en ese slot y las aulas libres que los admiten (capacidad >=
+alumnos del grupo, laboratorio si la materia lo requiere), así que no quedan
+choques de aula.
+
+El costo de una pareja evento-aula es la capacidad sobrante, más
+PENALIZACION_LABORATORIO si un laboratorio se usa para una materia que no lo
+requiere y PENALIZACION_CAMBIO si el aula no es la que el evento ya tenía. Un
+bloque de varias horas conserva su aula en todas sus horas, así que los slots
+de un mismo día se resuelven en orden; los días son independientes y, con
+EVENTOS_MINIMOS_POOL eventos o más, se reparten en un pool de procesos (por
+debajo el arranque del pool cuesta más que los emparejamientos). Los eventos sin aula posible quedan con
+aula_id -1 y se reportan en 'sin_aula'. Con 'dias' solo se resuelven esos días
+(ej. los que tocó un movimiento manual) y el resto conserva sus aulas.
+"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from busqueda_tabu_numpy import HORAS_DIA
+
+DIAS = 5
+
+PENALIZACION_LABORATORIO = 50  # Laboratorio ocupado por una materia que no lo requiere
+PENALIZACION_CAMBIO = 10       # Cambiar el aula que el evento ya tenía
+
+EVENTOS_MINIMOS_POOL = 2000
+
+MOTIVO_NO_ELEGIBLE = 'ninguna aula cumple capacidad o laboratorio'
+MOTIVO_OCUPADAS = 'aulas elegibles ocupadas en ese horario'
+
+
+def asignacion_minima(costo):
+    """
+    Asignación de costo mínimo (método húngaro con potenciales, O(n^2 m)).
+
+    Args:
+        costo: Matriz (n, m) con n <= m
+
+    Returns:
+        Arreglo (n,) con la columna asignada a cada fila
+    """
+    n, m = costo.shape
+    if n > m:
+        raise ValueError("La matriz de costos debe tener al menos tantas columnas como filas")
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    fila_de = np.zeros(m + 1, dtype=np.int64)  # fila (1..n) asignada a cada columna, 0 = libre
+    camino = np.zeros(m + 1, dtype=np.int64)
+
+    for i in range(1, n + 1):
+        fila_de[0] = i
+        j0 = 0
+        minimo = np.full(m + 1, np.inf)
+        usada = np.zeros(m + 1, dtype=bool)
+        # Camino de costo reducido mínimo desde la fila i hasta una columna libre
+        while True:
+            usada[j0] = True
+            i0 = fila_de[j0]
+            libres = ~usada[1:]
+            reducido = costo[i0 - 1] - u[i0] - v[1:]
+            mejora = libres & (reducido < minimo[1:])
+            minimo[1:][mejora] = reducido[mejora]
+            camino[1:][mejora] = j0
+            candidatos = np.where(libres, minimo[1:], np.inf)
+            j1 = int(candidatos.argmin()) + 1
+            delta = candidatos[j1 - 1]
+            u[fila_de[usada]] += delta
+            v[usada] -= delta
+            minimo[1:][libres] -= delta
+            j0 = j1
+            if fila_de[j0] == 0:
+                break
+        # Invertir el camino aumentante
+        while j0:
+            j1 = camino[j0]
+            fila_de[j0] = fila_de[j1]
+            j0 = j1
+
+    columna = np.empty(n, dtype=np.int64)
+    asignadas = np.flatnonzero(fila_de[1:]) + 1
+    columna[fila_de[asignadas] - 1] = asignadas - 1
+    return columna
+
+
+def _asignar_dia(tarea):
+    """
+    Aulas de los eventos de un día, slot por slot en orden de hora.
+
+    Returns:
+        Arreglo (n,) con el índice de aula de cada evento (-1 = sin aula)
+    """
+    horas, duraciones, costos, elegible = tarea['horas'], tarea['duraciones'], tarea['costos'], tarea['elegible']
+    num_aulas = costos.shape[1]
+    asignada = np.full(len(horas), -1, dtype=np.int64)
+    ocupada_hasta = np.zeros(num_aulas, dtype=np.int64)  # primera hora libre de cada aula
+
+    for hora in range(HORAS_DIA):
+        eventos = np.flatnonzero(horas == hora)
+        libres = np.flatnonzero(ocupada_hasta <= hora)
+        if not len(eventos) or not len(libres):
+            continue
+        sub = costos[np.ix_(eventos, libres)]
+        admite = elegible[np.ix_(eventos, libres)]
+        # Sin pareja = costo grande: se minimiza primero el número de eventos sin aula
+        grande = len(eventos) * (sub[admite].max(initial=0) + 1) + 1
+        matriz = np.hstack([np.where(admite, sub, grande), np.full((len(eventos), len(eventos)), grande)])
+        columna = asignacion_minima(matriz)
+        for fila, (k, c) in enumerate(zip(eventos, columna)):
+            if c < len(libres) and admite[fila, c]:
+                asignada[k] = libres[c]
+                ocupada_hasta[libres[c]] = hora + duraciones[k]
+    return asignada
+
+
+def asignar_aulas(eventos, duraciones, materias, grupos, aulas, procesos=None, dias=None):
+    """
+    Asigna aula a cada evento con horario sin choques de aula.
+
+    Args:
+        eventos: Arreglo (n, 7) [id, materia_id, profesor_id, grupo_id, aula_id, dia, hora]
+                 (un evento por sesión; los bloques no se expanden)
+        duraciones: Horas de cada evento (None = todos de 1 hora)
+        materias, grupos, aulas: Listas del dataset (requiere_laboratorio,
+                                 num_estudiantes, capacidad, es_laboratorio)
+        procesos: Procesos del pool (None = uno por día si hay EVENTOS_MINIMOS_POOL
+                  eventos o más, 1 = sin pool)
+        dias: Días a resolver (None = todos); los demás conservan su aula actual
+
+    Returns:
+        dict con 'aula_id' (n,) int32 (-1 = sin aula), 'sin_aula' (eventos
+        sin aula con su motivo), 'cambios', 'costo' y 'tiempo'
+    """
+    inicio = time.perf_counter()
+    eventos = np.asarray(eventos)
+    n = len(eventos)
+    duraciones = np.ones(n, dtype=np.int64) if duraciones is None else np.asarray(duraciones, dtype=np.int64)
+    resultado = eventos[:, 4].astype(np.int32)
+
+    ids_aula = np.array([a['id'] for a in aulas], dtype=np.int32)
+    capacidad = np.array([a.get('capacidad', 0) for a in aulas], dtype=np.int64)
+    laboratorio = np.array([bool(a.get('es_laboratorio', False)) for a in aulas])
+    alumnos = {g['id']: g.get('num_estudiantes', 0) for g in grupos}
+    requiere = {m['id']: bool(m.get('requiere_laboratorio', False)) for m in materias}
+    estudiantes = np.array([alumnos.get(int(g), 0) for g in eventos[:, 3]], dtype=np.int64)
+    requiere_lab = np.array([requiere.get(int(m), False) for m in eventos[:, 1]], dtype=bool)
+
+    # Elegibilidad y costo de cada pareja (n, aulas)
+    elegible = (capacidad[None, :] >= estudiantes[:, None]) & (laboratorio[None, :] | ~requiere_lab[:, None])
+    costos = (capacidad[None, :] - estudiantes[:, None]
+              + PENALIZACION_LABORATORIO * (laboratorio[None, :] & ~requiere_lab[:, None])
+              + PENALIZACION_CAMBIO * (ids_aula[None, :] != eventos[:, 4:5]))
+
+    programados = (eventos[:, 5] >= 0) & (eventos[:, 6] >= 0)
+    indices_dia = [np.flatnonzero(programados & (eventos[:, 5] == d)) for d in range(DIAS)]
+    resolver = [d for d in range(DIAS) if dias is None or d in dias]
+    tareas = [{'horas': eventos[indices_dia[d], 6], 'duraciones': duraciones[indices_dia[d]],
+               'costos': costos[indices_dia[d]], 'elegible': elegible[indices_dia[d]]} for d in resolver]
+
+    # Días que no se resuelven: índice de su aula actual (-1 = sin aula)
+    indice_aula = {int(a): k for k, a in enumerate(ids_aula)}
+    asignadas = [np.array([indice_aula.get(int(a), -1) for a in eventos[idx, 4]], dtype=np.int64)
+                 for idx in indices_dia]
+    if len(aulas) == 0:
+        resueltas = [np.full(len(t['horas']), -1, dtype=np.int64) for t in tareas]
+    elif procesos == 1 or (procesos is None and n < EVENTOS_MINIMOS_POOL):
+        resueltas = [_asignar_dia(t) for t in tareas]
+    else:
+        with ProcessPoolExecutor(max_workers=procesos or len(tareas) or 1) as pool:
+            resueltas = list(pool.map(_asignar_dia, tareas))
+    for d, asignada in zip(resolver, resueltas):
+        asignadas[d] = asignada
+
+    sin_aula = []
+    costo = 0
+    for idx, asignada in zip(indices_dia, asignadas):
+        con_aula = asignada >= 0
+        resultado[idx[con_aula]] = ids_aula[asignada[con_aula]]
+        costo += int(costos[idx[con_aula], asignada[con_aula]].sum())
+        resultado[idx[~con_aula]] = -1
+        for k in idx[~con_aula]:
+            sin_aula.append({
+                'evento_id': int(eventos[k, 0]),
+                'materia_id': int(eventos[k, 1]),
+                'grupo_id': int(eventos[k, 3]),
+                'dia': int(eventos[k, 5]),
+                'hora': int(eventos[k, 6]),
+                'motivo': MOTIVO_OCUPADAS if elegible[k].any() else MOTIVO_NO_ELEGIBLE,
+            })
+
+    return {
+        'aula_id': resultado,
+        'sin_aula': sin_aula,
+        'cambios': int((resultado != eventos[:, 4]).sum()),
+        'costo': costo,
+        'tiempo': time.perf_counter() - inicio,
+    }
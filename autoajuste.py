@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Autoajuste de los parámetros del motor por dataset (successive halving).
+
+Cada configuración candidata (motor + tamano_tabu + parametros_motor) se
+evalúa con las mismas semillas en un pool de procesos. En cada ronda las
+iteraciones se multiplican por eta y solo sigue la mejor 1/eta de las
+configuraciones, así que casi todo el presupuesto se gasta en las
+prometedoras. El costo de una corrida es PESO_CONFLICTO * conflictos +
+penalización blanda; entre configuraciones empatadas gana la más rápida.
+
+max_iteraciones de la ganadora es el presupuesto más pequeño con el que ya
+alcanzó su mejor costo medio: más iteraciones no mejoraban el horario.
+
+Las corridas parten de la asignación constructiva de optimizar() sobre los
+eventos del snapshot, igual que /api/optimizar. La configuración se guarda en
+el almacén (AlmacenSoluciones.guardar_configuracion) y api_server la usa como
+valor por defecto de /api/optimizar y del formulario de la interfaz web.
+
+Uso:
+    python autoajuste.py data/datos_iti.json data/datos_iti_usuario.json -j 4
+    python autoajuste.py 'data/*.json' --motores tabu,recocido --semillas 5
+"""
+
+import argparse
+import contextlib
+import glob
+import itertools
+import math
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+try:
+    from cython_modules.busqueda_tabu import MOTORES
+except ImportError:
+    from busqueda_tabu_numpy import MOTORES
+
+import datos_compilados
+from almacen import AlmacenSoluciones
+from busqueda_tabu_numpy import PESO_CONFLICTO
+
+DIRECTORIO_DATOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+# Valores candidatos por motor (producto cartesiano); tamano_tabu solo influye en 'tabu'
+ESPACIO = {
+    'tabu': {
+        'tamano_tabu': [5, 10, 20, 30, 50],
+        'candidatos_por_iteracion': [1, 8, 32],
+    },
+    'recocido': {
+        'temperatura_inicial': [2.0, 10.0, 50.0],
+        'enfriamiento': [0.99, 0.995, 0.999],
+    },
+    'aceptacion_tardia': {
+        'longitud_historia': [50, 200, 1000],
+    },
+}
+
+TAMANO_TABU_PREDETERMINADO = 20
+
+
+def configuraciones(motores):
+    """Lista de configuraciones {motor, tamano_tabu, parametros_motor} del espacio de búsqueda"""
+    candidatas = []
+    for motor in motores:
+        if motor not in ESPACIO:
+            raise ValueError(f"Motor desconocido: {motor} (opciones: {', '.join(ESPACIO)})")
+        nombres = list(ESPACIO[motor])
+        for valores in itertools.product(*(ESPACIO[motor][n] for n in nombres)):
+            parametros = dict(zip(nombres, valores))
+            candidatas.append({
+                'motor': motor,
+                'tamano_tabu': parametros.pop('tamano_tabu', TAMANO_TABU_PREDETERMINADO),
+                'parametros_motor': parametros,
+            })
+    return candidatas
+
+
+def presupuestos(iteraciones_min, iteraciones_max, eta):
+    """Iteraciones de cada ronda: iteraciones_max / eta^k, de menor a mayor, sin bajar de iteraciones_min"""
+    if iteraciones_min < 1 or iteraciones_max < iteraciones_min:
+        raise ValueError("Se requiere 1 <= iteraciones_min <= iteraciones_max")
+    if eta < 2:
+        raise ValueError("eta debe ser al menos 2")
+    rondas = [iteraciones_max]
+    while rondas[-1] // eta >= iteraciones_min:
+        rondas.append(rondas[-1] // eta)
+    return rondas[::-1]
+
+
+# ==================== EVALUACIÓN (procesos del pool) ====================
+
+# Snapshots abiertos por proceso: {ruta: ProblemaCompilado}
+_PROBLEMAS = {}
+
+
+def _evaluar(tarea):
+    """Una corrida de una configuración con una semilla y un presupuesto"""
+    problema = _PROBLEMAS.get(tarea['ruta'])
+    if problema is None:
+        problema = _PROBLEMAS[tarea['ruta']] = datos_compilados.cargar_json(tarea['ruta'])
+    datos = problema.metadatos
+    config = tarea['config']
+
+    # Los procesos del pool no escriben en la consola compartida
+    with open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo):
+        motor = MOTORES[config['motor']](tarea['max_iter'], config['tamano_tabu'], tarea['semilla'],
+                                         **config['parametros_motor'])
+        motor.inicializar_arreglo(np.array(problema.eventos), len(datos['profesores']),
+                                  len(datos['grupos']), len(datos['aulas']), datos['grupos'],
+                                  problema.duraciones)
+        inicio = time.perf_counter()
+        resultado = motor.optimizar(grupos_info=datos['grupos'])
+        tiempo = time.perf_counter() - inicio
+
+    return {
+        'costo': PESO_CONFLICTO * resultado['conflictos_duros'] + resultado['penalizacion_blandas'],
+        'conflictos_duros': resultado['conflictos_duros'],
+        'penalizacion_blandas': resultado['penalizacion_blandas'],
+        'tiempo': tiempo,
+    }
+
+
+# ==================== SUCCESSIVE HALVING ====================
+
+def autoajustar(ruta, motores=('tabu', 'recocido', 'aceptacion_tardia'), semillas=3,
+                iteraciones_min=100, iteraciones_max=2000, eta=3, procesos=None, semilla=0,
+                callback_log=print):
+    """
+    Busca la mejor configuración del motor para un dataset.
+
+    Args:
+        ruta: Dataset en formato data/*.json
+        motores: Motores a considerar (claves de ESPACIO)
+        semillas: Corridas por configuración y ronda (semilla, semilla + 1, ...)
+        iteraciones_min, iteraciones_max: Presupuesto de la primera y la última ronda
+        eta: Factor de reducción (sigue 1/eta de las configuraciones por ronda)
+        procesos: Procesos del pool (None = número de CPUs)
+
+    Returns:
+        dict con 'mejor' ({motor, max_iteraciones, tamano_tabu, parametros_motor}),
+        'costo', 'rondas' y tiempos
+    """
+    if semillas < 1:
+        raise ValueError("semillas debe ser al menos 1")
+    candidatas = configuraciones(motores)
+    rondas = presupuestos(iteraciones_min, iteraciones_max, eta)
+    nombre = os.path.splitext(os.path.basename(ruta))[0]
+    problema = datos_compilados.cargar_json(ruta)
+
+    callback_log(f"[INFO] Autoajuste de {nombre}: {len(candidatas)} configuraciones, "
+                 f"rondas de {rondas} iteraciones, {semillas} semillas")
+
+    tiempo_inicio = time.perf_counter()
+    historial = {i: [] for i in range(len(candidatas))}  # por configuración: resumen de cada ronda
+    vivas = list(range(len(candidatas)))
+    resumen_rondas = []
+    evaluaciones = 0
+
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        for numero, max_iter in enumerate(rondas):
+            tareas = [{'ruta': ruta, 'config': candidatas[i], 'max_iter': max_iter, 'semilla': semilla + s}
+                      for i in vivas for s in range(semillas)]
+            resultados = list(pool.map(_evaluar, tareas))
+            evaluaciones += len(tareas)
+
+            for k, i in enumerate(vivas):
+                corridas = resultados[k * semillas:(k + 1) * semillas]
+                historial[i].append({
+                    'max_iteraciones': max_iter,
+                    'costo': statistics.mean(r['costo'] for r in corridas),
+                    'conflictos_duros': statistics.mean(r['conflictos_duros'] for r in corridas),
+                    'penalizacion_blandas': statistics.mean(r['penalizacion_blandas'] for r in corridas),
+                    'tiempo': statistics.mean(r['tiempo'] for r in corridas),
+                })
+
+            vivas.sort(key=lambda i: (historial[i][-1]['costo'], historial[i][-1]['tiempo']))
+            mejor = historial[vivas[0]][-1]
+            resumen_rondas.append({'max_iteraciones': max_iter, 'configuraciones': len(vivas),
+                                   'mejor_costo': mejor['costo']})
+            callback_log(f"  Ronda {numero + 1}/{len(rondas)}: {len(vivas)} configuraciones x "
+                         f"{max_iter} iteraciones, mejor costo {mejor['costo']:.1f} ({mejor['tiempo']:.2f}s)")
+            if numero < len(rondas) - 1:
+                vivas = vivas[:max(1, math.ceil(len(vivas) / eta))]
+
+    ganadora = vivas[0]
+    # Presupuesto más pequeño con el que la ganadora ya alcanzó su mejor costo medio
+    mejor_costo = min(r['costo'] for r in historial[ganadora])
+    suficiente = next(r for r in historial[ganadora] if r['costo'] <= mejor_costo)
+    config = dict(candidatas[ganadora], max_iteraciones=suficiente['max_iteraciones'])
+
+    return {
+        'dataset': nombre,
+        'ruta': ruta,
+        'hash_datos': problema.hash,
+        'mejor': config,
+        'costo': suficiente['costo'],
+        'conflictos_duros': suficiente['conflictos_duros'],
+        'penalizacion_blandas': suficiente['penalizacion_blandas'],
+        'tiempo_por_corrida': suficiente['tiempo'],
+        'historial_mejor': historial[ganadora],
+        'rondas': resumen_rondas,
+        'semillas': semillas,
+        'evaluaciones': evaluaciones,
+        'tiempo_total': time.perf_counter() - tiempo_inicio,
+    }
+
+
+# ==================== CLI ====================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Autoajuste de parámetros del motor por dataset')
+    parser.add_argument('archivos', nargs='+', help="Datasets (rutas o patrones, ej. 'data/*.json')")
+    parser.add_argument('--motores', default=','.join(ESPACIO),
+                        help=f"Motores a considerar, separados por comas (default: {','.join(ESPACIO)})")
+    parser.add_argument('-j', '--procesos', type=int, default=None,
+                        help='Procesos en paralelo (default: número de CPUs)')
+    parser.add_argument('--semillas', type=int, default=3, help='Corridas por configuración y ronda')
+    parser.add_argument('--semilla', type=int, default=0, help='Semilla base')
+    parser.add_argument('--iteraciones-min', type=int, default=100, help='Iteraciones de la primera ronda')
+    parser.add_argument('--iteraciones', type=int, default=2000, help='Iteraciones de la última ronda')
+    parser.add_argument('--eta', type=int, default=3, help='Factor de reducción por ronda')
+    parser.add_argument('--almacen', default=os.environ.get('HORARIOS_ALMACEN',
+                                                            os.path.join(DIRECTORIO_DATOS, 'horarios.sqlite3')),
+                        help='Base SQLite donde guardar la mejor configuración')
+    parser.add_argument('--sin-guardar', action='store_true', help='No guardar en el almacén')
+    args = parser.parse_args(argv)
+
+    rutas = []
+    for patron in args.archivos:
+        coincidencias = sorted(glob.glob(patron)) if glob.has_magic(patron) else [patron]
+        rutas.extend(r for r in coincidencias if r not in rutas)
+    if not rutas:
+        print("[ERROR] Ningún archivo de datos coincide con los patrones indicados")
+        return 1
+
+    almacen = None if args.sin_guardar else AlmacenSoluciones(args.almacen)
+    try:
+        for ruta in rutas:
+            resumen = autoajustar(ruta, [m.strip() for m in args.motores.split(',') if m.strip()],
+                                  args.semillas, args.iteraciones_min, args.iteraciones, args.eta,
+                                  args.procesos, args.semilla)
+            mejor = resumen['mejor']
+            print(f"[✓] {resumen['dataset']}: motor={mejor['motor']} max_iteraciones={mejor['max_iteraciones']} "
+                  f"tamano_tabu={mejor['tamano_tabu']} {mejor['parametros_motor']} -> costo {resumen['costo']:.1f} "
+                  f"({resumen['evaluaciones']} corridas, {resumen['tiempo_total']:.1f}s)")
+            if almacen is not None:
+                almacen.guardar_configuracion(resumen['dataset'], mejor, resumen['costo'],
+                                              resumen['hash_datos'], resumen)
+    except ValueError as e:
+        print(f"[ERROR] {e}")
+        return 1
+    finally:
+        if almacen is not None:
+            almacen.cerrar()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+Benchmark de los motores de optimización de horarios.
+
+Mide iteraciones por segundo, tiempo hasta cero conflictos duros,
+calidad final y memoria pico para cada motor sobre las instancias
+de data/*.json y sobre instancias sintéticas.
+
+Uso:
+    python benchmarks/benchmark_motores.py -o resultados_bench.json
+    python benchmarks/benchmark_motores.py --baseline benchmarks/baseline.json
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+DIR_BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DIR_BASE)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+import datos_compilados
+from datos_compilados import bloques_materia
+from instancias import PRESETS, generar_instancia
+
+# Métricas comparadas contra el baseline: (nombre, mayor_es_mejor)
+METRICAS_COMPARADAS = [
+    ('iteraciones_por_segundo', True),
+    ('tiempo_hasta_factible', False),
+    ('calidad', True),
+    ('memoria_pico_kb', False),
+]
+
+
+# ==================== INSTANCIAS ====================
+
+def cargar_instancias(incluir_datos=True, presets=None, semilla=0):
+    """Retorna una lista de (nombre, datos) con las instancias del benchmark"""
+    instancias = []
+
+    if incluir_datos:
+        for ruta in sorted(glob.glob(os.path.join(DIR_BASE, 'data', '*.json'))):
+            with open(ruta, 'r', encoding='utf-8') as f:
+                instancias.append((os.path.splitext(os.path.basename(ruta))[0], json.load(f)))
+
+    for preset in presets or []:
+        instancias.append((f"sint_{preset}", generar_instancia(semilla=semilla, **PRESETS[preset])))
+
+    return instancias
+
+
+def cargar_snapshots():
+    """Retorna una lista de (nombre, ProblemaCompilado) con los snapshots de data/*.json"""
+    return [(os.path.splitext(os.path.basename(ruta))[0], datos_compilados.cargar_json(ruta))
+            for ruta in sorted(glob.glob(os.path.join(DIR_BASE, 'data', '*.json')))]
+
+
+def construir_eventos(datos):
+    """Un evento sin asignar por cada sesión semanal (igual que api_server.generar_eventos_iniciales)"""
+    materias = {m['id']: m for m in datos.get('materias', [])}
+    num_aulas = max(1, len(datos.get('aulas', [])))
+    eventos = []
+
+    for grupo_id_str, materias_grupo in datos.get('asignaciones', {}).items():
+        grupo_id = int(grupo_id_str)
+        for materia_id_str, profesor_id in materias_grupo.items():
+            materia = materias.get(int(materia_id_str))
+            if not materia:
+                continue
+            for duracion in bloques_materia(materia):
+                eventos.append({
+                    'id': len(eventos),
+                    'materia_id': materia['id'],
+                    'profesor_id': profesor_id,
+                    'grupo_id': grupo_id,
+                    'aula_id': grupo_id % num_aulas,
+                    'duracion': duracion,
+                    'slot': {'dia': -1, 'hora': -1}
+                })
+
+    return eventos
+
+
+# ==================== MOTORES ====================
+
+def ejecutar_cython(datos, eventos, max_iter, tamano_tabu, semilla):
+    """Ejecuta BusquedaTabu (Cython) y retorna las métricas de la corrida"""
+    from cython_modules.busqueda_tabu import BusquedaTabu
+    return _ejecutar_tabu(BusquedaTabu, datos, eventos, max_iter, tamano_tabu, semilla)
+
+
+def ejecutar_numpy(datos, eventos, max_iter, tamano_tabu, semilla):
+    """Ejecuta BusquedaTabuNumpy y retorna las métricas de la corrida"""
+    from busqueda_tabu_numpy import BusquedaTabuNumpy
+    return _ejecutar_tabu(BusquedaTabuNumpy, datos, eventos, max_iter, tamano_tabu, semilla)
+
+
+def _ejecutar_tabu(clase_motor, datos, eventos, max_iter, tamano_tabu, semilla):
+    """Corrida común para los motores con la API de BusquedaTabu"""
+    factible = {'tiempo': None}
+    inicio = time.perf_counter()
+
+    def callback_progreso(progreso, solucion):
+        if factible['tiempo'] is None and solucion.get('conflictos_duros', 1) == 0:
+            factible['tiempo'] = time.perf_counter() - inicio
+
+    optimizador = clase_motor(max_iter, tamano_tabu, semilla)
+    optimizador.inicializar(eventos, len(datos['profesores']), len(datos['grupos']),
+                            len(datos['aulas']), datos['grupos'])
+    resultado = optimizador.optimizar({}, callback_progreso, None, datos['grupos'])
+    tiempo = time.perf_counter() - inicio
+
+    if factible['tiempo'] is None and resultado['conflictos_duros'] == 0:
+        factible['tiempo'] = tiempo
+
+    return {
+        'tiempo_total': tiempo,
+        'iteraciones': resultado['iteraciones'],
+        'iteraciones_por_segundo': resultado['iteraciones'] / tiempo if tiempo > 0 else None,
+        'tiempo_hasta_factible': factible['tiempo'],
+        'conflictos_duros': resultado['conflictos_duros'],
+        'penalizacion_blandas': resultado['penalizacion_blandas'],
+        'calidad': resultado['calidad']
+    }
+
+
+def ejecutar_python(datos, eventos, max_iter, tamano_tabu, semilla):
+    """Ejecuta el constructivo greedy optimizar_python de api_server (referencia)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        from api_server import optimizar_python
+
+    inicio = time.perf_counter()
+    resultado = optimizar_python(eventos, datos['profesores'], datos['grupos'], max_iter, tamano_tabu)
+    tiempo = time.perf_counter() - inicio
+
+    # Constructivo de una sola pasada: no reporta iteraciones
+    return {
+        'tiempo_total': tiempo,
+        'iteraciones': None,
+        'iteraciones_por_segundo': None,
+        'tiempo_hasta_factible': tiempo if resultado['conflictos_duros'] == 0 else None,
+        'conflictos_duros': resultado['conflictos_duros'],
+        'penalizacion_blandas': resultado['penalizacion_blandas'],
+        'calidad': resultado['calidad']
+    }
+
+
+MOTORES = {
+    'cython': ejecutar_cython,
+    'numpy': ejecutar_numpy,
+    'python': ejecutar_python,
+}
+
+
+def motor_disponible(nombre):
+    """Comprueba que las dependencias del motor se puedan importar"""
+    try:
+        if nombre == 'cython':
+            import cython_modules.busqueda_tabu  # noqa: F401
+        elif nombre == 'numpy':
+            import busqueda_tabu_numpy  # noqa: F401
+        elif nombre == 'python':
+            with contextlib.redirect_stdout(io.StringIO()):
+                import api_server  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+# ==================== MEDICIÓN ====================
+
+def medir(motor, datos, max_iter, tamano_tabu, repeticiones, semilla, medir_memoria=True):
+    """
+    Ejecuta un motor varias veces y agrega las métricas (mediana de tiempos,
+    mejor calidad). La memoria pico se mide en una corrida aparte porque
+    tracemalloc distorsiona los tiempos.
+    """
+    ejecutar = MOTORES[motor]
+    corridas = []
+
+    for r in range(repeticiones):
+        corridas.append(ejecutar(datos, construir_eventos(datos), max_iter, tamano_tabu, semilla + r))
+
+    def mediana(clave):
+        valores = [c[clave] for c in corridas if c[clave] is not None]
+        return statistics.median(valores) if valores else None
+
+    resultado = {
+        'repeticiones': repeticiones,
+        'num_eventos': len(construir_eventos(datos)),
+        'tiempo_total': mediana('tiempo_total'),
+        'iteraciones': corridas[0]['iteraciones'],
+        'iteraciones_por_segundo': mediana('iteraciones_por_segundo'),
+        'tiempo_hasta_factible': mediana('tiempo_hasta_factible'),
+        'factibles': sum(1 for c in corridas if c['conflictos_duros'] == 0),
+        'conflictos_duros': min(c['conflictos_duros'] for c in corridas),
+        'penalizacion_blandas': min(c['penalizacion_blandas'] for c in corridas),
+        'calidad': max(c['calidad'] for c in corridas),
+        'memoria_pico_kb': None
+    }
+
+    if medir_memoria:
+        eventos = construir_eventos(datos)
+        tracemalloc.start()
+        try:
+            ejecutar(datos, eventos, max_iter, tamano_tabu, semilla)
+            _, pico = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        resultado['memoria_pico_kb'] = pico / 1024.0
+
+    return resultado
+
+
+def verificar_objetivo(datos, max_iter, tamano_tabu, semilla, problema=None):
+    """
+    Comprueba que Cython y NumPy calculan el mismo objetivo sobre la misma
+    solución: se resuelve con cada motor y la solución resultante se evalúa
+    también con el otro. Con problema (ProblemaCompilado) los motores parten
+    de los eventos y las duraciones mapeadas del snapshot, como autoajuste.
+
+    Returns:
+        Lista de discrepancias (vacía si los motores coinciden)
+    """
+    from cython_modules.busqueda_tabu import BusquedaTabu
+    from busqueda_tabu_numpy import BusquedaTabuNumpy
+
+    args = (len(datos['profesores']), len(datos['grupos']), len(datos['aulas']), datos['grupos'])
+    discrepancias = []
+
+    for origen, destino in ((BusquedaTabu, BusquedaTabuNumpy), (BusquedaTabuNumpy, BusquedaTabu)):
+        motor = origen(max_iter, tamano_tabu, semilla)
+        if problema is None:
+            motor.inicializar(construir_eventos(datos), *args)
+        else:
+            motor.inicializar_arreglo(np.array(problema.eventos), *args, problema.duraciones)
+        motor.optimizar({}, None, None, datos['grupos'])
+
+        evaluador = destino(max_iter, tamano_tabu, semilla)
+        evaluador.inicializar_arreglo(motor.obtener_arreglo().copy(), *args,
+                                      duraciones=motor.obtener_duraciones())
+
+        a, b = motor.get_estadisticas(), evaluador.get_estadisticas()
+        for clave in ('conflictos_duros', 'conflictos_blandos', 'calidad'):
+            if a[clave] != b[clave]:
+                discrepancias.append({
+                    'solucion_de': origen.__name__,
+                    'metrica': clave,
+                    origen.__name__: a[clave],
+                    destino.__name__: b[clave]
+                })
+
+    return discrepancias
+
+
+def comparar_con_baseline(resultados, baseline):
+    """Calcula la variación relativa de cada métrica respecto al baseline"""
+    referencia = {(r['instancia'], r['motor']): r for r in baseline.get('resultados', [])}
+    comparacion = []
+
+    for r in resultados:
+        base = referencia.get((r['instancia'], r['motor']))
+        if base is None:
+            continue
+        fila = {'instancia': r['instancia'], 'motor': r['motor']}
+        for metrica, mayor_es_mejor in METRICAS_COMPARADAS:
+            actual, anterior = r.get(metrica), base.get(metrica)
+            if actual is None or anterior is None or anterior == 0:
+                fila[metrica] = None
+                continue
+            cambio = (actual - anterior) / abs(anterior)
+            fila[metrica] = {
+                'baseline': anterior,
+                'actual': actual,
+                'cambio': cambio,
+                'mejora': cambio > 0 if mayor_es_mejor else cambio < 0
+            }
+        comparacion.append(fila)
+
+    return comparacion
+
+
+def imprimir_tabla(resultados):
+    """Imprime un resumen legible en stderr (stdout queda para el JSON)"""
+    print("=" * 100, file=sys.stderr)
+    print(f"{'Instancia':<22} {'Motor':<8} {'Eventos':>8} {'It/s':>10} {'T.factible':>11} "
+          f"{'Duros':>6} {'Calidad':>8} {'Mem (KB)':>10}", file=sys.stderr)
+    print("-" * 100, file=sys.stderr)
+    for r in resultados:
+        it_s = f"{r['iteraciones_por_segundo']:.0f}" if r['iteraciones_por_segundo'] else '-'
+        t_fact = f"{r['tiempo_hasta_factible']:.3f}s" if r['tiempo_hasta_factible'] is not None else '-'
+        memoria = f"{r['memoria_pico_kb']:.0f}" if r['memoria_pico_kb'] is not None else '-'
+        print(f"{r['instancia']:<22} {r['motor']:<8} {r['num_eventos']:>8} {it_s:>10} {t_fact:>11} "
+              f"{r['conflictos_duros']:>6} {r['calidad']:>7.1f}% {memoria:>10}", file=sys.stderr)
+    print("=" * 100, file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark de motores de horarios')
+    parser.add_argument('--motores', nargs='+', default=list(MOTORES), choices=list(MOTORES))
+    parser.add_argument('--presets', nargs='*', default=['pequena', 'mediana'], choices=list(PRESETS),
+                        help='Instancias sintéticas a incluir')
+    parser.add_argument('--sin-datos', action='store_true', help='No incluir data/*.json')
+    parser.add_argument('--iteraciones', type=int, default=1000)
+    parser.add_argument('--tabu', type=int, default=20)
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--sin-memoria', action='store_true', help='Omitir la medición de memoria pico')
+    parser.add_argument('-o', '--salida', default=None, help='Archivo JSON de resultados (default: stdout)')
+    parser.add_argument('--baseline', default=None, help='JSON de una corrida anterior para comparar')
+    parser.add_argument('--verificar', action='store_true',
+                        help='Solo comprobar que Cython y NumPy dan el mismo objetivo sobre la misma solución')
+    args = parser.parse_args(argv)
+
+    if args.verificar:
+        if not (motor_disponible('cython') and motor_disponible('numpy')):
+            print("[ERROR] La verificación requiere los motores Cython y NumPy", file=sys.stderr)
+            return 2
+        fallos = 0
+        verificaciones = [(nombre, datos, None)
+                          for nombre, datos in cargar_instancias(not args.sin_datos, args.presets, args.semilla)]
+        if not args.sin_datos:
+            verificaciones += [(f"{nombre} (snapshot)", problema.metadatos, problema)
+                               for nombre, problema in cargar_snapshots()]
+        for nombre, datos, problema in verificaciones:
+            discrepancias = verificar_objetivo(datos, args.iteraciones, args.tabu, args.semilla, problema)
+            fallos += len(discrepancias)
+            print(f"[{'OK' if not discrepancias else 'FALLO'}] {nombre}", file=sys.stderr)
+            for d in discrepancias:
+                print(f"    {d}", file=sys.stderr)
+        return 1 if fallos else 0
+
+    motores = [m for m in args.motores if motor_disponible(m)]
+    for m in set(args.motores) - set(motores):
+        print(f"[WARN] Motor '{m}' no disponible, se omite", file=sys.stderr)
+
+    resultados = []
+    for nombre, datos in cargar_instancias(not args.sin_datos, args.presets, args.semilla):
+        for motor in motores:
+            print(f"[INFO] {nombre} / {motor}...", file=sys.stderr)
+            medicion = medir(motor, datos, args.iteraciones, args.tabu, args.repeticiones,
+                             args.semilla, not args.sin_memoria)
+            resultados.append({'instancia': nombre, 'motor': motor, **medicion})
+
+    salida = {
+        'fecha': datetime.now().isoformat(),
+        'plataforma': {
+            'python': platform.python_version(),
+            'sistema': platform.platform(),
+            'procesador': platform.processor()
+        },
+        'parametros': {
+            'iteraciones': args.iteraciones,
+            'tamano_tabu': args.tabu,
+            'repeticiones': args.repeticiones,
+            'semilla': args.semilla
+        },
+        'resultados': resultados
+    }
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            salida['comparacion'] = comparar_con_baseline(resultados, json.load(f))
+
+    imprimir_tabla(resultados)
+
+    texto = json.dumps(salida, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            f.write(texto)
+        print(f"[✓] Resultados guardados en {args.salida}", file=sys.stderr)
+    else:
+        print(texto)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Prueba de carga de la API (api_server.py) con usuarios virtuales concurrentes.
+
+Cada usuario virtual es un hilo que, hasta agotar la duración, elige una
+operación según la mezcla configurada y espera una pausa entre peticiones:
+
+    lectura:   GET /estado, /horario/<grupo>, /grafo?vista=recursos, /soluciones
+    sondeo:    GET /progreso (lo que hace la interfaz durante una optimización)
+    optimizar: POST /optimizar (un 409 por optimización en curso no es error)
+
+Reporta en JSON el rendimiento (peticiones/s), latencias p50/p95/p99 y tasa de
+errores por ruta y en total. Con --baseline compara contra una corrida anterior
+y con --max-error / --max-p95 termina con código 1 si se superan los umbrales.
+
+Uso:
+    python api_server.py 5001 &
+    python benchmarks/carga_api.py --usuarios 50 --duracion 30 -o carga.json
+    python benchmarks/carga_api.py --iniciar-servidor --mezcla lectura=60,sondeo=35,optimizar=5
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+
+DIR_BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MEZCLA_PREDETERMINADA = 'lectura=70,sondeo=25,optimizar=5'
+
+# Peticiones de lectura: (método, plantilla de ruta para el reporte, ruta real)
+LECTURAS = (
+    ('GET', '/estado', lambda azar, grupos: '/estado'),
+    ('GET', '/horario/<grupo>', lambda azar, grupos: f"/horario/{azar.choice(grupos)}"),
+    ('GET', '/grafo', lambda azar, grupos: '/grafo?vista=recursos'),
+    ('GET', '/soluciones', lambda azar, grupos: '/soluciones?limite=10'),
+)
+
+# Métricas comparadas contra el baseline: (nombre, mayor_es_mejor)
+METRICAS_COMPARADAS = [
+    ('peticiones_por_segundo', True),
+    ('p50', False),
+    ('p95', False),
+    ('p99', False),
+    ('tasa_error', False),
+]
+
+
+def leer_mezcla(texto):
+    """'lectura=70,sondeo=25,optimizar=5' -> {operación: peso}"""
+    mezcla = {}
+    for parte in texto.split(','):
+        nombre, _, peso = parte.partition('=')
+        nombre = nombre.strip()
+        if nombre not in ('lectura', 'sondeo', 'optimizar'):
+            raise argparse.ArgumentTypeError(f"Operación desconocida en la mezcla: {nombre!r}")
+        try:
+            mezcla[nombre] = float(peso)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Peso inválido para {nombre}: {peso!r}")
+    if sum(mezcla.values()) <= 0:
+        raise argparse.ArgumentTypeError("La mezcla necesita al menos un peso positivo")
+    return mezcla
+
+
+def percentil(ordenados, p):
+    """Percentil p (0-100) de una lista ordenada, por rango más cercano"""
+    if not ordenados:
+        return None
+    k = max(0, min(len(ordenados) - 1, math.ceil(p / 100 * len(ordenados)) - 1))
+    return ordenados[k]
+
+
+# ==================== SERVIDOR LOCAL ====================
+
+def esperar_servidor(base, timeout):
+    """Espera a que /estado responda; retorna False si no lo hace a tiempo"""
+    limite = time.time() + timeout
+    while time.time() < limite:
+        try:
+            with urllib.request.urlopen(f"{base}/estado", timeout=5) as respuesta:
+                if respuesta.status == 200:
+                    return True
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.5)
+    return False
+
+
+def iniciar_servidor(puerto, almacen):
+    """Lanza api_server.py en su propio grupo de procesos (el modo debug crea un hijo)"""
+    entorno = dict(os.environ, HORARIOS_ALMACEN=almacen)
+    return subprocess.Popen(
+        [sys.executable, os.path.join(DIR_BASE, 'api_server.py'), str(puerto)],
+        cwd=DIR_BASE, env=entorno, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        start_new_session=True
+    )
+
+
+def detener_servidor(proceso):
+    try:
+        os.killpg(proceso.pid, signal.SIGTERM)
+        proceso.wait(timeout=10)
+    except (ProcessLookupError, subprocess.TimeoutExpired):
+        os.killpg(proceso.pid, signal.SIGKILL)
+
+
+# ==================== USUARIOS VIRTUALES ====================
+
+def peticion(metodo, url, cuerpo, timeout):
+    """Hace una petición; retorna (código HTTP o 0 si no hubo respuesta, segundos)"""
+    datos = json.dumps(cuerpo).encode('utf-8') if cuerpo is not None else None
+    req = urllib.request.Request(url, data=datos, method=metodo,
+                                 headers={'Content-Type': 'application/json'} if datos else {})
+    inicio = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as respuesta:
+            respuesta.read()
+            codigo = respuesta.status
+    except urllib.error.HTTPError as e:
+        e.read()
+        codigo = e.code
+    except (urllib.error.URLError, OSError):
+        codigo = 0
+    return codigo, time.perf_counter() - inicio
+
+
+def usuario_virtual(numero, base, args, grupos, fin, registros):
+    """Bucle de un usuario: elige operación, la ejecuta y anota (ruta, código, latencia, instante)"""
+    azar = random.Random(args.semilla * 100003 + numero)
+    operaciones, pesos = zip(*args.mezcla.items())
+    cuerpo_optimizar = {'max_iteraciones': args.iteraciones, 'motor': args.motor}
+
+    while time.time() < fin:
+        operacion = azar.choices(operaciones, pesos)[0]
+        if operacion == 'lectura':
+            metodo, ruta, construir = azar.choice(LECTURAS)
+            codigo, segundos = peticion(metodo, base + construir(azar, grupos), None, args.timeout)
+        elif operacion == 'sondeo':
+            metodo, ruta = 'GET', '/progreso'
+            codigo, segundos = peticion(metodo, f"{base}/progreso", None, args.timeout)
+        else:
+            metodo, ruta = 'POST', '/optimizar'
+            codigo, segundos = peticion(metodo, f"{base}/optimizar", cuerpo_optimizar, args.timeout)
+        registros.append((f"{metodo} {ruta}", codigo, segundos, time.time()))
+
+        if args.pausa > 0:
+            time.sleep(azar.expovariate(1 / args.pausa))
+
+
+def resumir(registros, duracion):
+    """Peticiones, rendimiento, percentiles (ms) y errores de un conjunto de registros"""
+    latencias = sorted(r[2] for r in registros)
+    codigos = {}
+    for r in registros:
+        codigos[str(r[1])] = codigos.get(str(r[1]), 0) + 1
+    # 409 = optimización en curso (respuesta esperada con varios usuarios optimizando)
+    errores = sum(n for c, n in codigos.items() if c == '0' or (int(c) >= 400 and c != '409'))
+
+    def ms(valor):
+        return round(valor * 1000, 3) if valor is not None else None
+
+    return {
+        'peticiones': len(registros),
+        'peticiones_por_segundo': round(len(registros) / duracion, 3) if duracion > 0 else 0.0,
+        'errores': errores,
+        'tasa_error': round(errores / len(registros), 5) if registros else 0.0,
+        'ocupado_409': codigos.get('409', 0),
+        'p50': ms(percentil(latencias, 50)),
+        'p95': ms(percentil(latencias, 95)),
+        'p99': ms(percentil(latencias, 99)),
+        'max': ms(latencias[-1] if latencias else None),
+        'codigos': dict(sorted(codigos.items()))
+    }
+
+
+def ejecutar_carga(base, args):
+    """Corre los usuarios virtuales y retorna (registros medidos, duración medida)"""
+    with urllib.request.urlopen(f"{base}/estado", timeout=args.timeout) as respuesta:
+        estado = json.loads(respuesta.read())
+    grupos = [g['id'] for g in estado.get('grupos', [])] or [0]
+
+    inicio = time.time()
+    inicio_medicion = inicio + args.calentamiento
+    fin = inicio_medicion + args.duracion
+    registros_por_usuario = [[] for _ in range(args.usuarios)]
+
+    hilos = [threading.Thread(target=usuario_virtual, name=f"usuario-{i}",
+                              args=(i, base, args, grupos, fin, registros_por_usuario[i]), daemon=True)
+             for i in range(args.usuarios)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    # Las peticiones que terminan antes del fin del calentamiento no se cuentan
+    registros = [r for lista in registros_por_usuario for r in lista if r[3] >= inicio_medicion]
+    duracion = max(r[3] for r in registros) - inicio_medicion if registros else args.duracion
+    return registros, max(duracion, args.duracion)
+
+
+def comparar_con_baseline(rutas, baseline):
+    """Variación relativa de cada métrica por ruta respecto al baseline"""
+    comparacion = {}
+    for ruta, actual in rutas.items():
+        base = baseline.get('rutas', {}).get(ruta)
+        if base is None:
+            continue
+        fila = {}
+        for metrica, mayor_es_mejor in METRICAS_COMPARADAS:
+            valor, anterior = actual.get(metrica), base.get(metrica)
+            if valor is None or anterior is None or anterior == 0:
+                fila[metrica] = None
+                continue
+            cambio = (valor - anterior) / abs(anterior)
+            fila[metrica] = {
+                'baseline': anterior,
+                'actual': valor,
+                'cambio': cambio,
+                'mejora': cambio > 0 if mayor_es_mejor else cambio < 0
+            }
+        comparacion[ruta] = fila
+    return comparacion
+
+
+def imprimir_tabla(salida):
+    """Imprime un resumen legible en stderr (stdout queda para el JSON)"""
+    print("=" * 100, file=sys.stderr)
+    print(f"{'Ruta':<24} {'Peticiones':>10} {'Pet/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          f"{'Errores':>8} {'409':>6}", file=sys.stderr)
+    print("-" * 100, file=sys.stderr)
+    for ruta, r in list(salida['rutas'].items()) + [('TOTAL', salida['total'])]:
+        def f(valor):
+            return f"{valor:.1f}" if valor is not None else '-'
+        print(f"{ruta:<24} {r['peticiones']:>10} {r['peticiones_por_segundo']:>9.1f} {f(r['p50']):>9} "
+              f"{f(r['p95']):>9} {f(r['p99']):>9} {r['errores']:>8} {r['ocupado_409']:>6}", file=sys.stderr)
+    print("=" * 100, file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Prueba de carga de la API de horarios')
+    parser.add_argument('--url', default='http://localhost:5001', help='Servidor a probar')
+    parser.add_argument('--dataset', default=None, help='Usar /api/datasets/<nombre>/... en vez de /api/...')
+    parser.add_argument('--usuarios', type=int, default=20, help='Usuarios virtuales concurrentes')
+    parser.add_argument('--duracion', type=float, default=30.0, help='Segundos medidos')
+    parser.add_argument('--calentamiento', type=float, default=2.0, help='Segundos iniciales sin medir')
+    parser.add_argument('--mezcla', type=leer_mezcla, default=leer_mezcla(MEZCLA_PREDETERMINADA),
+                        help=f"Pesos de las operaciones (default: {MEZCLA_PREDETERMINADA})")
+    parser.add_argument('--pausa', type=float, default=0.1,
+                        help='Pausa media entre peticiones de un usuario, en segundos (exponencial)')
+    parser.add_argument('--iteraciones', type=int, default=300, help='max_iteraciones de cada /optimizar')
+    parser.add_argument('--motor', default='tabu', help='Motor de cada /optimizar')
+    parser.add_argument('--timeout', type=float, default=120.0, help='Timeout por petición (s)')
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--iniciar-servidor', action='store_true',
+                        help='Lanzar api_server.py en --puerto (con un almacén temporal) y detenerlo al final')
+    parser.add_argument('--puerto', type=int, default=5055, help='Puerto de --iniciar-servidor')
+    parser.add_argument('-o', '--salida', default=None, help='Archivo JSON de resultados (default: stdout)')
+    parser.add_argument('--baseline', default=None, help='JSON de una corrida anterior para comparar')
+    parser.add_argument('--max-error', type=float, default=None, help='Falla (código 1) si la tasa de error la supera')
+    parser.add_argument('--max-p95', type=float, default=None, help='Falla (código 1) si el p95 total (ms) lo supera')
+    args = parser.parse_args(argv)
+
+    servidor = None
+    directorio_temporal = None
+    url = args.url.rstrip('/')
+    if args.iniciar_servidor:
+        directorio_temporal = tempfile.TemporaryDirectory(prefix='carga_api_')
+        url = f"http://127.0.0.1:{args.puerto}"
+        print(f"[INFO] Iniciando api_server.py en {url}...", file=sys.stderr)
+        servidor = iniciar_servidor(args.puerto, os.path.join(directorio_temporal.name, 'horarios.sqlite3'))
+
+    base = f"{url}/api/datasets/{args.dataset}" if args.dataset else f"{url}/api"
+    try:
+        if not esperar_servidor(base, 60 if servidor else 5):
+            print(f"[ERROR] El servidor no responde en {base}/estado", file=sys.stderr)
+            return 2
+
+        print(f"[INFO] {args.usuarios} usuarios, {args.duracion:.0f}s (+{args.calentamiento:.0f}s de "
+              f"calentamiento), mezcla {args.mezcla}", file=sys.stderr)
+        registros, duracion = ejecutar_carga(base, args)
+    finally:
+        if servidor is not None:
+            detener_servidor(servidor)
+            directorio_temporal.cleanup()
+
+    por_ruta = {}
+    for r in registros:
+        por_ruta.setdefault(r[0], []).append(r)
+
+    salida = {
+        'fecha': datetime.now().isoformat(),
+        'plataforma': {
+            'python': platform.python_version(),
+            'sistema': platform.platform(),
+            'procesador': platform.processor(),
+            'cpus': os.cpu_count()
+        },
+        'parametros': {
+            'url': base,
+            'usuarios': args.usuarios,
+            'duracion': args.duracion,
+            'calentamiento': args.calentamiento,
+            'mezcla': args.mezcla,
+            'pausa': args.pausa,
+            'iteraciones': args.iteraciones,
+            'motor': args.motor,
+            'semilla': args.semilla
+        },
+        'duracion_medida': round(duracion, 3),
+        'total': resumir(registros, duracion),
+        'rutas': {ruta: resumir(lista, duracion) for ruta, lista in sorted(por_ruta.items())}
+    }
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            salida['comparacion'] = comparar_con_baseline(salida['rutas'], json.load(f))
+
+    imprimir_tabla(salida)
+
+    texto = json.dumps(salida, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            f.write(texto)
+        print(f"[✓] Resultados guardados en {args.salida}", file=sys.stderr)
+    else:
+        print(texto)
+
+    fallos = []
+    if args.max_error is not None and salida['total']['tasa_error'] > args.max_error:
+        fallos.append(f"tasa de error {salida['total']['tasa_error']:.2%} > {args.max_error:.2%}")
+    if args.max_p95 is not None and (salida['total']['p95'] or 0) > args.max_p95:
+        fallos.append(f"p95 {salida['total']['p95']:.1f} ms > {args.max_p95:.1f} ms")
+    for fallo in fallos:
+        print(f"[FALLO] {fallo}", file=sys.stderr)
+    return 1 if fallos else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
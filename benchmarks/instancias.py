@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Generador de instancias sintéticas para el benchmark de los motores.
+Produce datasets con el mismo formato que data/*.json
+"""
+
+import json
+import os
+import random
+
+# Malla fija del motor: 5 días x 14 horas
+SLOTS_SEMANA = 70
+
+# Tamaños predefinidos para el benchmark
+PRESETS = {
+    'pequena': {'eventos': 150, 'grupos': 6, 'profesores': 10},
+    'mediana': {'eventos': 600, 'grupos': 20, 'profesores': 40},
+    'grande': {'eventos': 2400, 'grupos': 80, 'profesores': 150},
+    # Laboratorios en bloques de 2 horas consecutivas
+    'bloques': {'eventos': 300, 'grupos': 10, 'profesores': 20, 'bloques': 0.5},
+}
+
+
+def generar_instancia(eventos=300, grupos=10, profesores=30, slots=SLOTS_SEMANA,
+                      densidad=None, vespertino=0.3, horas_materia=(3, 6), bloques=0.0, semilla=0):
+    """
+    Genera un dataset sintético.
+
+    Args:
+        eventos: Total de horas-clase semanales (ignorado si se da densidad)
+        grupos: Número de grupos
+        profesores: Número de profesores
+        slots: Slots disponibles por grupo a la semana (la malla del motor es de 70)
+        densidad: Fracción de celdas grupo x slot ocupadas (eventos = densidad * grupos * slots)
+        vespertino: Proporción de grupos en turno vespertino
+        horas_materia: Rango (min, max) de horas semanales por materia
+        bloques: Proporción de materias de laboratorio que se imparten en
+                 bloques de 2 horas consecutivas (horas_bloque = 2)
+        semilla: Semilla del generador
+
+    Returns:
+        dict con profesores, materias, grupos, aulas, asignaciones y metadata
+    """
+    rng = random.Random(semilla)
+
+    if densidad is not None:
+        eventos = int(round(densidad * grupos * slots))
+    densidad = eventos / float(max(1, grupos * slots))
+
+    num_vespertinos = int(round(grupos * vespertino))
+
+    datos = {
+        'profesores': [],
+        'materias': [],
+        'grupos': [],
+        'aulas': [],
+        'asignaciones': {}
+    }
+
+    for p in range(profesores):
+        datos['profesores'].append({
+            'id': p,
+            'nombre': f"Profesor {p}",
+            'max_horas': 0,
+            'preferencias_horarias': []
+        })
+
+    for g in range(grupos):
+        es_vespertino = g < num_vespertinos
+        # El motor detecta el turno vespertino por el sufijo '-3' del nombre
+        datos['grupos'].append({
+            'id': g,
+            'nombre': f"GEN {g + 1}-{3 if es_vespertino else 1}",
+            'num_estudiantes': 30,
+            'turno_matutino': not es_vespertino
+        })
+
+    for a in range(max(1, grupos)):
+        datos['aulas'].append({
+            'id': a,
+            'nombre': f"Aula {a}",
+            'capacidad': 40,
+            'es_laboratorio': a % 4 == 0
+        })
+
+    # Repartir las horas entre grupos y partirlas en materias
+    materia_id = 0
+    for g in range(grupos):
+        horas_grupo = eventos // grupos + (1 if g < eventos % grupos else 0)
+        asignacion = {}
+
+        while horas_grupo > 0:
+            horas = min(horas_grupo, rng.randint(horas_materia[0], horas_materia[1]))
+            materia = {
+                'id': materia_id,
+                'nombre': f"Materia {materia_id}",
+                'horas_semanales': horas,
+                'requiere_laboratorio': rng.random() < 0.25
+            }
+            if bloques and materia['requiere_laboratorio'] and rng.random() < bloques:
+                materia['horas_bloque'] = 2
+            datos['materias'].append(materia)
+            asignacion[str(materia_id)] = rng.randrange(profesores)
+            materia_id += 1
+            horas_grupo -= horas
+
+        datos['asignaciones'][str(g)] = asignacion
+
+    datos['metadata'] = {
+        'sintetica': True,
+        'eventos': eventos,
+        'grupos': grupos,
+        'profesores': profesores,
+        'slots': slots,
+        'densidad': densidad,
+        'vespertino': vespertino,
+        'bloques': bloques,
+        'semilla': semilla
+    }
+    return datos
+
+
+def guardar_instancia(datos, ruta):
+    """Guarda una instancia en formato JSON"""
+    os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump(datos, f, indent=2, ensure_ascii=False)
@@ -0,0 +1,1280 @@
+#!/usr/bin/env python3
+"""
+Motor de Búsqueda Tabú en Python/NumPy para equipos sin compilador de C.
+
+Implementa la misma API y la misma función objetivo que
+cython_modules.busqueda_tabu.BusquedaTabu, pero evalúa el delta de los
+70 slots candidatos de cada movimiento con operaciones vectorizadas.
+"""
+
+import os
+import pickle
+import time as pytime
+
+import numpy as np
+
+NUM_SLOTS = 70
+HORAS_DIA = 14
+
+# Columnas de eventos_array y dtype estructurado equivalente
+CAMPOS_EVENTO = ('id', 'materia_id', 'profesor_id', 'grupo_id', 'aula_id', 'dia', 'hora')
+DTYPE_EVENTO = np.dtype([(campo, np.int32) for campo in CAMPOS_EVENTO])
+
+# Peso de un conflicto duro frente a una hora de hueco en el costo escalar
+# que usan los motores de movimientos aleatorios
+PESO_CONFLICTO = 100
+
+# Versión del estado serializado (__getstate__ / checkpoints)
+FORMATO_CHECKPOINT = 1
+
+
+def es_grupo_vespertino(nombre):
+    """ITI 1-1, ITI 2-3, ITI 5-3, ITI 8-2 son vespertinos (misma regla que el motor Cython)"""
+    return nombre == 'ITI 1-1' or '-3' in nombre or nombre == 'ITI 8-2'
+
+
+def como_arreglo_eventos(eventos):
+    """
+    Convierte eventos a un arreglo int32 (n, 7) C-contiguo.
+
+    Acepta un ndarray int32 (n, 7), un arreglo estructurado con los campos
+    de CAMPOS_EVENTO o cualquier objeto con protocolo buffer. Si la entrada
+    ya es int32, C-contigua y escribible se retorna la misma memoria (sin copia).
+    """
+    arr = np.asarray(eventos)
+
+    if arr.dtype.names is not None:
+        if arr.dtype == DTYPE_EVENTO and arr.flags.c_contiguous:
+            arr = arr.view(np.int32).reshape(arr.shape[0], 7)
+        else:
+            arr = np.stack([arr[campo] for campo in CAMPOS_EVENTO], axis=1)
+
+    if arr.ndim != 2 or arr.shape[1] != 7:
+        raise ValueError(f"Se esperaba un arreglo de eventos (n, 7), se recibió {arr.shape}")
+
+    if arr.dtype != np.int32 or not arr.flags.c_contiguous or not arr.flags.writeable:
+        arr = np.array(arr, dtype=np.int32, order='C')
+
+    return arr
+
+
+def eventos_a_arreglo(eventos):
+    """Convierte la lista de diccionarios de la API en un arreglo int32 (n, 7)"""
+    return np.array(
+        [(e.get('id', i), e.get('materia_id', 0), e.get('profesor_id', 0),
+          e.get('grupo_id', 0), e.get('aula_id', 0),
+          e.get('slot', {}).get('dia', -1), e.get('slot', {}).get('hora', -1))
+         for i, e in enumerate(eventos)],
+        dtype=np.int32
+    ).reshape(len(eventos), 7)
+
+
+def arreglo_a_eventos(eventos, duraciones=None):
+    """Convierte un arreglo (n, 7) (y sus duraciones) en la lista de diccionarios de la API"""
+    filas = np.asarray(eventos).tolist()
+    duraciones = [1] * len(filas) if duraciones is None else np.asarray(duraciones).tolist()
+    return [{
+        'id': fila[0],
+        'materia_id': fila[1],
+        'profesor_id': fila[2],
+        'grupo_id': fila[3],
+        'aula_id': fila[4],
+        'duracion': duracion,
+        'slot': {'dia': fila[5], 'hora': fila[6]}
+    } for fila, duracion in zip(filas, duraciones)]
+
+
+# ==================== EVENTOS DE VARIAS HORAS ====================
+
+def duraciones_de(eventos):
+    """Duración en horas consecutivas de cada evento de la lista de diccionarios de la API"""
+    return np.array([e.get('duracion', 1) for e in eventos], dtype=np.int32)
+
+
+def como_duraciones(duraciones, n):
+    """Duraciones int32 (n,) validadas; None = todos los eventos de una hora"""
+    if duraciones is None:
+        return np.ones(n, dtype=np.int32)
+    # Copia propia: las del snapshot mapeado son de solo lectura y el motor Cython pide un buffer escribible
+    arr = np.array(duraciones, dtype=np.int32).reshape(-1)
+    if len(arr) != n:
+        raise ValueError(f"Se esperaban {n} duraciones, se recibieron {len(arr)}")
+    if n and (arr.min() < 1 or arr.max() > HORAS_DIA):
+        raise ValueError(f"Las duraciones deben estar entre 1 y {HORAS_DIA} horas")
+    return arr
+
+
+def slots_validos(duracion):
+    """Máscara (NUM_SLOTS,) de los slots donde puede empezar un bloque (mismo día)"""
+    return np.tile(np.arange(HORAS_DIA) <= HORAS_DIA - duracion, 5)
+
+
+def expandir_bloques(eventos, duraciones=None):
+    """
+    Una fila (m, 7) por hora ocupada: un bloque de d horas se repite d veces
+    con hora, hora + 1, ..., para los consumidores que trabajan por hora
+    (exportación, disponibilidad, grafo). Sin bloques retorna la misma entrada.
+    """
+    ev = np.asarray(eventos)
+    if duraciones is None or len(duraciones) == 0 or np.max(duraciones) <= 1:
+        return ev
+    duraciones = np.asarray(duraciones)
+    filas = np.repeat(ev, duraciones, axis=0)
+    desplazamiento = np.arange(len(filas)) - np.repeat(np.cumsum(duraciones) - duraciones, duraciones)
+    asignadas = filas[:, 6] >= 0
+    filas[asignadas, 6] += desplazamiento[asignadas].astype(filas.dtype)
+    return filas
+
+
+def _suma_bloque(valores, duracion):
+    """Suma de valores (NUM_SLOTS,) en las duracion horas que empiezan en cada slot (0 si no cabe)"""
+    if duracion == 1:
+        return valores
+    acumulado = np.zeros((5, HORAS_DIA + 1), dtype=np.int64)
+    acumulado[:, 1:] = np.cumsum(valores.reshape(5, HORAS_DIA), axis=1)
+    suma = np.zeros((5, HORAS_DIA), dtype=np.int64)
+    suma[:, :HORAS_DIA - duracion + 1] = acumulado[:, duracion:] - acumulado[:, :HORAS_DIA - duracion + 1]
+    return suma.reshape(NUM_SLOTS)
+
+
+def _slot_alternativo(r, slot_orig, duracion):
+    """
+    r-ésimo slot de inicio válido para un bloque de duracion horas, saltando
+    slot_orig (r en [0, 5 * (HORAS_DIA + 1 - duracion) - 1)).
+    """
+    por_dia = HORAS_DIA + 1 - duracion
+    orig = (slot_orig // HORAS_DIA) * por_dia + slot_orig % HORAS_DIA
+    if r >= orig:
+        r += 1
+    return (r // por_dia) * HORAS_DIA + r % por_dia
+
+
+# Slots donde no puede empezar un bloque de d horas (se sale del día)
+_INICIOS_INVALIDOS = {d: ~slots_validos(d) for d in range(1, HORAS_DIA + 1)}
+
+
+def construir_grafo_conflictos(eventos):
+    """
+    Grafo de conflictos entre eventos en formato CSR: dos eventos son vecinos
+    si comparten profesor o grupo. Los vecinos de u son
+    indices[indptr[u]:indptr[u + 1]], ordenados y sin repetir.
+
+    Returns:
+        (indptr, indices) como arreglos int32
+    """
+    ev = np.asarray(eventos)
+    n = ev.shape[0]
+    pares = []
+    for columna in (2, 3):
+        orden = np.argsort(ev[:, columna], kind='stable')
+        limites = np.flatnonzero(np.diff(ev[orden, columna])) + 1
+        for bloque in np.split(orden, limites):
+            if len(bloque) > 1:
+                origen, destino = np.meshgrid(bloque, bloque, indexing='ij')
+                distintos = origen != destino
+                pares.append(origen[distintos].astype(np.int64) * n + destino[distintos])
+
+    codigos = np.sort(np.concatenate(pares)) if pares else np.zeros(0, dtype=np.int64)
+    codigos = codigos[np.r_[True, np.diff(codigos) != 0]] if len(codigos) else codigos
+    indptr = np.zeros(n + 1, dtype=np.int32)
+    indptr[1:] = np.cumsum(np.bincount(codigos // max(n, 1), minlength=n))
+    return indptr, (codigos % max(n, 1)).astype(np.int32)
+
+
+def calcular_calidad(conflictos, blandos):
+    """Calidad de una solución (0-100%), la misma escala en ambos motores"""
+    if conflictos > 0:
+        return max(0.0, 50.0 - conflictos * 5)
+    return max(0.0, 100.0 - blandos * 2)
+
+
+def cargar_checkpoint(ruta):
+    """Motor guardado con guardar_checkpoint(), listo para reanudar()"""
+    with open(ruta, 'rb') as f:
+        return pickle.load(f)
+
+
+def _huecos_por_dia(ocupacion):
+    """Huecos (5, columnas) de una ocupación (5, HORAS_DIA, columnas)"""
+    ocupado = ocupacion > 0
+    clases = ocupado.sum(axis=1)
+    primera = ocupado.argmax(axis=1)
+    ultima = HORAS_DIA - 1 - ocupado[:, ::-1, :].argmax(axis=1)
+    return np.where(clases > 1, ultima - primera + 1 - clases, 0)
+
+
+class BusquedaTabuNumpy:
+    """
+    Búsqueda Tabú para optimización de horarios (versión NumPy).
+
+    Restricciones Duras (conflictos):
+    - Un profesor no puede estar en dos lugares al mismo tiempo
+    - Un grupo no puede estar en dos lugares al mismo tiempo
+
+    Restricciones Blandas (penalizaciones):
+    - Minimizar huecos entre clases
+    """
+
+    def __init__(self, max_iter=1000, tamano_tabu=30, semilla=-1, intervalo_compactacion=100,
+                 candidatos_por_iteracion=8):
+        """
+        Inicializa el optimizador de Búsqueda Tabú.
+
+        Args:
+            max_iter: Máximo de iteraciones
+            tamano_tabu: Tamaño de la lista tabú
+            semilla: Semilla del generador aleatorio (-1 = aleatoria)
+            intervalo_compactacion: Con cero conflictos duros, compactar huecos al
+                                    llegar a cero y cada este número de
+                                    iteraciones (0 = nunca)
+            candidatos_por_iteracion: Eventos aleatorios cuyo vecindario se evalúa
+                                      en cada iteración (se aplica el mejor
+                                      movimiento entre todos)
+        """
+        if intervalo_compactacion < 0:
+            raise ValueError("intervalo_compactacion no puede ser negativo")
+        if candidatos_por_iteracion < 1:
+            raise ValueError("candidatos_por_iteracion debe ser positivo")
+        self.max_iteraciones = max_iter
+        self.tamano_lista_tabu = tamano_tabu
+        self.intervalo_compactacion = intervalo_compactacion
+        self.candidatos_por_iteracion = candidatos_por_iteracion
+        self.lista_tabu = []
+        self.iteracion_actual = 0
+        self.grupos_vespertinos = []
+        self.mejor_solucion = None
+        self.rng = np.random.default_rng(None if semilla is None or semilla < 0 else semilla)
+
+        self.num_eventos = 0
+        self.num_profesores = 0
+        self.num_grupos = 0
+        self.num_aulas = 0
+        self.eventos_array = np.zeros((0, 7), dtype=np.int32)
+        self.duraciones = np.zeros(0, dtype=np.int32)
+        self.profesores_ocupados = np.zeros((NUM_SLOTS, 0), dtype=np.int32)
+        self.grupos_ocupados = np.zeros((NUM_SLOTS, 0), dtype=np.int32)
+        self.grafo_indptr = np.zeros(1, dtype=np.int32)
+        self.grafo_indices = np.zeros(0, dtype=np.int32)
+        self.conflictos_actuales = self.blandos_actuales = 0
+        self.mejor_conflictos = self.mejor_blandos = 0
+        self.mejor_slots = np.zeros((0, 2), dtype=np.int32)
+        self.siguiente_iteracion = 0
+        self.en_curso = self.compactada = False
+        self.intervalo_checkpoint = 0
+        self.ruta_checkpoint = self.metadatos_checkpoint = None
+        self.cota_conflictos, self.cota_blandos = -1, 0
+        self.cota_alcanzada = False
+        self.callback_progreso = self.callback_log = None
+        self._reiniciar_contadores()
+
+    def inicializar(self, eventos, num_profesores, num_grupos, num_aulas, grupos_info=None):
+        """
+        Inicializa las estructuras de datos con los eventos.
+
+        Args:
+            eventos: Lista de diccionarios con eventos
+            num_profesores: Número total de profesores
+            num_grupos: Número total de grupos
+            num_aulas: Número de aulas
+            grupos_info: Lista con información de grupos (nombre, turno)
+        """
+        self.inicializar_arreglo(eventos_a_arreglo(eventos), num_profesores, num_grupos,
+                                 num_aulas, grupos_info, duraciones_de(eventos))
+
+    def inicializar_arreglo(self, eventos, num_profesores, num_grupos, num_aulas, grupos_info=None,
+                            duraciones=None):
+        """
+        Inicializa el motor directamente desde un arreglo de eventos.
+
+        Si eventos es un ndarray int32 (n, 7) C-contiguo y escribible (o un
+        arreglo estructurado DTYPE_EVENTO) el motor trabaja sobre esa misma
+        memoria: al terminar, las columnas dia/hora contienen la solución.
+
+        duraciones (n,) da las horas consecutivas de cada evento (None = 1):
+        un bloque ocupa el mismo día desde su hora de inicio y se mueve entero.
+        """
+        self.eventos_array = como_arreglo_eventos(eventos)
+        self.num_eventos = self.eventos_array.shape[0]
+        self.duraciones = como_duraciones(duraciones, self.num_eventos)
+        fuera = np.flatnonzero((self.eventos_array[:, 6] >= 0) &
+                               (self.eventos_array[:, 6] + self.duraciones > HORAS_DIA))
+        if len(fuera):
+            raise ValueError(f"El evento {fuera[0]} ({self.duraciones[fuera[0]]} horas) "
+                             f"no cabe en el día desde la hora {self.eventos_array[fuera[0], 6]}")
+        # Slots de inicio alternativos de cada evento (para muestrear movimientos)
+        self.alternativas = 5 * (HORAS_DIA + 1 - self.duraciones.astype(np.int64)) - 1
+        self.num_profesores = max(num_profesores, 50)
+        self.num_grupos = max(num_grupos, 20)
+        self.num_aulas = max(num_aulas, 10)
+
+        self.grupos_vespertinos = []
+        if grupos_info:
+            self._detectar_vespertinos(grupos_info)
+
+        self.profesores_ocupados = np.zeros((NUM_SLOTS, self.num_profesores), dtype=np.int32)
+        self.grupos_ocupados = np.zeros((NUM_SLOTS, self.num_grupos), dtype=np.int32)
+        self._actualizar_matrices_ocupacion()
+
+        self.lista_tabu = []
+        self.iteracion_actual = 0
+        self.en_curso = False
+        self._reiniciar_contadores()
+
+    def _detectar_vespertinos(self, grupos_info):
+        self.grupos_vespertinos = [g.get('id', 0) for g in grupos_info
+                                   if es_grupo_vespertino(g.get('nombre', ''))]
+
+    def _reiniciar_contadores(self):
+        """Pone a cero los contadores de instrumentación"""
+        self.movimientos_evaluados = 0
+        self.rechazos_tabu = 0
+        self.movimientos_aplicados = 0
+        self.mejoras = 0
+        self.tiempo_vecindario = 0.0
+        self.tiempo_movimiento = 0.0
+        self.tiempo_evaluacion = 0.0
+        self.tiempo_callbacks = 0.0
+        self.tiempo_compactacion = 0.0
+        self.tiempo_checkpoints = 0.0
+        self.tiempo_ejecucion = 0.0
+        self.iteraciones_ejecutadas = 0
+        self.checkpoints_guardados = 0
+
+    # ==================== OCUPACIÓN Y FUNCIÓN OBJETIVO ====================
+
+    def _actualizar_matrices_ocupacion(self):
+        """Recalcula las matrices de ocupación basándose en eventos_array"""
+        self.profesores_ocupados.fill(0)
+        self.grupos_ocupados.fill(0)
+
+        # Una fila por hora ocupada (los bloques cubren todo su intervalo)
+        ev = expandir_bloques(self.eventos_array, self.duraciones)
+        asignados = (ev[:, 5] >= 0) & (ev[:, 6] >= 0)
+        slots = ev[:, 5] * HORAS_DIA + ev[:, 6]
+
+        m = asignados & (ev[:, 2] < self.num_profesores)
+        np.add.at(self.profesores_ocupados, (slots[m], ev[m, 2]), 1)
+        m = asignados & (ev[:, 3] < self.num_grupos)
+        np.add.at(self.grupos_ocupados, (slots[m], ev[m, 3]), 1)
+
+    def _calcular_conflictos_duros(self):
+        """Un conflicto = mismo profesor O mismo grupo en el mismo slot"""
+        return int(np.maximum(self.profesores_ocupados - 1, 0).sum() +
+                   np.maximum(self.grupos_ocupados - 1, 0).sum())
+
+    def _calcular_conflictos_blandos(self):
+        """Huecos entre la primera y la última clase de cada grupo por día"""
+        return int(_huecos_por_dia(self.grupos_ocupados.reshape(5, HORAS_DIA, -1)).sum())
+
+    def _huecos_grupo_dia(self, grupo, dia):
+        """Huecos de un grupo en un día: (última - primera + 1) - clases"""
+        horas = np.flatnonzero(self.grupos_ocupados[dia * HORAS_DIA:(dia + 1) * HORAS_DIA, grupo])
+        if len(horas) > 1:
+            return int(horas[-1] - horas[0] + 1 - len(horas))
+        return 0
+
+    def _ocupar(self, profesor_id, grupo_id, slot, duracion, signo):
+        """Suma signo a la ocupación del profesor y del grupo en las duracion horas desde slot"""
+        if profesor_id < self.num_profesores:
+            self.profesores_ocupados[slot:slot + duracion, profesor_id] += signo
+        if grupo_id < self.num_grupos:
+            self.grupos_ocupados[slot:slot + duracion, grupo_id] += signo
+
+    def _delta_conflictos(self, profesor_id, grupo_id, slot_orig, slot_nuevo, duracion=1):
+        """
+        Cambio en conflictos duros al mover un evento de slot_orig a slot_nuevo - O(duracion).
+        Un bloque se quita de todo su intervalo antes de contar el destino, así
+        que los intervalos de origen y destino pueden solaparse.
+        """
+        delta = 0
+        if duracion == 1:
+            if profesor_id < self.num_profesores:
+                col = self.profesores_ocupados[:, profesor_id]
+                delta += int(col[slot_nuevo] > 0) - int(col[slot_orig] > 1)
+            if grupo_id < self.num_grupos:
+                col = self.grupos_ocupados[:, grupo_id]
+                delta += int(col[slot_nuevo] > 0) - int(col[slot_orig] > 1)
+            return delta
+
+        self._ocupar(profesor_id, grupo_id, slot_orig, duracion, -1)
+        for ocupacion, recurso, limite in ((self.profesores_ocupados, profesor_id, self.num_profesores),
+                                           (self.grupos_ocupados, grupo_id, self.num_grupos)):
+            if recurso < limite:
+                col = ocupacion[:, recurso]
+                delta += int((col[slot_nuevo:slot_nuevo + duracion] > 0).sum()) - \
+                    int((col[slot_orig:slot_orig + duracion] > 0).sum())
+        self._ocupar(profesor_id, grupo_id, slot_orig, duracion, 1)
+        return delta
+
+    def _delta_blandos(self, grupo_id, slot_orig, slot_nuevo, duracion=1):
+        """Cambio en huecos del grupo al mover un evento (solo los días afectados)"""
+        if grupo_id >= self.num_grupos:
+            return 0
+        dias = {slot_orig // HORAS_DIA, slot_nuevo // HORAS_DIA}
+        antes = sum(self._huecos_grupo_dia(grupo_id, d) for d in dias)
+        col = self.grupos_ocupados[:, grupo_id]
+        col[slot_orig:slot_orig + duracion] -= 1
+        col[slot_nuevo:slot_nuevo + duracion] += 1
+        despues = sum(self._huecos_grupo_dia(grupo_id, d) for d in dias)
+        col[slot_nuevo:slot_nuevo + duracion] -= 1
+        col[slot_orig:slot_orig + duracion] += 1
+        return despues - antes
+
+    def _mover_evento(self, idx, slot_nuevo):
+        """Mueve un evento asignado (todo su bloque) a slot_nuevo actualizando la ocupación"""
+        profesor_id, grupo_id = int(self.eventos_array[idx, 2]), int(self.eventos_array[idx, 3])
+        slot_orig = int(self.eventos_array[idx, 5]) * HORAS_DIA + int(self.eventos_array[idx, 6])
+        duracion = int(self.duraciones[idx])
+        self._ocupar(profesor_id, grupo_id, slot_orig, duracion, -1)
+        self._ocupar(profesor_id, grupo_id, slot_nuevo, duracion, 1)
+        self.eventos_array[idx, 5] = slot_nuevo // HORAS_DIA
+        self.eventos_array[idx, 6] = slot_nuevo % HORAS_DIA
+
+    @staticmethod
+    def _calcular_calidad(conflictos, blandos):
+        """Calcula la calidad de la solución (0-100%)"""
+        return calcular_calidad(conflictos, blandos)
+
+    # ==================== SOLUCIÓN INICIAL ====================
+
+    def asignar_slots_iniciales(self, grupos_info=None):
+        """
+        Asigna slots iniciales a eventos sin asignar coloreando el grafo de
+        conflictos con DSATUR (70 colores = 70 slots).
+
+        Los eventos que ya tienen slot se respetan. En cada paso se colorea el
+        evento con más slots bloqueados por sus vecinos (desempate: mayor grado)
+        y se elige, en este orden, el slot sin conflictos, dentro del turno del
+        grupo, sin exceder las horas por día de la materia, que abra menos
+        huecos y en el día menos cargado del grupo. Un bloque de varias horas
+        solo puede empezar donde cabe entero en el día y se puntúa por todo su
+        intervalo.
+        """
+        if grupos_info:
+            self._detectar_vespertinos(grupos_info)
+
+        ev = self.eventos_array
+        n = self.num_eventos
+        vespertinos = set(self.grupos_vespertinos)
+
+        indptr, indices = construir_grafo_conflictos(ev)
+        self.grafo_indptr, self.grafo_indices = indptr, indices
+        grado = np.diff(indptr).astype(np.int64)
+
+        duraciones = self.duraciones
+        # Horas por día permitidas para cada par (grupo, materia)
+        _, par = np.unique(ev[:, [3, 1]], axis=0, return_inverse=True)
+        par = par.reshape(-1)
+        limite_par = np.where(np.bincount(par, weights=duraciones, minlength=1) > 3, 2, 1)
+        par_dia = np.zeros((len(limite_par), 5), dtype=np.int32)
+
+        bloqueado = np.zeros((n, NUM_SLOTS), dtype=bool)
+        saturacion = np.zeros(n, dtype=np.int64)
+        coloreado = np.zeros(n, dtype=bool)
+        occ_prof = np.zeros((NUM_SLOTS, self.num_profesores), dtype=np.int32)
+        occ_grupo = np.zeros((NUM_SLOTS, self.num_grupos), dtype=np.int32)
+
+        def colorear(v, slot):
+            d = int(duraciones[v])
+            ev[v, 5] = slot // HORAS_DIA
+            ev[v, 6] = slot % HORAS_DIA
+            coloreado[v] = True
+            if ev[v, 2] < self.num_profesores:
+                occ_prof[slot:slot + d, ev[v, 2]] += 1
+            if ev[v, 3] < self.num_grupos:
+                occ_grupo[slot:slot + d, ev[v, 3]] += 1
+            par_dia[par[v], slot // HORAS_DIA] += d
+            vecinos = indices[indptr[v]:indptr[v + 1]]
+            for hora in range(slot, slot + d):
+                nuevos = vecinos[~bloqueado[vecinos, hora]]
+                bloqueado[nuevos, hora] = True
+                saturacion[nuevos] += 1
+
+        for v in np.flatnonzero((ev[:, 5] >= 0) & (ev[:, 6] >= 0)):
+            colorear(v, int(ev[v, 5]) * HORAS_DIA + int(ev[v, 6]))
+
+        horas = np.arange(HORAS_DIA)
+        for _ in range(n - int(coloreado.sum())):
+            v = int(np.argmax(np.where(coloreado, -1, saturacion * (n + 1) + grado)))
+            profesor_id, grupo_id = int(ev[v, 2]), int(ev[v, 3])
+            d = int(duraciones[v])
+
+            conflictos = np.zeros(NUM_SLOTS, dtype=np.int64)
+            if profesor_id < self.num_profesores:
+                conflictos += occ_prof[:, profesor_id]
+            if grupo_id < self.num_grupos:
+                conflictos += occ_grupo[:, grupo_id]
+                ocupado = occ_grupo[:, grupo_id].reshape(5, HORAS_DIA) > 0
+            else:
+                ocupado = np.zeros((5, HORAS_DIA), dtype=bool)
+
+            conflictos = _suma_bloque(conflictos, d)
+
+            hora_inicio, hora_fin = (7, 13) if grupo_id in vespertinos else (0, 7)
+            fuera_turno = np.tile((horas < hora_inicio) | (horas + d - 1 > hora_fin), 5)
+            excede = np.repeat(par_dia[par[v]] + d > max(limite_par[par[v]], d), HORAS_DIA)
+
+            # Huecos nuevos del grupo en el día si se agrega la clase (o el bloque) en cada hora
+            clases = ocupado.sum(axis=1)[:, None]
+            primera = ocupado.argmax(axis=1)[:, None]
+            ultima = (HORAS_DIA - 1 - ocupado[:, ::-1].argmax(axis=1))[:, None]
+            delta = ((np.maximum(ultima, horas + d - 1) - np.minimum(primera, horas) + 1 - (clases + d)) -
+                     (ultima - primera + 1 - clases))
+            libre = _suma_bloque(ocupado.reshape(NUM_SLOTS), d).reshape(5, HORAS_DIA) == 0
+            delta = np.where((clases > 0) & libre, delta, 0).reshape(NUM_SLOTS)
+
+            puntaje = (conflictos * 1000000 + fuera_turno * 100000 + excede * 10000 +
+                       (delta + HORAS_DIA) * 20 + np.repeat(clases[:, 0], HORAS_DIA))
+            if d > 1:
+                puntaje[_INICIOS_INVALIDOS[d]] = np.iinfo(np.int64).max
+            colorear(v, int(np.argmin(puntaje)))
+
+        self._actualizar_matrices_ocupacion()
+
+    # ==================== BÚSQUEDA TABÚ ====================
+
+    def _explorar_y_mover(self):
+        """
+        Lista de candidatos: evalúa los 70 slots de candidatos_por_iteracion
+        eventos aleatorios en una sola pasada vectorizada (k, 70) y aplica el
+        mejor movimiento no tabú entre todos ellos (un bloque de varias horas
+        se evalúa y se mueve entero). Retorna True si se hizo un movimiento.
+        """
+        t0 = pytime.perf_counter()
+        indices = self.rng.integers(self.num_eventos, size=self.candidatos_por_iteracion)
+        filas = self.eventos_array[indices]
+        duraciones = self.duraciones[indices]
+        asignados = (filas[:, 5] >= 0) & (filas[:, 6] >= 0)
+        slots_orig = filas[:, 5] * HORAS_DIA + filas[:, 6]
+        k = len(indices)
+
+        # Al quitar el evento del slot original se elimina un conflicto por
+        # cada recurso que estaba duplicado; al añadirlo en un slot nuevo se
+        # crea uno por cada recurso que ya estaba ocupado. El término de
+        # quitar es uno por evento; el de añadir, una columna de ocupación.
+        delta = np.zeros((k, NUM_SLOTS), dtype=np.int32)
+        prohibidos = np.zeros((k, NUM_SLOTS), dtype=bool)
+        prohibidos[~asignados] = True
+        unidad = asignados & (duraciones == 1)
+        for ocupacion, columna, total in ((self.profesores_ocupados, 2, self.num_profesores),
+                                          (self.grupos_ocupados, 3, self.num_grupos)):
+            usa = np.flatnonzero(unidad & (filas[:, columna] < total))
+            if len(usa):
+                columnas = ocupacion[:, filas[usa, columna]]
+                delta[usa] += (columnas > 0).T
+                delta[usa] -= (columnas[slots_orig[usa], np.arange(len(usa))] > 1)[:, None]
+
+        # Bloques: lo mismo hora por hora, con el bloque fuera de la ocupación
+        for c in np.flatnonzero(asignados & (duraciones > 1)).tolist():
+            profesor_id, grupo_id = int(filas[c, 2]), int(filas[c, 3])
+            slot_orig, duracion = int(slots_orig[c]), int(duraciones[c])
+            self._ocupar(profesor_id, grupo_id, slot_orig, duracion, -1)
+            quitar = 0
+            for ocupacion, recurso, total in ((self.profesores_ocupados, profesor_id, self.num_profesores),
+                                              (self.grupos_ocupados, grupo_id, self.num_grupos)):
+                if recurso < total:
+                    ocupado = ocupacion[:, recurso] > 0
+                    delta[c] += _suma_bloque(ocupado, duracion).astype(np.int32)
+                    quitar += int(ocupado[slot_orig:slot_orig + duracion].sum())
+            self._ocupar(profesor_id, grupo_id, slot_orig, duracion, 1)
+            delta[c] -= quitar
+            prohibidos[c] = _INICIOS_INVALIDOS[duracion]
+
+        candidatos_asignados = np.flatnonzero(asignados)
+        prohibidos[candidatos_asignados, slots_orig[candidatos_asignados]] = True
+
+        # Una sola pasada por la lista tabú para todos los candidatos
+        filas_por_evento = {}
+        for c in candidatos_asignados.tolist():
+            filas_por_evento.setdefault(int(filas[c, 0]), []).append(c)
+        rechazados = 0
+        for ev_id, dia, hora in self.lista_tabu:
+            for c in filas_por_evento.get(ev_id, ()):
+                if not prohibidos[c, dia * HORAS_DIA + hora]:
+                    prohibidos[c, dia * HORAS_DIA + hora] = True
+                    rechazados += 1
+
+        candidatos = np.where(prohibidos, np.iinfo(np.int32).max, delta)
+        c, slot_nuevo = divmod(int(candidatos.argmin()), NUM_SLOTS)
+
+        t1 = pytime.perf_counter()
+        self.tiempo_vecindario += t1 - t0
+        self.movimientos_evaluados += int(self.alternativas[indices[asignados]].sum()) - rechazados
+        self.rechazos_tabu += rechazados
+
+        if prohibidos[c, slot_nuevo]:
+            return False
+
+        evento_id, dia_orig, hora_orig = int(filas[c, 0]), int(filas[c, 5]), int(filas[c, 6])
+        self._mover_evento(int(indices[c]), slot_nuevo)
+
+        # Agregar a lista tabú (movimiento inverso)
+        self.lista_tabu.append((evento_id, dia_orig, hora_orig))
+        if len(self.lista_tabu) > self.tamano_lista_tabu:
+            self.lista_tabu.pop(0)
+
+        self.movimientos_aplicados += 1
+        self.tiempo_movimiento += pytime.perf_counter() - t1
+        return True
+
+    def ejecutar(self, datos_adicionales=None, callback_progreso=None, callback_log=None):
+        """
+        Ejecuta la búsqueda para minimizar conflictos.
+        Guarda la mejor solución y la restaura al final.
+
+        Cada iteración llama a _paso() y a _evaluar(); las subclases
+        (RecocidoSimuladoNumpy, AceptacionTardiaNumpy) solo redefinen esos puntos.
+        Con cero conflictos duros se intercala _compactar() (la primera vez que
+        se llega a cero y cada intervalo_compactacion iteraciones) y se aplica
+        una última vez sobre la mejor solución.
+
+        Returns:
+            dict con la mejor solución encontrada
+        """
+        self.callback_progreso = callback_progreso
+        self.callback_log = callback_log
+
+        self._evaluar_completo()
+        calidad_inicial = self._calcular_calidad(self.conflictos_actuales, self.blandos_actuales)
+
+        self.mejor_slots = self.eventos_array[:, 5:7].copy()
+        self.mejor_conflictos, self.mejor_blandos = self.conflictos_actuales, self.blandos_actuales
+        self.mejor_solucion = {
+            'conflictos_duros': self.conflictos_actuales,
+            'penalizacion_blandas': self.blandos_actuales,
+            'calidad': calidad_inicial
+        }
+
+        if callback_log:
+            callback_log(f"[INICIO] Ejecutando {self.max_iteraciones} iteraciones...")
+            callback_log(f"[INFO] Solución inicial - Conflictos: {self.conflictos_actuales}, "
+                         f"Blandos: {self.blandos_actuales}, Calidad: {calidad_inicial:.1f}%")
+
+        self._preparar()
+        self.siguiente_iteracion = 0
+        self.compactada = self.cota_alcanzada = False
+        self.en_curso = True
+        return self._buscar()
+
+    def reanudar(self, callback_progreso=None, callback_log=None):
+        """
+        Continúa una búsqueda interrumpida (motor restaurado con
+        cargar_checkpoint() o pickle) desde la iteración siguiente al último
+        checkpoint. Con la misma semilla el resultado es el mismo que sin
+        interrupción.
+
+        Returns:
+            dict con la mejor solución encontrada
+        """
+        if not self.en_curso:
+            raise ValueError("El motor no tiene una búsqueda en curso que reanudar")
+
+        self.callback_progreso = callback_progreso
+        self.callback_log = callback_log
+        if callback_log:
+            callback_log(f"[INICIO] Reanudando en la iteración {self.siguiente_iteracion}/"
+                         f"{self.max_iteraciones} (mejor: {self.mejor_conflictos} conflictos, "
+                         f"{self.mejor_blandos} blandos)")
+        return self._buscar()
+
+    def _buscar(self):
+        """Bucle principal desde siguiente_iteracion y restauración de la mejor solución"""
+        tiempo_inicio = pytime.time()
+        callback_progreso, callback_log = self.callback_progreso, self.callback_log
+        intervalo_progreso = max(10, self.max_iteraciones // 100)
+        intervalo_log = max(100, self.max_iteraciones // 20)
+
+        for self.iteracion_actual in range(self.siguiente_iteracion, self.max_iteraciones):
+
+            # La mejor solución ya alcanzó la cota inferior: no se puede mejorar
+            if self.mejor_conflictos <= self.cota_conflictos and self.mejor_blandos <= self.cota_blandos:
+                self.cota_alcanzada = True
+                if callback_log:
+                    callback_log(f"[COTA] Cota inferior alcanzada en la iteración {self.iteracion_actual}: "
+                                 f"{self.mejor_conflictos} conflictos, {self.mejor_blandos} blandos")
+                break
+
+            self._paso()
+
+            t0 = pytime.perf_counter()
+            self._evaluar()
+            self.tiempo_evaluacion += pytime.perf_counter() - t0
+            self.iteraciones_ejecutadas += 1
+
+            # Intensificación: compactar huecos la primera vez que se llega a cero
+            # conflictos y después cada intervalo_compactacion iteraciones
+            if self.intervalo_compactacion > 0 and self.conflictos_actuales == 0:
+                if not self.compactada or (self.iteracion_actual + 1) % self.intervalo_compactacion == 0:
+                    self._compactar()
+                    self.compactada = True
+
+            self._registrar_mejor()
+
+            if callback_progreso and self.iteracion_actual % intervalo_progreso == 0:
+                t0 = pytime.perf_counter()
+                progreso = ((self.iteracion_actual + 1) / self.max_iteraciones) * 100
+                callback_progreso(progreso, self.mejor_solucion)
+                self.tiempo_callbacks += pytime.perf_counter() - t0
+
+            if callback_log and self.iteracion_actual % intervalo_log == 0 and self.iteracion_actual > 0:
+                t0 = pytime.perf_counter()
+                callback_log(f"[PROGRESO] Iter {self.iteracion_actual}/{self.max_iteraciones} - "
+                             f"Mejor: {self.mejor_conflictos} conflictos, {self.mejor_solucion['calidad']:.1f}%")
+                self.tiempo_callbacks += pytime.perf_counter() - t0
+
+            # Checkpoint periódico (la iteración ya está completa)
+            self.siguiente_iteracion = self.iteracion_actual + 1
+            if self.intervalo_checkpoint > 0 and self.siguiente_iteracion < self.max_iteraciones and \
+               self.siguiente_iteracion % self.intervalo_checkpoint == 0:
+                self.guardar_checkpoint()
+
+        self.en_curso = False
+
+        # Restaurar la mejor solución encontrada
+        self.eventos_array[:, 5:7] = self.mejor_slots
+        self._actualizar_matrices_ocupacion()
+
+        # Compactación final de la mejor solución
+        if self.intervalo_compactacion > 0 and self.mejor_conflictos == 0:
+            self.conflictos_actuales, self.blandos_actuales = self.mejor_conflictos, self.mejor_blandos
+            if self._compactar() > 0:
+                self._registrar_mejor()
+
+        tiempo_total = pytime.time() - tiempo_inicio
+        self.tiempo_ejecucion += tiempo_total
+
+        if callback_log:
+            callback_log(f"[FINALIZADO] {self.siguiente_iteracion} iteraciones en {tiempo_total:.2f}s")
+            callback_log(f"[RESULTADO] Conflictos duros: {self.mejor_solucion['conflictos_duros']}")
+            callback_log(f"[RESULTADO] Penalización blandas: {self.mejor_solucion['penalizacion_blandas']}")
+            callback_log(f"[RESULTADO] Calidad final: {self.mejor_solucion['calidad']:.2f}%")
+
+        return self.mejor_solucion
+
+    def establecer_cota_inferior(self, conflictos, blandos=0):
+        """
+        Detiene ejecutar()/reanudar() en cuanto la mejor solución alcanza una
+        cota inferior demostrada (analisis_previo.analizar): ya es óptima.
+        conflictos -1 la desactiva.
+        """
+        if blandos < 0:
+            raise ValueError("blandos no puede ser negativo")
+        self.cota_conflictos, self.cota_blandos = conflictos, blandos
+
+    # ==================== CHECKPOINTS Y SERIALIZACIÓN ====================
+
+    def activar_checkpoints(self, ruta, intervalo=1000, metadatos=None):
+        """
+        Guarda el estado completo en ruta cada intervalo iteraciones durante
+        ejecutar()/reanudar() (intervalo 0 o ruta None los desactivan).
+        metadatos (picklable) viaja con el checkpoint en metadatos_checkpoint.
+        """
+        if intervalo < 0:
+            raise ValueError("intervalo no puede ser negativo")
+        self.ruta_checkpoint = os.fspath(ruta) if ruta is not None else None
+        self.intervalo_checkpoint = intervalo if ruta is not None else 0
+        self.metadatos_checkpoint = metadatos
+
+    def guardar_checkpoint(self, ruta=None):
+        """
+        Escribe el estado completo del motor (pickle binario) en ruta o en
+        ruta_checkpoint. La escritura es atómica: un corte a mitad de la
+        escritura deja el checkpoint anterior intacto.
+        """
+        t0 = pytime.perf_counter()
+        ruta = os.fspath(ruta) if ruta is not None else self.ruta_checkpoint
+        if ruta is None:
+            raise ValueError("No hay ruta de checkpoint (activar_checkpoints)")
+
+        temporal = f"{ruta}.tmp"
+        with open(temporal, 'wb') as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporal, ruta)
+
+        self.checkpoints_guardados += 1
+        self.tiempo_checkpoints += pytime.perf_counter() - t0
+        return ruta
+
+    def __getstate__(self):
+        """
+        Estado completo (incluye el generador aleatorio). Las matrices de
+        ocupación se reconstruyen desde eventos_array en __setstate__ y los
+        callbacks se vuelven a pasar a reanudar().
+        """
+        estado = dict(self.__dict__, formato=FORMATO_CHECKPOINT)
+        for clave in ('profesores_ocupados', 'grupos_ocupados', 'callback_progreso', 'callback_log'):
+            estado.pop(clave, None)
+        return estado
+
+    def __setstate__(self, estado):
+        estado = dict(estado)
+        formato = estado.pop('formato', None)
+        if formato != FORMATO_CHECKPOINT:
+            raise ValueError(f"Formato de checkpoint no soportado: {formato} (se esperaba {FORMATO_CHECKPOINT})")
+        self.__dict__.update(estado)
+        self.callback_progreso = self.callback_log = None
+        self.profesores_ocupados = np.zeros((NUM_SLOTS, self.num_profesores), dtype=np.int32)
+        self.grupos_ocupados = np.zeros((NUM_SLOTS, self.num_grupos), dtype=np.int32)
+        self._actualizar_matrices_ocupacion()
+
+    # ==================== COMPACTACIÓN DE HUECOS ====================
+
+    def _compactar(self):
+        """
+        Fase de intensificación: rellena los huecos de cada grupo-día.
+
+        Los huecos se leen de la matriz de ocupación del grupo y los candidatos
+        salen de un índice de eventos por grupo; un evento se mueve al hueco solo
+        si el delta incremental prueba que no crea conflictos duros y el costo
+        (PESO_CONFLICTO * conflictos + huecos) baja. Un bloque de varias horas
+        puede cubrir el hueco con cualquiera de sus horas. Mantiene
+        conflictos_actuales y blandos_actuales. Retorna la reducción total del costo.
+        """
+        t0 = pytime.perf_counter()
+        ev = self.eventos_array
+        grupos = ev[:, 3]
+        validos = np.flatnonzero((grupos >= 0) & (grupos < self.num_grupos) & (ev[:, 5] >= 0) & (ev[:, 6] >= 0))
+        por_grupo = validos[np.argsort(grupos[validos], kind='stable')]
+        inicio = np.concatenate(([0], np.cumsum(np.bincount(grupos[validos], minlength=self.num_grupos))))
+
+        reduccion = 0
+        mejorado = True
+        while mejorado:
+            mejorado = False
+            for g in np.flatnonzero(np.diff(inicio)):
+                del_grupo = por_grupo[inicio[g]:inicio[g + 1]]
+                candidatos = del_grupo[self.duraciones[del_grupo] == 1]
+                bloques = del_grupo[self.duraciones[del_grupo] > 1].tolist()
+                profesores = ev[candidatos, 2]
+                con_profesor = profesores < self.num_profesores
+                for d in range(5):
+                    ocupado = self.grupos_ocupados[d * HORAS_DIA:(d + 1) * HORAS_DIA, g] > 0
+                    horas = np.flatnonzero(ocupado)
+                    if len(horas) < 2:
+                        continue
+                    for h in np.flatnonzero(~ocupado[horas[0]:horas[-1]]) + horas[0]:
+                        slot_hueco = d * HORAS_DIA + int(h)
+                        if self.grupos_ocupados[slot_hueco, g] > 0:
+                            continue
+
+                        mejor = (0, -1, -1, 0, 0)  # (delta, idx, slot, delta_conf, delta_blandos)
+
+                        # Delta de conflictos de todos los candidatos a la vez (el grupo está libre en el hueco)
+                        origen = ev[candidatos, 5] * HORAS_DIA + ev[candidatos, 6]
+                        dc = -(self.grupos_ocupados[origen, g] > 1).astype(np.int64)
+                        p = profesores[con_profesor]
+                        dc[con_profesor] += (self.profesores_ocupados[slot_hueco, p] > 0).astype(np.int64) - \
+                            (self.profesores_ocupados[origen[con_profesor], p] > 1)
+
+                        # Delta de huecos: columna del grupo tras cada movimiento posible
+                        factibles = np.flatnonzero(dc <= 0)
+                        if len(factibles):
+                            columna = self.grupos_ocupados[:, g]
+                            despues = np.repeat(columna[None, :], len(factibles), axis=0)
+                            despues[np.arange(len(factibles)), origen[factibles]] -= 1
+                            despues[:, slot_hueco] += 1
+                            db = _huecos_por_dia(despues.reshape(-1, 5, HORAS_DIA).transpose(1, 2, 0)).sum(axis=0) - \
+                                _huecos_por_dia(columna.reshape(5, HORAS_DIA, 1)).sum()
+                            delta = PESO_CONFLICTO * dc[factibles] + db
+                            self.movimientos_evaluados += len(factibles)
+                            k = int(np.argmin(delta))
+                            if delta[k] < 0:
+                                mejor = (int(delta[k]), int(candidatos[factibles[k]]), slot_hueco,
+                                         int(dc[factibles[k]]), int(db[k]))
+
+                        # Bloques: cada inicio del mismo día cuyo intervalo incluye el hueco
+                        for idx in bloques:
+                            duracion = int(self.duraciones[idx])
+                            slot_orig = int(ev[idx, 5]) * HORAS_DIA + int(ev[idx, 6])
+                            for hora in range(max(0, int(h) - duracion + 1), min(int(h), HORAS_DIA - duracion) + 1):
+                                slot = d * HORAS_DIA + hora
+                                if slot == slot_orig:
+                                    continue
+                                delta_conf = self._delta_conflictos(int(ev[idx, 2]), int(g), slot_orig, slot, duracion)
+                                if delta_conf > 0:
+                                    continue
+                                delta_blandos = self._delta_blandos(int(g), slot_orig, slot, duracion)
+                                self.movimientos_evaluados += 1
+                                delta = PESO_CONFLICTO * delta_conf + delta_blandos
+                                if delta < mejor[0]:
+                                    mejor = (delta, idx, slot, delta_conf, delta_blandos)
+
+                        delta, idx, slot, delta_conf, delta_blandos = mejor
+                        if delta < 0:
+                            self._mover_evento(idx, slot)
+                            self.conflictos_actuales += delta_conf
+                            self.blandos_actuales += delta_blandos
+                            self.movimientos_aplicados += 1
+                            reduccion -= delta
+                            mejorado = True
+
+        self.tiempo_compactacion += pytime.perf_counter() - t0
+        return reduccion
+
+    # ==================== PUNTOS DE EXTENSIÓN DEL BUCLE ====================
+
+    def _preparar(self):
+        """Se llama una vez antes de la primera iteración"""
+
+    def _paso(self):
+        """Una iteración de la búsqueda: explorar el vecindario de un evento y moverlo"""
+        return self._explorar_y_mover()
+
+    def _evaluar(self):
+        """Actualiza conflictos_actuales / blandos_actuales tras _paso()"""
+        self._evaluar_completo()
+
+    def _evaluar_completo(self):
+        """Recalcula el costo de la solución actual desde las matrices de ocupación"""
+        self.conflictos_actuales = self._calcular_conflictos_duros()
+        self.blandos_actuales = self._calcular_conflictos_blandos()
+
+    def _registrar_mejor(self):
+        """Guarda la solución actual si mejora a la mejor conocida"""
+        if self.conflictos_actuales > self.mejor_conflictos or \
+           (self.conflictos_actuales == self.mejor_conflictos and self.blandos_actuales >= self.mejor_blandos):
+            return False
+
+        self.mejoras += 1
+        self.mejor_conflictos, self.mejor_blandos = self.conflictos_actuales, self.blandos_actuales
+        self.mejor_slots[:] = self.eventos_array[:, 5:7]
+        calidad = self._calcular_calidad(self.conflictos_actuales, self.blandos_actuales)
+        self.mejor_solucion = {
+            'conflictos_duros': self.conflictos_actuales,
+            'penalizacion_blandas': self.blandos_actuales,
+            'calidad': calidad
+        }
+
+        if self.callback_log:
+            t0 = pytime.perf_counter()
+            self.callback_log(f"[MEJORA] Iter {self.iteracion_actual}: "
+                              f"Conflictos={self.conflictos_actuales}, Blandos={self.blandos_actuales}, "
+                              f"Calidad={calidad:.1f}%")
+            self.tiempo_callbacks += pytime.perf_counter() - t0
+        return True
+
+    def _proponer_movimientos(self, k):
+        """
+        Muestrea k movimientos aleatorios (evento, slot distinto) y los evalúa
+        de uno en uno contra la ocupación vigente en el momento de evaluarlos.
+        Genera (idx, slot_nuevo, delta_conflictos, delta_blandos).
+        """
+        indices = self.rng.integers(self.num_eventos, size=k)
+        destinos = self.rng.integers(self.alternativas[indices])
+        for idx, destino in zip(indices.tolist(), destinos.tolist()):
+            dia, hora = int(self.eventos_array[idx, 5]), int(self.eventos_array[idx, 6])
+            if dia < 0 or hora < 0:
+                continue
+            slot_orig = dia * HORAS_DIA + hora
+            duracion = int(self.duraciones[idx])
+            destino = _slot_alternativo(destino, slot_orig, duracion)
+            profesor_id, grupo_id = int(self.eventos_array[idx, 2]), int(self.eventos_array[idx, 3])
+            yield (idx, destino,
+                   self._delta_conflictos(profesor_id, grupo_id, slot_orig, destino, duracion),
+                   self._delta_blandos(grupo_id, slot_orig, destino, duracion))
+
+    def optimizar(self, datos_adicionales=None, callback_progreso=None, callback_log=None,
+                  grupos_info=None):
+        """
+        Método wrapper para ejecutar la optimización completa.
+
+        1. Asigna slots iniciales a eventos sin asignar
+        2. Ejecuta Búsqueda Tabú para minimizar conflictos
+
+        Returns:
+            dict con resultado de la optimización
+        """
+        tiempo_inicio = pytime.time()
+
+        if callback_log:
+            callback_log(f"[INICIO] Optimización NumPy con {self.num_eventos} eventos...")
+
+        self.asignar_slots_iniciales(grupos_info)
+
+        if callback_log:
+            callback_log(f"[INFO] Slots iniciales asignados. "
+                         f"Conflictos iniciales: {self._calcular_conflictos_duros()}")
+
+        resultado = self.ejecutar(datos_adicionales, callback_progreso, callback_log)
+
+        tiempo_total = pytime.time() - tiempo_inicio
+        resultado['tiempo_ejecucion'] = tiempo_total
+        resultado['iteraciones'] = self.iteracion_actual
+
+        if callback_log:
+            callback_log(f"[FINALIZADO] Optimización completada en {tiempo_total:.2f}s")
+
+        return resultado
+
+    # ==================== RESULTADOS ====================
+
+    def obtener_eventos(self):
+        """Retorna los eventos actuales como lista de diccionarios"""
+        return arreglo_a_eventos(self.eventos_array, self.duraciones)
+
+    def obtener_arreglo(self):
+        """Retorna eventos_array (n, 7) sin copiar"""
+        return self.eventos_array
+
+    def obtener_slots(self):
+        """Retorna una vista (n, 2) [dia, hora] de la solución actual, sin copiar"""
+        return self.eventos_array[:, 5:7]
+
+    def obtener_duraciones(self):
+        """Retorna las duraciones (n,) en horas de cada evento, sin copiar"""
+        return self.duraciones
+
+    # ==================== EDICIÓN INTERACTIVA ====================
+
+    def evaluar_movimientos(self, indices, slots):
+        """
+        Efecto de mover cada evento indices[k] al slot slots[k] (dia * 14 + hora),
+        cada movimiento por separado sobre la solución actual (no la modifica).
+        Los eventos de una hora se evalúan con operaciones vectorizadas; los
+        bloques de varias horas, uno por uno con el delta incremental.
+
+        Returns:
+            (delta_conflictos, delta_blandos): arreglos int32 del tamaño del lote
+
+        Raises:
+            ValueError: índice o slot fuera de rango, o evento sin slot asignado
+        """
+        idx = np.asarray(indices, dtype=np.int64).ravel()
+        destino = np.asarray(slots, dtype=np.int64).ravel()
+        if len(idx) != len(destino):
+            raise ValueError("indices y slots deben tener el mismo tamaño")
+        self._validar_movimientos(idx, destino)
+
+        ev = self.eventos_array
+        origen = ev[idx, 5].astype(np.int64) * HORAS_DIA + ev[idx, 6]
+        profesores, grupos = ev[idx, 2], ev[idx, 3]
+        duraciones = self.duraciones[idx]
+        bloques = np.flatnonzero((origen != destino) & (duraciones > 1))
+        mueve = (origen != destino) & (duraciones == 1)
+        delta_conf = np.zeros(len(idx), dtype=np.int32)
+
+        for ocupacion, recursos, limite in ((self.profesores_ocupados, profesores, self.num_profesores),
+                                            (self.grupos_ocupados, grupos, self.num_grupos)):
+            m = mueve & (recursos < limite)
+            delta_conf[m] += (ocupacion[destino[m], recursos[m]] > 0).astype(np.int32) - \
+                (ocupacion[origen[m], recursos[m]] > 1)
+
+        # Huecos: columna del grupo antes y después de cada movimiento
+        delta_blandos = np.zeros(len(idx), dtype=np.int32)
+        m = np.flatnonzero(mueve & (grupos < self.num_grupos))
+        if len(m):
+            antes = self.grupos_ocupados[:, grupos[m]].T
+            despues = antes.copy()
+            filas = np.arange(len(m))
+            despues[filas, origen[m]] -= 1
+            despues[filas, destino[m]] += 1
+            delta_blandos[m] = (_huecos_por_dia(despues.reshape(-1, 5, HORAS_DIA).transpose(1, 2, 0)).sum(axis=0) -
+                                _huecos_por_dia(antes.reshape(-1, 5, HORAS_DIA).transpose(1, 2, 0)).sum(axis=0))
+
+        for k in bloques.tolist():
+            o, dst, d = int(origen[k]), int(destino[k]), int(duraciones[k])
+            delta_conf[k] = self._delta_conflictos(int(profesores[k]), int(grupos[k]), o, dst, d)
+            delta_blandos[k] = self._delta_blandos(int(grupos[k]), o, dst, d)
+
+        self.movimientos_evaluados += len(idx)
+        return delta_conf, delta_blandos
+
+    def aplicar_movimiento(self, idx, slot_nuevo):
+        """
+        Mueve el evento idx a slot_nuevo actualizando la ocupación de forma
+        incremental. Retorna (delta_conflictos, delta_blandos) del movimiento.
+        """
+        self._validar_movimientos(np.array([idx]), np.array([slot_nuevo]))
+        ev = self.eventos_array
+        slot_orig = int(ev[idx, 5]) * HORAS_DIA + int(ev[idx, 6])
+        if slot_nuevo == slot_orig:
+            return 0, 0
+        duracion = int(self.duraciones[idx])
+        delta_conf = self._delta_conflictos(int(ev[idx, 2]), int(ev[idx, 3]), slot_orig, slot_nuevo, duracion)
+        delta_blandos = self._delta_blandos(int(ev[idx, 3]), slot_orig, slot_nuevo, duracion)
+        self._mover_evento(idx, slot_nuevo)
+        self.movimientos_aplicados += 1
+        return delta_conf, delta_blandos
+
+    def _validar_movimientos(self, idx, destino):
+        """Comprueba índices, slots, que los eventos tengan slot asignado y que los bloques quepan"""
+        fuera = np.flatnonzero((idx < 0) | (idx >= self.num_eventos))
+        if len(fuera):
+            raise ValueError(f"Evento fuera de rango: {idx[fuera[0]]}")
+        fuera = np.flatnonzero((destino < 0) | (destino >= NUM_SLOTS))
+        if len(fuera):
+            raise ValueError(f"Slot fuera de rango: {destino[fuera[0]]} (0-69)")
+        sin_slot = np.flatnonzero((self.eventos_array[idx, 5] < 0) | (self.eventos_array[idx, 6] < 0))
+        if len(sin_slot):
+            raise ValueError(f"El evento {idx[sin_slot[0]]} no tiene slot asignado")
+        no_cabe = np.flatnonzero(destino % HORAS_DIA + self.duraciones[idx] > HORAS_DIA)
+        if len(no_cabe):
+            k = no_cabe[0]
+            raise ValueError(f"El evento {idx[k]} ({self.duraciones[idx[k]]} horas) "
+                             f"no cabe en el día desde el slot {destino[k]}")
+
+    def get_estadisticas(self):
+        """Retorna estadísticas de la solución actual y contadores del motor"""
+        conflictos = self._calcular_conflictos_duros()
+        blandos = self._calcular_conflictos_blandos()
+
+        return {
+            'num_eventos': self.num_eventos,
+            'num_profesores': self.num_profesores,
+            'num_grupos': self.num_grupos,
+            'conflictos_duros': conflictos,
+            'conflictos_blandos': blandos,
+            'calidad': self._calcular_calidad(conflictos, blandos),
+            'iteraciones': self.iteracion_actual,
+            'metricas': self.get_metricas()
+        }
+
+    def get_metricas(self):
+        """Contadores acumulados desde inicializar() (mismo formato que el motor Cython)"""
+        return {
+            'iteraciones': self.iteraciones_ejecutadas,
+            'movimientos_evaluados': self.movimientos_evaluados,
+            'rechazos_tabu': self.rechazos_tabu,
+            'movimientos_aplicados': self.movimientos_aplicados,
+            'mejoras': self.mejoras,
+            'checkpoints': self.checkpoints_guardados,
+            'cota_alcanzada': self.cota_alcanzada,
+            'iteraciones_por_segundo': (self.iteraciones_ejecutadas / self.tiempo_ejecucion
+                                        if self.tiempo_ejecucion > 0 else 0.0),
+            'tiempo': {
+                'vecindario': self.tiempo_vecindario,
+                'movimiento': self.tiempo_movimiento,
+                'evaluacion': self.tiempo_evaluacion,
+                'compactacion': self.tiempo_compactacion,
+                'checkpoints': self.tiempo_checkpoints,
+                'callbacks': self.tiempo_callbacks,
+                'total': self.tiempo_ejecucion
+            }
+        }
+
+
+# ==================== MOTORES DE MOVIMIENTOS ALEATORIOS ====================
+
+class RecocidoSimuladoNumpy(BusquedaTabuNumpy):
+    """
+    Recocido simulado sobre la misma representación, ocupación y función
+    objetivo que BusquedaTabuNumpy (equivalente a RecocidoSimulado en Cython).
+
+    Cada iteración muestrea movimientos_por_iteracion movimientos aleatorios
+    evaluados en O(1) y los acepta con el criterio de Metropolis sobre el costo
+    PESO_CONFLICTO * conflictos + huecos.
+    """
+
+    def __init__(self, max_iter=1000, tamano_tabu=30, semilla=-1,
+                 temperatura_inicial=10.0, enfriamiento=0.995, tipo_enfriamiento='geometrico',
+                 temperatura_minima=0.01, movimientos_por_iteracion=70, intervalo_compactacion=100):
+        super().__init__(max_iter, tamano_tabu, semilla, intervalo_compactacion)
+        if tipo_enfriamiento not in ('geometrico', 'lineal'):
+            raise ValueError(f"tipo_enfriamiento desconocido: {tipo_enfriamiento} (geometrico o lineal)")
+        if movimientos_por_iteracion < 1:
+            raise ValueError("movimientos_por_iteracion debe ser positivo")
+        self.temperatura_inicial = temperatura_inicial
+        self.temperatura_minima = temperatura_minima
+        self.enfriamiento = enfriamiento
+        self.enfriamiento_lineal = tipo_enfriamiento == 'lineal'
+        self.movimientos_por_iteracion = movimientos_por_iteracion
+        self.temperatura = temperatura_inicial
+
+    def _preparar(self):
+        self.temperatura = self.temperatura_inicial
+
+    def _paso(self):
+        t0 = pytime.perf_counter()
+        evaluados = aplicados = 0
+        azar = self.rng.random(self.movimientos_por_iteracion)
+
+        for k, (idx, slot_nuevo, delta_conf, delta_blandos) in enumerate(
+                self._proponer_movimientos(self.movimientos_por_iteracion)):
+            evaluados += 1
+            delta = PESO_CONFLICTO * delta_conf + delta_blandos
+            if delta <= 0 or (self.temperatura > 0 and azar[k] < np.exp(-delta / self.temperatura)):
+                self._mover_evento(idx, slot_nuevo)
+                self.conflictos_actuales += delta_conf
+                self.blandos_actuales += delta_blandos
+                aplicados += 1
+                if delta < 0:
+                    self._registrar_mejor()
+
+        if self.enfriamiento_lineal:
+            self.temperatura = self.temperatura_inicial - (self.temperatura_inicial - self.temperatura_minima) * \
+                (self.iteracion_actual + 1) / self.max_iteraciones
+        else:
+            self.temperatura *= self.enfriamiento
+        self.temperatura = max(self.temperatura, self.temperatura_minima)
+
+        self.movimientos_evaluados += evaluados
+        self.movimientos_aplicados += aplicados
+        self.tiempo_vecindario += pytime.perf_counter() - t0
+        return aplicados > 0
+
+    def _evaluar(self):
+        # El costo se mantiene incrementalmente en _paso()
+        pass
+
+
+class AceptacionTardiaNumpy(BusquedaTabuNumpy):
+    """
+    Late Acceptance Hill Climbing (Burke y Bykov) sobre la misma representación,
+    ocupación y función objetivo que BusquedaTabuNumpy.
+
+    Un movimiento aleatorio se acepta si no empeora el costo actual o si no es
+    peor que el costo de hace longitud_historia movimientos.
+    """
+
+    def __init__(self, max_iter=1000, tamano_tabu=30, semilla=-1,
+                 longitud_historia=1000, movimientos_por_iteracion=70, intervalo_compactacion=100):
+        super().__init__(max_iter, tamano_tabu, semilla, intervalo_compactacion)
+        if longitud_historia < 1 or movimientos_por_iteracion < 1:
+            raise ValueError("longitud_historia y movimientos_por_iteracion deben ser positivos")
+        self.longitud_historia = longitud_historia
+        self.movimientos_por_iteracion = movimientos_por_iteracion
+        self.historia = np.zeros(longitud_historia, dtype=np.int64)
+        self.movimientos_realizados = 0
+
+    def _preparar(self):
+        self.historia[:] = PESO_CONFLICTO * self.conflictos_actuales + self.blandos_actuales
+        self.movimientos_realizados = 0
+
+    def _paso(self):
+        t0 = pytime.perf_counter()
+        evaluados = aplicados = 0
+        costo = PESO_CONFLICTO * self.conflictos_actuales + self.blandos_actuales
+
+        for idx, slot_nuevo, delta_conf, delta_blandos in self._proponer_movimientos(self.movimientos_por_iteracion):
+            evaluados += 1
+            delta = PESO_CONFLICTO * delta_conf + delta_blandos
+            v = self.movimientos_realizados % self.longitud_historia
+
+            if costo + delta <= self.historia[v] or delta <= 0:
+                self._mover_evento(idx, slot_nuevo)
+                self.conflictos_actuales += delta_conf
+                self.blandos_actuales += delta_blandos
+                costo += delta
+                aplicados += 1
+                if delta < 0:
+                    self._registrar_mejor()
+
+            self.historia[v] = costo
+            self.movimientos_realizados += 1
+
+        self.movimientos_evaluados += evaluados
+        self.movimientos_aplicados += aplicados
+        self.tiempo_vecindario += pytime.perf_counter() - t0
+        return aplicados > 0
+
+    def _evaluar(self):
+        # El costo se mantiene incrementalmente en _paso()
+        pass
+
+
+# Motores disponibles por nombre (parámetro 'motor' de la API y de sistema_horarios)
+MOTORES = {
+    'tabu': BusquedaTabuNumpy,
+    'recocido': RecocidoSimuladoNumpy,
+    'aceptacion_tardia': AceptacionTardiaNumpy,
+}
@@ -10,12 +10,142 @@ Implementación basada en la lógica de JavaScript con optimizaciones Cython.
 Autor: Sistema de Horarios ITI
 """
 
+import os
+import pickle
+
 import numpy as np
 cimport numpy as cnp
-from libc.stdlib cimport rand, srand, RAND_MAX
-from libc.time cimport time as ctime
+from libc.math cimport exp
 import time as pytime
 
+# Columnas de eventos_array y dtype estructurado equivalente
+CAMPOS_EVENTO = ('id', 'materia_id', 'profesor_id', 'grupo_id', 'aula_id', 'dia', 'hora')
+DTYPE_EVENTO = np.dtype([(campo, np.int32) for campo in CAMPOS_EVENTO])
+
+# Peso de un conflicto duro frente a una hora de hueco en el costo escalar
+# que usan los motores de movimientos aleatorios
+cdef enum:
+    PESO_CONFLICTO = 100
+
+# Versión del estado serializado (__getstate__ / checkpoints)
+FORMATO_CHECKPOINT = 1
+
+
+def como_arreglo_eventos(eventos):
+    """
+    Convierte eventos a un arreglo int32 (n, 7) C-contiguo.
+    
+    Acepta un ndarray int32 (n, 7), un arreglo estructurado con los campos
+    de CAMPOS_EVENTO o cualquier objeto con protocolo buffer. Si la entrada
+    ya es int32, C-contigua y escribible se retorna la misma memoria (sin copia).
+    """
+    arr = np.asarray(eventos)
+    
+    if arr.dtype.names is not None:
+        if arr.dtype == DTYPE_EVENTO and arr.flags.c_contiguous:
+            arr = arr.view(np.int32).reshape(arr.shape[0], 7)
+        else:
+            arr = np.stack([arr[campo] for campo in CAMPOS_EVENTO], axis=1)
+    
+    if arr.ndim != 2 or arr.shape[1] != 7:
+        raise ValueError(f"Se esperaba un arreglo de eventos (n, 7), se recibió {arr.shape}")
+    
+    if arr.dtype != np.int32 or not arr.flags.c_contiguous or not arr.flags.writeable:
+        arr = np.array(arr, dtype=np.int32, order='C')
+    
+    return arr
+
+
+def como_duraciones(duraciones, int n):
+    """Duraciones int32 (n,) validadas; None = todos los eventos de una hora"""
+    if duraciones is None:
+        return np.ones(n, dtype=np.int32)
+    # Copia propia: las del snapshot mapeado son de solo lectura y la vista tipada pide un buffer escribible
+    arr = np.array(duraciones, dtype=np.int32).reshape(-1)
+    if len(arr) != n:
+        raise ValueError(f"Se esperaban {n} duraciones, se recibieron {len(arr)}")
+    if n and (arr.min() < 1 or arr.max() > 14):
+        raise ValueError("Las duraciones deben estar entre 1 y 14 horas")
+    return arr
+
+
+cdef inline unsigned long long _mezclar_semilla(unsigned long long x):
+    """splitmix64: estado inicial (nunca cero) del generador xorshift a partir de la semilla"""
+    x += 0x9E3779B97F4A7C15ULL
+    x = (x ^ (x >> 30)) * 0xBF58476D1CE4E5B9ULL
+    x = (x ^ (x >> 27)) * 0x94D049BB133111EBULL
+    x ^= x >> 31
+    return x if x != 0 else 0x9E3779B97F4A7C15ULL
+
+
+def cargar_checkpoint(ruta):
+    """Motor guardado con guardar_checkpoint(), listo para reanudar()"""
+    with open(ruta, 'rb') as f:
+        return pickle.load(f)
+
+
+cdef inline int _slot_alternativo(int r, int slot_orig, int duracion):
+    """
+    r-ésimo slot de inicio válido para un bloque de duracion horas, saltando
+    slot_orig (r en [0, 5 * (15 - duracion) - 1)).
+    """
+    cdef int por_dia = 15 - duracion
+    if r >= (slot_orig // 14) * por_dia + slot_orig % 14:
+        r += 1
+    return (r // por_dia) * 14 + r % por_dia
+
+
+def construir_grafo_conflictos(eventos):
+    """
+    Grafo de conflictos entre eventos en formato CSR: dos eventos son vecinos
+    si comparten profesor o grupo. Los vecinos de u son
+    indices[indptr[u]:indptr[u + 1]], ordenados y sin repetir.
+    
+    Returns:
+        (indptr, indices) como arreglos int32
+    """
+    ev = np.asarray(eventos)
+    n = ev.shape[0]
+    pares = []
+    for columna in (2, 3):
+        orden = np.argsort(ev[:, columna], kind='stable')
+        limites = np.flatnonzero(np.diff(ev[orden, columna])) + 1
+        for bloque in np.split(orden, limites):
+            if len(bloque) > 1:
+                origen, destino = np.meshgrid(bloque, bloque, indexing='ij')
+                distintos = origen != destino
+                pares.append(origen[distintos].astype(np.int64) * n + destino[distintos])
+    
+    codigos = np.sort(np.concatenate(pares)) if pares else np.zeros(0, dtype=np.int64)
+    codigos = codigos[np.r_[True, np.diff(codigos) != 0]] if len(codigos) else codigos
+    indptr = np.zeros(n + 1, dtype=np.int32)
+    indptr[1:] = np.cumsum(np.bincount(codigos // max(n, 1), minlength=n))
+    return indptr, (codigos % max(n, 1)).astype(np.int32)
+
+
+cdef void _colorear_evento(int v, int slot, cnp.int32_t[:, ::1] ev, cnp.int32_t[::1] dur,
+                           cnp.int32_t[::1] par, cnp.int32_t[:, ::1] par_dia,
+                           cnp.int32_t[:, ::1] occ_prof, cnp.int32_t[:, ::1] occ_grupo,
+                           cnp.int32_t[::1] indptr, cnp.int32_t[::1] indices,
+                           cnp.uint8_t[:, ::1] bloqueado, cnp.int32_t[::1] saturacion,
+                           cnp.uint8_t[::1] coloreado):
+    """Fija el slot de v (todas las horas de su bloque) y propaga la saturación a sus vecinos (DSATUR)"""
+    cdef int k, u, s
+    ev[v, 5] = slot // 14
+    ev[v, 6] = slot % 14
+    coloreado[v] = 1
+    for s in range(slot, slot + dur[v]):
+        if ev[v, 2] < occ_prof.shape[1]:
+            occ_prof[s, ev[v, 2]] += 1
+        if ev[v, 3] < occ_grupo.shape[1]:
+            occ_grupo[s, ev[v, 3]] += 1
+        for k in range(indptr[v], indptr[v + 1]):
+            u = indices[k]
+            if not bloqueado[u, s]:
+                bloqueado[u, s] = 1
+                saturacion[u] += 1
+    par_dia[par[v], slot // 14] += dur[v]
+
 # ==================== CLASE BÚSQUEDA TABÚ ====================
 
 cdef class BusquedaTabu:
@@ -43,16 +173,45 @@ cdef class BusquedaTabu:
         # Matriz de eventos: [id, materia_id, profesor_id, grupo_id, aula_id, dia, hora]
         cnp.ndarray eventos_array
         
+        # Horas consecutivas de cada evento (un bloque se mueve entero)
+        cnp.ndarray duraciones
+        
         # Matrices de ocupación: ocupacion[slot_id, recurso_id] = count
         # slot_id = dia * 14 + hora (0-69 para 5 días x 14 horas)
         cnp.ndarray profesores_ocupados
         cnp.ndarray grupos_ocupados
         
+        # Vistas tipadas sobre los mismos buffers (acceso O(1) sin pasar por Python)
+        cnp.int32_t[:, ::1] ev
+        cnp.int32_t[::1] dur
+        cnp.int32_t[:, ::1] occ_prof
+        cnp.int32_t[:, ::1] occ_grupo
+        
+        # Grafo de conflictos (CSR) del último coloreo inicial
+        public object grafo_indptr
+        public object grafo_indices
+        
         # Lista tabú y solución
         list lista_tabu
         dict mejor_solucion
         int iteracion_actual
         
+        # Búsqueda en curso: se reanuda desde siguiente_iteracion (reanudar())
+        int siguiente_iteracion
+        bint en_curso
+        bint compactada
+        
+        # Estado del generador xorshift64* propio del motor (no comparte rand()
+        # con otros motores del proceso y viaja en los checkpoints)
+        unsigned long long estado_rng
+        
+        # Costo de la solución actual y copia de la mejor (dia, hora por evento)
+        int conflictos_actuales
+        int blandos_actuales
+        int mejor_conflictos
+        int mejor_blandos
+        cnp.ndarray mejor_slots
+        
         # Información de grupos (vespertino/matutino)
         list grupos_vespertinos  # IDs de grupos vespertinos
         
@@ -60,22 +219,70 @@ cdef class BusquedaTabu:
         object callback_progreso
         object callback_log
         
-    def __init__(self, int max_iter=1000, int tamano_tabu=30):
+        # Contadores de instrumentación (siempre activos, se reinician en inicializar)
+        long long movimientos_evaluados
+        long long rechazos_tabu
+        long long movimientos_aplicados
+        long long mejoras
+        double tiempo_vecindario
+        double tiempo_movimiento
+        double tiempo_evaluacion
+        double tiempo_callbacks
+        double tiempo_compactacion
+        double tiempo_checkpoints
+        double tiempo_ejecucion
+        int iteraciones_ejecutadas
+        long long checkpoints_guardados
+        
+        # Compactación de huecos (0 = desactivada)
+        public int intervalo_compactacion
+        
+        # Eventos cuyo vecindario se evalúa por iteración (lista de candidatos)
+        public int candidatos_por_iteracion
+        
+        # Checkpoints periódicos (activar_checkpoints(); 0 = desactivados)
+        public int intervalo_checkpoint
+        public object ruta_checkpoint
+        public object metadatos_checkpoint
+        
+        # Cota inferior demostrada (establecer_cota_inferior(); -1 = sin cota)
+        public int cota_conflictos
+        public int cota_blandos
+        bint cota_alcanzada
+        
+    def __init__(self, int max_iter=1000, int tamano_tabu=30, long semilla=-1,
+                 int intervalo_compactacion=100, int candidatos_por_iteracion=8):
         """
         Inicializa el optimizador de Búsqueda Tabú.
         
         Args:
             max_iter: Máximo de iteraciones
             tamano_tabu: Tamaño de la lista tabú
+            semilla: Semilla del generador aleatorio (-1 = usar la hora actual)
+            intervalo_compactacion: Con cero conflictos duros, compactar huecos al
+                                    llegar a cero y cada este número de
+                                    iteraciones (0 = nunca)
+            candidatos_por_iteracion: Eventos aleatorios cuyo vecindario se evalúa
+                                      en cada iteración (se aplica el mejor
+                                      movimiento entre todos)
         """
+        if intervalo_compactacion < 0:
+            raise ValueError("intervalo_compactacion no puede ser negativo")
+        if candidatos_por_iteracion < 1:
+            raise ValueError("candidatos_por_iteracion debe ser positivo")
         self.max_iteraciones = max_iter
         self.tamano_lista_tabu = tamano_tabu
+        self.intervalo_compactacion = intervalo_compactacion
+        self.candidatos_por_iteracion = candidatos_por_iteracion
         self.lista_tabu = []
         self.iteracion_actual = 0
         self.grupos_vespertinos = []
+        self.intervalo_checkpoint = 0
+        self.cota_conflictos = -1
+        self.cota_blandos = 0
         
-        # Seed aleatorio
-        srand(ctime(NULL))
+        # Seed aleatorio (reproducible si se indica semilla)
+        self.estado_rng = _mezclar_semilla(semilla if semilla >= 0 else pytime.time_ns())
         
     def inicializar(self, list eventos, int num_profesores, int num_grupos, int num_aulas, 
                     list grupos_info=None):
@@ -89,7 +296,40 @@ cdef class BusquedaTabu:
             num_aulas: Número de aulas
             grupos_info: Lista con información de grupos (nombre, turno)
         """
-        self.num_eventos = len(eventos)
+        arreglo = np.array(
+            [(e.get('id', i), e.get('materia_id', 0), e.get('profesor_id', 0),
+              e.get('grupo_id', 0), e.get('aula_id', 0),
+              e.get('slot', {}).get('dia', -1), e.get('slot', {}).get('hora', -1))
+             for i, e in enumerate(eventos)],
+            dtype=np.int32
+        ).reshape(len(eventos), 7)
+        duraciones = np.array([e.get('duracion', 1) for e in eventos], dtype=np.int32)
+        
+        self.inicializar_arreglo(arreglo, num_profesores, num_grupos, num_aulas, grupos_info, duraciones)
+    
+    def inicializar_arreglo(self, eventos, int num_profesores, int num_grupos, int num_aulas,
+                            list grupos_info=None, duraciones=None):
+        """
+        Inicializa el motor directamente desde un arreglo de eventos.
+        
+        Si eventos es un ndarray int32 (n, 7) C-contiguo y escribible (o un
+        arreglo estructurado DTYPE_EVENTO) el motor trabaja sobre esa misma
+        memoria: al terminar, las columnas dia/hora contienen la solución.
+        
+        Args:
+            eventos: Arreglo (n, 7) [id, materia_id, profesor_id, grupo_id, aula_id, dia, hora]
+            num_profesores, num_grupos, num_aulas, grupos_info: como en inicializar()
+            duraciones: Horas consecutivas de cada evento (None = 1); un bloque
+                        ocupa el mismo día desde su hora de inicio y se mueve entero
+        """
+        self.eventos_array = como_arreglo_eventos(eventos)
+        self.num_eventos = self.eventos_array.shape[0]
+        self.duraciones = como_duraciones(duraciones, self.num_eventos)
+        fuera = np.flatnonzero((self.eventos_array[:, 6] >= 0) &
+                               (self.eventos_array[:, 6] + self.duraciones > 14))
+        if len(fuera):
+            raise ValueError(f"El evento {fuera[0]} ({self.duraciones[fuera[0]]} horas) "
+                             f"no cabe en el día desde la hora {self.eventos_array[fuera[0], 6]}")
         self.num_profesores = max(num_profesores, 50)
         self.num_grupos = max(num_grupos, 20)
         self.num_aulas = max(num_aulas, 10)
@@ -103,25 +343,10 @@ cdef class BusquedaTabu:
                 if nombre == 'ITI 1-1' or '-3' in nombre or nombre == 'ITI 8-2':
                     self.grupos_vespertinos.append(g.get('id', 0))
         
-        # Inicializar matriz de eventos
-        self.eventos_array = np.zeros((self.num_eventos, 7), dtype=np.int32)
-        
-        cdef int i
-        for i in range(self.num_eventos):
-            e = eventos[i]
-            self.eventos_array[i, 0] = e.get('id', i)
-            self.eventos_array[i, 1] = e.get('materia_id', 0)
-            self.eventos_array[i, 2] = e.get('profesor_id', 0)
-            self.eventos_array[i, 3] = e.get('grupo_id', 0)
-            self.eventos_array[i, 4] = e.get('aula_id', 0)
-            
-            slot = e.get('slot', {})
-            self.eventos_array[i, 5] = slot.get('dia', -1)
-            self.eventos_array[i, 6] = slot.get('hora', -1)
-        
         # Inicializar matrices de ocupación
         self.profesores_ocupados = np.zeros((70, self.num_profesores), dtype=np.int32)
         self.grupos_ocupados = np.zeros((70, self.num_grupos), dtype=np.int32)
+        self._enlazar_vistas()
         
         # Llenar ocupación inicial si hay slots asignados
         self._actualizar_matrices_ocupacion()
@@ -129,28 +354,63 @@ cdef class BusquedaTabu:
         # Inicializar lista tabú
         self.lista_tabu = []
         self.iteracion_actual = 0
-        
+        self.en_curso = False
+        self._reiniciar_contadores()
+        
+    cdef void _enlazar_vistas(self):
+        """Apunta las vistas tipadas a eventos_array y a las matrices de ocupación"""
+        self.ev = self.eventos_array
+        self.dur = self.duraciones
+        self.occ_prof = self.profesores_ocupados
+        self.occ_grupo = self.grupos_ocupados
+    
+    cdef void _reiniciar_contadores(self):
+        """Pone a cero los contadores de instrumentación"""
+        self.movimientos_evaluados = 0
+        self.rechazos_tabu = 0
+        self.movimientos_aplicados = 0
+        self.mejoras = 0
+        self.tiempo_vecindario = 0.0
+        self.tiempo_movimiento = 0.0
+        self.tiempo_evaluacion = 0.0
+        self.tiempo_callbacks = 0.0
+        self.tiempo_compactacion = 0.0
+        self.tiempo_checkpoints = 0.0
+        self.tiempo_ejecucion = 0.0
+        self.iteraciones_ejecutadas = 0
+        self.checkpoints_guardados = 0
+    
+    # ==================== GENERADOR ALEATORIO ====================
+    
+    cdef inline unsigned int _aleatorio(self):
+        """xorshift64*: siguiente entero de 32 bits"""
+        cdef unsigned long long x = self.estado_rng
+        x ^= x >> 12
+        x ^= x << 25
+        x ^= x >> 27
+        self.estado_rng = x
+        return <unsigned int>((x * 0x2545F4914F6CDD1DULL) >> 32)
+    
+    cdef inline int _entero(self, int n):
+        """Entero uniforme en [0, n)"""
+        return <int>(self._aleatorio() % <unsigned int>n)
+    
+    cdef inline double _uniforme(self):
+        """Real uniforme en [0, 1)"""
+        return self._aleatorio() / 4294967296.0
+    
     cdef void _actualizar_matrices_ocupacion(self):
         """Recalcula las matrices de ocupación basándose en eventos_array"""
-        cdef int i, slot_id, profesor_id, grupo_id, dia, hora
+        cdef int i
         
         # Limpiar matrices
         self.profesores_ocupados.fill(0)
         self.grupos_ocupados.fill(0)
         
+        # Cada evento ocupa todas las horas de su bloque
         for i in range(self.num_eventos):
-            dia = self.eventos_array[i, 5]
-            hora = self.eventos_array[i, 6]
-            
-            if dia >= 0 and hora >= 0:
-                slot_id = dia * 14 + hora
-                profesor_id = self.eventos_array[i, 2]
-                grupo_id = self.eventos_array[i, 3]
-                
-                if profesor_id < self.num_profesores:
-                    self.profesores_ocupados[slot_id, profesor_id] += 1
-                if grupo_id < self.num_grupos:
-                    self.grupos_ocupados[slot_id, grupo_id] += 1
+            if self.ev[i, 5] >= 0 and self.ev[i, 6] >= 0:
+                self._ocupar(self.ev[i, 2], self.ev[i, 3], self.ev[i, 5] * 14 + self.ev[i, 6], self.dur[i], 1)
     
     cdef int _calcular_conflictos_duros(self):
         """
@@ -179,15 +439,6 @@ cdef class BusquedaTabu:
         
         return conflictos
     
-    cdef int _calcular_conflicto_en_slot(self, int slot_id, int profesor_id, int grupo_id):
-        """Calcula conflictos solo en un slot específico - O(1)"""
-        cdef int conf = 0
-        if profesor_id < self.num_profesores and self.profesores_ocupados[slot_id, profesor_id] > 1:
-            conf += self.profesores_ocupados[slot_id, profesor_id] - 1
-        if grupo_id < self.num_grupos and self.grupos_ocupados[slot_id, grupo_id] > 1:
-            conf += self.grupos_ocupados[slot_id, grupo_id] - 1
-        return conf
-    
     cdef int _calcular_conflictos_blandos(self):
         """
         Calcula penalizaciones de restricciones blandas.
@@ -195,40 +446,134 @@ cdef class BusquedaTabu:
         - Clases fuera de turno
         """
         cdef int penalizacion = 0
-        cdef int grupo, dia, hora, slot_id
-        cdef int primera_clase, ultima_clase, clases_dia, huecos
+        cdef int grupo, dia
         
         # Para cada grupo, contar huecos
         for grupo in range(self.num_grupos):
             for dia in range(5):
-                primera_clase = -1
-                ultima_clase = -1
-                clases_dia = 0
-                
-                for hora in range(14):
-                    slot_id = dia * 14 + hora
-                    if self.grupos_ocupados[slot_id, grupo] > 0:
-                        if primera_clase < 0:
-                            primera_clase = hora
-                        ultima_clase = hora
-                        clases_dia += 1
-                
-                # Huecos = diferencia entre primera y última clase menos clases
-                if primera_clase >= 0 and clases_dia > 1:
-                    huecos = (ultima_clase - primera_clase + 1) - clases_dia
-                    penalizacion += huecos
+                penalizacion += self._huecos_grupo_dia(grupo, dia)
         
         return penalizacion
     
+    cdef inline int _huecos_grupo_dia(self, int grupo, int dia):
+        """Huecos de un grupo en un día: (última - primera + 1) - clases"""
+        cdef int hora
+        cdef int primera_clase = -1
+        cdef int ultima_clase = -1
+        cdef int clases_dia = 0
+        
+        for hora in range(14):
+            if self.occ_grupo[dia * 14 + hora, grupo] > 0:
+                if primera_clase < 0:
+                    primera_clase = hora
+                ultima_clase = hora
+                clases_dia += 1
+        
+        if clases_dia > 1:
+            return (ultima_clase - primera_clase + 1) - clases_dia
+        return 0
+    
+    cdef inline void _ocupar(self, int profesor_id, int grupo_id, int slot, int duracion, int signo):
+        """Suma signo a la ocupación del profesor y del grupo en las duracion horas desde slot"""
+        cdef int s
+        for s in range(slot, slot + duracion):
+            if profesor_id < self.num_profesores:
+                self.occ_prof[s, profesor_id] += signo
+            if grupo_id < self.num_grupos:
+                self.occ_grupo[s, grupo_id] += signo
+    
+    cdef inline int _horas_ocupadas(self, int profesor_id, int grupo_id, int slot, int duracion):
+        """Horas del intervalo en que el profesor o el grupo ya tienen clase (una por recurso)"""
+        cdef int s
+        cdef int ocupadas = 0
+        for s in range(slot, slot + duracion):
+            if profesor_id < self.num_profesores:
+                ocupadas += self.occ_prof[s, profesor_id] > 0
+            if grupo_id < self.num_grupos:
+                ocupadas += self.occ_grupo[s, grupo_id] > 0
+        return ocupadas
+    
+    cdef inline int _delta_conflictos(self, int profesor_id, int grupo_id, int slot_orig, int slot_nuevo,
+                                      int duracion):
+        """
+        Cambio en conflictos duros al mover un evento de slot_orig a slot_nuevo - O(duracion).
+        Al salir se elimina un conflicto por cada recurso duplicado en el origen;
+        al entrar se crea uno por cada recurso ya ocupado en el destino. Un
+        bloque se quita de todo su intervalo antes de contar el destino, así
+        que los intervalos de origen y destino pueden solaparse.
+        """
+        cdef int delta = 0
+        if duracion == 1:
+            if profesor_id < self.num_profesores:
+                delta += (self.occ_prof[slot_nuevo, profesor_id] > 0) - (self.occ_prof[slot_orig, profesor_id] > 1)
+            if grupo_id < self.num_grupos:
+                delta += (self.occ_grupo[slot_nuevo, grupo_id] > 0) - (self.occ_grupo[slot_orig, grupo_id] > 1)
+            return delta
+        
+        self._ocupar(profesor_id, grupo_id, slot_orig, duracion, -1)
+        delta = self._horas_ocupadas(profesor_id, grupo_id, slot_nuevo, duracion) - \
+            self._horas_ocupadas(profesor_id, grupo_id, slot_orig, duracion)
+        self._ocupar(profesor_id, grupo_id, slot_orig, duracion, 1)
+        return delta
+    
+    cdef int _delta_blandos(self, int grupo_id, int slot_orig, int slot_nuevo, int duracion):
+        """Cambio en huecos del grupo al mover un evento (solo los días afectados)"""
+        cdef int dia_orig = slot_orig // 14
+        cdef int dia_nuevo = slot_nuevo // 14
+        cdef int antes, despues, s
+        
+        if grupo_id >= self.num_grupos:
+            return 0
+        
+        antes = self._huecos_grupo_dia(grupo_id, dia_orig)
+        if dia_nuevo != dia_orig:
+            antes += self._huecos_grupo_dia(grupo_id, dia_nuevo)
+        
+        for s in range(duracion):
+            self.occ_grupo[slot_orig + s, grupo_id] -= 1
+        for s in range(duracion):
+            self.occ_grupo[slot_nuevo + s, grupo_id] += 1
+        despues = self._huecos_grupo_dia(grupo_id, dia_orig)
+        if dia_nuevo != dia_orig:
+            despues += self._huecos_grupo_dia(grupo_id, dia_nuevo)
+        for s in range(duracion):
+            self.occ_grupo[slot_nuevo + s, grupo_id] -= 1
+        for s in range(duracion):
+            self.occ_grupo[slot_orig + s, grupo_id] += 1
+        
+        return despues - antes
+    
+    cdef void _mover_evento(self, int idx, int slot_nuevo):
+        """Mueve un evento asignado (todo su bloque) a slot_nuevo actualizando la ocupación"""
+        cdef int profesor_id = self.ev[idx, 2]
+        cdef int grupo_id = self.ev[idx, 3]
+        cdef int slot_orig = self.ev[idx, 5] * 14 + self.ev[idx, 6]
+        
+        self._ocupar(profesor_id, grupo_id, slot_orig, self.dur[idx], -1)
+        self._ocupar(profesor_id, grupo_id, slot_nuevo, self.dur[idx], 1)
+        
+        self.ev[idx, 5] = slot_nuevo // 14
+        self.ev[idx, 6] = slot_nuevo % 14
+    
     def asignar_slots_iniciales(self, list grupos_info=None):
         """
-        Asigna slots iniciales a eventos sin asignar.
-        Respeta turnos matutino/vespertino y evita conflictos iniciales.
+        Asigna slots iniciales a eventos sin asignar coloreando el grafo de
+        conflictos con DSATUR (70 colores = 70 slots).
+        
+        Los eventos que ya tienen slot se respetan. En cada paso se colorea el
+        evento con más slots bloqueados por sus vecinos (desempate: mayor grado)
+        y se elige, en este orden, el slot sin conflictos, dentro del turno del
+        grupo, sin exceder las horas por día de la materia, que abra menos
+        huecos y en el día menos cargado del grupo. Un bloque de varias horas
+        solo puede empezar donde cabe entero en el día y se puntúa por todo su
+        intervalo.
         """
-        cdef int i, dia, hora, slot_id
-        cdef int grupo_id, profesor_id, materia_id
-        cdef int hora_inicio, hora_fin
-        cdef bint asignado, grupo_libre, prof_libre
+        cdef int i, v, paso, slot, mejor_slot, dia, hora, pendientes, s, d
+        cdef int profesor_id, grupo_id, hora_inicio, hora_fin, limite
+        cdef int clases, primera, ultima, nueva_primera, nueva_ultima, delta
+        cdef bint libre
+        cdef long long puntaje, mejor_puntaje, clave, mejor_clave
+        cdef int n = self.num_eventos
         
         # Actualizar grupos vespertinos si se proporciona info
         if grupos_info:
@@ -237,145 +582,119 @@ cdef class BusquedaTabu:
                 nombre = g.get('nombre', '')
                 if nombre == 'ITI 1-1' or '-3' in nombre or nombre == 'ITI 8-2':
                     self.grupos_vespertinos.append(g.get('id', 0))
-        
-        # Matrices temporales para asignación
-        cdef cnp.ndarray[cnp.int32_t, ndim=2] temp_prof = np.zeros((70, self.num_profesores), dtype=np.int32)
-        cdef cnp.ndarray[cnp.int32_t, ndim=2] temp_grupo = np.zeros((70, self.num_grupos), dtype=np.int32)
-        
-        # Primero marcar los que ya tienen slot
-        for i in range(self.num_eventos):
-            dia = self.eventos_array[i, 5]
-            hora = self.eventos_array[i, 6]
-            if dia >= 0 and hora >= 0:
-                slot_id = dia * 14 + hora
-                profesor_id = self.eventos_array[i, 2]
-                grupo_id = self.eventos_array[i, 3]
-                if profesor_id < self.num_profesores:
-                    temp_prof[slot_id, profesor_id] += 1
-                if grupo_id < self.num_grupos:
-                    temp_grupo[slot_id, grupo_id] += 1
-        
-        # Agrupar eventos sin asignar por grupo y materia
-        eventos_sin_asignar = {}
-        for i in range(self.num_eventos):
-            if self.eventos_array[i, 5] < 0 or self.eventos_array[i, 6] < 0:
-                grupo_id = self.eventos_array[i, 3]
-                materia_id = self.eventos_array[i, 1]
-                key = (grupo_id, materia_id)
-                if key not in eventos_sin_asignar:
-                    eventos_sin_asignar[key] = []
-                eventos_sin_asignar[key].append(i)
-        
-        # Asignar por grupo/materia distribuyendo en 5 días
-        for key_tuple in eventos_sin_asignar:
-            grupo_id = key_tuple[0]
-            materia_id = key_tuple[1]
-            indices = eventos_sin_asignar[key_tuple]
-            
-            # Determinar turno
-            es_vespertino = grupo_id in self.grupos_vespertinos
-            hora_inicio = 7 if es_vespertino else 0
-            hora_fin = 13 if es_vespertino else 7
-            
-            profesor_id = self.eventos_array[indices[0], 2]
-            total_horas = len(indices)
-            max_horas_dia = 2 if total_horas > 3 else 1
+        vespertinos = set(self.grupos_vespertinos)
+        
+        self.grafo_indptr, self.grafo_indices = construir_grafo_conflictos(self.eventos_array)
+        cdef cnp.int32_t[::1] indptr = self.grafo_indptr
+        cdef cnp.int32_t[::1] indices = self.grafo_indices
+        cdef cnp.int32_t[:, ::1] ev = self.eventos_array
+        cdef cnp.int32_t[::1] dur = self.duraciones
+        
+        # Horas por día permitidas para cada par (grupo, materia)
+        _, par_np = np.unique(self.eventos_array[:, [3, 1]], axis=0, return_inverse=True)
+        par_np = par_np.reshape(-1).astype(np.int32)
+        limite_np = np.where(np.bincount(par_np, weights=self.duraciones, minlength=1) > 3, 2, 1).astype(np.int32)
+        cdef cnp.int32_t[::1] par = par_np
+        cdef cnp.int32_t[::1] limite_par = limite_np
+        cdef cnp.int32_t[:, ::1] par_dia = np.zeros((len(limite_np), 5), dtype=np.int32)
+        
+        cdef cnp.uint8_t[:, ::1] bloqueado = np.zeros((n, 70), dtype=np.uint8)
+        cdef cnp.int32_t[::1] saturacion = np.zeros(n, dtype=np.int32)
+        cdef cnp.uint8_t[::1] coloreado = np.zeros(n, dtype=np.uint8)
+        cdef cnp.int32_t[:, ::1] occ_prof = np.zeros((70, self.num_profesores), dtype=np.int32)
+        cdef cnp.int32_t[:, ::1] occ_grupo = np.zeros((70, self.num_grupos), dtype=np.int32)
+        
+        # Los eventos que ya tienen slot quedan fijos
+        pendientes = 0
+        for i in range(n):
+            if ev[i, 5] >= 0 and ev[i, 6] >= 0:
+                _colorear_evento(i, ev[i, 5] * 14 + ev[i, 6], ev, dur, par, par_dia, occ_prof, occ_grupo,
+                                 indptr, indices, bloqueado, saturacion, coloreado)
+            else:
+                pendientes += 1
+        
+        for paso in range(pendientes):
+            # Evento más saturado (desempate: mayor grado, menor índice)
+            v = -1
+            mejor_clave = -1
+            for i in range(n):
+                if not coloreado[i]:
+                    clave = <long long>saturacion[i] * (n + 1) + (indptr[i + 1] - indptr[i])
+                    if clave > mejor_clave:
+                        mejor_clave = clave
+                        v = i
             
-            idx_asignado = 0
+            profesor_id = ev[v, 2]
+            grupo_id = ev[v, 3]
+            d = dur[v]
+            limite = limite_par[par[v]] if limite_par[par[v]] > d else d
+            if grupo_id in vespertinos:
+                hora_inicio, hora_fin = 7, 13
+            else:
+                hora_inicio, hora_fin = 0, 7
             
-            # Distribuir en los 5 días
-            for ciclo in range(3):
-                if idx_asignado >= total_horas:
-                    break
-                    
-                for dia in range(5):
-                    if idx_asignado >= total_horas:
-                        break
+            mejor_slot = 0
+            mejor_puntaje = -1
+            for dia in range(5):
+                # Primera/última clase del grupo en el día
+                clases = 0
+                primera = 0
+                ultima = 0
+                if grupo_id < self.num_grupos:
+                    for hora in range(14):
+                        if occ_grupo[dia * 14 + hora, grupo_id] > 0:
+                            if clases == 0:
+                                primera = hora
+                            ultima = hora
+                            clases += 1
+                
+                # Solo inicios en los que el bloque cabe en el día
+                for hora in range(15 - d):
+                    slot = dia * 14 + hora
+                    puntaje = 0
+                    libre = True
+                    for s in range(slot, slot + d):
+                        if profesor_id < self.num_profesores:
+                            puntaje += <long long>occ_prof[s, profesor_id] * 1000000
+                        if grupo_id < self.num_grupos:
+                            puntaje += <long long>occ_grupo[s, grupo_id] * 1000000
+                            libre = libre and occ_grupo[s, grupo_id] == 0
+                    if hora < hora_inicio or hora + d - 1 > hora_fin:
+                        puntaje += 100000
+                    if par_dia[par[v], dia] + d > limite:
+                        puntaje += 10000
                     
-                    horas_este_dia = 0
+                    # Huecos nuevos del grupo en el día
+                    delta = 0
+                    if clases > 0 and libre:
+                        nueva_primera = hora if hora < primera else primera
+                        nueva_ultima = hora + d - 1 if hora + d - 1 > ultima else ultima
+                        delta = (nueva_ultima - nueva_primera + 1 - clases - d) - (ultima - primera + 1 - clases)
+                    puntaje += (delta + 14) * 20 + clases
                     
-                    for hora in range(hora_inicio, hora_fin + 1):
-                        if idx_asignado >= total_horas or horas_este_dia >= max_horas_dia:
-                            break
-                        
-                        slot_id = dia * 14 + hora
-                        
-                        # Verificar disponibilidad
-                        grupo_libre = grupo_id >= self.num_grupos or temp_grupo[slot_id, grupo_id] == 0
-                        prof_libre = profesor_id >= self.num_profesores or temp_prof[slot_id, profesor_id] == 0
-                        
-                        if grupo_libre and prof_libre:
-                            event_idx = indices[idx_asignado]
-                            self.eventos_array[event_idx, 5] = dia
-                            self.eventos_array[event_idx, 6] = hora
-                            
-                            if grupo_id < self.num_grupos:
-                                temp_grupo[slot_id, grupo_id] += 1
-                            if profesor_id < self.num_profesores:
-                                temp_prof[slot_id, profesor_id] += 1
-                            
-                            idx_asignado += 1
-                            horas_este_dia += 1
+                    if mejor_puntaje < 0 or puntaje < mejor_puntaje:
+                        mejor_puntaje = puntaje
+                        mejor_slot = slot
             
-            # Si quedan sin asignar, expandir búsqueda
-            while idx_asignado < total_horas:
-                asignado = False
-                for dia in range(5):
-                    for hora in range(14):
-                        slot_id = dia * 14 + hora
-                        
-                        grupo_libre = grupo_id >= self.num_grupos or temp_grupo[slot_id, grupo_id] == 0
-                        prof_libre = profesor_id >= self.num_profesores or temp_prof[slot_id, profesor_id] == 0
-                        
-                        if grupo_libre and prof_libre:
-                            event_idx = indices[idx_asignado]
-                            self.eventos_array[event_idx, 5] = dia
-                            self.eventos_array[event_idx, 6] = hora
-                            
-                            if grupo_id < self.num_grupos:
-                                temp_grupo[slot_id, grupo_id] += 1
-                            if profesor_id < self.num_profesores:
-                                temp_prof[slot_id, profesor_id] += 1
-                            
-                            idx_asignado += 1
-                            asignado = True
-                            break
-                    if asignado:
-                        break
-                
-                if not asignado:
-                    # Forzar asignación aunque cause conflicto de profesor
-                    for dia in range(5):
-                        for hora in range(14):
-                            slot_id = dia * 14 + hora
-                            if grupo_id >= self.num_grupos or temp_grupo[slot_id, grupo_id] == 0:
-                                event_idx = indices[idx_asignado]
-                                self.eventos_array[event_idx, 5] = dia
-                                self.eventos_array[event_idx, 6] = hora
-                                
-                                if grupo_id < self.num_grupos:
-                                    temp_grupo[slot_id, grupo_id] += 1
-                                if profesor_id < self.num_profesores:
-                                    temp_prof[slot_id, profesor_id] += 1
-                                
-                                idx_asignado += 1
-                                asignado = True
-                                break
-                        if asignado:
-                            break
-                
-                if not asignado:
-                    break  # No se pudo asignar
+            _colorear_evento(v, mejor_slot, ev, dur, par, par_dia, occ_prof, occ_grupo,
+                             indptr, indices, bloqueado, saturacion, coloreado)
         
         # Actualizar matrices de ocupación
         self._actualizar_matrices_ocupacion()
     
     def ejecutar(self, dict datos_adicionales=None, callback_progreso=None, callback_log=None):
         """
-        Ejecuta el algoritmo de Búsqueda Tabú para minimizar conflictos.
-        Siempre ejecuta TODAS las iteraciones configuradas.
+        Ejecuta la búsqueda para minimizar conflictos.
+        Ejecuta todas las iteraciones configuradas, salvo que se alcance la
+        cota inferior fijada con establecer_cota_inferior().
         GUARDA LA MEJOR SOLUCIÓN Y LA RESTAURA AL FINAL.
         
+        Cada iteración llama a _paso() y a _evaluar(); las subclases
+        (RecocidoSimulado, AceptacionTardia) solo redefinen esos puntos.
+        Con cero conflictos duros se intercala _compactar() (la primera vez que
+        se llega a cero y cada intervalo_compactacion iteraciones) y se aplica
+        una última vez sobre la mejor solución.
+        
         Returns:
             dict con la mejor solución encontrada
         """
@@ -385,218 +704,488 @@ cdef class BusquedaTabu:
         self.callback_progreso = callback_progreso
         self.callback_log = callback_log
         
-        cdef double tiempo_inicio = pytime.time()
-        cdef int mejor_conflictos_historico = 999999
-        cdef int mejor_blandos_historico = 999999
-        
         # Evaluar solución inicial
-        cdef int conflictos_inicial = self._calcular_conflictos_duros()
-        cdef int blandos_inicial = self._calcular_conflictos_blandos()
-        cdef double calidad_inicial = self._calcular_calidad(conflictos_inicial, blandos_inicial)
+        self._evaluar_completo()
+        cdef double calidad_inicial = self._calcular_calidad(self.conflictos_actuales, self.blandos_actuales)
         
         # GUARDAR COPIA DE LA MEJOR SOLUCIÓN (array de slots: dia, hora por evento)
-        cdef cnp.ndarray[cnp.int32_t, ndim=2] mejor_slots = np.zeros((self.num_eventos, 2), dtype=np.int32)
-        cdef int i
-        for i in range(self.num_eventos):
-            mejor_slots[i, 0] = self.eventos_array[i, 5]  # dia
-            mejor_slots[i, 1] = self.eventos_array[i, 6]  # hora
-        
+        self.mejor_slots = np.array(self.eventos_array[:, 5:7], dtype=np.int32)
+        self.mejor_conflictos = self.conflictos_actuales
+        self.mejor_blandos = self.blandos_actuales
         self.mejor_solucion = {
-            'conflictos_duros': conflictos_inicial,
-            'penalizacion_blandas': blandos_inicial,
+            'conflictos_duros': self.conflictos_actuales,
+            'penalizacion_blandas': self.blandos_actuales,
             'calidad': calidad_inicial
         }
-        mejor_conflictos_historico = conflictos_inicial
-        mejor_blandos_historico = blandos_inicial
         
         if self.callback_log:
             self.callback_log(f"[INICIO] Ejecutando {self.max_iteraciones} iteraciones...")
-            self.callback_log(f"[INFO] Solución inicial - Conflictos: {conflictos_inicial}, Blandos: {blandos_inicial}, Calidad: {calidad_inicial:.1f}%")
+            self.callback_log(f"[INFO] Solución inicial - Conflictos: {self.conflictos_actuales}, "
+                              f"Blandos: {self.blandos_actuales}, Calidad: {calidad_inicial:.1f}%")
+        
+        self._preparar()
+        self.siguiente_iteracion = 0
+        self.compactada = False
+        self.cota_alcanzada = False
+        self.en_curso = True
+        return self._buscar()
+    
+    def reanudar(self, callback_progreso=None, callback_log=None):
+        """
+        Continúa una búsqueda interrumpida (motor restaurado con
+        cargar_checkpoint() o pickle) desde la iteración siguiente al último
+        checkpoint. Con la misma semilla el resultado es el mismo que sin
+        interrupción.
         
-        # Variables para la búsqueda
-        cdef int conflictos_actual, blandos_actual
-        cdef double calidad_actual
-        cdef bint hubo_mejora
+        Returns:
+            dict con la mejor solución encontrada
+        """
+        if not self.en_curso:
+            raise ValueError("El motor no tiene una búsqueda en curso que reanudar")
         
-        # ===== BÚSQUEDA TABÚ - EJECUTAR TODAS LAS ITERACIONES =====
-        for self.iteracion_actual in range(self.max_iteraciones):
+        self.callback_progreso = callback_progreso
+        self.callback_log = callback_log
+        if self.callback_log:
+            self.callback_log(f"[INICIO] Reanudando en la iteración {self.siguiente_iteracion}/"
+                              f"{self.max_iteraciones} (mejor: {self.mejor_conflictos} conflictos, "
+                              f"{self.mejor_blandos} blandos)")
+        return self._buscar()
+    
+    cdef dict _buscar(self):
+        """Bucle principal desde siguiente_iteracion y restauración de la mejor solución"""
+        cdef double tiempo_inicio = pytime.time()
+        cdef double t0
+        cdef int i
+        cdef int intervalo_progreso = max(10, self.max_iteraciones // 100)
+        cdef int intervalo_log = max(100, self.max_iteraciones // 20)
+        
+        # ===== BÚSQUEDA - HASTA max_iteraciones O LA COTA INFERIOR =====
+        for self.iteracion_actual in range(self.siguiente_iteracion, self.max_iteraciones):
+            
+            # La mejor solución ya alcanzó la cota inferior: no se puede mejorar
+            if self.mejor_conflictos <= self.cota_conflictos and self.mejor_blandos <= self.cota_blandos:
+                self.cota_alcanzada = True
+                if self.callback_log:
+                    self.callback_log(f"[COTA] Cota inferior alcanzada en la iteración {self.iteracion_actual}: "
+                                      f"{self.mejor_conflictos} conflictos, {self.mejor_blandos} blandos")
+                break
             
-            # En cada iteración, explorar vecindario y hacer el mejor movimiento
-            hubo_mejora = self._explorar_y_mover()
+            # Explorar vecindario y mover
+            self._paso()
             
             # Evaluar nueva solución
-            conflictos_actual = self._calcular_conflictos_duros()
-            blandos_actual = self._calcular_conflictos_blandos()
-            calidad_actual = self._calcular_calidad(conflictos_actual, blandos_actual)
+            t0 = pytime.perf_counter()
+            self._evaluar()
+            self.tiempo_evaluacion += pytime.perf_counter() - t0
+            self.iteraciones_ejecutadas += 1
+            
+            # Intensificación: compactar huecos la primera vez que se llega a cero
+            # conflictos y después cada intervalo_compactacion iteraciones
+            if self.intervalo_compactacion > 0 and self.conflictos_actuales == 0:
+                if not self.compactada or (self.iteracion_actual + 1) % self.intervalo_compactacion == 0:
+                    self._compactar()
+                    self.compactada = True
             
             # Actualizar mejor solución si mejora
-            if conflictos_actual < mejor_conflictos_historico or \
-               (conflictos_actual == mejor_conflictos_historico and blandos_actual < mejor_blandos_historico):
-                
-                mejor_conflictos_historico = conflictos_actual
-                mejor_blandos_historico = blandos_actual
-                
-                # GUARDAR COPIA DE ESTA MEJOR SOLUCIÓN
-                for i in range(self.num_eventos):
-                    mejor_slots[i, 0] = self.eventos_array[i, 5]
-                    mejor_slots[i, 1] = self.eventos_array[i, 6]
-                
-                self.mejor_solucion = {
-                    'conflictos_duros': conflictos_actual,
-                    'penalizacion_blandas': blandos_actual,
-                    'calidad': calidad_actual
-                }
-                
-                if self.callback_log:
-                    self.callback_log(f"[MEJORA] Iter {self.iteracion_actual}: "
-                                    f"Conflictos={conflictos_actual}, Blandos={blandos_actual}, "
-                                    f"Calidad={calidad_actual:.1f}%")
+            self._registrar_mejor()
             
-            # Callback de progreso cada 10 iteraciones
-            if self.callback_progreso and self.iteracion_actual % 10 == 0:
+            # Callback de progreso
+            if self.callback_progreso and self.iteracion_actual % intervalo_progreso == 0:
+                t0 = pytime.perf_counter()
                 progreso = ((self.iteracion_actual + 1) / self.max_iteraciones) * 100
                 self.callback_progreso(progreso, self.mejor_solucion)
+                self.tiempo_callbacks += pytime.perf_counter() - t0
             
-            # Log de progreso cada 100 iteraciones
-            if self.callback_log and self.iteracion_actual % 100 == 0 and self.iteracion_actual > 0:
+            # Log de progreso
+            if self.callback_log and self.iteracion_actual % intervalo_log == 0 and self.iteracion_actual > 0:
+                t0 = pytime.perf_counter()
                 self.callback_log(f"[PROGRESO] Iter {self.iteracion_actual}/{self.max_iteraciones} - "
-                                f"Mejor: {mejor_conflictos_historico} conflictos, {self.mejor_solucion['calidad']:.1f}%")
+                                f"Mejor: {self.mejor_conflictos} conflictos, {self.mejor_solucion['calidad']:.1f}%")
+                self.tiempo_callbacks += pytime.perf_counter() - t0
             
             # Limpiar lista tabú
             self._limpiar_lista_tabu()
+            
+            # Checkpoint periódico (la iteración ya está completa)
+            self.siguiente_iteracion = self.iteracion_actual + 1
+            if self.intervalo_checkpoint > 0 and self.siguiente_iteracion < self.max_iteraciones and \
+               self.siguiente_iteracion % self.intervalo_checkpoint == 0:
+                self.guardar_checkpoint()
+        
+        self.en_curso = False
         
         # ===== RESTAURAR LA MEJOR SOLUCIÓN ENCONTRADA =====
+        cdef cnp.int32_t[:, ::1] mejor = self.mejor_slots
         for i in range(self.num_eventos):
-            self.eventos_array[i, 5] = mejor_slots[i, 0]
-            self.eventos_array[i, 6] = mejor_slots[i, 1]
+            self.ev[i, 5] = mejor[i, 0]
+            self.ev[i, 6] = mejor[i, 1]
         
         # Actualizar matrices de ocupación con la mejor solución
         self._actualizar_matrices_ocupacion()
         
+        # Compactación final de la mejor solución
+        if self.intervalo_compactacion > 0 and self.mejor_conflictos == 0:
+            self.conflictos_actuales = self.mejor_conflictos
+            self.blandos_actuales = self.mejor_blandos
+            if self._compactar() > 0:
+                self._registrar_mejor()
+        
         tiempo_total = pytime.time() - tiempo_inicio
+        self.tiempo_ejecucion += tiempo_total
         
         if self.callback_log:
-            self.callback_log(f"[FINALIZADO] {self.max_iteraciones} iteraciones en {tiempo_total:.2f}s")
+            self.callback_log(f"[FINALIZADO] {self.siguiente_iteracion} iteraciones en {tiempo_total:.2f}s")
             self.callback_log(f"[RESULTADO] Conflictos duros: {self.mejor_solucion['conflictos_duros']}")
             self.callback_log(f"[RESULTADO] Penalización blandas: {self.mejor_solucion['penalizacion_blandas']}")
             self.callback_log(f"[RESULTADO] Calidad final: {self.mejor_solucion['calidad']:.2f}%")
         
         return self.mejor_solucion
     
-    cdef bint _explorar_y_mover(self):
+    def establecer_cota_inferior(self, int conflictos, int blandos=0):
         """
-        Explora el vecindario completo y hace el mejor movimiento posible.
-        USA CÁLCULO INCREMENTAL DE CONFLICTOS (O(1) por candidato)
-        Retorna True si se hizo un movimiento.
+        Detiene ejecutar()/reanudar() en cuanto la mejor solución alcanza una
+        cota inferior demostrada (analisis_previo.analizar): ya es óptima.
+        conflictos -1 la desactiva.
         """
-        cdef int i, dia, hora, slot_nuevo
-        cdef int evento_id, profesor_id, grupo_id
-        cdef int dia_orig, hora_orig, slot_orig
-        cdef int delta_conflictos
-        cdef int mejor_delta = 999999
+        if blandos < 0:
+            raise ValueError("blandos no puede ser negativo")
+        self.cota_conflictos = conflictos
+        self.cota_blandos = blandos
+    
+    # ==================== CHECKPOINTS Y SERIALIZACIÓN ====================
+    
+    def activar_checkpoints(self, ruta, int intervalo=1000, metadatos=None):
+        """
+        Guarda el estado completo en ruta cada intervalo iteraciones durante
+        ejecutar()/reanudar() (intervalo 0 o ruta None los desactivan).
+        metadatos (picklable) viaja con el checkpoint en metadatos_checkpoint.
+        """
+        if intervalo < 0:
+            raise ValueError("intervalo no puede ser negativo")
+        self.ruta_checkpoint = os.fspath(ruta) if ruta is not None else None
+        self.intervalo_checkpoint = intervalo if ruta is not None else 0
+        self.metadatos_checkpoint = metadatos
+    
+    def guardar_checkpoint(self, ruta=None):
+        """
+        Escribe el estado completo del motor (pickle binario) en ruta o en
+        ruta_checkpoint. La escritura es atómica: un corte a mitad de la
+        escritura deja el checkpoint anterior intacto.
+        """
+        cdef double t0 = pytime.perf_counter()
+        ruta = os.fspath(ruta) if ruta is not None else self.ruta_checkpoint
+        if ruta is None:
+            raise ValueError("No hay ruta de checkpoint (activar_checkpoints)")
+        
+        temporal = f"{ruta}.tmp"
+        with open(temporal, 'wb') as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporal, ruta)
+        
+        self.checkpoints_guardados += 1
+        self.tiempo_checkpoints += pytime.perf_counter() - t0
+        return ruta
+    
+    def __reduce__(self):
+        return (type(self), (), self.__getstate__())
+    
+    def __getstate__(self):
+        """
+        Estado completo: eventos, lista tabú, mejor solución, generador,
+        iteración y contadores. Las matrices de ocupación no se guardan: se
+        reconstruyen desde eventos_array en __setstate__. Los callbacks
+        tampoco (se vuelven a pasar a reanudar()).
+        """
+        return {
+            'formato': FORMATO_CHECKPOINT,
+            'max_iteraciones': self.max_iteraciones,
+            'tamano_lista_tabu': self.tamano_lista_tabu,
+            'intervalo_compactacion': self.intervalo_compactacion,
+            'candidatos_por_iteracion': self.candidatos_por_iteracion,
+            'num_eventos': self.num_eventos,
+            'num_profesores': self.num_profesores,
+            'num_grupos': self.num_grupos,
+            'num_aulas': self.num_aulas,
+            'eventos_array': self.eventos_array,
+            'duraciones': self.duraciones,
+            'grafo_indptr': self.grafo_indptr,
+            'grafo_indices': self.grafo_indices,
+            'grupos_vespertinos': self.grupos_vespertinos,
+            'lista_tabu': self.lista_tabu,
+            'iteracion_actual': self.iteracion_actual,
+            'siguiente_iteracion': self.siguiente_iteracion,
+            'en_curso': self.en_curso,
+            'compactada': self.compactada,
+            'estado_rng': self.estado_rng,
+            'conflictos_actuales': self.conflictos_actuales,
+            'blandos_actuales': self.blandos_actuales,
+            'mejor_conflictos': self.mejor_conflictos,
+            'mejor_blandos': self.mejor_blandos,
+            'mejor_slots': self.mejor_slots,
+            'mejor_solucion': self.mejor_solucion,
+            'intervalo_checkpoint': self.intervalo_checkpoint,
+            'ruta_checkpoint': self.ruta_checkpoint,
+            'metadatos_checkpoint': self.metadatos_checkpoint,
+            'cota_conflictos': self.cota_conflictos,
+            'cota_blandos': self.cota_blandos,
+            'cota_alcanzada': self.cota_alcanzada,
+            'contadores': {
+                'movimientos_evaluados': self.movimientos_evaluados,
+                'rechazos_tabu': self.rechazos_tabu,
+                'movimientos_aplicados': self.movimientos_aplicados,
+                'mejoras': self.mejoras,
+                'tiempo_vecindario': self.tiempo_vecindario,
+                'tiempo_movimiento': self.tiempo_movimiento,
+                'tiempo_evaluacion': self.tiempo_evaluacion,
+                'tiempo_callbacks': self.tiempo_callbacks,
+                'tiempo_compactacion': self.tiempo_compactacion,
+                'tiempo_checkpoints': self.tiempo_checkpoints,
+                'tiempo_ejecucion': self.tiempo_ejecucion,
+                'iteraciones_ejecutadas': self.iteraciones_ejecutadas,
+                'checkpoints_guardados': self.checkpoints_guardados,
+            },
+        }
+    
+    def __setstate__(self, dict estado):
+        if estado.get('formato') != FORMATO_CHECKPOINT:
+            raise ValueError(f"Formato de checkpoint no soportado: {estado.get('formato')} "
+                             f"(se esperaba {FORMATO_CHECKPOINT})")
+        self.max_iteraciones = estado['max_iteraciones']
+        self.tamano_lista_tabu = estado['tamano_lista_tabu']
+        self.intervalo_compactacion = estado['intervalo_compactacion']
+        self.candidatos_por_iteracion = estado.get('candidatos_por_iteracion', 1)
+        self.num_eventos = estado['num_eventos']
+        self.num_profesores = estado['num_profesores']
+        self.num_grupos = estado['num_grupos']
+        self.num_aulas = estado['num_aulas']
+        self.grafo_indptr = estado['grafo_indptr']
+        self.grafo_indices = estado['grafo_indices']
+        self.grupos_vespertinos = estado['grupos_vespertinos']
+        self.lista_tabu = estado['lista_tabu']
+        self.iteracion_actual = estado['iteracion_actual']
+        self.siguiente_iteracion = estado['siguiente_iteracion']
+        self.en_curso = estado['en_curso']
+        self.compactada = estado['compactada']
+        self.estado_rng = estado['estado_rng']
+        self.conflictos_actuales = estado['conflictos_actuales']
+        self.blandos_actuales = estado['blandos_actuales']
+        self.mejor_conflictos = estado['mejor_conflictos']
+        self.mejor_blandos = estado['mejor_blandos']
+        self.mejor_slots = estado['mejor_slots']
+        self.mejor_solucion = estado['mejor_solucion']
+        self.intervalo_checkpoint = estado['intervalo_checkpoint']
+        self.ruta_checkpoint = estado['ruta_checkpoint']
+        self.metadatos_checkpoint = estado['metadatos_checkpoint']
+        self.cota_conflictos = estado.get('cota_conflictos', -1)
+        self.cota_blandos = estado.get('cota_blandos', 0)
+        self.cota_alcanzada = estado.get('cota_alcanzada', False)
+        contadores = estado['contadores']
+        self.movimientos_evaluados = contadores['movimientos_evaluados']
+        self.rechazos_tabu = contadores['rechazos_tabu']
+        self.movimientos_aplicados = contadores['movimientos_aplicados']
+        self.mejoras = contadores['mejoras']
+        self.tiempo_vecindario = contadores['tiempo_vecindario']
+        self.tiempo_movimiento = contadores['tiempo_movimiento']
+        self.tiempo_evaluacion = contadores['tiempo_evaluacion']
+        self.tiempo_callbacks = contadores['tiempo_callbacks']
+        self.tiempo_compactacion = contadores['tiempo_compactacion']
+        self.tiempo_checkpoints = contadores['tiempo_checkpoints']
+        self.tiempo_ejecucion = contadores['tiempo_ejecucion']
+        self.iteraciones_ejecutadas = contadores['iteraciones_ejecutadas']
+        self.checkpoints_guardados = contadores['checkpoints_guardados']
+        
+        # Las vistas tipadas apuntan a los buffers nuevos
+        if estado['eventos_array'] is not None:
+            self.eventos_array = como_arreglo_eventos(estado['eventos_array'])
+            self.duraciones = como_duraciones(estado['duraciones'], self.num_eventos)
+            self.profesores_ocupados = np.zeros((70, self.num_profesores), dtype=np.int32)
+            self.grupos_ocupados = np.zeros((70, self.num_grupos), dtype=np.int32)
+            self._enlazar_vistas()
+            self._actualizar_matrices_ocupacion()
+    
+    # ==================== PUNTOS DE EXTENSIÓN DEL BUCLE ====================
+    
+    cdef void _preparar(self):
+        """Se llama una vez antes de la primera iteración"""
+        pass
+    
+    cdef bint _paso(self):
+        """Una iteración de la búsqueda: explorar el vecindario de un evento y moverlo"""
+        return self._explorar_y_mover()
+    
+    cdef void _evaluar(self):
+        """Actualiza conflictos_actuales / blandos_actuales tras _paso()"""
+        self._evaluar_completo()
+    
+    cdef void _evaluar_completo(self):
+        """Recalcula el costo de la solución actual desde las matrices de ocupación"""
+        self.conflictos_actuales = self._calcular_conflictos_duros()
+        self.blandos_actuales = self._calcular_conflictos_blandos()
+    
+    cdef bint _registrar_mejor(self):
+        """Guarda la solución actual si mejora a la mejor conocida"""
+        cdef int i
+        cdef double t0, calidad
+        cdef cnp.int32_t[:, ::1] mejor
         
-        cdef int mejor_evento_idx = -1
-        cdef int mejor_dia = -1
-        cdef int mejor_hora = -1
+        if self.conflictos_actuales > self.mejor_conflictos or \
+           (self.conflictos_actuales == self.mejor_conflictos and self.blandos_actuales >= self.mejor_blandos):
+            return False
         
-        # Seleccionar un evento aleatorio para mover
-        cdef int idx = rand() % self.num_eventos
+        self.mejoras += 1
+        self.mejor_conflictos = self.conflictos_actuales
+        self.mejor_blandos = self.blandos_actuales
         
-        evento_id = self.eventos_array[idx, 0]
-        profesor_id = self.eventos_array[idx, 2]
-        grupo_id = self.eventos_array[idx, 3]
-        dia_orig = self.eventos_array[idx, 5]
-        hora_orig = self.eventos_array[idx, 6]
+        # GUARDAR COPIA DE ESTA MEJOR SOLUCIÓN
+        mejor = self.mejor_slots
+        for i in range(self.num_eventos):
+            mejor[i, 0] = self.ev[i, 5]
+            mejor[i, 1] = self.ev[i, 6]
         
-        if dia_orig < 0 or hora_orig < 0:
-            return False
+        calidad = self._calcular_calidad(self.conflictos_actuales, self.blandos_actuales)
+        self.mejor_solucion = {
+            'conflictos_duros': self.conflictos_actuales,
+            'penalizacion_blandas': self.blandos_actuales,
+            'calidad': calidad
+        }
         
-        slot_orig = dia_orig * 14 + hora_orig
+        if self.callback_log:
+            t0 = pytime.perf_counter()
+            self.callback_log(f"[MEJORA] Iter {self.iteracion_actual}: "
+                            f"Conflictos={self.conflictos_actuales}, Blandos={self.blandos_actuales}, "
+                            f"Calidad={calidad:.1f}%")
+            self.tiempo_callbacks += pytime.perf_counter() - t0
+        return True
+    
+    cdef int _proponer_movimiento(self, int* idx, int* slot_nuevo, int* delta_conf, int* delta_blandos):
+        """
+        Muestrea un movimiento aleatorio (evento, slot distinto) y calcula su
+        efecto en O(1). Retorna 0 si el evento elegido no tiene slot.
+        """
+        cdef int i = self._entero(self.num_eventos)
+        cdef int slot_orig, destino, duracion
         
-        # Conflictos actuales en el slot original (ANTES de mover)
-        cdef int conf_orig_antes = 0
-        if profesor_id < self.num_profesores:
-            if self.profesores_ocupados[slot_orig, profesor_id] > 1:
-                conf_orig_antes += self.profesores_ocupados[slot_orig, profesor_id] - 1
-        if grupo_id < self.num_grupos:
-            if self.grupos_ocupados[slot_orig, grupo_id] > 1:
-                conf_orig_antes += self.grupos_ocupados[slot_orig, grupo_id] - 1
+        if self.ev[i, 5] < 0 or self.ev[i, 6] < 0:
+            return 0
         
-        # Probar todos los slots posibles
-        cdef int conf_orig_despues, conf_nuevo_despues, conf_nuevo_antes
+        slot_orig = self.ev[i, 5] * 14 + self.ev[i, 6]
+        duracion = self.dur[i]
+        destino = _slot_alternativo(self._entero(5 * (15 - duracion) - 1), slot_orig, duracion)
         
-        for dia in range(5):
-            for hora in range(14):
-                if dia == dia_orig and hora == hora_orig:
-                    continue
-                
-                # Verificar lista tabú
-                key = (evento_id, dia, hora)
-                if key in self.lista_tabu:
-                    continue
-                
-                slot_nuevo = dia * 14 + hora
-                
-                # Calcular delta de conflictos de forma INCREMENTAL (O(1))
-                
-                # Conflictos en slot original DESPUÉS de quitar evento
-                conf_orig_despues = 0
-                if profesor_id < self.num_profesores:
-                    if self.profesores_ocupados[slot_orig, profesor_id] - 1 > 1:
-                        conf_orig_despues += self.profesores_ocupados[slot_orig, profesor_id] - 2
-                if grupo_id < self.num_grupos:
-                    if self.grupos_ocupados[slot_orig, grupo_id] - 1 > 1:
-                        conf_orig_despues += self.grupos_ocupados[slot_orig, grupo_id] - 2
-                
-                # Conflictos en slot nuevo ANTES de añadir evento
-                conf_nuevo_antes = 0
-                if profesor_id < self.num_profesores:
-                    if self.profesores_ocupados[slot_nuevo, profesor_id] > 1:
-                        conf_nuevo_antes += self.profesores_ocupados[slot_nuevo, profesor_id] - 1
-                if grupo_id < self.num_grupos:
-                    if self.grupos_ocupados[slot_nuevo, grupo_id] > 1:
-                        conf_nuevo_antes += self.grupos_ocupados[slot_nuevo, grupo_id] - 1
-                
-                # Conflictos en slot nuevo DESPUÉS de añadir evento
-                conf_nuevo_despues = 0
-                if profesor_id < self.num_profesores:
-                    if self.profesores_ocupados[slot_nuevo, profesor_id] + 1 > 1:
-                        conf_nuevo_despues += self.profesores_ocupados[slot_nuevo, profesor_id]
-                if grupo_id < self.num_grupos:
-                    if self.grupos_ocupados[slot_nuevo, grupo_id] + 1 > 1:
-                        conf_nuevo_despues += self.grupos_ocupados[slot_nuevo, grupo_id]
-                
-                # Delta = (conflictos después - conflictos antes)
-                delta_conflictos = (conf_orig_despues + conf_nuevo_despues) - (conf_orig_antes + conf_nuevo_antes)
-                
-                if delta_conflictos < mejor_delta:
-                    mejor_delta = delta_conflictos
-                    mejor_evento_idx = idx
-                    mejor_dia = dia
-                    mejor_hora = hora
-        
-        # Aplicar mejor movimiento
-        if mejor_evento_idx >= 0 and mejor_dia >= 0:
-            slot_nuevo = mejor_dia * 14 + mejor_hora
+        idx[0] = i
+        slot_nuevo[0] = destino
+        delta_conf[0] = self._delta_conflictos(self.ev[i, 2], self.ev[i, 3], slot_orig, destino, duracion)
+        delta_blandos[0] = self._delta_blandos(self.ev[i, 3], slot_orig, destino, duracion)
+        return 1
+    
+    cdef bint _explorar_y_mover(self):
+        """
+        Lista de candidatos: evalúa todos los slots de candidatos_por_iteracion
+        eventos aleatorios y hace el mejor movimiento no tabú entre todos ellos.
+        USA CÁLCULO INCREMENTAL DE CONFLICTOS: el término de quitar el evento de
+        su slot se calcula una vez por evento y cada slot candidato cuesta dos
+        lecturas de ocupación (un bloque de varias horas se evalúa y se mueve
+        entero en O(duración)).
+        Retorna True si se hizo un movimiento.
+        """
+        cdef int c, k, s, idx, dia, hora, slot_nuevo, slot_orig
+        cdef int evento_id, profesor_id, grupo_id, duracion, quitar, delta
+        cdef bint usa_prof, usa_grupo
+        cdef int mejor_delta = 999999
+        cdef int mejor_idx = -1
+        cdef int mejor_slot = -1
+        cdef unsigned char tabu[70]
+        
+        cdef double t0 = pytime.perf_counter()
+        cdef double t1
+        cdef int evaluados = 0
+        cdef int rechazados = 0
+        
+        for c in range(self.candidatos_por_iteracion):
+            # Seleccionar un evento aleatorio para mover
+            idx = self._entero(self.num_eventos)
+            if self.ev[idx, 5] < 0 or self.ev[idx, 6] < 0:
+                continue
             
-            if profesor_id < self.num_profesores:
-                self.profesores_ocupados[slot_orig, profesor_id] -= 1
-                self.profesores_ocupados[slot_nuevo, profesor_id] += 1
-            if grupo_id < self.num_grupos:
-                self.grupos_ocupados[slot_orig, grupo_id] -= 1
-                self.grupos_ocupados[slot_nuevo, grupo_id] += 1
+            evento_id = self.ev[idx, 0]
+            profesor_id = self.ev[idx, 2]
+            grupo_id = self.ev[idx, 3]
+            slot_orig = self.ev[idx, 5] * 14 + self.ev[idx, 6]
+            duracion = self.dur[idx]
+            usa_prof = profesor_id < self.num_profesores
+            usa_grupo = grupo_id < self.num_grupos
             
-            self.eventos_array[idx, 5] = mejor_dia
-            self.eventos_array[idx, 6] = mejor_hora
+            # Slots tabú de este evento (una pasada por la lista)
+            for s in range(70):
+                tabu[s] = 0
+            for entrada in self.lista_tabu:
+                if entrada[0] == evento_id:
+                    tabu[entrada[1] * 14 + entrada[2]] = 1
             
-            # Agregar a lista tabú
-            self.lista_tabu.append((evento_id, dia_orig, hora_orig))
-            if len(self.lista_tabu) > self.tamano_lista_tabu:
-                self.lista_tabu.pop(0)
+            # Conflictos que desaparecen al quitar el evento de su slot original:
+            # uno por cada recurso duplicado (por hora, en un bloque, con el
+            # bloque fuera de la ocupación hasta terminar de evaluarlo)
+            if duracion == 1:
+                quitar = 0
+                if usa_prof and self.occ_prof[slot_orig, profesor_id] > 1:
+                    quitar += 1
+                if usa_grupo and self.occ_grupo[slot_orig, grupo_id] > 1:
+                    quitar += 1
+            else:
+                self._ocupar(profesor_id, grupo_id, slot_orig, duracion, -1)
+                quitar = self._horas_ocupadas(profesor_id, grupo_id, slot_orig, duracion)
+            
+            # Probar todos los slots posibles: al añadir el evento se crea un
+            # conflicto por cada recurso que ya estaba ocupado
+            for dia in range(5):
+                for hora in range(15 - duracion):
+                    slot_nuevo = dia * 14 + hora
+                    if slot_nuevo == slot_orig:
+                        continue
+                    if tabu[slot_nuevo]:
+                        rechazados += 1
+                        continue
+                    evaluados += 1
+                    
+                    if duracion == 1:
+                        delta = -quitar
+                        if usa_prof and self.occ_prof[slot_nuevo, profesor_id] > 0:
+                            delta += 1
+                        if usa_grupo and self.occ_grupo[slot_nuevo, grupo_id] > 0:
+                            delta += 1
+                    else:
+                        delta = self._horas_ocupadas(profesor_id, grupo_id, slot_nuevo, duracion) - quitar
+                    
+                    if delta < mejor_delta:
+                        mejor_delta = delta
+                        mejor_idx = idx
+                        mejor_slot = slot_nuevo
             
-            return True
+            if duracion > 1:
+                self._ocupar(profesor_id, grupo_id, slot_orig, duracion, 1)
         
-        return False
+        t1 = pytime.perf_counter()
+        self.tiempo_vecindario += t1 - t0
+        self.movimientos_evaluados += evaluados
+        self.rechazos_tabu += rechazados
+        
+        # Aplicar el mejor movimiento de todos los candidatos
+        if mejor_idx < 0:
+            return False
+        
+        evento_id = self.ev[mejor_idx, 0]
+        dia = self.ev[mejor_idx, 5]
+        hora = self.ev[mejor_idx, 6]
+        self._mover_evento(mejor_idx, mejor_slot)
+        
+        # Agregar a lista tabú (movimiento inverso)
+        self.lista_tabu.append((evento_id, dia, hora))
+        if len(self.lista_tabu) > self.tamano_lista_tabu:
+            self.lista_tabu.pop(0)
+        
+        self.movimientos_aplicados += 1
+        self.tiempo_movimiento += pytime.perf_counter() - t1
+        return True
     
     cdef double _calcular_calidad(self, int conflictos, int blandos):
         """Calcula la calidad de la solución (0-100%)"""
@@ -607,200 +1196,187 @@ cdef class BusquedaTabu:
             # Sin conflictos duros, calidad depende de blandos
             return max(0.0, 100.0 - blandos * 2)
     
-    cdef list _encontrar_eventos_con_conflicto(self):
-        """Encuentra índices de eventos que tienen conflictos"""
-        cdef list eventos_conflicto = []
-        cdef int i, slot_id, profesor_id, grupo_id, dia, hora
-        
-        for i in range(self.num_eventos):
-            dia = self.eventos_array[i, 5]
-            hora = self.eventos_array[i, 6]
-            
-            if dia < 0 or hora < 0:
-                continue
-            
-            slot_id = dia * 14 + hora
-            profesor_id = self.eventos_array[i, 2]
-            grupo_id = self.eventos_array[i, 3]
-            
-            # Verificar si hay conflicto
-            tiene_conflicto = False
-            
-            if profesor_id < self.num_profesores and self.profesores_ocupados[slot_id, profesor_id] > 1:
-                tiene_conflicto = True
-            
-            if grupo_id < self.num_grupos and self.grupos_ocupados[slot_id, grupo_id] > 1:
-                tiene_conflicto = True
-            
-            if tiene_conflicto:
-                eventos_conflicto.append(i)
-        
-        return eventos_conflicto
-    
-    cdef bint _intentar_mejora(self, list eventos_conflicto):
-        """Intenta mover un evento conflictivo a un mejor slot"""
-        if len(eventos_conflicto) == 0:
-            return False
-        
-        # Seleccionar evento aleatorio
-        cdef int idx = eventos_conflicto[rand() % len(eventos_conflicto)]
-        cdef int evento_id = self.eventos_array[idx, 0]
-        cdef int profesor_id = self.eventos_array[idx, 2]
-        cdef int grupo_id = self.eventos_array[idx, 3]
-        cdef int dia_orig = self.eventos_array[idx, 5]
-        cdef int hora_orig = self.eventos_array[idx, 6]
-        
-        cdef int mejor_dia = -1
-        cdef int mejor_hora = -1
-        cdef int menor_conflictos = self._calcular_conflictos_duros()
-        
-        cdef int dia, hora, slot_id, slot_orig, slot_nuevo
-        cdef int conflictos_temp
-        
-        # Probar todos los slots posibles
-        for dia in range(5):
-            for hora in range(14):
-                # Verificar si está en lista tabú
-                key = (evento_id, dia, hora)
-                if key in self.lista_tabu:
-                    continue
-                
-                # Simular movimiento
-                slot_orig = dia_orig * 14 + hora_orig
-                slot_nuevo = dia * 14 + hora
-                
-                # Actualizar ocupación temporalmente
-                if profesor_id < self.num_profesores:
-                    self.profesores_ocupados[slot_orig, profesor_id] -= 1
-                    self.profesores_ocupados[slot_nuevo, profesor_id] += 1
-                if grupo_id < self.num_grupos:
-                    self.grupos_ocupados[slot_orig, grupo_id] -= 1
-                    self.grupos_ocupados[slot_nuevo, grupo_id] += 1
-                
-                # Calcular conflictos con el movimiento
-                conflictos_temp = self._calcular_conflictos_duros()
-                
-                if conflictos_temp < menor_conflictos:
-                    menor_conflictos = conflictos_temp
-                    mejor_dia = dia
-                    mejor_hora = hora
-                
-                # Revertir
-                if profesor_id < self.num_profesores:
-                    self.profesores_ocupados[slot_orig, profesor_id] += 1
-                    self.profesores_ocupados[slot_nuevo, profesor_id] -= 1
-                if grupo_id < self.num_grupos:
-                    self.grupos_ocupados[slot_orig, grupo_id] += 1
-                    self.grupos_ocupados[slot_nuevo, grupo_id] -= 1
-        
-        # Aplicar mejor movimiento si es mejor
-        if mejor_dia >= 0 and mejor_hora >= 0:
-            slot_orig = dia_orig * 14 + hora_orig
-            slot_nuevo = mejor_dia * 14 + mejor_hora
-            
-            # Actualizar ocupación
-            if profesor_id < self.num_profesores:
-                self.profesores_ocupados[slot_orig, profesor_id] -= 1
-                self.profesores_ocupados[slot_nuevo, profesor_id] += 1
-            if grupo_id < self.num_grupos:
-                self.grupos_ocupados[slot_orig, grupo_id] -= 1
-                self.grupos_ocupados[slot_nuevo, grupo_id] += 1
-            
-            # Actualizar evento
-            self.eventos_array[idx, 5] = mejor_dia
-            self.eventos_array[idx, 6] = mejor_hora
-            
-            # Agregar a lista tabú (movimiento inverso)
-            self.lista_tabu.append((evento_id, dia_orig, hora_orig))
-            if len(self.lista_tabu) > self.tamano_lista_tabu:
-                self.lista_tabu.pop(0)
-            
-            return True
-        
-        return False
-    
     cdef void _limpiar_lista_tabu(self):
         """Limpia movimientos antiguos de la lista tabú"""
         # Mantener solo los últimos N movimientos
         if len(self.lista_tabu) > self.tamano_lista_tabu:
             self.lista_tabu = self.lista_tabu[-self.tamano_lista_tabu:]
     
-    cdef void _intentar_compactar(self):
+    cdef int _compactar(self):
         """
-        Intenta compactar horarios moviendo eventos para reducir huecos.
-        Solo se usa cuando no hay conflictos duros.
+        Fase de intensificación: rellena los huecos de cada grupo-día.
+        
+        Los huecos se leen de la matriz de ocupación del grupo y los candidatos
+        salen de un índice de eventos por grupo; un evento se mueve al hueco solo
+        si el delta incremental prueba que no crea conflictos duros y el costo
+        (PESO_CONFLICTO * conflictos + huecos) baja. Un bloque de varias horas
+        puede cubrir el hueco con cualquiera de sus horas. Mantiene
+        conflictos_actuales y blandos_actuales. Retorna la reducción total del costo.
         """
-        cdef int i, grupo, dia, hora, slot_id
-        cdef int profesor_id, grupo_id
-        cdef int mejor_hora, slot_orig, slot_nuevo
-        cdef bint movido
-        
-        # Para cada grupo, intentar eliminar huecos
-        for grupo in range(self.num_grupos):
-            for dia in range(5):
-                # Encontrar eventos de este grupo en este día
-                eventos_dia = []
-                for i in range(self.num_eventos):
-                    if self.eventos_array[i, 3] == grupo and self.eventos_array[i, 5] == dia:
-                        eventos_dia.append((i, self.eventos_array[i, 6]))  # (idx, hora)
-                
-                if len(eventos_dia) <= 1:
+        cdef int g, d, h, k, idx, primera, ultima, slot_hueco, slot_orig, slot, hora, duracion
+        cdef int dc, db, delta, mejor_idx, mejor_slot, mejor_dc, mejor_db, mejor_delta
+        cdef int reduccion = 0
+        cdef bint mejorado = True
+        cdef double t0 = pytime.perf_counter()
+        
+        # Índice de eventos por grupo (CSR): por_grupo[inicio[g]:inicio[g + 1]]
+        cdef cnp.ndarray grupos = self.eventos_array[:, 3]
+        cdef cnp.ndarray validos = np.flatnonzero((grupos >= 0) & (grupos < self.num_grupos))
+        cdef cnp.int32_t[::1] por_grupo = validos[np.argsort(grupos[validos], kind='stable')].astype(np.int32)
+        cdef cnp.int32_t[::1] inicio = np.concatenate(
+            ([0], np.cumsum(np.bincount(grupos[validos], minlength=self.num_grupos)))).astype(np.int32)
+        
+        while mejorado:
+            mejorado = False
+            for g in range(self.num_grupos):
+                if inicio[g] == inicio[g + 1]:
                     continue
-                
-                # Ordenar por hora
-                eventos_dia.sort(key=lambda x: x[1])
-                
-                # Intentar mover para eliminar huecos
-                for j in range(1, len(eventos_dia)):
-                    idx_actual = eventos_dia[j][0]
-                    hora_actual = eventos_dia[j][1]
-                    hora_anterior = eventos_dia[j-1][1]
+                for d in range(5):
+                    primera = -1
+                    ultima = -1
+                    for h in range(14):
+                        if self.occ_grupo[d * 14 + h, g] > 0:
+                            if primera < 0:
+                                primera = h
+                            ultima = h
+                    if ultima - primera < 2:
+                        continue
                     
-                    # Si hay hueco
-                    if hora_actual - hora_anterior > 1:
-                        mejor_hora = hora_anterior + 1
-                        profesor_id = self.eventos_array[idx_actual, 2]
-                        grupo_id = self.eventos_array[idx_actual, 3]
-                        
-                        slot_nuevo = dia * 14 + mejor_hora
-                        
-                        # Verificar si el profesor está libre en ese slot
-                        if profesor_id < self.num_profesores and self.profesores_ocupados[slot_nuevo, profesor_id] > 0:
+                    for h in range(primera + 1, ultima):
+                        slot_hueco = d * 14 + h
+                        if self.occ_grupo[slot_hueco, g] > 0:
                             continue
                         
-                        # Mover evento
-                        slot_orig = dia * 14 + hora_actual
+                        mejor_idx = -1
+                        mejor_delta = 0
+                        for k in range(inicio[g], inicio[g + 1]):
+                            idx = por_grupo[k]
+                            if self.ev[idx, 5] < 0 or self.ev[idx, 6] < 0:
+                                continue
+                            slot_orig = self.ev[idx, 5] * 14 + self.ev[idx, 6]
+                            duracion = self.dur[idx]
+                            # Inicios del mismo día cuyo intervalo incluye el hueco
+                            for hora in range(max(0, h - duracion + 1), min(h, 14 - duracion) + 1):
+                                slot = d * 14 + hora
+                                if slot == slot_orig:
+                                    continue
+                                dc = self._delta_conflictos(self.ev[idx, 2], g, slot_orig, slot, duracion)
+                                if dc > 0:
+                                    continue
+                                db = self._delta_blandos(g, slot_orig, slot, duracion)
+                                delta = PESO_CONFLICTO * dc + db
+                                self.movimientos_evaluados += 1
+                                if delta < mejor_delta:
+                                    mejor_idx, mejor_slot, mejor_dc, mejor_db, mejor_delta = idx, slot, dc, db, delta
                         
-                        if profesor_id < self.num_profesores:
-                            self.profesores_ocupados[slot_orig, profesor_id] -= 1
-                            self.profesores_ocupados[slot_nuevo, profesor_id] += 1
-                        if grupo_id < self.num_grupos:
-                            self.grupos_ocupados[slot_orig, grupo_id] -= 1
-                            self.grupos_ocupados[slot_nuevo, grupo_id] += 1
-                        
-                        self.eventos_array[idx_actual, 6] = mejor_hora
-                        eventos_dia[j] = (idx_actual, mejor_hora)
+                        if mejor_idx >= 0:
+                            self._mover_evento(mejor_idx, mejor_slot)
+                            self.conflictos_actuales += mejor_dc
+                            self.blandos_actuales += mejor_db
+                            self.movimientos_aplicados += 1
+                            reduccion -= mejor_delta
+                            mejorado = True
+        
+        self.tiempo_compactacion += pytime.perf_counter() - t0
+        return reduccion
 
     def obtener_eventos(self):
         """
         Retorna los eventos actuales como lista de diccionarios.
         Compatible con el formato esperado por la interfaz web.
         """
-        eventos = []
-        for i in range(self.num_eventos):
-            eventos.append({
-                'id': int(self.eventos_array[i, 0]),
-                'materia_id': int(self.eventos_array[i, 1]),
-                'profesor_id': int(self.eventos_array[i, 2]),
-                'grupo_id': int(self.eventos_array[i, 3]),
-                'aula_id': int(self.eventos_array[i, 4]),
-                'slot': {
-                    'dia': int(self.eventos_array[i, 5]),
-                    'hora': int(self.eventos_array[i, 6])
-                }
-            })
-        return eventos
+        return [{
+            'id': fila[0],
+            'materia_id': fila[1],
+            'profesor_id': fila[2],
+            'grupo_id': fila[3],
+            'aula_id': fila[4],
+            'duracion': duracion,
+            'slot': {'dia': fila[5], 'hora': fila[6]}
+        } for fila, duracion in zip(self.eventos_array.tolist(), self.duraciones.tolist())]
     
+    def obtener_arreglo(self):
+        """Retorna eventos_array (n, 7) sin copiar"""
+        return self.eventos_array
+    
+    def obtener_slots(self):
+        """Retorna una vista (n, 2) [dia, hora] de la solución actual, sin copiar"""
+        return self.eventos_array[:, 5:7]
+    
+    def obtener_duraciones(self):
+        """Retorna las duraciones (n,) en horas de cada evento, sin copiar"""
+        return self.duraciones
+
+    # ==================== EDICIÓN INTERACTIVA ====================
+
+    def evaluar_movimientos(self, indices, slots):
+        """
+        Efecto de mover cada evento indices[k] al slot slots[k] (dia * 14 + hora),
+        cada movimiento por separado sobre la solución actual (no la modifica).
+
+        Returns:
+            (delta_conflictos, delta_blandos): arreglos int32 del tamaño del lote
+
+        Raises:
+            ValueError: índice o slot fuera de rango, o evento sin slot asignado
+        """
+        cdef cnp.int32_t[::1] idx = np.ascontiguousarray(indices, dtype=np.int32)
+        cdef cnp.int32_t[::1] destino = np.ascontiguousarray(slots, dtype=np.int32)
+        cdef cnp.ndarray delta_conf = np.zeros(idx.shape[0], dtype=np.int32)
+        cdef cnp.ndarray delta_blandos = np.zeros(idx.shape[0], dtype=np.int32)
+        cdef cnp.int32_t[::1] dc = delta_conf
+        cdef cnp.int32_t[::1] db = delta_blandos
+        cdef int k, i, slot_orig
+
+        if idx.shape[0] != destino.shape[0]:
+            raise ValueError("indices y slots deben tener el mismo tamaño")
+        self._validar_movimientos(idx, destino)
+
+        for k in range(idx.shape[0]):
+            i = idx[k]
+            slot_orig = self.ev[i, 5] * 14 + self.ev[i, 6]
+            if destino[k] == slot_orig:
+                continue
+            dc[k] = self._delta_conflictos(self.ev[i, 2], self.ev[i, 3], slot_orig, destino[k], self.dur[i])
+            db[k] = self._delta_blandos(self.ev[i, 3], slot_orig, destino[k], self.dur[i])
+
+        self.movimientos_evaluados += idx.shape[0]
+        return delta_conf, delta_blandos
+
+    def aplicar_movimiento(self, int idx, int slot_nuevo):
+        """
+        Mueve el evento idx a slot_nuevo actualizando la ocupación de forma
+        incremental. Retorna (delta_conflictos, delta_blandos) del movimiento.
+        """
+        cdef cnp.int32_t[::1] i = np.array([idx], dtype=np.int32)
+        cdef cnp.int32_t[::1] s = np.array([slot_nuevo], dtype=np.int32)
+        cdef int slot_orig, dc, db
+
+        self._validar_movimientos(i, s)
+        slot_orig = self.ev[idx, 5] * 14 + self.ev[idx, 6]
+        if slot_nuevo == slot_orig:
+            return 0, 0
+        dc = self._delta_conflictos(self.ev[idx, 2], self.ev[idx, 3], slot_orig, slot_nuevo, self.dur[idx])
+        db = self._delta_blandos(self.ev[idx, 3], slot_orig, slot_nuevo, self.dur[idx])
+        self._mover_evento(idx, slot_nuevo)
+        self.movimientos_aplicados += 1
+        return dc, db
+
+    cdef int _validar_movimientos(self, cnp.int32_t[::1] idx, cnp.int32_t[::1] destino) except -1:
+        """Comprueba índices, slots, que los eventos tengan slot asignado y que los bloques quepan"""
+        cdef int k
+        for k in range(idx.shape[0]):
+            if idx[k] < 0 or idx[k] >= self.num_eventos:
+                raise ValueError(f"Evento fuera de rango: {idx[k]}")
+            if destino[k] < 0 or destino[k] >= 70:
+                raise ValueError(f"Slot fuera de rango: {destino[k]} (0-69)")
+            if self.ev[idx[k], 5] < 0 or self.ev[idx[k], 6] < 0:
+                raise ValueError(f"El evento {idx[k]} no tiene slot asignado")
+            if destino[k] % 14 + self.dur[idx[k]] > 14:
+                raise ValueError(f"El evento {idx[k]} ({self.dur[idx[k]]} horas) "
+                                 f"no cabe en el día desde el slot {destino[k]}")
+        return 0
+
     def optimizar(self, dict datos_adicionales=None, callback_progreso=None, callback_log=None,
                   list grupos_info=None):
         """
@@ -846,7 +1422,7 @@ cdef class BusquedaTabu:
         return resultado
     
     def get_estadisticas(self):
-        """Retorna estadísticas de la solución actual"""
+        """Retorna estadísticas de la solución actual y contadores del motor"""
         conflictos = self._calcular_conflictos_duros()
         blandos = self._calcular_conflictos_blandos()
         
@@ -857,6 +1433,240 @@ cdef class BusquedaTabu:
             'conflictos_duros': conflictos,
             'conflictos_blandos': blandos,
             'calidad': self._calcular_calidad(conflictos, blandos),
-            'iteraciones': self.iteracion_actual
+            'iteraciones': self.iteracion_actual,
+            'metricas': self.get_metricas()
         }
+    
+    def get_metricas(self):
+        """
+        Contadores acumulados desde inicializar():
+        movimientos evaluados, rechazos tabú, mejoras, checkpoints,
+        iteraciones/s y reparto del tiempo entre vecindario, movimiento,
+        evaluación, compactación, checkpoints y callbacks.
+        """
+        return {
+            'iteraciones': self.iteraciones_ejecutadas,
+            'movimientos_evaluados': self.movimientos_evaluados,
+            'rechazos_tabu': self.rechazos_tabu,
+            'movimientos_aplicados': self.movimientos_aplicados,
+            'mejoras': self.mejoras,
+            'checkpoints': self.checkpoints_guardados,
+            'cota_alcanzada': self.cota_alcanzada,
+            'iteraciones_por_segundo': (self.iteraciones_ejecutadas / self.tiempo_ejecucion
+                                        if self.tiempo_ejecucion > 0 else 0.0),
+            'tiempo': {
+                'vecindario': self.tiempo_vecindario,
+                'movimiento': self.tiempo_movimiento,
+                'evaluacion': self.tiempo_evaluacion,
+                'compactacion': self.tiempo_compactacion,
+                'checkpoints': self.tiempo_checkpoints,
+                'callbacks': self.tiempo_callbacks,
+                'total': self.tiempo_ejecucion
+            }
+        }
+
+
+# ==================== MOTORES DE MOVIMIENTOS ALEATORIOS ====================
+
+cdef class RecocidoSimulado(BusquedaTabu):
+    """
+    Recocido simulado sobre la misma representación, ocupación y función
+    objetivo que BusquedaTabu.
+    
+    Cada iteración muestrea movimientos_por_iteracion movimientos aleatorios
+    (evento, slot) evaluados en O(1) y los acepta con el criterio de Metropolis
+    sobre el costo PESO_CONFLICTO * conflictos + huecos. La temperatura baja
+    por iteración de forma geométrica (T *= enfriamiento) o lineal hasta
+    temperatura_minima.
+    """
+    
+    cdef:
+        double temperatura_inicial
+        double temperatura_minima
+        double enfriamiento
+        bint enfriamiento_lineal
+        int movimientos_por_iteracion
+        public double temperatura
+    
+    def __init__(self, int max_iter=1000, int tamano_tabu=30, long semilla=-1,
+                 double temperatura_inicial=10.0, double enfriamiento=0.995,
+                 str tipo_enfriamiento='geometrico', double temperatura_minima=0.01,
+                 int movimientos_por_iteracion=70, int intervalo_compactacion=100):
+        """
+        Args:
+            max_iter, tamano_tabu, semilla, intervalo_compactacion: como en
+                BusquedaTabu (la lista tabú no se usa)
+            temperatura_inicial: Temperatura de la primera iteración
+            enfriamiento: Factor por iteración del enfriamiento geométrico
+            tipo_enfriamiento: 'geometrico' o 'lineal'
+            temperatura_minima: Temperatura final / mínima
+            movimientos_por_iteracion: Movimientos muestreados por iteración
+        """
+        BusquedaTabu.__init__(self, max_iter, tamano_tabu, semilla, intervalo_compactacion)
+        if tipo_enfriamiento not in ('geometrico', 'lineal'):
+            raise ValueError(f"tipo_enfriamiento desconocido: {tipo_enfriamiento} (geometrico o lineal)")
+        if movimientos_por_iteracion < 1:
+            raise ValueError("movimientos_por_iteracion debe ser positivo")
+        self.temperatura_inicial = temperatura_inicial
+        self.temperatura_minima = temperatura_minima
+        self.enfriamiento = enfriamiento
+        self.enfriamiento_lineal = tipo_enfriamiento == 'lineal'
+        self.movimientos_por_iteracion = movimientos_por_iteracion
+        self.temperatura = temperatura_inicial
+    
+    def __getstate__(self):
+        estado = BusquedaTabu.__getstate__(self)
+        estado.update(temperatura_inicial=self.temperatura_inicial, temperatura_minima=self.temperatura_minima,
+                      enfriamiento=self.enfriamiento, enfriamiento_lineal=self.enfriamiento_lineal,
+                      movimientos_por_iteracion=self.movimientos_por_iteracion, temperatura=self.temperatura)
+        return estado
+    
+    def __setstate__(self, dict estado):
+        BusquedaTabu.__setstate__(self, estado)
+        self.temperatura_inicial = estado['temperatura_inicial']
+        self.temperatura_minima = estado['temperatura_minima']
+        self.enfriamiento = estado['enfriamiento']
+        self.enfriamiento_lineal = estado['enfriamiento_lineal']
+        self.movimientos_por_iteracion = estado['movimientos_por_iteracion']
+        self.temperatura = estado['temperatura']
+    
+    cdef void _preparar(self):
+        self.temperatura = self.temperatura_inicial
+    
+    cdef bint _paso(self):
+        cdef int k, idx, slot_nuevo, delta_conf, delta_blandos, delta
+        cdef int aplicados = 0
+        cdef int evaluados = 0
+        cdef double t0 = pytime.perf_counter()
+        
+        for k in range(self.movimientos_por_iteracion):
+            if not self._proponer_movimiento(&idx, &slot_nuevo, &delta_conf, &delta_blandos):
+                continue
+            evaluados += 1
+            
+            delta = PESO_CONFLICTO * delta_conf + delta_blandos
+            if delta <= 0 or (self.temperatura > 0 and
+                              self._uniforme() < exp(-delta / self.temperatura)):
+                self._mover_evento(idx, slot_nuevo)
+                self.conflictos_actuales += delta_conf
+                self.blandos_actuales += delta_blandos
+                aplicados += 1
+                if delta < 0:
+                    self._registrar_mejor()
+        
+        # Enfriar
+        if self.enfriamiento_lineal:
+            self.temperatura = self.temperatura_inicial - (self.temperatura_inicial - self.temperatura_minima) * \
+                (self.iteracion_actual + 1) / <double>self.max_iteraciones
+        else:
+            self.temperatura *= self.enfriamiento
+        if self.temperatura < self.temperatura_minima:
+            self.temperatura = self.temperatura_minima
+        
+        self.movimientos_evaluados += evaluados
+        self.movimientos_aplicados += aplicados
+        self.tiempo_vecindario += pytime.perf_counter() - t0
+        return aplicados > 0
+    
+    cdef void _evaluar(self):
+        # El costo se mantiene incrementalmente en _paso()
+        pass
+
+
+cdef class AceptacionTardia(BusquedaTabu):
+    """
+    Late Acceptance Hill Climbing (Burke y Bykov) sobre la misma
+    representación, ocupación y función objetivo que BusquedaTabu.
+    
+    Un movimiento aleatorio se acepta si no empeora el costo actual o si no
+    es peor que el costo de hace longitud_historia movimientos.
+    """
+    
+    cdef:
+        int longitud_historia
+        int movimientos_por_iteracion
+        long long movimientos_realizados
+        cnp.ndarray historia
+    
+    def __init__(self, int max_iter=1000, int tamano_tabu=30, long semilla=-1,
+                 int longitud_historia=1000, int movimientos_por_iteracion=70,
+                 int intervalo_compactacion=100):
+        """
+        Args:
+            max_iter, tamano_tabu, semilla, intervalo_compactacion: como en
+                BusquedaTabu (la lista tabú no se usa)
+            longitud_historia: Número de costos anteriores que se recuerdan
+            movimientos_por_iteracion: Movimientos muestreados por iteración
+        """
+        BusquedaTabu.__init__(self, max_iter, tamano_tabu, semilla, intervalo_compactacion)
+        if longitud_historia < 1 or movimientos_por_iteracion < 1:
+            raise ValueError("longitud_historia y movimientos_por_iteracion deben ser positivos")
+        self.longitud_historia = longitud_historia
+        self.movimientos_por_iteracion = movimientos_por_iteracion
+    
+    def __getstate__(self):
+        estado = BusquedaTabu.__getstate__(self)
+        estado.update(longitud_historia=self.longitud_historia,
+                      movimientos_por_iteracion=self.movimientos_por_iteracion,
+                      movimientos_realizados=self.movimientos_realizados, historia=self.historia)
+        return estado
+    
+    def __setstate__(self, dict estado):
+        BusquedaTabu.__setstate__(self, estado)
+        self.longitud_historia = estado['longitud_historia']
+        self.movimientos_por_iteracion = estado['movimientos_por_iteracion']
+        self.movimientos_realizados = estado['movimientos_realizados']
+        self.historia = estado['historia']
+    
+    cdef void _preparar(self):
+        self.historia = np.full(self.longitud_historia,
+                                PESO_CONFLICTO * self.conflictos_actuales + self.blandos_actuales,
+                                dtype=np.int64)
+        self.movimientos_realizados = 0
+    
+    cdef bint _paso(self):
+        cdef int k, idx, slot_nuevo, delta_conf, delta_blandos, delta, v
+        cdef long long costo, nuevo
+        cdef int aplicados = 0
+        cdef int evaluados = 0
+        cdef cnp.int64_t[::1] historia = self.historia
+        cdef double t0 = pytime.perf_counter()
+        
+        for k in range(self.movimientos_por_iteracion):
+            if not self._proponer_movimiento(&idx, &slot_nuevo, &delta_conf, &delta_blandos):
+                continue
+            evaluados += 1
+            
+            delta = PESO_CONFLICTO * delta_conf + delta_blandos
+            costo = PESO_CONFLICTO * self.conflictos_actuales + self.blandos_actuales
+            nuevo = costo + delta
+            v = self.movimientos_realizados % self.longitud_historia
+            
+            if nuevo <= historia[v] or delta <= 0:
+                self._mover_evento(idx, slot_nuevo)
+                self.conflictos_actuales += delta_conf
+                self.blandos_actuales += delta_blandos
+                costo = nuevo
+                aplicados += 1
+                if delta < 0:
+                    self._registrar_mejor()
+            
+            historia[v] = costo
+            self.movimientos_realizados += 1
+        
+        self.movimientos_evaluados += evaluados
+        self.movimientos_aplicados += aplicados
+        self.tiempo_vecindario += pytime.perf_counter() - t0
+        return aplicados > 0
+    
+    cdef void _evaluar(self):
+        # El costo se mantiene incrementalmente en _paso()
+        pass
+
 
+# Motores disponibles por nombre (parámetro 'motor' de la API y de sistema_horarios)
+MOTORES = {
+    'tabu': BusquedaTabu,
+    'recocido': RecocidoSimulado,
+    'aceptacion_tardia': AceptacionTardia,
+}
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Snapshots compilados de los datos del problema.
+
+Un snapshot es un único archivo binario con los arreglos densos ya
+preprocesados (eventos, tablas de penalización, máscaras de elegibilidad)
+que se mapea en memoria al cargar. Se invalida automáticamente cuando cambia
+el contenido de los archivos fuente (hash BLAKE2b).
+
+Formato:
+    MAGIA (8 bytes) | longitud del encabezado (uint32 LE) | encabezado JSON |
+    arreglos alineados a 64 bytes | metadatos JSON (nombres y asignaciones)
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from busqueda_tabu_numpy import es_grupo_vespertino, NUM_SLOTS, HORAS_DIA
+
+MAGIA = b'HORSNAP1'
+VERSION_FORMATO = 2
+ALINEACION = 64
+DIRECTORIO_SNAPSHOTS = '.compilados'
+
+# Ventanas de turno (horas inclusivas), igual que asignar_slots_iniciales
+VENTANA_MATUTINA = (0, 7)
+VENTANA_VESPERTINA = (7, 13)
+
+
+def hash_archivos(rutas):
+    """Hash del contenido de uno o varios archivos fuente"""
+    h = hashlib.blake2b(digest_size=16)
+    for ruta in rutas:
+        with open(ruta, 'rb') as f:
+            for bloque in iter(lambda: f.read(1 << 20), b''):
+                h.update(bloque)
+        h.update(b'\0')
+    return h.hexdigest()
+
+
+def ruta_snapshot(ruta_fuente):
+    """Ruta del snapshot asociado a un archivo fuente (data/.compilados/<nombre>.snap)"""
+    directorio, nombre = os.path.split(os.path.abspath(ruta_fuente))
+    return os.path.join(directorio, DIRECTORIO_SNAPSHOTS, os.path.splitext(nombre)[0] + '.snap')
+
+
+# ==================== COMPILACIÓN ====================
+
+def bloques_materia(materia):
+    """
+    Duración de cada sesión semanal de una materia: bloques de horas_bloque
+    horas consecutivas y, si no alcanza, uno más corto con el resto
+    (horas_semanales=5, horas_bloque=2 -> [2, 2, 1]). Sin horas_bloque
+    cada hora es una sesión.
+    """
+    horas = materia.get('horas_semanales', 4)
+    bloque = max(1, min(int(materia.get('horas_bloque', 1)), HORAS_DIA))
+    return [bloque] * (horas // bloque) + ([horas % bloque] if horas % bloque else [])
+
+
+def construir_arreglos(datos):
+    """
+    Preprocesa un dataset (formato data/*.json) en arreglos densos.
+
+    Returns:
+        dict {nombre: np.ndarray}
+    """
+    profesores = datos.get('profesores', [])
+    materias = {m['id']: m for m in datos.get('materias', [])}
+    grupos = {g['id']: g for g in datos.get('grupos', [])}
+    aulas = datos.get('aulas', [])
+    num_aulas = max(1, len(aulas))
+
+    # Eventos: [id, materia_id, profesor_id, grupo_id, aula_id, dia, hora]
+    # (mismo orden y reglas que api_server.generar_eventos_iniciales); un
+    # evento por sesión, con su duración en horas en duraciones
+    filas = []
+    duraciones = []
+    for grupo_id_str, materias_grupo in datos.get('asignaciones', {}).items():
+        grupo_id = int(grupo_id_str)
+        for materia_id_str, profesor_id in materias_grupo.items():
+            materia = materias.get(int(materia_id_str))
+            if not materia:
+                continue
+            for duracion in bloques_materia(materia):
+                filas.append((len(filas), materia['id'], profesor_id, grupo_id,
+                              grupo_id % num_aulas, -1, -1))
+                duraciones.append(duracion)
+    eventos = np.array(filas, dtype=np.int32).reshape(len(filas), 7)
+    duraciones = np.array(duraciones, dtype=np.int32)
+
+    num_profesores = max([p['id'] for p in profesores] + [-1]) + 1
+    num_grupos = max(list(grupos) + [-1]) + 1
+
+    # Penalización por preferencias: preferencias[slot, profesor] = 1 si NO quiere ese slot
+    preferencias = np.zeros((NUM_SLOTS, num_profesores), dtype=np.uint8)
+    for p in profesores:
+        for slot in p.get('preferencias_horarias', []):
+            if 0 <= slot < NUM_SLOTS:
+                preferencias[slot, p['id']] = 1
+
+    # Ventana de turno: ventana_turno[grupo, slot] = 1 si el slot está dentro del turno
+    ventana_turno = np.zeros((num_grupos, NUM_SLOTS), dtype=np.uint8)
+    for grupo_id, g in grupos.items():
+        inicio, fin = VENTANA_VESPERTINA if es_grupo_vespertino(g.get('nombre', '')) else VENTANA_MATUTINA
+        for dia in range(5):
+            ventana_turno[grupo_id, dia * HORAS_DIA + inicio:dia * HORAS_DIA + fin + 1] = 1
+
+    # Elegibilidad de aulas por evento (capacidad y laboratorio)
+    capacidad = np.array([a.get('capacidad', 0) for a in aulas], dtype=np.int32)
+    es_lab = np.array([a.get('es_laboratorio', False) for a in aulas], dtype=bool)
+    aulas_elegibles = np.zeros((len(eventos), len(aulas)), dtype=np.uint8)
+    for i, (_, materia_id, _, grupo_id, _, _, _) in enumerate(filas):
+        estudiantes = grupos.get(grupo_id, {}).get('num_estudiantes', 0)
+        requiere_lab = materias[materia_id].get('requiere_laboratorio', False)
+        aulas_elegibles[i] = (capacidad >= estudiantes) & (es_lab | (not requiere_lab))
+
+    # Cargas semanales por recurso (en horas)
+    carga_profesores = np.bincount(eventos[:, 2], weights=duraciones, minlength=num_profesores).astype(np.int32)
+    carga_grupos = np.bincount(eventos[:, 3], weights=duraciones, minlength=num_grupos).astype(np.int32)
+
+    return {
+        'eventos': eventos,
+        'duraciones': duraciones,
+        'preferencias': preferencias,
+        'ventana_turno': ventana_turno,
+        'aulas_elegibles': aulas_elegibles,
+        'carga_profesores': carga_profesores,
+        'carga_grupos': carga_grupos,
+    }
+
+
+def escribir_snapshot(ruta, datos, hash_fuente):
+    """Compila un dataset y lo escribe de forma atómica en ruta"""
+    arreglos = construir_arreglos(datos)
+    metadatos = json.dumps({
+        'profesores': datos.get('profesores', []),
+        'materias': datos.get('materias', []),
+        'grupos': datos.get('grupos', []),
+        'aulas': datos.get('aulas', []),
+        'asignaciones': datos.get('asignaciones', {}),
+    }, ensure_ascii=False).encode('utf-8')
+
+    # Calcular desplazamientos (relativos al inicio de la zona de datos)
+    indice = {}
+    desplazamiento = 0
+    for nombre, arr in arreglos.items():
+        indice[nombre] = {'dtype': arr.dtype.str, 'shape': list(arr.shape), 'offset': desplazamiento}
+        desplazamiento += _alinear(arr.nbytes)
+
+    encabezado = json.dumps({
+        'version': VERSION_FORMATO,
+        'hash': hash_fuente,
+        'arreglos': indice,
+        'metadatos': {'offset': desplazamiento, 'longitud': len(metadatos)},
+    }).encode('utf-8')
+    inicio_datos = _alinear(len(MAGIA) + 4 + len(encabezado))
+
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    with open(temporal, 'wb') as f:
+        f.write(MAGIA)
+        f.write(struct.pack('<I', len(encabezado)))
+        f.write(encabezado)
+        f.write(b'\0' * (inicio_datos - f.tell()))
+        for nombre, arr in arreglos.items():
+            datos_arr = np.ascontiguousarray(arr).tobytes()
+            f.write(datos_arr)
+            f.write(b'\0' * (_alinear(len(datos_arr)) - len(datos_arr)))
+        f.write(metadatos)
+    os.replace(temporal, ruta)
+
+
+def _alinear(n):
+    return (n + ALINEACION - 1) // ALINEACION * ALINEACION
+
+
+# ==================== CARGA ====================
+
+class ProblemaCompilado:
+    """
+    Vista de solo lectura sobre un snapshot mapeado en memoria.
+    Los arreglos son np.ndarray sin copia sobre el mmap; los metadatos
+    (nombres, asignaciones) se decodifican la primera vez que se piden.
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        with open(ruta, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mmap[:len(MAGIA)] != MAGIA:
+            raise ValueError(f"No es un snapshot válido: {ruta}")
+        (longitud,) = struct.unpack_from('<I', self._mmap, len(MAGIA))
+        inicio = len(MAGIA) + 4
+        self.encabezado = json.loads(self._mmap[inicio:inicio + longitud])
+        self._inicio_datos = _alinear(inicio + longitud)
+        self._metadatos = None
+
+        for nombre, info in self.encabezado['arreglos'].items():
+            dtype = np.dtype(info['dtype'])
+            forma = tuple(info['shape'])
+            arr = np.frombuffer(self._mmap, dtype=dtype, count=int(np.prod(forma)),
+                                offset=self._inicio_datos + info['offset']).reshape(forma)
+            setattr(self, nombre, arr)
+
+    @property
+    def hash(self):
+        return self.encabezado['hash']
+
+    @property
+    def metadatos(self):
+        """dict con profesores, materias, grupos, aulas y asignaciones"""
+        if self._metadatos is None:
+            info = self.encabezado['metadatos']
+            inicio = self._inicio_datos + info['offset']
+            self._metadatos = json.loads(self._mmap[inicio:inicio + info['longitud']].decode('utf-8'))
+        return self._metadatos
+
+    def eventos_como_dicts(self):
+        """Eventos en el formato de lista de diccionarios de la API"""
+        return [{
+            'id': fila[0],
+            'materia_id': fila[1],
+            'profesor_id': fila[2],
+            'grupo_id': fila[3],
+            'aula_id': fila[4],
+            'duracion': duracion,
+            'slot': {'dia': fila[5], 'hora': fila[6]}
+        } for fila, duracion in zip(self.eventos.tolist(), self.duraciones.tolist())]
+
+
+def leer_snapshot(ruta, hash_esperado=None):
+    """Abre un snapshot; retorna None si no existe, es de otra versión o está desactualizado"""
+    try:
+        problema = ProblemaCompilado(ruta)
+    except (OSError, ValueError):
+        return None
+    if problema.encabezado.get('version') != VERSION_FORMATO:
+        return None
+    if hash_esperado is not None and problema.hash != hash_esperado:
+        return None
+    return problema
+
+
+def cargar_json(ruta_json, usar_cache=True):
+    """
+    Carga un dataset JSON a través de su snapshot compilado,
+    recompilándolo si no existe o si el JSON cambió.
+
+    Returns:
+        ProblemaCompilado
+    """
+    hash_fuente = hash_archivos([ruta_json])
+    destino = ruta_snapshot(ruta_json)
+
+    if usar_cache:
+        problema = leer_snapshot(destino, hash_fuente)
+        if problema is not None:
+            return problema
+
+    with open(ruta_json, 'r', encoding='utf-8') as f:
+        datos = json.load(f)
+    escribir_snapshot(destino, datos, hash_fuente)
+    return ProblemaCompilado(destino)
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Descomposición del problema en subproblemas independientes.
+
+Dos eventos solo pueden chocar si comparten profesor o grupo, así que cada
+componente conexa del grafo bipartito grupo-profesor es un subproblema
+independiente. Las componentes se reparten en lotes equilibrados, se resuelven
+en un pool de procesos con el motor elegido y sus slots se combinan en una sola
+solución: el tiempo queda acotado por la componente más grande y no por el
+total de eventos.
+
+Tras combinar se evalúa la solución conjunta y, si quedan conflictos, se hace
+una pasada de reparación sobre la instancia completa partiendo de los slots
+combinados (sin volver a sembrar).
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+try:
+    from cython_modules.busqueda_tabu import MOTORES
+except ImportError:
+    from busqueda_tabu_numpy import MOTORES
+
+from busqueda_tabu_numpy import como_arreglo_eventos, como_duraciones, duraciones_de, eventos_a_arreglo
+
+CONTADORES = ('iteraciones', 'movimientos_evaluados', 'rechazos_tabu',
+              'movimientos_aplicados', 'mejoras')
+
+
+# ==================== COMPONENTES ====================
+
+def componentes_conexas(eventos):
+    """
+    Componentes conexas del grafo grupo-profesor de un arreglo de eventos (n, 7).
+
+    Returns:
+        (etiquetas, tamanos): etiqueta de componente por evento, numeradas de
+        mayor a menor número de eventos, y el número de eventos de cada una
+    """
+    eventos = np.asarray(eventos)
+    if len(eventos) == 0:
+        return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int64)
+
+    # Nodos: grupos en [0, G) y profesores en [G, G + P)
+    grupos = eventos[:, 3].astype(np.int64)
+    profesores = eventos[:, 2].astype(np.int64)
+    desplazamiento = int(grupos.max()) + 1
+    base = desplazamiento + int(profesores.max()) + 1
+    padre = np.arange(base)
+
+    def raiz(x):
+        while padre[x] != x:
+            padre[x] = padre[padre[x]]
+            x = padre[x]
+        return x
+
+    # Unión por cada par (grupo, profesor) distinto
+    codigos = np.sort(grupos * base + profesores)
+    codigos = codigos[np.r_[True, np.diff(codigos) != 0]]
+    for grupo, profesor in zip((codigos // base).tolist(), (codigos % base).tolist()):
+        a, b = raiz(grupo), raiz(desplazamiento + profesor)
+        if a != b:
+            padre[a] = b
+
+    raices = np.array([raiz(g) for g in range(desplazamiento)])[grupos]
+    _, inversa, tamanos = np.unique(raices, return_inverse=True, return_counts=True)
+
+    # Renumerar de la componente más grande a la más pequeña
+    orden = np.argsort(-tamanos, kind='stable')
+    nueva = np.empty_like(orden)
+    nueva[orden] = np.arange(len(orden))
+    return nueva[inversa.reshape(-1)].astype(np.int32), tamanos[orden]
+
+
+def agrupar_componentes(tamanos, num_lotes):
+    """
+    Reparte las componentes en num_lotes lotes de carga parecida
+    (la mayor primero, al lote con menos eventos).
+
+    Returns:
+        Lista de listas de índices de componente (sin lotes vacíos)
+    """
+    lotes = [[] for _ in range(max(1, num_lotes))]
+    carga = [0] * len(lotes)
+    for c in np.argsort(-np.asarray(tamanos), kind='stable').tolist():
+        destino = carga.index(min(carga))
+        lotes[destino].append(c)
+        carga[destino] += int(tamanos[c])
+    return [lote for lote in lotes if lote]
+
+
+# ==================== RESOLUCIÓN ====================
+
+def _resolver_lote(tarea):
+    """Resuelve en un proceso del pool las componentes de un lote"""
+    motor = MOTORES[tarea['motor']]
+    resultados = []
+    for componente, eventos, duraciones, max_iter, semilla in tarea['componentes']:
+        instancia = motor(max_iter, tarea['tamano_tabu'], semilla, **tarea['parametros_motor'])
+        instancia.inicializar_arreglo(eventos, tarea['num_profesores'], tarea['num_grupos'],
+                                      tarea['num_aulas'], tarea['grupos_info'], duraciones)
+        resultado = instancia.optimizar(grupos_info=tarea['grupos_info'])
+        resultados.append({
+            'componente': componente,
+            'slots': instancia.obtener_slots().copy(),
+            'conflictos_duros': resultado['conflictos_duros'],
+            'penalizacion_blandas': resultado['penalizacion_blandas'],
+            'iteraciones': resultado['iteraciones'],
+            'tiempo_ejecucion': resultado['tiempo_ejecucion'],
+            'metricas': instancia.get_metricas()
+        })
+    return resultados
+
+
+class OptimizadorDescompuesto:
+    """
+    Envuelve un motor de MOTORES con la misma interfaz (inicializar_arreglo,
+    optimizar, obtener_eventos, get_metricas...), resolviendo cada componente
+    conexa por separado.
+
+    Args:
+        max_iter: Iteraciones de toda la instancia; cada componente recibe
+                  una parte proporcional a su número de eventos
+        tamano_tabu, semilla: Igual que el motor (semilla de la componente
+                              i = semilla + i)
+        motor: Clave de MOTORES
+        procesos: Procesos del pool (None = número de CPUs, 1 = sin pool)
+        iteraciones_reparacion: Iteraciones de la pasada conjunta
+                                (None = max_iter // 4)
+        **parametros_motor: Parámetros propios del motor
+    """
+
+    def __init__(self, max_iter=1000, tamano_tabu=30, semilla=-1, motor='tabu', procesos=None,
+                 iteraciones_reparacion=None, **parametros_motor):
+        if motor not in MOTORES:
+            raise ValueError(f"Motor desconocido: {motor} (opciones: {', '.join(MOTORES)})")
+        # Validar los parámetros antes de repartir trabajo
+        MOTORES[motor](max_iter, tamano_tabu, semilla, **parametros_motor)
+
+        self.max_iter = max_iter
+        self.tamano_tabu = tamano_tabu
+        self.semilla = semilla
+        self.motor = motor
+        self.procesos = procesos
+        self.iteraciones_reparacion = max_iter // 4 if iteraciones_reparacion is None else iteraciones_reparacion
+        self.parametros_motor = parametros_motor
+
+        self.eventos_array = None
+        self.duraciones = None
+        self.conjunto = None
+        self.componentes = []
+        self.reparado = False
+
+    def inicializar(self, eventos, num_profesores, num_grupos, num_aulas, grupos_info=None):
+        """Inicializa desde la lista de diccionarios de la API"""
+        self.inicializar_arreglo(eventos_a_arreglo(eventos), num_profesores, num_grupos,
+                                 num_aulas, grupos_info, duraciones_de(eventos))
+
+    def inicializar_arreglo(self, eventos, num_profesores, num_grupos, num_aulas, grupos_info=None,
+                            duraciones=None):
+        """Igual que en el motor: sin copia si eventos ya es un arreglo int32 (n, 7) escribible"""
+        self.eventos_array = como_arreglo_eventos(eventos)
+        self.duraciones = como_duraciones(duraciones, len(self.eventos_array))
+        self.num_profesores = num_profesores
+        self.num_grupos = num_grupos
+        self.num_aulas = num_aulas
+        self.grupos_info = list(grupos_info or [])
+
+    def optimizar(self, datos_adicionales=None, callback_progreso=None, callback_log=None,
+                  grupos_info=None):
+        """
+        Resuelve las componentes en paralelo, combina sus slots y repara la
+        solución conjunta si quedan conflictos.
+
+        Returns:
+            dict con conflictos_duros, penalizacion_blandas, calidad, iteraciones,
+            tiempo_ejecucion y el detalle de 'componentes'
+        """
+        tiempo_inicio = time.perf_counter()
+        if grupos_info:
+            self.grupos_info = list(grupos_info)
+
+        ev = self.eventos_array
+        etiquetas, tamanos = componentes_conexas(ev)
+        miembros = [np.flatnonzero(etiquetas == c) for c in range(len(tamanos))]
+
+        if callback_log:
+            callback_log(f"[INICIO] Descomposición: {len(ev)} eventos en {len(tamanos)} componentes "
+                         f"(mayor: {int(tamanos[0]) if len(tamanos) else 0} eventos)")
+
+        lotes = agrupar_componentes(tamanos, self.procesos or os.cpu_count() or 1)
+        tareas = [{
+            'motor': self.motor,
+            'tamano_tabu': self.tamano_tabu,
+            'parametros_motor': self.parametros_motor,
+            'num_profesores': self.num_profesores,
+            'num_grupos': self.num_grupos,
+            'num_aulas': self.num_aulas,
+            'grupos_info': self.grupos_info,
+            'componentes': [(c, np.ascontiguousarray(ev[miembros[c]]), self.duraciones[miembros[c]],
+                             self._iteraciones(tamanos[c], len(ev)),
+                             self.semilla + c if self.semilla >= 0 else -1) for c in lote]
+        } for lote in lotes]
+
+        self.componentes = [None] * len(tamanos)
+        resueltos = 0
+
+        def recibir(resultados):
+            nonlocal resueltos
+            for r in resultados:
+                c = r['componente']
+                ev[miembros[c], 5:7] = r['slots']
+                resueltos += len(miembros[c])
+                self.componentes[c] = {k: v for k, v in r.items() if k != 'slots'}
+                self.componentes[c]['num_eventos'] = len(miembros[c])
+                if callback_log:
+                    callback_log(f"[COMPONENTE {c}] {len(miembros[c])} eventos - "
+                                 f"Conflictos: {r['conflictos_duros']}, Blandos: {r['penalizacion_blandas']} "
+                                 f"({r['tiempo_ejecucion']:.2f}s)")
+            if callback_progreso:
+                conflictos = sum(x['conflictos_duros'] for x in self.componentes if x)
+                callback_progreso(100.0 * resueltos / max(1, len(ev)),
+                                  {'conflictos_duros': conflictos, 'calidad': 0.0})
+
+        if len(tareas) <= 1:
+            for tarea in tareas:
+                recibir(_resolver_lote(tarea))
+        else:
+            with ProcessPoolExecutor(max_workers=len(tareas)) as pool:
+                for futuro in as_completed([pool.submit(_resolver_lote, t) for t in tareas]):
+                    recibir(futuro.result())
+
+        # Evaluación conjunta y, si hace falta, reparación sin volver a sembrar
+        self.reparado = False
+        self.conjunto = MOTORES[self.motor](self.iteraciones_reparacion, self.tamano_tabu,
+                                            self.semilla, **self.parametros_motor)
+        self.conjunto.inicializar_arreglo(ev, self.num_profesores, self.num_grupos,
+                                          self.num_aulas, self.grupos_info, self.duraciones)
+        estadisticas = self.conjunto.get_estadisticas()
+        resultado = {
+            'conflictos_duros': estadisticas['conflictos_duros'],
+            'penalizacion_blandas': estadisticas['conflictos_blandos'],
+            'calidad': estadisticas['calidad']
+        }
+        if resultado['conflictos_duros'] > 0 and self.iteraciones_reparacion > 0:
+            if callback_log:
+                callback_log(f"[REPARACIÓN] {resultado['conflictos_duros']} conflictos tras combinar; "
+                             f"{self.iteraciones_reparacion} iteraciones sobre la instancia completa")
+            resultado = self.conjunto.ejecutar(datos_adicionales or {}, None, callback_log)
+            self.reparado = True
+
+        # Iteraciones hechas (un motor que alcanza su cota se detiene antes de max_iter)
+        iteraciones = sum(c['iteraciones'] for c in self.componentes if c)
+        if self.reparado:
+            iteraciones += resultado['iteraciones']
+
+        tiempo_total = time.perf_counter() - tiempo_inicio
+        resultado.update({
+            'iteraciones': iteraciones,
+            'tiempo_ejecucion': tiempo_total,
+            'componentes': self.componentes,
+            'reparado': self.reparado
+        })
+
+        if callback_log:
+            callback_log(f"[FINALIZADO] Optimización descompuesta en {tiempo_total:.2f}s - "
+                         f"Conflictos: {resultado['conflictos_duros']}")
+        return resultado
+
+    def _iteraciones(self, tamano, total):
+        """Iteraciones de una componente, proporcionales a su número de eventos"""
+        return max(1, -(-self.max_iter * int(tamano) // max(1, total)))
+
+    def ejecutar(self, datos_adicionales=None, callback_progreso=None, callback_log=None):
+        """Igual que optimizar(); los eventos que ya tienen slot se respetan al sembrar"""
+        return self.optimizar(datos_adicionales, callback_progreso, callback_log)
+
+    # ==================== RESULTADOS ====================
+
+    def obtener_eventos(self):
+        return self.conjunto.obtener_eventos()
+
+    def obtener_arreglo(self):
+        return self.eventos_array
+
+    def obtener_slots(self):
+        return self.eventos_array[:, 5:7]
+
+    def obtener_duraciones(self):
+        return self.duraciones
+
+    def get_estadisticas(self):
+        estadisticas = self.conjunto.get_estadisticas()
+        estadisticas['metricas'] = self.get_metricas()
+        estadisticas['componentes'] = self.componentes
+        return estadisticas
+
+    def get_metricas(self):
+        """Contadores sumados de todas las componentes y de la pasada conjunta"""
+        partes = [c['metricas'] for c in self.componentes if c]
+        if self.conjunto is not None and self.reparado:
+            partes.append(self.conjunto.get_metricas())
+
+        metricas = {clave: sum(p.get(clave, 0) for p in partes) for clave in CONTADORES}
+        tiempos = {}
+        for p in partes:
+            for fase, valor in p.get('tiempo', {}).items():
+                tiempos[fase] = tiempos.get(fase, 0.0) + valor
+        metricas['iteraciones_por_segundo'] = (metricas['iteraciones'] / tiempos['total']
+                                               if tiempos.get('total') else 0.0)
+        metricas['tiempo'] = tiempos
+        return metricas
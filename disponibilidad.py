@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Horas libres en común para conjuntos de profesores, grupos y aulas.
+
+Disponibilidad se construye una vez por versión de la solución: una matriz
+booleana (recursos x 70 slots) de ocupación por tipo de recurso. Una consulta
+solo une las filas de los recursos pedidos, así que cuesta O(recursos pedidos
+x 70) y no toca al motor.
+
+Los resultados se ordenan por el impacto en la penalización blanda del motor
+(huecos en el día de los grupos): cuántas horas de hueco agregaría (o quitaría,
+si rellena un hueco) ocupar ese bloque en el día de cada grupo del conjunto.
+Los huecos de los profesores no entran en esa penalización y solo desempatan.
+"""
+
+import numpy as np
+
+from busqueda_tabu_numpy import HORAS_DIA, NUM_SLOTS
+
+DIAS = 5
+
+# tipo de recurso -> columna de eventos_array
+COLUMNAS = {'profesores': 2, 'grupos': 3, 'aulas': 4}
+
+
+def _huecos(ocupado):
+    """Huecos por fila de una ocupación (..., HORAS_DIA): (última - primera + 1) - clases"""
+    clases = ocupado.sum(axis=-1)
+    primera = ocupado.argmax(axis=-1)
+    ultima = HORAS_DIA - 1 - ocupado[..., ::-1].argmax(axis=-1)
+    return np.where(clases > 1, ultima - primera + 1 - clases, 0)
+
+
+class Disponibilidad:
+    """
+    Índice de ocupación de una solución.
+
+    Args:
+        eventos: Arreglo (n, 7) [id, materia_id, profesor_id, grupo_id, aula_id, dia, hora]
+        num_profesores, num_grupos, num_aulas: Tamaño de cada tipo de recurso
+        version: Versión de la solución indexada (para invalidar cachés)
+    """
+
+    def __init__(self, eventos, num_profesores, num_grupos, num_aulas, version=None):
+        self.version = version
+        eventos = np.asarray(eventos)
+        asignados = eventos[(eventos[:, 5] >= 0) & (eventos[:, 6] >= 0)]
+        slots = asignados[:, 5] * HORAS_DIA + asignados[:, 6]
+
+        self.ocupacion = {}
+        for tipo, cantidad in (('profesores', num_profesores), ('grupos', num_grupos), ('aulas', num_aulas)):
+            recursos = asignados[:, COLUMNAS[tipo]]
+            validos = recursos >= 0  # aula_id -1 = sin aula
+            # Ids fuera de la lista (datos inconsistentes) también se indexan
+            total = max(cantidad, int(recursos[validos].max()) + 1 if validos.any() else 0)
+            ocupacion = np.zeros((total, NUM_SLOTS), dtype=bool)
+            ocupacion[recursos[validos], slots[validos]] = True
+            self.ocupacion[tipo] = ocupacion
+
+    @property
+    def nbytes(self):
+        return sum(o.nbytes for o in self.ocupacion.values())
+
+    def _filas(self, tipo, ids):
+        """Filas de ocupación de los recursos pedidos (un id sin eventos está libre)"""
+        ocupacion = self.ocupacion[tipo]
+        ids = np.asarray(list(ids), dtype=np.int64)
+        if len(ids) and ids.min() < 0:
+            raise ValueError(f"Id de {tipo} inválido: {int(ids.min())}")
+        filas = np.zeros((len(ids), NUM_SLOTS), dtype=bool)
+        dentro = ids < len(ocupacion)
+        filas[dentro] = ocupacion[ids[dentro]]
+        return filas
+
+    def libres(self, profesores=(), grupos=(), aulas=(), duracion=1, dias=None,
+               hora_min=0, hora_max=HORAS_DIA - 1, limite=None):
+        """
+        Bloques de duracion horas consecutivas en que todos los recursos están libres.
+
+        Args:
+            profesores, grupos, aulas: Ids de los recursos del conjunto
+            duracion: Horas consecutivas necesarias (mismo día)
+            dias: Días permitidos (None = lunes a viernes)
+            hora_min, hora_max: Primera y última hora permitidas del bloque
+            limite: Máximo de resultados (None = todos)
+
+        Returns:
+            Lista de dicts {dia, hora, duracion, impacto, huecos_grupos,
+            huecos_profesores}, de menor a mayor impacto (huecos_grupos, la
+            penalización blanda) y luego por huecos_profesores, día y hora
+        """
+        if not 1 <= duracion <= HORAS_DIA:
+            raise ValueError(f"duracion debe estar entre 1 y {HORAS_DIA}")
+        if not 0 <= hora_min <= hora_max < HORAS_DIA:
+            raise ValueError(f"Rango de horas inválido: {hora_min}-{hora_max} (0-{HORAS_DIA - 1})")
+        dias = list(range(DIAS)) if dias is None else sorted(set(dias))
+        if any(not 0 <= d < DIAS for d in dias):
+            raise ValueError(f"Días inválidos: {dias} (0-{DIAS - 1})")
+        if limite is not None and limite < 0:
+            raise ValueError("limite no puede ser negativo")
+
+        filas = {tipo: self._filas(tipo, ids)
+                 for tipo, ids in (('profesores', profesores), ('grupos', grupos), ('aulas', aulas))}
+        ocupado = np.zeros(NUM_SLOTS, dtype=bool)
+        for f in filas.values():
+            ocupado |= f.any(axis=0)
+        ocupado = ocupado.reshape(DIAS, HORAS_DIA)
+
+        # Inicios posibles: el bloque entero cabe en [hora_min, hora_max] y está libre
+        inicios = np.arange(hora_min, hora_max - duracion + 2)
+        if len(inicios) == 0:
+            return []
+        bloques = np.zeros((len(inicios), HORAS_DIA), dtype=bool)
+        for k in range(duracion):
+            bloques[np.arange(len(inicios)), inicios + k] = True
+        libre = ~(ocupado[:, None, :] & bloques[None, :, :]).any(axis=-1)  # (DIAS, inicios)
+
+        # Impacto en huecos: (recursos, DIAS, inicios) antes y después de ocupar el bloque
+        impacto = {}
+        for tipo in ('grupos', 'profesores'):
+            dia_recurso = filas[tipo].reshape(-1, DIAS, HORAS_DIA)
+            antes = _huecos(dia_recurso)[:, :, None]
+            despues = _huecos(dia_recurso[:, :, None, :] | bloques[None, None, :, :])
+            impacto[tipo] = (despues - antes).sum(axis=0)
+
+        resultados = []
+        for d in dias:
+            for k in np.flatnonzero(libre[d]):
+                huecos_grupos = int(impacto['grupos'][d, k])
+                huecos_profesores = int(impacto['profesores'][d, k])
+                resultados.append({
+                    'dia': d,
+                    'hora': int(inicios[k]),
+                    'duracion': duracion,
+                    'impacto': huecos_grupos,
+                    'huecos_grupos': huecos_grupos,
+                    'huecos_profesores': huecos_profesores
+                })
+
+        resultados.sort(key=lambda r: (r['huecos_grupos'], r['huecos_profesores'], r['dia'], r['hora']))
+        return resultados[:limite] if limite is not None else resultados
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Exportación del horario en el servidor: CSV, iCalendar (.ics) y XLSX.
+
+Todo se genera con generadores sobre un índice de los eventos (n, 7) ordenado
+por recurso (grupo, profesor o aula), día y hora: cada formato produce el
+archivo en trozos, recurso por recurso, así que la memoria no crece con el
+tamaño de la facultad y la respuesta HTTP se envía por partes (chunked).
+
+El XLSX es un ZIP escrito sobre un flujo sin seek (zipfile usa descriptores de
+datos) con una hoja por recurso en forma de cuadrícula hora x día; las celdas
+usan cadenas en línea, sin tabla de cadenas compartidas.
+"""
+
+import csv
+import io
+import re
+import zipfile
+from datetime import date, datetime, timedelta
+from xml.sax.saxutils import escape
+
+import numpy as np
+
+DIAS_SEMANA = ('Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes')
+DIAS_ICS = ('MO', 'TU', 'WE', 'TH', 'FR')
+
+# Horario real de la UPV (mismo que HORAS_RANGO en web/app.js)
+HORAS_RANGO = (
+    ('7:00', '7:55'), ('7:55', '8:50'), ('8:50', '9:45'), ('9:45', '10:40'),
+    ('11:10', '12:05'), ('12:05', '13:00'), ('13:00', '13:55'), ('14:00', '14:55'),
+    ('14:55', '15:50'), ('15:50', '16:45'), ('16:45', '17:40'), ('17:40', '18:35'),
+    ('18:35', '19:30'), ('19:30', '20:25')
+)
+
+# vista -> (columna de eventos_array, clave de la lista de la API, encabezado)
+VISTAS = {
+    'grupos': (3, 'grupos', 'Grupo'),
+    'profesores': (2, 'profesores', 'Profesor'),
+    'aulas': (4, 'aulas', 'Aula'),
+}
+FORMATOS = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'ics': ('text/calendar; charset=utf-8', 'ics'),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+}
+
+FILAS_POR_TROZO = 256
+SEMANAS_PREDETERMINADAS = 16
+
+
+def indexar_eventos(eventos, vista, ids=None):
+    """
+    Índice de los eventos asignados ordenados por recurso, día y hora.
+
+    Args:
+        eventos: Arreglo (n, 7) [id, materia_id, profesor_id, grupo_id, aula_id, dia, hora]
+        vista: 'grupos', 'profesores' o 'aulas'
+        ids: Recursos a incluir (None = todos)
+
+    Returns:
+        (orden, recursos, inicio): los eventos del recurso recursos[k] son
+        orden[inicio[k]:inicio[k + 1]]
+    """
+    columna = VISTAS[vista][0]
+    mascara = (eventos[:, 5] >= 0) & (eventos[:, 6] >= 0)
+    if ids is not None:
+        mascara &= np.isin(eventos[:, columna], list(ids))
+    seleccion = np.flatnonzero(mascara)
+    orden = seleccion[np.lexsort((eventos[seleccion, 6], eventos[seleccion, 5], eventos[seleccion, columna]))]
+    claves = eventos[orden, columna]
+    cortes = np.flatnonzero(np.diff(claves)) + 1
+    inicio = np.concatenate(([0], cortes, [len(orden)])).astype(np.int64)
+    recursos = claves[inicio[:-1]] if len(orden) else claves[:0]
+    return orden, recursos, inicio
+
+
+def recorrer(eventos, vista, ids=None):
+    """Genera (recurso_id, filas (k, 7) del recurso ordenadas por día y hora)"""
+    orden, recursos, inicio = indexar_eventos(eventos, vista, ids)
+    for k, recurso in enumerate(recursos):
+        yield int(recurso), eventos[orden[inicio[k]:inicio[k + 1]]]
+
+
+class Nombres:
+    """Nombres por id de profesores, materias, grupos y aulas (con respaldo 'Grupo 7')"""
+
+    def __init__(self, profesores, materias, grupos, aulas):
+        self._tablas = {
+            clave: {e['id']: e.get('nombre', f"{clave} {e['id']}") for e in lista}
+            for clave, lista in (('profesores', profesores), ('materias', materias),
+                                 ('grupos', grupos), ('aulas', aulas))
+        }
+
+    def __call__(self, clave, id_):
+        return self._tablas[clave].get(int(id_), f"{VISTAS.get(clave, (0, 0, clave))[2]} {int(id_)}")
+
+
+# ==================== CSV ====================
+
+def generar_csv(eventos, nombres, vista='grupos', ids=None):
+    """Una fila por hora de clase: recurso de la vista, día, hora, materia y los otros dos recursos"""
+    otras = [clave for clave in VISTAS if clave != vista]
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    escritor.writerow([VISTAS[vista][2], 'Día', 'Hora', 'Materia'] + [VISTAS[o][2] for o in otras])
+    filas = 0
+
+    for recurso, bloque in recorrer(eventos, vista, ids):
+        nombre_recurso = nombres(VISTAS[vista][1], recurso)
+        for e in bloque:
+            escritor.writerow([nombre_recurso, DIAS_SEMANA[e[5]], '-'.join(HORAS_RANGO[e[6]]),
+                               nombres('materias', e[1])] +
+                              [nombres(VISTAS[o][1], e[VISTAS[o][0]]) for o in otras])
+            filas += 1
+            if filas % FILAS_POR_TROZO == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+# ==================== ICALENDAR ====================
+
+def _texto_ics(texto):
+    return str(texto).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n')
+
+
+def _plegar(linea):
+    """Pliega una línea de contenido a 75 octetos (RFC 5545 §3.1)"""
+    datos = linea.encode('utf-8')
+    if len(datos) <= 75:
+        return linea + '\r\n'
+    partes, limite = [], 75
+    while datos:
+        corte = min(limite, len(datos))
+        # No partir un carácter UTF-8 de varios bytes
+        while corte < len(datos) and (datos[corte] & 0xC0) == 0x80:
+            corte -= 1
+        partes.append(datos[:corte].decode('utf-8'))
+        datos = datos[corte:]
+        limite = 74  # el espacio inicial de la continuación cuenta
+    return '\r\n '.join(partes) + '\r\n'
+
+
+def _hora(texto):
+    h, m = texto.split(':')
+    return int(h), int(m)
+
+
+def lunes_de(fecha=None):
+    """Lunes de la semana de la fecha (hoy si es None)"""
+    fecha = fecha or date.today()
+    return fecha - timedelta(days=fecha.weekday())
+
+
+def generar_ics(eventos, nombres, vista='grupos', ids=None, inicio=None, semanas=SEMANAS_PREDETERMINADAS,
+                dominio='horarios-iti', version=0):
+    """
+    Calendario con un VEVENT semanal recurrente por bloque de clase.
+
+    Las horas consecutivas de la misma clase (materia, profesor, grupo y aula)
+    en el mismo día se unen en un solo bloque. Las horas son locales (flotantes).
+
+    Args:
+        inicio: Fecha del primer lunes del periodo (por defecto, el de esta semana)
+        semanas: Repeticiones de cada clase (RRULE COUNT)
+        dominio: Sufijo de los UID (estables mientras no cambie la solución)
+        version: Versión de la solución (parte del UID y del SEQUENCE)
+    """
+    lunes = lunes_de(inicio)
+    sello = datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')
+    clave_recurso = VISTAS[vista][1]
+
+    yield ''.join(_plegar(linea) for linea in (
+        'BEGIN:VCALENDAR', 'VERSION:2.0', 'PRODID:-//UPV//Sistema Horarios ITI//ES',
+        'CALSCALE:GREGORIAN', 'METHOD:PUBLISH',
+        f"X-WR-CALNAME:{_texto_ics('Horarios por ' + VISTAS[vista][2].lower())}"))
+
+    for recurso, bloque in recorrer(eventos, vista, ids):
+        nombre_recurso = nombres(clave_recurso, recurso)
+        salida = []
+        k = 0
+        while k < len(bloque):
+            e = bloque[k]
+            fin = k
+            while fin + 1 < len(bloque) and bloque[fin + 1, 5] == e[5] and bloque[fin + 1, 6] == bloque[fin, 6] + 1 \
+                    and (bloque[fin + 1, 1:5] == e[1:5]).all():
+                fin += 1
+
+            dia = lunes + timedelta(days=int(e[5]))
+            h0, m0 = _hora(HORAS_RANGO[e[6]][0])
+            h1, m1 = _hora(HORAS_RANGO[bloque[fin, 6]][1])
+            materia = nombres('materias', e[1])
+            salida.extend((
+                'BEGIN:VEVENT',
+                f"UID:{vista}-{recurso}-{int(e[0])}-v{version}@{dominio}",
+                f"DTSTAMP:{sello}",
+                f"SEQUENCE:{version}",
+                f"DTSTART:{dia:%Y%m%d}T{h0:02d}{m0:02d}00",
+                f"DTEND:{dia:%Y%m%d}T{h1:02d}{m1:02d}00",
+                f"RRULE:FREQ=WEEKLY;BYDAY={DIAS_ICS[e[5]]};COUNT={semanas}",
+                f"SUMMARY:{_texto_ics(materia + ' - ' + nombres('grupos', e[3]))}",
+                f"LOCATION:{_texto_ics(nombres('aulas', e[4]))}",
+                f"DESCRIPTION:{_texto_ics('Profesor: ' + nombres('profesores', e[2]))}",
+                f"CATEGORIES:{_texto_ics(nombre_recurso)}",
+                'END:VEVENT'
+            ))
+            k = fin + 1
+        yield ''.join(_plegar(linea) for linea in salida)
+
+    yield 'END:VCALENDAR\r\n'
+
+
+# ==================== XLSX ====================
+
+class _Trozos(io.RawIOBase):
+    """Destino de zipfile sin seek: acumula lo escrito hasta que se recoge"""
+
+    def __init__(self):
+        self._partes = []
+
+    def writable(self):
+        return True
+
+    def write(self, datos):
+        self._partes.append(bytes(datos))
+        return len(datos)
+
+    def recoger(self):
+        datos = b''.join(self._partes)
+        self._partes = []
+        return datos
+
+
+def _nombre_hoja(nombre, usados):
+    """Nombre de hoja válido para Excel: sin []:*?/\\, máximo 31 caracteres y único"""
+    base = re.sub(r'[\[\]:*?/\\]', '_', str(nombre)).strip("'")[:31] or 'Hoja'
+    candidato, n = base, 2
+    while candidato.lower() in usados:
+        sufijo = f" ({n})"
+        candidato, n = base[:31 - len(sufijo)] + sufijo, n + 1
+    usados.add(candidato.lower())
+    return candidato
+
+
+def _celda(columna, fila, texto):
+    return (f'<c r="{"ABCDEF"[columna]}{fila}" t="inlineStr"><is><t xml:space="preserve">'
+            f'{escape(texto)}</t></is></c>')
+
+
+def _hoja_xml(bloque, nombres, vista):
+    """Cuadrícula hora x día de un recurso; cada celda lista las clases de ese slot"""
+    otras = [clave for clave in VISTAS if clave != vista]
+    celdas = {}
+    for e in bloque:
+        detalle = [nombres('materias', e[1])] + [nombres(VISTAS[o][1], e[VISTAS[o][0]]) for o in otras]
+        celdas.setdefault((int(e[6]), int(e[5])), []).append(' - '.join(detalle))
+
+    filas = ['<row r="1">' + _celda(0, 1, 'Hora') +
+             ''.join(_celda(d + 1, 1, dia) for d, dia in enumerate(DIAS_SEMANA)) + '</row>']
+    for hora, rango in enumerate(HORAS_RANGO):
+        r = hora + 2
+        filas.append(f'<row r="{r}">' + _celda(0, r, '-'.join(rango)) +
+                     ''.join(_celda(d + 1, r, '\n'.join(celdas[(hora, d)]))
+                             for d in range(5) if (hora, d) in celdas) + '</row>')
+    return ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+            '<cols><col min="1" max="1" width="13" customWidth="1"/>'
+            '<col min="2" max="6" width="38" customWidth="1"/></cols>'
+            f'<sheetData>{"".join(filas)}</sheetData></worksheet>')
+
+
+def generar_xlsx(eventos, nombres, vista='grupos', ids=None):
+    """
+    Libro XLSX con una hoja por recurso, producido en trozos de bytes.
+
+    Las hojas se escriben primero, a medida que se recorren los recursos; el
+    libro, sus relaciones y los tipos de contenido (que necesitan la lista de
+    hojas) van al final del ZIP.
+    """
+    destino = _Trozos()
+    hojas = []
+    usados = set()
+
+    with zipfile.ZipFile(destino, 'w', zipfile.ZIP_DEFLATED) as libro:
+        for recurso, bloque in recorrer(eventos, vista, ids):
+            hojas.append(_nombre_hoja(nombres(VISTAS[vista][1], recurso), usados))
+            libro.writestr(f"xl/worksheets/sheet{len(hojas)}.xml", _hoja_xml(bloque, nombres, vista))
+            yield destino.recoger()
+
+        if not hojas:
+            hojas.append('Horario')
+            libro.writestr('xl/worksheets/sheet1.xml', _hoja_xml(eventos[:0], nombres, vista))
+
+        libro.writestr('[Content_Types].xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/styles.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>' +
+            ''.join(f'<Override PartName="/xl/worksheets/sheet{i}.xml" '
+                    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+                    for i in range(1, len(hojas) + 1)) +
+            '</Types>'))
+        libro.writestr('_rels/.rels', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+            'Target="xl/workbook.xml"/></Relationships>'))
+        libro.writestr('xl/workbook.xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"><sheets>' +
+            ''.join(f'<sheet name="{escape(nombre, {chr(34): "&quot;"})}" sheetId="{i}" r:id="rId{i}"/>'
+                    for i, nombre in enumerate(hojas, 1)) +
+            '</sheets></workbook>'))
+        libro.writestr('xl/_rels/workbook.xml.rels', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">' +
+            ''.join(f'<Relationship Id="rId{i}" '
+                    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+                    f'Target="worksheets/sheet{i}.xml"/>' for i in range(1, len(hojas) + 1)) +
+            f'<Relationship Id="rId{len(hojas) + 1}" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+            'Target="styles.xml"/></Relationships>'))
+        libro.writestr('xl/styles.xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+            '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+            '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+            '<fill><patternFill patternType="gray125"/></fill></fills>'
+            '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+            '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+            '<cellXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/></cellXfs>'
+            '</styleSheet>'))
+
+    yield destino.recoger()
+
+
+GENERADORES = {'csv': generar_csv, 'ics': generar_ics, 'xlsx': generar_xlsx}
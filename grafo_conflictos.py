@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Grafo de conflictos del horario, precalculado en el servidor para las vistas web.
+
+Se construye en tiempo lineal en el tamaño del grafo a partir de índices por
+profesor y por grupo (nunca comparando todos los pares de eventos) y se entrega
+como lista de aristas y en formato CSR.
+
+Vistas:
+    materias: un nodo por clase (grupo, materia). Dos clases son vecinas si
+              comparten profesor o grupo; 'choques' cuenta los pares de eventos
+              de ambas que hoy están en el mismo slot.
+    recursos: grafo bipartito grupo-profesor; 'peso' son las horas semanales
+              que el profesor imparte al grupo y 'choques' los eventos de ese
+              par que están en conflicto.
+"""
+
+import re
+
+import numpy as np
+
+VISTAS = ('materias', 'recursos')
+
+
+def semestre_de_grupo(grupo):
+    """Semestre de un grupo: campo 'semestre' o el número del nombre ('ITI 5-1' -> 5)"""
+    if grupo.get('semestre') is not None:
+        return int(grupo['semestre'])
+    m = re.search(r'(\d+)-\d+', grupo.get('nombre', ''))
+    return int(m.group(1)) if m else None
+
+
+def filtrar_eventos(eventos, grupos, grupo=None, profesor=None, semestre=None):
+    """Máscara de los eventos (n, 7) que cumplen los filtros dados"""
+    mascara = np.ones(len(eventos), dtype=bool)
+    if grupo is not None:
+        mascara &= eventos[:, 3] == grupo
+    if profesor is not None:
+        mascara &= eventos[:, 2] == profesor
+    if semestre is not None:
+        ids = [g['id'] for g in grupos if semestre_de_grupo(g) == semestre]
+        mascara &= np.isin(eventos[:, 3], ids)
+    return mascara
+
+
+def construir_grafo(eventos, profesores, materias, grupos, vista='materias',
+                    grupo=None, profesor=None, semestre=None):
+    """
+    Construye el grafo de la vista pedida sobre los eventos que pasan los filtros.
+
+    Args:
+        eventos: Arreglo (n, 7) [id, materia_id, profesor_id, grupo_id, aula_id, dia, hora]
+        profesores, materias, grupos: Listas de la API (para etiquetas y semestres)
+        vista: 'materias' o 'recursos'
+        grupo, profesor, semestre: Filtros opcionales
+
+    Returns:
+        dict con nodos, aristas (origen < destino), csr {indptr, indices, pesos} y totales
+    """
+    if vista not in VISTAS:
+        raise ValueError(f"Vista desconocida: {vista} (opciones: {', '.join(VISTAS)})")
+
+    eventos = np.asarray(eventos)
+    eventos = eventos[filtrar_eventos(eventos, grupos, grupo, profesor, semestre)]
+
+    nombres_grupo = {g['id']: g.get('nombre', f"Grupo {g['id']}") for g in grupos}
+    nombres_prof = {p['id']: p.get('nombre', f"Profesor {p['id']}") for p in profesores}
+    nombres_materia = {m['id']: m.get('nombre', f"Materia {m['id']}") for m in materias}
+
+    if vista == 'materias':
+        nodos, aristas = _grafo_materias(eventos, nombres_grupo, nombres_prof, nombres_materia)
+    else:
+        nodos, aristas = _grafo_recursos(eventos, nombres_grupo, nombres_prof)
+
+    indptr, indices, pesos = _a_csr(len(nodos), aristas)
+    for i, nodo in enumerate(nodos):
+        nodo['grado'] = int(indptr[i + 1] - indptr[i])
+
+    return {
+        'vista': vista,
+        'filtros': {'grupo': grupo, 'profesor': profesor, 'semestre': semestre},
+        'num_nodos': len(nodos),
+        'num_aristas': len(aristas),
+        'total_choques': sum(a['choques'] for a in aristas) + sum(n.get('choques_internos', 0) for n in nodos),
+        'nodos': nodos,
+        'aristas': aristas,
+        'csr': {'indptr': indptr.tolist(), 'indices': indices.tolist(), 'pesos': pesos.tolist()}
+    }
+
+
+def _grafo_materias(eventos, nombres_grupo, nombres_prof, nombres_materia):
+    """Nodos = clases (grupo, materia); aristas = recurso compartido"""
+    nodos = []
+    clase_de_evento = np.empty(len(eventos), dtype=np.int64)
+    indice_clase = {}
+    por_profesor = {}
+    por_grupo = {}
+
+    for i, (_, materia_id, profesor_id, grupo_id) in enumerate(eventos[:, :4].tolist()):
+        clave = (grupo_id, materia_id)
+        nodo = indice_clase.get(clave)
+        if nodo is None:
+            nodo = indice_clase[clave] = len(nodos)
+            nodos.append({
+                'id': nodo,
+                'tipo': 'clase',
+                'grupo_id': grupo_id,
+                'materia_id': materia_id,
+                'profesor_id': profesor_id,
+                'etiqueta': f"{nombres_materia.get(materia_id, materia_id)} ({nombres_grupo.get(grupo_id, grupo_id)})",
+                'profesor': nombres_prof.get(profesor_id, str(profesor_id)),
+                'horas': 0,
+                'choques_internos': 0
+            })
+            por_profesor.setdefault(profesor_id, []).append(nodo)
+            por_grupo.setdefault(grupo_id, []).append(nodo)
+        nodos[nodo]['horas'] += 1
+        clase_de_evento[i] = nodo
+
+    # Aristas: todas las clases de un mismo profesor o de un mismo grupo
+    comparten = {}
+    for recurso, indice in (('profesor', por_profesor), ('grupo', por_grupo)):
+        for clases in indice.values():
+            for a in range(len(clases)):
+                for b in range(a + 1, len(clases)):
+                    clave = (clases[a], clases[b])
+                    comparten[clave] = 'ambos' if clave in comparten else recurso
+
+    # Choques: pares de eventos en el mismo slot que comparten profesor o grupo
+    choques = dict.fromkeys(comparten, 0)
+    for clase_u, clase_v in _pares_en_choque(eventos, clase_de_evento):
+        if clase_u == clase_v:
+            nodos[clase_u]['choques_internos'] += 1
+        else:
+            choques[(min(clase_u, clase_v), max(clase_u, clase_v))] += 1
+
+    aristas = [{'origen': u, 'destino': v, 'comparten': recurso, 'choques': choques[(u, v)]}
+               for (u, v), recurso in sorted(comparten.items())]
+    return nodos, aristas
+
+
+def _grafo_recursos(eventos, nombres_grupo, nombres_prof):
+    """Nodos = grupos y profesores; aristas = horas del profesor con el grupo"""
+    nodos = []
+    indice = {}
+
+    def nodo(tipo, recurso_id, nombre):
+        clave = (tipo, recurso_id)
+        if clave not in indice:
+            indice[clave] = len(nodos)
+            nodos.append({
+                'id': len(nodos),
+                'clave': f"{tipo[0]}-{recurso_id}",
+                'tipo': tipo,
+                'recurso_id': recurso_id,
+                'etiqueta': nombre,
+                'horas': 0
+            })
+        return indice[clave]
+
+    pares = {}
+    par_de_evento = []
+    for _, _, profesor_id, grupo_id in eventos[:, :4].tolist():
+        g = nodo('grupo', grupo_id, nombres_grupo.get(grupo_id, str(grupo_id)))
+        p = nodo('profesor', profesor_id, nombres_prof.get(profesor_id, str(profesor_id)))
+        nodos[g]['horas'] += 1
+        nodos[p]['horas'] += 1
+        clave = (min(g, p), max(g, p))
+        pares[clave] = pares.get(clave, 0) + 1
+        par_de_evento.append(clave)
+
+    # Eventos en conflicto (su profesor o su grupo está duplicado en el slot)
+    choques = dict.fromkeys(pares, 0)
+    for i in np.flatnonzero(_eventos_en_conflicto(eventos)):
+        choques[par_de_evento[i]] += 1
+
+    aristas = [{'origen': u, 'destino': v, 'peso': horas, 'choques': choques[(u, v)]}
+               for (u, v), horas in sorted(pares.items())]
+    return nodos, aristas
+
+
+def _pares_en_choque(eventos, clase_de_evento):
+    """Pares (clase_u, clase_v) de eventos en el mismo slot con profesor o grupo en común"""
+    asignados = np.flatnonzero((eventos[:, 5] >= 0) & (eventos[:, 6] >= 0))
+    slots = eventos[asignados, 5] * 14 + eventos[asignados, 6]
+    cubetas = {}
+    for columna in (2, 3):
+        for i, slot, recurso in zip(asignados.tolist(), slots.tolist(), eventos[asignados, columna].tolist()):
+            cubetas.setdefault((columna, slot, recurso), []).append(i)
+
+    vistos = set()
+    for miembros in cubetas.values():
+        for a in range(len(miembros)):
+            for b in range(a + 1, len(miembros)):
+                par = (miembros[a], miembros[b])
+                if par not in vistos:
+                    vistos.add(par)
+                    yield int(clase_de_evento[par[0]]), int(clase_de_evento[par[1]])
+
+
+def _eventos_en_conflicto(eventos):
+    """Máscara de eventos cuyo profesor o grupo tiene otra clase en el mismo slot"""
+    asignados = (eventos[:, 5] >= 0) & (eventos[:, 6] >= 0)
+    slots = eventos[:, 5] * 14 + eventos[:, 6]
+    en_conflicto = np.zeros(len(eventos), dtype=bool)
+    for columna in (2, 3):
+        claves = slots.astype(np.int64) * (int(eventos[:, columna].max(initial=0)) + 1) + eventos[:, columna]
+        _, inversa, cuentas = np.unique(claves, return_inverse=True, return_counts=True)
+        en_conflicto |= cuentas[inversa.reshape(-1)] > 1
+    return en_conflicto & asignados
+
+
+def _a_csr(num_nodos, aristas):
+    """Adyacencia simétrica en CSR; pesos = choques de cada arista"""
+    if not aristas:
+        return np.zeros(num_nodos + 1, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    origen = np.array([a['origen'] for a in aristas], dtype=np.int64)
+    destino = np.array([a['destino'] for a in aristas], dtype=np.int64)
+    choques = np.array([a['choques'] for a in aristas], dtype=np.int64)
+
+    filas = np.concatenate([origen, destino])
+    columnas = np.concatenate([destino, origen])
+    pesos = np.concatenate([choques, choques])
+    orden = np.lexsort((columnas, filas))
+
+    indptr = np.zeros(num_nodos + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum(np.bincount(filas, minlength=num_nodos))
+    return indptr, columnas[orden], pesos[orden]
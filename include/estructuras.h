@@ -98,6 +98,18 @@ public:
     void mostrar_grafo();
 };
 
+// Representación compacta (CSR) que construyen los motores para el coloreo DSATUR
+// (construir_grafo_conflictos): vecinos de u = indices[indptr[u] .. indptr[u+1]-1]
+struct GrafoCSR {
+    int num_vertices;
+    vector<int> indptr;     // num_vertices + 1 desplazamientos
+    vector<int> indices;    // vecinos ordenados, sin repetir
+
+    GrafoCSR() : num_vertices(0) {}
+
+    int grado(int u) const { return indptr[u + 1] - indptr[u]; }
+};
+
 // ==================== SOLUCIÓN ====================
 
 struct Solucion {
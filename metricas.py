@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Métricas del servidor en formato de texto de Prometheus.
+Histogramas de latencia por ruta y exportación de los contadores del motor.
+"""
+
+import threading
+
+# Límites de los buckets de latencia (segundos)
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class HistogramaLatencias:
+    """Histograma acumulativo de latencias por (método, ruta, estado)"""
+
+    def __init__(self, buckets=BUCKETS_LATENCIA):
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observar(self, metodo, ruta, estado, segundos):
+        """Registra la duración de una petición"""
+        clave = (metodo, ruta, str(estado))
+        with self._lock:
+            serie = self._series.get(clave)
+            if serie is None:
+                serie = self._series[clave] = {'cuentas': [0] * len(self.buckets), 'suma': 0.0, 'total': 0}
+            for i, limite in enumerate(self.buckets):
+                if segundos <= limite:
+                    serie['cuentas'][i] += 1
+                    break
+            serie['suma'] += segundos
+            serie['total'] += 1
+
+    def formato_prometheus(self, nombre):
+        """Retorna las líneas del histograma en formato de exposición de Prometheus"""
+        lineas = [
+            f"# HELP {nombre} Latencia de las peticiones HTTP por ruta.",
+            f"# TYPE {nombre} histogram"
+        ]
+        with self._lock:
+            series = sorted((k, dict(v, cuentas=list(v['cuentas']))) for k, v in self._series.items())
+
+        for (metodo, ruta, estado), serie in series:
+            etiquetas = f'method="{metodo}",route="{_escapar(ruta)}",status="{estado}"'
+            acumulado = 0
+            for limite, cuenta in zip(self.buckets, serie['cuentas']):
+                acumulado += cuenta
+                lineas.append(f'{nombre}_bucket{{{etiquetas},le="{limite}"}} {acumulado}')
+            lineas.append(f'{nombre}_bucket{{{etiquetas},le="+Inf"}} {serie["total"]}')
+            lineas.append(f'{nombre}_sum{{{etiquetas}}} {serie["suma"]:.6f}')
+            lineas.append(f'{nombre}_count{{{etiquetas}}} {serie["total"]}')
+        return lineas
+
+
+def metricas_motor(metricas, prefijo='horarios_motor', etiquetas=''):
+    """
+    Convierte el dict de BusquedaTabu.get_metricas() en líneas de Prometheus.
+
+    Args:
+        metricas: dict retornado por get_metricas()
+        prefijo: Prefijo de los nombres de métrica
+        etiquetas: Etiquetas adicionales ya formateadas (ej. 'motor="Cython"')
+    """
+    sel = f'{{{etiquetas}}}' if etiquetas else ''
+    lineas = []
+
+    contadores = (
+        ('iteraciones', 'Iteraciones ejecutadas.'),
+        ('movimientos_evaluados', 'Movimientos candidatos evaluados.'),
+        ('rechazos_tabu', 'Movimientos descartados por la lista tabú.'),
+        ('movimientos_aplicados', 'Movimientos aplicados.'),
+        ('mejoras', 'Mejoras de la mejor solución.'),
+    )
+    for clave, ayuda in contadores:
+        lineas.append(f"# HELP {prefijo}_{clave}_total {ayuda}")
+        lineas.append(f"# TYPE {prefijo}_{clave}_total counter")
+        lineas.append(f"{prefijo}_{clave}_total{sel} {metricas.get(clave, 0)}")
+
+    lineas.append(f"# HELP {prefijo}_iteraciones_por_segundo Iteraciones por segundo de la última ejecución.")
+    lineas.append(f"# TYPE {prefijo}_iteraciones_por_segundo gauge")
+    lineas.append(f"{prefijo}_iteraciones_por_segundo{sel} {metricas.get('iteraciones_por_segundo', 0):.3f}")
+
+    # 'total' cubre todas las fases: en la misma familia un sum() lo contaría dos veces
+    tiempos = dict(metricas.get('tiempo', {}))
+    total = tiempos.pop('total', None)
+
+    lineas.append(f"# HELP {prefijo}_tiempo_segundos_total Tiempo acumulado por fase del motor.")
+    lineas.append(f"# TYPE {prefijo}_tiempo_segundos_total counter")
+    sep = ',' if etiquetas else ''
+    for fase, segundos in tiempos.items():
+        lineas.append(f'{prefijo}_tiempo_segundos_total{{{etiquetas}{sep}fase="{fase}"}} {segundos:.6f}')
+
+    if total is not None:
+        lineas.append(f"# HELP {prefijo}_tiempo_ejecucion_segundos_total Tiempo total de ejecución del motor.")
+        lineas.append(f"# TYPE {prefijo}_tiempo_ejecucion_segundos_total counter")
+        lineas.append(f"{prefijo}_tiempo_ejecucion_segundos_total{sel} {total:.6f}")
+
+    return lineas
+
+
+def combinar_familias(listas):
+    """
+    Une varias salidas de metricas_motor (una por dataset) agrupando las
+    muestras de cada métrica bajo un único HELP/TYPE, como exige el formato.
+    """
+    familias = {}
+    for lineas in listas:
+        for linea in lineas:
+            if linea.startswith('#'):
+                nombre = linea.split()[2]
+                cabecera = familias.setdefault(nombre, {'cabecera': [], 'muestras': []})['cabecera']
+                if len(cabecera) < 2:
+                    cabecera.append(linea)
+            else:
+                nombre = linea.split('{', 1)[0].split(' ', 1)[0]
+                familias.setdefault(nombre, {'cabecera': [], 'muestras': []})['muestras'].append(linea)
+    return [linea for familia in familias.values() for linea in familia['cabecera'] + familia['muestras']]
+
+
+def _escapar(valor):
+    """Escapa un valor de etiqueta según el formato de texto de Prometheus"""
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
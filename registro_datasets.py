@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Registro de datasets del servidor.
+
+Cada dataset con nombre (data/<nombre>.json o uno subido por la API) tiene su
+propio estado: datos, eventos, solución, motor y cachés. Se carga la primera
+vez que se pide y, cuando la memoria estimada de los cargados supera el
+presupuesto, se descartan los menos usados recientemente (nunca uno que esté
+optimizando). Un dataset descartado se vuelve a cargar desde su snapshot
+compilado en el siguiente acceso (y al_cargar puede restaurar su solución).
+"""
+
+import glob
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import datos_compilados
+from busqueda_tabu_numpy import NUM_SLOTS
+
+NOMBRE_VALIDO = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+# Estimación del costo en memoria de un evento en la lista de diccionarios
+# de la API (dict del evento + dict del slot)
+BYTES_POR_EVENTO = 1024
+BYTES_POR_ELEMENTO_GRAFO = 256
+
+
+def nuevo_estado(nombre, ruta):
+    """Estado vacío de un dataset (mismas claves que usaba el estado global)"""
+    return {
+        'nombre': nombre,
+        'ruta': ruta,
+        'profesores': [],
+        'materias': [],
+        'grupos': [],
+        'aulas': [],
+        'asignaciones': {},
+        'eventos': [],
+        'eventos_array': None,  # Arreglo (n, 7) equivalente a 'eventos', compartido con el motor
+        'solucion': None,
+        'optimizando': False,
+        'bloqueo': threading.Lock(),  # Protege la comprobación y la marca de 'optimizando'
+        'progreso': 0,
+        'log_messages': [],
+        'problema': None,  # Snapshot compilado (datos_compilados.ProblemaCompilado)
+        'version_solucion': 0,  # Se incrementa cada vez que cambian los datos o los eventos
+        'optimizador': None,
+        'edicion': None,  # Motor de edición interactiva sincronizado con eventos_array
+        'cache_grafo': {'version': None, 'entradas': {}},  # Grafos de la versión actual
+        'disponibilidad': None,  # Índice de ocupación (disponibilidad.Disponibilidad) de la versión actual
+        'analitica': None,  # Utilización por recurso (analitica.Analitica) de la versión actual
+        'ultimo_acceso': 0.0
+    }
+
+
+def cargar_estado(estado):
+    """Carga (o recarga) los datos del JSON del dataset a través de su snapshot"""
+    problema = datos_compilados.cargar_json(estado['ruta'])
+    datos = problema.metadatos
+    estado['profesores'] = datos.get('profesores', [])
+    estado['materias'] = datos.get('materias', [])
+    estado['grupos'] = datos.get('grupos', [])
+    estado['aulas'] = datos.get('aulas', [])
+    estado['asignaciones'] = datos.get('asignaciones', {})
+    estado['problema'] = problema
+    estado['version_solucion'] += 1
+    return estado
+
+
+def memoria_estimada(estado):
+    """Bytes aproximados que ocupa un dataset cargado"""
+    total = len(estado['eventos']) * BYTES_POR_EVENTO
+    if estado['eventos_array'] is not None:
+        total += estado['eventos_array'].nbytes
+    if estado['problema'] is not None:
+        # Páginas del snapshot mapeado (cota superior de lo residente)
+        total += os.path.getsize(estado['problema'].ruta)
+    # Matrices de ocupación (70 slots x profesores / grupos, int32) de cada motor
+    motores = (estado['optimizador'] is not None) + (estado['edicion'] is not None)
+    total += motores * NUM_SLOTS * (max(len(estado['profesores']), 50) + max(len(estado['grupos']), 20)) * 4
+    for grafo in estado['cache_grafo']['entradas'].values():
+        total += (grafo['num_nodos'] + grafo['num_aristas']) * BYTES_POR_ELEMENTO_GRAFO
+    if estado['disponibilidad'] is not None:
+        total += estado['disponibilidad'].nbytes
+    if estado['analitica'] is not None:
+        total += estado['analitica'].nbytes
+    return total
+
+
+class RegistroDatasets:
+    """
+    Datasets con nombre cargados bajo demanda y desalojados por LRU.
+
+    Args:
+        directorio: Carpeta con los <nombre>.json (también destino de los subidos)
+        memoria_maxima: Presupuesto en bytes para los datasets cargados
+        predeterminado: Dataset de las rutas /api/... sin nombre
+        al_cargar: Función opcional llamada con el estado recién cargado
+                   (ej. restaurar la última solución guardada)
+    """
+
+    def __init__(self, directorio, memoria_maxima, predeterminado, al_cargar=None):
+        self.directorio = directorio
+        self.memoria_maxima = memoria_maxima
+        self.predeterminado = predeterminado
+        self.al_cargar = al_cargar
+        self._cargados = OrderedDict()
+        self._cargando = {}  # nombre -> Future de la carga en curso
+        self._lock = threading.RLock()
+        self.desalojos = 0
+
+    def disponibles(self):
+        """{nombre: ruta} de todos los datasets direccionables"""
+        rutas = sorted(glob.glob(os.path.join(self.directorio, '*.json')))
+        return {os.path.splitext(os.path.basename(r))[0]: r for r in rutas}
+
+    def obtener(self, nombre=None):
+        """
+        Estado del dataset, cargándolo si hace falta.
+
+        La carga (compilar el snapshot, al_cargar) se hace fuera del bloqueo
+        del registro para no frenar las peticiones de los demás datasets; las
+        peticiones concurrentes del mismo dataset esperan esa misma carga.
+
+        Raises:
+            KeyError: si no existe un dataset con ese nombre
+        """
+        nombre = nombre or self.predeterminado
+        with self._lock:
+            estado = self._cargados.get(nombre)
+            if estado is not None:
+                return self._usar(nombre, estado)
+            carga = self._cargando.get(nombre)
+            if carga is None:
+                ruta = self.disponibles().get(nombre) if NOMBRE_VALIDO.match(nombre) else None
+                if ruta is None:
+                    raise KeyError(nombre)
+                carga = self._cargando[nombre] = Future()
+                propia = True
+            else:
+                propia = False
+
+        if not propia:
+            return carga.result()
+
+        try:
+            estado = cargar_estado(nuevo_estado(nombre, ruta))
+            print(f"✓ Dataset '{nombre}' cargado: {len(estado['profesores'])} profesores, "
+                  f"{len(estado['materias'])} materias, {len(estado['grupos'])} grupos")
+            if self.al_cargar is not None:
+                self.al_cargar(estado)
+        except BaseException as e:
+            with self._lock:
+                del self._cargando[nombre]
+            carga.set_exception(e)
+            raise
+
+        with self._lock:
+            del self._cargando[nombre]
+            self._cargados[nombre] = estado
+            self._usar(nombre, estado)
+        carga.set_result(estado)
+        return estado
+
+    def _usar(self, nombre, estado):
+        """Marca el dataset como el más reciente y desaloja otros si hace falta"""
+        self._cargados.move_to_end(nombre)
+        estado['ultimo_acceso'] = time.time()
+        self._liberar(conservar=nombre)
+        return estado
+
+    def registrar(self, nombre, datos):
+        """
+        Guarda un dataset subido como <directorio>/<nombre>.json.
+
+        Raises:
+            ValueError: nombre inválido
+            FileExistsError: ya existe un dataset con ese nombre
+        """
+        if not NOMBRE_VALIDO.match(nombre or ''):
+            raise ValueError(f"Nombre de dataset inválido: {nombre!r} (letras, dígitos, '_' y '-')")
+        ruta = os.path.join(self.directorio, f"{nombre}.json")
+        with self._lock:
+            if os.path.exists(ruta):
+                raise FileExistsError(nombre)
+            temporal = f"{ruta}.{os.getpid()}.tmp"
+            with open(temporal, 'w', encoding='utf-8') as f:
+                json.dump(datos, f, ensure_ascii=False)
+            os.replace(temporal, ruta)
+        return ruta
+
+    def descargar(self, nombre):
+        """Saca un dataset de memoria; retorna False si no estaba cargado o está optimizando"""
+        with self._lock:
+            estado = self._cargados.get(nombre)
+            if estado is None or estado['optimizando']:
+                return False
+            del self._cargados[nombre]
+            return True
+
+    def cargados(self):
+        """Lista de estados cargados, del menos al más usado recientemente"""
+        with self._lock:
+            return list(self._cargados.values())
+
+    def memoria_total(self):
+        with self._lock:
+            return sum(memoria_estimada(e) for e in self._cargados.values())
+
+    def resumen(self):
+        """Datasets disponibles con su estado de carga (para GET /api/datasets)"""
+        with self._lock:
+            return [{
+                'nombre': nombre,
+                'predeterminado': nombre == self.predeterminado,
+                'cargado': nombre in self._cargados,
+                'optimizando': nombre in self._cargados and self._cargados[nombre]['optimizando'],
+                'num_eventos': len(self._cargados[nombre]['eventos']) if nombre in self._cargados else None,
+                'memoria_estimada': memoria_estimada(self._cargados[nombre]) if nombre in self._cargados else 0
+            } for nombre in self.disponibles()]
+
+    def _liberar(self, conservar):
+        """Desaloja por LRU hasta entrar en el presupuesto"""
+        total = sum(memoria_estimada(e) for e in self._cargados.values())
+        for nombre in list(self._cargados):
+            if total <= self.memoria_maxima:
+                break
+            estado = self._cargados[nombre]
+            if nombre == conservar or estado['optimizando']:
+                continue
+            total -= memoria_estimada(estado)
+            del self._cargados[nombre]
+            self.desalojos += 1
+            print(f"[INFO] Dataset '{nombre}' desalojado (memoria estimada: {total / 2**20:.1f} MB)")
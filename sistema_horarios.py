@@ -8,19 +8,35 @@ Autores: Carlos Adrian Vargas Saldierna, Eliezer Mores Oyervides,
 Catedrático: Dr. Said Polanco Martagón
 """
 
+import argparse
+import contextlib
 import json
 import csv
+import glob
+import io
 import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from html import escape
 from typing import List, Dict, Tuple
 import numpy as np
 
+import datos_compilados
+from asignacion_aulas import asignar_aulas
+from analisis_previo import analizar
+
 # ==================== CONSTANTES ====================
 
 DIAS_SEMANA = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes']
 HORAS_INICIO = ['7:00', '7:55', '8:50', '9:45', '10:40', '11:35', '12:30', 
                 '13:25', '14:20', '15:15', '16:10', '17:05', '18:00', '18:55', '19:50']
 
+# Vistas disponibles para los reportes HTML
+VISTAS_REPORTE = ('grupo', 'profesor', 'aula')
+TITULOS_VISTA = {'grupo': 'Grupo', 'profesor': 'Profesor', 'aula': 'Aula'}
+
 # Pesos de restricciones blandas
 PESO_HORAS_LIBRES = 10
 PESO_DISTRIBUCION = 8
@@ -28,6 +44,23 @@ PESO_HORARIOS_EXTREMOS = 5
 PESO_PREFERENCIAS = 15
 PESO_DIAS_COMPLETOS = 7
 
+# Caché de plantillas de reporte: {ruta: (mtime, contenido)}
+_CACHE_PLANTILLAS = {}
+
+def _leer_plantilla(ruta: str):
+    """Lee una plantilla una sola vez mientras no cambie en disco (None si no existe)"""
+    try:
+        mtime = os.path.getmtime(ruta)
+    except OSError:
+        return None
+    
+    cache = _CACHE_PLANTILLAS.get(ruta)
+    if cache is None or cache[0] != mtime:
+        with open(ruta, 'r', encoding='utf-8') as f:
+            cache = (mtime, f.read())
+        _CACHE_PLANTILLAS[ruta] = cache
+    return cache[1]
+
 # ==================== CLASES DE DATOS ====================
 
 class Profesor:
@@ -49,10 +82,11 @@ class Profesor:
         }
 
 class Materia:
-    def __init__(self, id: int, nombre: str, horas_semanales: int):
+    def __init__(self, id: int, nombre: str, horas_semanales: int, horas_bloque: int = 1):
         self.id = id
         self.nombre = nombre
         self.horas_semanales = horas_semanales
+        self.horas_bloque = horas_bloque  # Horas consecutivas por sesión (laboratorios)
         self.requiere_laboratorio = False
         self.color = 'blue'  # Para visualización
     
@@ -61,6 +95,7 @@ class Materia:
             'id': self.id,
             'nombre': self.nombre,
             'horas_semanales': self.horas_semanales,
+            'horas_bloque': self.horas_bloque,
             'requiere_laboratorio': self.requiere_laboratorio,
             'color': self.color
         }
@@ -97,14 +132,22 @@ class Aula:
         }
 
 class Evento:
-    def __init__(self, id: int, materia_id: int, profesor_id: int, grupo_id: int):
+    def __init__(self, id: int, materia_id: int, profesor_id: int, grupo_id: int, duracion: int = 1):
         self.id = id
         self.materia_id = materia_id
         self.profesor_id = profesor_id
         self.grupo_id = grupo_id
         self.aula_id = -1
+        self.duracion = duracion  # Horas consecutivas desde slot (mismo día)
         self.slot = {'dia': 0, 'hora': 0}
     
+    def slots(self) -> List[int]:
+        """Slots (dia * 14 + hora) que ocupa el evento; vacío si no tiene slot"""
+        if self.slot['dia'] < 0 or self.slot['hora'] < 0:
+            return []
+        inicio = self.slot['dia'] * 14 + self.slot['hora']
+        return list(range(inicio, inicio + self.duracion))
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -112,6 +155,7 @@ class Evento:
             'profesor_id': self.profesor_id,
             'grupo_id': self.grupo_id,
             'aula_id': self.aula_id,
+            'duracion': self.duracion,
             'slot': self.slot
         }
 
@@ -128,15 +172,28 @@ class SistemaHorariosITI:
         
         self.mejor_solucion = None
         self.log_ejecucion = []
+        self.problema = None  # Snapshot compilado de los datos (datos_compilados)
         
     # ==================== CARGA DE DATOS ====================
     
     def cargar_datos_csv(self, ruta_profesores: str, ruta_materias: str, 
                          ruta_grupos: str, ruta_aulas: str, ruta_asignaciones: str):
-        """Carga datos desde archivos CSV"""
+        """Carga datos desde archivos CSV (o desde su snapshot si no cambiaron)"""
         
         print("[INFO] Cargando datos desde archivos CSV...")
         
+        rutas = [ruta_profesores, ruta_materias, ruta_grupos, ruta_aulas, ruta_asignaciones]
+        hash_fuente = datos_compilados.hash_archivos(rutas)
+        ruta_snap = datos_compilados.ruta_snapshot(ruta_profesores)[:-len('.snap')] + '_csv.snap'
+        
+        problema = datos_compilados.leer_snapshot(ruta_snap, hash_fuente)
+        if problema is not None:
+            self.problema = problema
+            self._cargar_desde_dict(problema.metadatos)
+            print(f"  ✓ Datos cargados desde snapshot compilado ({len(self.profesores)} profesores, "
+                  f"{len(self.materias)} materias, {len(self.grupos)} grupos)\n")
+            return
+        
         # Cargar profesores
         with open(ruta_profesores, 'r', encoding='utf-8') as f:
             reader = csv.DictReader(f)
@@ -152,7 +209,8 @@ class SistemaHorariosITI:
         with open(ruta_materias, 'r', encoding='utf-8') as f:
             reader = csv.DictReader(f)
             for row in reader:
-                mat = Materia(int(row['id']), row['nombre'], int(row['horas_semanales']))
+                mat = Materia(int(row['id']), row['nombre'], int(row['horas_semanales']),
+                              int(row.get('horas_bloque') or 1))
                 mat.requiere_laboratorio = row.get('laboratorio', '0') == '1'
                 mat.color = row.get('color', 'blue')
                 self.materias.append(mat)
@@ -194,31 +252,40 @@ class SistemaHorariosITI:
                 self.asignaciones[grupo_id][materia_id] = profesor_id
         
         print(f"  ✓ Cargadas {len(self.asignaciones)} asignaciones\n")
+        
+        # Compilar para las siguientes cargas
+        datos_compilados.escribir_snapshot(ruta_snap, self._a_dict(), hash_fuente)
+        self.problema = datos_compilados.leer_snapshot(ruta_snap)
     
     def cargar_datos_json(self, ruta_json: str):
-        """Carga datos desde un archivo JSON"""
+        """Carga datos desde un archivo JSON (a través de su snapshot compilado)"""
         
         print(f"[INFO] Cargando datos desde {ruta_json}...")
         
-        with open(ruta_json, 'r', encoding='utf-8') as f:
-            datos = json.load(f)
+        self.problema = datos_compilados.cargar_json(ruta_json)
+        self._cargar_desde_dict(self.problema.metadatos)
+        
+        print(f"  ✓ Datos cargados correctamente\n")
+    
+    def _cargar_desde_dict(self, datos: Dict):
+        """Crea los objetos del sistema a partir de un dataset en formato data/*.json"""
         
         # Cargar profesores
         for p in datos.get('profesores', []):
-            prof = Profesor(p['id'], p['nombre'], p['max_horas'])
+            prof = Profesor(p['id'], p['nombre'], p.get('max_horas', 0))
             prof.preferencias_horarias = p.get('preferencias_horarias', [])
             self.profesores.append(prof)
         
         # Cargar materias
         for m in datos.get('materias', []):
-            mat = Materia(m['id'], m['nombre'], m['horas_semanales'])
+            mat = Materia(m['id'], m['nombre'], m['horas_semanales'], m.get('horas_bloque', 1))
             mat.requiere_laboratorio = m.get('requiere_laboratorio', False)
             mat.color = m.get('color', 'blue')
             self.materias.append(mat)
         
         # Cargar grupos
         for g in datos.get('grupos', []):
-            grupo = Grupo(g['id'], g['nombre'], g['num_estudiantes'], g['turno_matutino'])
+            grupo = Grupo(g['id'], g['nombre'], g.get('num_estudiantes', 0), g.get('turno_matutino', True))
             self.grupos.append(grupo)
         
         # Cargar aulas
@@ -231,16 +298,26 @@ class SistemaHorariosITI:
         # Convertir keys a int
         self.asignaciones = {int(k): {int(mk): v for mk, v in mv.items()} 
                             for k, mv in self.asignaciones.items()}
-        
-        print(f"  ✓ Datos cargados correctamente\n")
+    
+    def _a_dict(self) -> Dict:
+        """Dataset actual en formato data/*.json"""
+        return {
+            'profesores': [p.to_dict() for p in self.profesores],
+            'materias': [m.to_dict() for m in self.materias],
+            'grupos': [g.to_dict() for g in self.grupos],
+            'aulas': [a.to_dict() for a in self.aulas],
+            'asignaciones': {str(g): {str(m): p for m, p in mp.items()}
+                             for g, mp in self.asignaciones.items()}
+        }
     
     # ==================== GENERACIÓN DE SOLUCIÓN INICIAL ====================
     
-    def generar_solucion_inicial(self):
+    def generar_solucion_inicial(self, semilla=None):
         """Genera una solución inicial factible (o lo más cercano posible)"""
         
         print("[INFO] Generando solución inicial...")
         
+        rng = np.random.RandomState(semilla)
         self.eventos = []
         evento_id = 0
         
@@ -257,13 +334,13 @@ class SistemaHorariosITI:
                 if not materia:
                     continue
                 
-                # Crear tantos eventos como horas semanales tenga la materia
-                for _ in range(materia.horas_semanales):
-                    evento = Evento(evento_id, materia_id, profesor_id, grupo_id)
+                # Un evento por sesión: una hora o un bloque de horas_bloque horas
+                for duracion in datos_compilados.bloques_materia(materia.to_dict()):
+                    evento = Evento(evento_id, materia_id, profesor_id, grupo_id, duracion)
                     
-                    # Asignar slot aleatorio inicial
-                    dia = np.random.randint(0, 5)
-                    hora = np.random.randint(0, 14)
+                    # Asignar slot aleatorio inicial (el bloque cabe en el día)
+                    dia = int(rng.randint(0, 5))
+                    hora = int(rng.randint(0, 15 - duracion))
                     evento.slot = {'dia': dia, 'hora': hora}
                     
                     # Asignar aula (primera disponible con capacidad suficiente)
@@ -281,66 +358,115 @@ class SistemaHorariosITI:
     
     # ==================== OPTIMIZACIÓN CON BÚSQUEDA TABÚ ====================
     
-    def optimizar_con_tabu(self, max_iteraciones=1000, tamano_tabu=20):
-        """Ejecuta el algoritmo de Búsqueda Tabú para optimizar el horario"""
+    def optimizar_con_tabu(self, max_iteraciones=1000, tamano_tabu=20, semilla=None,
+                           verbose=True, motor='tabu', descomponer=False, procesos=None,
+                           **parametros_motor):
+        """
+        Ejecuta el algoritmo de Búsqueda Tabú para optimizar el horario
         
-        print("[INFO] Iniciando optimización con Búsqueda Tabú...")
-        print(f"  - Máximo de iteraciones: {max_iteraciones}")
-        print(f"  - Tamaño lista tabú: {tamano_tabu}")
-        print()
+        Args:
+            max_iteraciones: Iteraciones de la búsqueda
+            tamano_tabu: Tamaño de la lista tabú
+            semilla: Semilla del motor (None = aleatoria)
+            verbose: Mostrar progreso en consola
+            motor: 'tabu', 'recocido' o 'aceptacion_tardia' (mismo evaluador)
+            descomponer: Resolver por separado cada componente independiente
+                         del grafo grupo-profesor (descomposicion.py)
+            procesos: Procesos para las componentes (None = número de CPUs)
+            **parametros_motor: Parámetros propios del motor
+                                (ej. temperatura_inicial, longitud_historia)
+        """
         
         try:
             # Importar módulo Cython
-            from cython_modules.busqueda_tabu import BusquedaTabu
-            
-            # Crear instancia del algoritmo
-            tabu = BusquedaTabu(max_iteraciones, tamano_tabu, mejoras=50)
-            
-            # Preparar datos
-            eventos_dict = [e.to_dict() for e in self.eventos]
-            
-            datos_adicionales = {
-                'preferencias_profesores': {
-                    p.id: p.preferencias_horarias for p in self.profesores
-                }
+            from cython_modules.busqueda_tabu import MOTORES
+        except ImportError:
+            print("[ADVERTENCIA] No se pudo importar el módulo Cython, usando el motor NumPy.")
+            print("              Para compilarlo: python setup.py build_ext --inplace")
+            from busqueda_tabu_numpy import MOTORES
+        
+        if motor not in MOTORES:
+            raise ValueError(f"Motor desconocido: {motor} (opciones: {', '.join(MOTORES)})")
+        
+        if verbose:
+            print(f"[INFO] Iniciando optimización con el motor '{motor}'...")
+            print(f"  - Máximo de iteraciones: {max_iteraciones}")
+            print(f"  - Tamaño lista tabú: {tamano_tabu}")
+            for nombre, valor in parametros_motor.items():
+                print(f"  - {nombre}: {valor}")
+            print()
+        
+        # Crear instancia del algoritmo
+        semilla = -1 if semilla is None else semilla
+        if descomponer:
+            from descomposicion import OptimizadorDescompuesto
+            tabu = OptimizadorDescompuesto(max_iteraciones, tamano_tabu, semilla, motor=motor,
+                                           procesos=procesos, **parametros_motor)
+        else:
+            tabu = MOTORES[motor](max_iteraciones, tamano_tabu, semilla, **parametros_motor)
+        
+        # Preparar datos
+        eventos_dict = [e.to_dict() for e in self.eventos]
+        
+        datos_adicionales = {
+            'preferencias_profesores': {
+                p.id: p.preferencias_horarias for p in self.profesores
             }
-            
-            # Inicializar
-            tabu.inicializar(eventos_dict, len(self.profesores), 
-                           len(self.grupos), len(self.aulas))
-            
-            # Callbacks
-            def callback_progreso(progreso, solucion):
+        }
+        
+        # Inicializar
+        tabu.inicializar(eventos_dict, len(self.profesores), 
+                         len(self.grupos), len(self.aulas),
+                         [g.to_dict() for g in self.grupos])
+        
+        # Cotas y factibilidad: el motor se detiene al alcanzar la cota inferior
+        analisis = analizar(tabu.obtener_arreglo(), tabu.obtener_duraciones(),
+                            [p.to_dict() for p in self.profesores], [g.to_dict() for g in self.grupos])
+        if not descomponer:
+            tabu.establecer_cota_inferior(analisis['cota_inferior']['conflictos_duros'],
+                                          analisis['cota_inferior']['penalizacion_blandas'])
+        if verbose and not analisis['factible']:
+            print(f"[ADVERTENCIA] Datos infactibles: al menos {analisis['cota_inferior']['conflictos_duros']} "
+                  f"conflictos duros en cualquier horario")
+            for hallazgo in analisis['errores']:
+                print(f"  ✗ {hallazgo['tipo']} {hallazgo['nombre']}: {hallazgo['mensaje']}")
+            print()
+        
+        # Callbacks
+        def callback_progreso(progreso, solucion):
+            if verbose:
                 print(f"\r  Progreso: {progreso:.1f}% | Conflictos: {solucion['conflictos_duros']} | "
                       f"Calidad: {solucion['calidad']:.1f}%", end='', flush=True)
-            
-            def callback_log(mensaje):
-                self.log_ejecucion.append(f"[{datetime.now().strftime('%H:%M:%S')}] {mensaje}")
+        
+        def callback_log(mensaje):
+            self.log_ejecucion.append(f"[{datetime.now().strftime('%H:%M:%S')}] {mensaje}")
+            if verbose:
                 print(f"\n{mensaje}")
-            
-            # Ejecutar optimización
-            self.mejor_solucion = tabu.ejecutar(datos_adicionales, 
-                                                callback_progreso, 
-                                                callback_log)
-            
-            # Actualizar eventos con la mejor solución
-            eventos_optimizados = self.mejor_solucion['eventos']
-            for i, evento in enumerate(self.eventos):
-                if i < len(eventos_optimizados):
-                    evento.slot = {
-                        'dia': eventos_optimizados[i][5],
-                        'hora': eventos_optimizados[i][6]
-                    }
-            
+        
+        # Ejecutar optimización
+        self.mejor_solucion = tabu.ejecutar(datos_adicionales, 
+                                            callback_progreso, 
+                                            callback_log)
+        
+        # Actualizar eventos con la mejor solución
+        eventos_optimizados = tabu.obtener_eventos()
+        for evento, optimizado in zip(self.eventos, eventos_optimizados):
+            evento.slot = optimizado['slot']
+        
+        # Aulas sin choques para los nuevos horarios (el motor no mueve aulas)
+        aulas = asignar_aulas(tabu.obtener_arreglo(), tabu.obtener_duraciones(),
+                              [m.to_dict() for m in self.materias], [g.to_dict() for g in self.grupos],
+                              [a.to_dict() for a in self.aulas])
+        for evento, aula_id in zip(self.eventos, aulas['aula_id'].tolist()):
+            evento.aula_id = aula_id
+        
+        if verbose:
             print("\n\n[✓] Optimización completada!")
             print(f"  - Conflictos duros: {self.mejor_solucion['conflictos_duros']}")
             print(f"  - Penalización blandas: {self.mejor_solucion['penalizacion_blandas']}")
-            print(f"  - Calidad final: {self.mejor_solucion['calidad']:.2f}%\n")
-            
-        except ImportError:
-            print("[ERROR] No se pudo importar el módulo Cython.")
-            print("        Ejecuta: python setup.py build_ext --inplace")
-            return False
+            print(f"  - Calidad final: {self.mejor_solucion['calidad']:.2f}%")
+            print(f"  - Aulas: {aulas['cambios']} cambios, {len(aulas['sin_aula'])} eventos sin aula "
+                  f"({aulas['tiempo'] * 1000:.1f} ms)\n")
         
         return True
     
@@ -354,104 +480,155 @@ class SistemaHorariosITI:
         # Detectar conflictos duros
         
         # 1. Superposición de profesores
+        # (un bloque de varias horas se revisa en cada una de sus horas)
         ocupacion_prof = {}
         for evento in self.eventos:
-            slot_id = evento.slot['dia'] * 14 + evento.slot['hora']
-            key = (slot_id, evento.profesor_id)
-            
-            if key in ocupacion_prof:
-                conflictos.append({
-                    'tipo': 'duro',
-                    'descripcion': f"Profesor duplicado: {self._get_profesor_nombre(evento.profesor_id)}",
-                    'tiempo': f"{DIAS_SEMANA[evento.slot['dia']]} {HORAS_INICIO[evento.slot['hora']]}",
-                    'eventos': [ocupacion_prof[key], evento.id]
-                })
-            else:
-                ocupacion_prof[key] = evento.id
+            for slot_id in evento.slots():
+                key = (slot_id, evento.profesor_id)
+                
+                if key in ocupacion_prof:
+                    conflictos.append({
+                        'tipo': 'duro',
+                        'descripcion': f"Profesor duplicado: {self._get_profesor_nombre(evento.profesor_id)}",
+                        'tiempo': f"{DIAS_SEMANA[slot_id // 14]} {HORAS_INICIO[slot_id % 14]}",
+                        'eventos': [ocupacion_prof[key], evento.id]
+                    })
+                else:
+                    ocupacion_prof[key] = evento.id
         
         # 2. Superposición de grupos
         ocupacion_grupo = {}
         for evento in self.eventos:
-            slot_id = evento.slot['dia'] * 14 + evento.slot['hora']
-            key = (slot_id, evento.grupo_id)
-            
-            if key in ocupacion_grupo:
-                conflictos.append({
-                    'tipo': 'duro',
-                    'descripcion': f"Grupo duplicado: {self._get_grupo_nombre(evento.grupo_id)}",
-                    'tiempo': f"{DIAS_SEMANA[evento.slot['dia']]} {HORAS_INICIO[evento.slot['hora']]}",
-                    'eventos': [ocupacion_grupo[key], evento.id]
-                })
-            else:
-                ocupacion_grupo[key] = evento.id
+            for slot_id in evento.slots():
+                key = (slot_id, evento.grupo_id)
+                
+                if key in ocupacion_grupo:
+                    conflictos.append({
+                        'tipo': 'duro',
+                        'descripcion': f"Grupo duplicado: {self._get_grupo_nombre(evento.grupo_id)}",
+                        'tiempo': f"{DIAS_SEMANA[slot_id // 14]} {HORAS_INICIO[slot_id % 14]}",
+                        'eventos': [ocupacion_grupo[key], evento.id]
+                    })
+                else:
+                    ocupacion_grupo[key] = evento.id
         
         # 3. Superposición de aulas
         ocupacion_aula = {}
         for evento in self.eventos:
             if evento.aula_id < 0:
                 continue
-            slot_id = evento.slot['dia'] * 14 + evento.slot['hora']
-            key = (slot_id, evento.aula_id)
-            
-            if key in ocupacion_aula:
-                conflictos.append({
-                    'tipo': 'duro',
-                    'descripcion': f"Aula duplicada: {self._get_aula_nombre(evento.aula_id)}",
-                    'tiempo': f"{DIAS_SEMANA[evento.slot['dia']]} {HORAS_INICIO[evento.slot['hora']]}",
-                    'eventos': [ocupacion_aula[key], evento.id]
-                })
-            else:
-                ocupacion_aula[key] = evento.id
+            for slot_id in evento.slots():
+                key = (slot_id, evento.aula_id)
+                
+                if key in ocupacion_aula:
+                    conflictos.append({
+                        'tipo': 'duro',
+                        'descripcion': f"Aula duplicada: {self._get_aula_nombre(evento.aula_id)}",
+                        'tiempo': f"{DIAS_SEMANA[slot_id // 14]} {HORAS_INICIO[slot_id % 14]}",
+                        'eventos': [ocupacion_aula[key], evento.id]
+                    })
+                else:
+                    ocupacion_aula[key] = evento.id
         
         # Detectar violaciones blandas (ejemplos)
         
         # Preferencias de profesores
         for evento in self.eventos:
-            slot_id = evento.slot['dia'] * 14 + evento.slot['hora']
             profesor = next((p for p in self.profesores if p.id == evento.profesor_id), None)
+            if not profesor:
+                continue
             
-            if profesor and slot_id in profesor.preferencias_horarias:
-                conflictos.append({
-                    'tipo': 'blando',
-                    'descripcion': f"Profesor en horario no deseado: {profesor.nombre}",
-                    'tiempo': f"{DIAS_SEMANA[evento.slot['dia']]} {HORAS_INICIO[evento.slot['hora']]}",
-                    'penalizacion': PESO_PREFERENCIAS,
-                    'eventos': [evento.id]
-                })
+            for slot_id in evento.slots():
+                if slot_id in profesor.preferencias_horarias:
+                    conflictos.append({
+                        'tipo': 'blando',
+                        'descripcion': f"Profesor en horario no deseado: {profesor.nombre}",
+                        'tiempo': f"{DIAS_SEMANA[slot_id // 14]} {HORAS_INICIO[slot_id % 14]}",
+                        'penalizacion': PESO_PREFERENCIAS,
+                        'eventos': [evento.id]
+                    })
         
         return conflictos
     
-    def generar_reporte_html(self, ruta_salida: str):
-        """Genera un reporte HTML completo del horario"""
+    def generar_reporte_html(self, ruta_salida: str, vista: str = 'grupo'):
+        """
+        Genera un reporte HTML completo del horario.
+        
+        Las tablas se escriben directamente al archivo a partir de un índice
+        (recurso, día, hora) -> eventos construido una sola vez.
+        
+        Args:
+            ruta_salida: Archivo HTML a generar
+            vista: 'grupo', 'profesor' o 'aula'
+        """
         
         print(f"[INFO] Generando reporte HTML en {ruta_salida}...")
         
-        # Leer plantilla
+        indice = self._construir_indice_horarios()
+        self._escribir_reporte_html(ruta_salida, vista, indice)
+        
+        print(f"  ✓ Reporte generado exitosamente\n")
+    
+    def generar_reportes_html(self, directorio: str, prefijo: str = 'horario') -> Dict[str, str]:
+        """
+        Genera los reportes por grupo, profesor y aula usando un único índice.
+        
+        Returns:
+            dict {vista: ruta del archivo generado}
+        """
+        
+        print(f"[INFO] Generando reportes HTML en {directorio}...")
+        
+        os.makedirs(directorio, exist_ok=True)
+        indice = self._construir_indice_horarios()
+        rutas = {}
+        
+        for vista in VISTAS_REPORTE:
+            ruta = os.path.join(directorio, f"{prefijo}_{vista}.html")
+            self._escribir_reporte_html(ruta, vista, indice)
+            rutas[vista] = ruta
+        
+        print(f"  ✓ {len(rutas)} reportes generados exitosamente\n")
+        return rutas
+    
+    def _escribir_reporte_html(self, ruta_salida: str, vista: str, indice: Dict):
+        """Escribe un reporte en streaming, con plantilla si existe"""
+        
+        if vista not in VISTAS_REPORTE:
+            raise ValueError(f"Vista desconocida: {vista}")
+        
         template_path = os.path.join(os.path.dirname(__file__), 'web', 'template_reporte.html')
+        plantilla = _leer_plantilla(template_path)
         
-        if not os.path.exists(template_path):
-            print("[ADVERTENCIA] Plantilla no encontrada, generando reporte básico...")
-            html = self._generar_html_basico()
-        else:
-            with open(template_path, 'r', encoding='utf-8') as f:
-                html = f.read()
+        with open(ruta_salida, 'w', encoding='utf-8') as f:
+            if plantilla is None:
+                self._escribir_html_basico(f, vista, indice)
+                return
             
             # Reemplazar datos dinámicos
-            html = html.replace('{{NUM_PROFESORES}}', str(len(self.profesores)))
+            html = plantilla.replace('{{NUM_PROFESORES}}', str(len(self.profesores)))
             html = html.replace('{{NUM_MATERIAS}}', str(len(self.materias)))
             html = html.replace('{{NUM_GRUPOS}}', str(len(self.grupos)))
             html = html.replace('{{CALIDAD}}', f"{self.mejor_solucion['calidad']:.1f}%" 
                               if self.mejor_solucion else "N/A")
-        
-        with open(ruta_salida, 'w', encoding='utf-8') as f:
-            f.write(html)
-        
-        print(f"  ✓ Reporte generado exitosamente\n")
+            
+            # Las tablas se insertan en {{TABLAS_HORARIOS}} sin construir el documento en memoria
+            antes, _, despues = html.partition('{{TABLAS_HORARIOS}}')
+            f.write(antes)
+            if _:
+                self._escribir_tablas_horarios(f, vista, indice)
+            f.write(despues)
     
-    def _generar_html_basico(self) -> str:
+    def _generar_html_basico(self, vista: str = 'grupo') -> str:
         """Genera un HTML básico si no hay plantilla"""
+        buffer = io.StringIO()
+        self._escribir_html_basico(buffer, vista, self._construir_indice_horarios())
+        return buffer.getvalue()
+    
+    def _escribir_html_basico(self, f, vista: str, indice: Dict):
+        """Escribe el HTML básico (sin plantilla) en el archivo f"""
         
-        html = f"""<!DOCTYPE html>
+        f.write(f"""<!DOCTYPE html>
 <html lang="es">
 <head>
     <meta charset="UTF-8">
@@ -493,45 +670,101 @@ class SistemaHorariosITI:
     </div>
     
     <div class="horario">
-        <h2>Horarios por Grupo</h2>
-        {self._generar_tablas_horarios()}
+        <h2>Horarios por {TITULOS_VISTA[vista]}</h2>
+""")
+        self._escribir_tablas_horarios(f, vista, indice)
+        f.write("""
     </div>
 </body>
-</html>"""
-        return html
+</html>""")
     
-    def _generar_tablas_horarios(self) -> str:
-        """Genera tablas HTML para cada grupo"""
-        html = ""
+    def _construir_indice_horarios(self) -> Dict:
+        """
+        Construye en una sola pasada los índices usados por los reportes:
+        {vista: {recurso_id: [eventos por slot_id]}} y búsquedas por id.
+        """
+        indice = {vista: {} for vista in VISTAS_REPORTE}
         
-        for grupo in self.grupos:
-            html += f"<h3>{grupo.nombre}</h3><table><thead><tr><th>Hora</th>"
-            for dia in DIAS_SEMANA:
-                html += f"<th>{dia}</th>"
-            html += "</tr></thead><tbody>"
+        for evento in self.eventos:
+            # Un bloque de varias horas aparece en cada una de sus celdas
+            for slot_id in evento.slots():
+                for vista, recurso_id in (('grupo', evento.grupo_id),
+                                          ('profesor', evento.profesor_id),
+                                          ('aula', evento.aula_id)):
+                    if recurso_id < 0:
+                        continue
+                    celdas = indice[vista].get(recurso_id)
+                    if celdas is None:
+                        celdas = indice[vista][recurso_id] = [None] * 70
+                    if celdas[slot_id] is None:
+                        celdas[slot_id] = [evento]
+                    else:
+                        celdas[slot_id].append(evento)
+        
+        indice['materias'] = {m.id: m for m in self.materias}
+        indice['profesores'] = {p.id: p for p in self.profesores}
+        indice['grupos'] = {g.id: g for g in self.grupos}
+        indice['aulas'] = {a.id: a for a in self.aulas}
+        return indice
+    
+    def _generar_tablas_horarios(self, vista: str = 'grupo') -> str:
+        """Genera tablas HTML para cada recurso de la vista"""
+        buffer = io.StringIO()
+        self._escribir_tablas_horarios(buffer, vista, self._construir_indice_horarios())
+        return buffer.getvalue()
+    
+    def _escribir_tablas_horarios(self, f, vista: str, indice: Dict):
+        """Escribe una tabla HTML por recurso (grupo, profesor o aula) en f"""
+        
+        materias = indice['materias']
+        profesores = indice['profesores']
+        grupos = indice['grupos']
+        aulas = indice['aulas']
+        
+        recursos = {'grupo': self.grupos, 'profesor': self.profesores, 'aula': self.aulas}[vista]
+        cabecera = "<thead><tr><th>Hora</th>" + "".join(f"<th>{dia}</th>" for dia in DIAS_SEMANA) + "</tr></thead>"
+        
+        for recurso in recursos:
+            celdas = indice[vista].get(recurso.id)
+            if celdas is None and vista != 'grupo':
+                continue  # Profesores/aulas sin clases no generan tabla
+            
+            f.write(f"<h3>{escape(recurso.nombre)}</h3><table>{cabecera}<tbody>")
             
             for hora in range(14):
-                html += f"<tr><td>{HORAS_INICIO[hora]}-{HORAS_INICIO[hora+1] if hora < 14 else '20:45'}</td>"
+                fila = [f"<tr><td>{HORAS_INICIO[hora]}-{HORAS_INICIO[hora+1]}</td>"]
                 
                 for dia in range(5):
-                    evento = next((e for e in self.eventos 
-                                 if e.grupo_id == grupo.id and 
-                                 e.slot['dia'] == dia and 
-                                 e.slot['hora'] == hora), None)
+                    eventos_celda = celdas[dia * 14 + hora] if celdas else None
                     
-                    if evento:
-                        materia = next((m for m in self.materias if m.id == evento.materia_id), None)
-                        profesor = next((p for p in self.profesores if p.id == evento.profesor_id), None)
-                        html += f"<td style='background: #dbeafe;'><b>{materia.nombre if materia else 'N/A'}</b><br>"
-                        html += f"<small>{profesor.nombre if profesor else 'N/A'}</small></td>"
-                    else:
-                        html += "<td></td>"
+                    if not eventos_celda:
+                        fila.append("<td></td>")
+                        continue
+                    
+                    contenido = []
+                    for evento in eventos_celda:
+                        materia = materias.get(evento.materia_id)
+                        # La segunda línea muestra el recurso que no es el de la vista
+                        if vista == 'profesor':
+                            otro = grupos.get(evento.grupo_id)
+                        else:
+                            otro = profesores.get(evento.profesor_id)
+                        detalle = f"<b>{escape(materia.nombre) if materia else 'N/A'}</b><br>" \
+                                  f"<small>{escape(otro.nombre) if otro else 'N/A'}</small>"
+                        if vista != 'aula':
+                            aula = aulas.get(evento.aula_id)
+                            if aula:
+                                detalle += f"<br><small>{escape(aula.nombre)}</small>"
+                        contenido.append(detalle)
+                    
+                    # Más de un evento en la celda = conflicto
+                    color = '#dbeafe' if len(contenido) == 1 else '#fee2e2'
+                    fila.append(f"<td style='background: {color};'>{'<hr>'.join(contenido)}</td>")
                 
-                html += "</tr>"
+                fila.append("</tr>")
+                f.write("".join(fila))
             
-            html += "</tbody></table><br>"
-        
-        return html
+            f.write("</tbody></table><br>")
     
     # ==================== UTILIDADES ====================
     
@@ -567,9 +800,187 @@ class SistemaHorariosITI:
         print(f"[✓] Solución guardada en {ruta}")
 
 
+# ==================== EJECUCIÓN POR LOTES ====================
+
+def resolver_dataset(tarea: Dict) -> Dict:
+    """
+    Resuelve un dataset completo (pensado para ejecutarse en un proceso del pool).
+    
+    Args:
+        tarea: dict con 'ruta', 'directorio_salida', 'semilla',
+               'max_iteraciones', 'tamano_tabu' y opcionalmente 'motor',
+               'parametros_motor' y 'descomponer'
+    
+    Returns:
+        dict con el resumen de la ejecución
+    """
+    ruta = tarea['ruta']
+    nombre = os.path.splitext(os.path.basename(ruta))[0]
+    resumen = {
+        'dataset': nombre,
+        'ruta': ruta,
+        'semilla': tarea['semilla'],
+        'max_iteraciones': tarea['max_iteraciones'],
+        'tamano_tabu': tarea['tamano_tabu'],
+        'motor': tarea.get('motor', 'tabu'),
+        'num_eventos': 0,
+        'conflictos_duros': None,
+        'penalizacion_blandas': None,
+        'calidad': None,
+        'tiempo_ejecucion': 0.0,
+        'solucion': None,
+        'error': None
+    }
+    
+    tiempo_inicio = time.perf_counter()
+    try:
+        # Los procesos del pool no escriben en la consola compartida
+        with open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo):
+            sistema = SistemaHorariosITI()
+            sistema.cargar_datos_json(ruta)
+            sistema.generar_solucion_inicial(semilla=tarea['semilla'])
+            sistema.optimizar_con_tabu(tarea['max_iteraciones'], tarea['tamano_tabu'],
+                                       semilla=tarea['semilla'], verbose=False,
+                                       motor=resumen['motor'],
+                                       descomponer=tarea.get('descomponer', False), procesos=1,
+                                       **tarea.get('parametros_motor', {}))
+            
+            ruta_solucion = os.path.join(tarea['directorio_salida'], f"solucion_{nombre}.json")
+            sistema.guardar_solucion_json(ruta_solucion)
+        
+        resumen.update({
+            'num_eventos': len(sistema.eventos),
+            'conflictos_duros': sistema.mejor_solucion['conflictos_duros'],
+            'penalizacion_blandas': sistema.mejor_solucion['penalizacion_blandas'],
+            'calidad': sistema.mejor_solucion['calidad'],
+            'solucion': ruta_solucion
+        })
+    except Exception as e:
+        resumen['error'] = f"{type(e).__name__}: {e}"
+    
+    resumen['tiempo_ejecucion'] = time.perf_counter() - tiempo_inicio
+    return resumen
+
+
+def ejecutar_lote(archivos: List[str], directorio_salida: str, procesos: int = None,
+                  max_iteraciones: int = 1000, tamano_tabu: int = 20, semilla: int = 0,
+                  parametros: Dict = None, motor: str = 'tabu',
+                  descomponer: bool = False) -> List[Dict]:
+    """
+    Resuelve varios datasets en paralelo con un pool de procesos.
+    
+    Args:
+        archivos: Rutas o patrones glob (ej. 'data/*.json')
+        directorio_salida: Carpeta para las soluciones y el resumen
+        procesos: Número de procesos (None = número de CPUs)
+        max_iteraciones, tamano_tabu: Parámetros por defecto del motor
+        semilla: Semilla base; cada dataset recibe semilla + índice
+        parametros: {nombre_dataset: {max_iteraciones, tamano_tabu, semilla,
+                    motor, parametros_motor}} para sobrescribir los valores por defecto
+        motor: Motor por defecto ('tabu', 'recocido' o 'aceptacion_tardia')
+        descomponer: Resolver por componentes independientes (secuencialmente
+                     dentro de cada proceso, que ya corre en paralelo)
+    
+    Returns:
+        Lista de resúmenes (uno por dataset, en el orden de entrada)
+    """
+    rutas = []
+    for patron in archivos:
+        coincidencias = sorted(glob.glob(patron)) if glob.has_magic(patron) else [patron]
+        rutas.extend(r for r in coincidencias if r not in rutas)
+    
+    if not rutas:
+        print("[ERROR] Ningún archivo de datos coincide con los patrones indicados")
+        return []
+    
+    os.makedirs(directorio_salida, exist_ok=True)
+    parametros = parametros or {}
+    
+    tareas = []
+    for i, ruta in enumerate(rutas):
+        nombre = os.path.splitext(os.path.basename(ruta))[0]
+        tarea = {
+            'ruta': ruta,
+            'directorio_salida': directorio_salida,
+            'semilla': semilla + i,
+            'max_iteraciones': max_iteraciones,
+            'tamano_tabu': tamano_tabu,
+            'motor': motor,
+            'descomponer': descomponer
+        }
+        tarea.update(parametros.get(nombre, {}))
+        tareas.append(tarea)
+    
+    print(f"[INFO] Resolviendo {len(tareas)} datasets con {procesos or os.cpu_count()} procesos...")
+    
+    tiempo_inicio = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        resultados = list(pool.map(resolver_dataset, tareas))
+    tiempo_total = time.perf_counter() - tiempo_inicio
+    
+    ruta_resumen = os.path.join(directorio_salida, 'resumen_lote.json')
+    with open(ruta_resumen, 'w', encoding='utf-8') as f:
+        json.dump({
+            'fecha_generacion': datetime.now().isoformat(),
+            'tiempo_total': tiempo_total,
+            'resultados': resultados
+        }, f, indent=2, ensure_ascii=False)
+    
+    _imprimir_resumen_lote(resultados)
+    print(f"  Tiempo total: {tiempo_total:.2f}s")
+    print(f"[✓] Resumen guardado en {ruta_resumen}")
+    return resultados
+
+
+def _imprimir_resumen_lote(resultados: List[Dict]):
+    """Imprime la tabla resumen de una ejecución por lotes"""
+    
+    print("\n" + "=" * 86)
+    print(f"{'Dataset':<28} {'Eventos':>8} {'Duros':>6} {'Blandas':>8} {'Calidad':>9} {'Tiempo':>9}  Estado")
+    print("-" * 86)
+    for r in resultados:
+        if r['error']:
+            print(f"{r['dataset']:<28} {r['num_eventos']:>8} {'-':>6} {'-':>8} {'-':>9} "
+                  f"{r['tiempo_ejecucion']:>8.2f}s  {r['error']}")
+        else:
+            print(f"{r['dataset']:<28} {r['num_eventos']:>8} {r['conflictos_duros']:>6} "
+                  f"{r['penalizacion_blandas']:>8} {r['calidad']:>8.1f}% "
+                  f"{r['tiempo_ejecucion']:>8.2f}s  OK")
+    print("=" * 86)
+
+
 # ==================== FUNCIÓN PRINCIPAL ====================
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Sistema de Horarios ITI - Búsqueda Tabú')
+    parser.add_argument('archivos', nargs='*',
+                        help="Datasets a resolver por lotes (rutas o patrones, ej. 'data/*.json')")
+    parser.add_argument('-o', '--salida', default='resultados',
+                        help='Carpeta de salida del modo por lotes (default: resultados)')
+    parser.add_argument('-j', '--procesos', type=int, default=None,
+                        help='Procesos en paralelo (default: número de CPUs)')
+    parser.add_argument('--iteraciones', type=int, default=1000, help='Máximo de iteraciones')
+    parser.add_argument('--tabu', type=int, default=20, help='Tamaño de la lista tabú')
+    parser.add_argument('--semilla', type=int, default=0,
+                        help='Semilla base del modo por lotes (dataset i usa semilla + i)')
+    parser.add_argument('--parametros', default=None,
+                        help='JSON {dataset: {max_iteraciones, tamano_tabu, semilla, motor, parametros_motor}}')
+    parser.add_argument('--motor', default='tabu', choices=['tabu', 'recocido', 'aceptacion_tardia'],
+                        help='Motor de búsqueda local (default: tabu)')
+    parser.add_argument('--descomponer', action='store_true',
+                        help='Resolver por separado los grupos que no comparten profesores')
+    args = parser.parse_args(argv)
+    
+    if args.archivos:
+        parametros = None
+        if args.parametros:
+            with open(args.parametros, 'r', encoding='utf-8') as f:
+                parametros = json.load(f)
+        resultados = ejecutar_lote(args.archivos, args.salida, args.procesos,
+                                   args.iteraciones, args.tabu, args.semilla, parametros,
+                                   args.motor, args.descomponer)
+        return 0 if resultados and not any(r['error'] for r in resultados) else 1
+    
     print("=" * 70)
     print("SISTEMA DE GENERACIÓN DE HORARIOS UNIVERSITARIOS - ITI UPV")
     print("Algoritmo: Búsqueda Tabú con optimización Cython")
@@ -587,13 +998,14 @@ def main():
     else:
         print(f"[ERROR] No se encontró el archivo de datos: {ruta_datos}")
         print("[INFO] Por favor, crea el archivo con los datos de profesores, materias, etc.")
-        return
+        return 1
     
     # Generar solución inicial
     sistema.generar_solucion_inicial()
     
     # Optimizar con Búsqueda Tabú
-    if sistema.optimizar_con_tabu(max_iteraciones=1000, tamano_tabu=20):
+    if sistema.optimizar_con_tabu(max_iteraciones=args.iteraciones, tamano_tabu=args.tabu,
+                                  motor=args.motor, descomponer=args.descomponer):
         
         # Generar reportes
         ruta_reporte = os.path.join(os.path.dirname(__file__), 'horario_iti_final.html')
@@ -618,4 +1030,4 @@ def main():
         print()
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
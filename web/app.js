@@ -2,7 +2,11 @@
 // Aplicación Web Interactiva con Búsqueda Tabú (Cython Backend)
 
 // Configuración del servidor API
-const API_BASE = 'http://localhost:5001/api';
+// ?dataset=<nombre> en la URL trabaja sobre otro dataset del servidor (data/<nombre>.json)
+const DATASET = new URLSearchParams(window.location.search).get('dataset');
+const API_BASE = DATASET
+    ? `http://localhost:5001/api/datasets/${encodeURIComponent(DATASET)}`
+    : 'http://localhost:5001/api';
 const USAR_CYTHON = true;  // true = usar servidor Cython, false = algoritmo JS local
 
 // Datos globales
@@ -21,6 +25,8 @@ let appState = {
     dataEntryTab: 'profesores',  // Tab activo en entrada de datos
     intervaloOptimizacion: null,
     cythonDisponible: false,     // Se actualiza al conectar con el servidor
+    parametros: null,            // Parámetros por defecto del servidor (autoajuste.py)
+    analitica: null,             // Utilización calculada en el servidor (/api/analitica) para 'eventos'
     motorUsado: 'JavaScript'     // 'Cython' o 'JavaScript'
 };
 
@@ -131,12 +137,41 @@ function getAulaNombre(id) {
     return aula ? aula.nombre : `Aula ${id}`;
 }
 
+// Un bloque (laboratorio) ocupa 'duracion' horas consecutivas desde su slot
+function ocupaSlot(e, dia, hora) {
+    return e.slot.dia === dia && e.slot.hora <= hora && hora < e.slot.hora + (e.duracion || 1);
+}
+
+// Horas semanales precalculadas por el servidor, si corresponden a los eventos actuales
+function horasAnalitica(tipo, id) {
+    const analitica = appState.analitica;
+    if (!analitica || analitica.eventos !== appState.eventos) return null;
+    return analitica[tipo].horas_semanales[id] ?? 0;
+}
+
 function contarHorasProfesor(profId) {
-    return appState.eventos.filter(e => e.profesor_id === profId).length;
+    return horasAnalitica('profesores', profId)
+        ?? appState.eventos.filter(e => e.profesor_id === profId).reduce((s, e) => s + (e.duracion || 1), 0);
 }
 
 function contarHorasGrupo(grupoId) {
-    return appState.eventos.filter(e => e.grupo_id === grupoId).length;
+    return horasAnalitica('grupos', grupoId)
+        ?? appState.eventos.filter(e => e.grupo_id === grupoId).reduce((s, e) => s + (e.duracion || 1), 0);
+}
+
+async function actualizarAnalitica() {
+    appState.analitica = null;
+    if (!solucionEnServidor()) return;
+    const eventos = appState.eventos;
+    try {
+        const response = await fetch(`${API_BASE}/analitica?matrices=0`);
+        const data = await response.json();
+        if (data.success && appState.eventos === eventos) {
+            appState.analitica = { ...data, eventos };
+        }
+    } catch (error) {
+        console.warn('[WARN] Analítica no disponible:', error.message);
+    }
 }
 
 // ==================== NAVEGACIÓN ====================
@@ -258,11 +293,11 @@ function renderDashboard() {
                     <div class="space-y-4">
                         <div>
                             <label class="block text-sm font-medium text-gray-700 mb-1">Número Máximo de Iteraciones</label>
-                            <input type="number" value="1000" id="max-iter" class="w-full px-3 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-blue-500 outline-none transition-shadow text-sm">
+                            <input type="number" value="${appState.parametros?.max_iteraciones ?? 1000}" id="max-iter" class="w-full px-3 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-blue-500 outline-none transition-shadow text-sm">
                         </div>
                         <div>
                             <label class="block text-sm font-medium text-gray-700 mb-1">Tamaño de la Lista Tabú</label>
-                            <input type="number" value="20" id="tabu-size" class="w-full px-3 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-blue-500 outline-none transition-shadow text-sm">
+                            <input type="number" value="${appState.parametros?.tamano_tabu ?? 20}" id="tabu-size" class="w-full px-3 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-blue-500 outline-none transition-shadow text-sm">
                         </div>
                         <div>
                             <label class="block text-sm font-bold text-gray-700 mb-1">Prioridad de Optimización</label>
@@ -619,6 +654,9 @@ function renderVisualization() {
                     <button onclick="exportarTodosGruposCSV()" class="flex items-center gap-2 px-4 py-2 bg-purple-600 text-white rounded-lg hover:bg-purple-700 text-sm font-medium transition-colors">
                         ${iconSmall('download')} Todos
                     </button>
+                    <button onclick="exportarCalendario()" class="flex items-center gap-2 px-4 py-2 bg-blue-600 text-white rounded-lg hover:bg-blue-700 text-sm font-medium transition-colors">
+                        ${iconSmall('calendar')} Calendario
+                    </button>
                 </div>
             </div>
             
@@ -699,7 +737,7 @@ function actualizarVisualizacionProfesor() {
         html += `<tr class="hover:bg-gray-50"><td class="px-3 py-2 text-sm font-semibold text-gray-700 bg-gray-100 sticky left-0 border-r">${HORAS_RANGO[hora]}</td>`;
 
         for (let dia = 0; dia < 5; dia++) {
-            const evento = eventosProfesor.find(e => e.slot.dia === dia && e.slot.hora === hora);
+            const evento = eventosProfesor.find(e => ocupaSlot(e, dia, hora));
 
             if (evento) {
                 const color = getMateriaColor(evento.materia_id);
@@ -858,6 +896,7 @@ async function cargarDatosPrueba() {
                 appState.aulas = data.aulas || [];
                 appState.asignaciones = data.asignaciones || {};
                 appState.cythonDisponible = data.cython_disponible || false;
+                appState.parametros = data.parametros || null;
 
                 console.log('[INFO] Datos cargados desde servidor Cython:', {
                     profesores: appState.profesores.length,
@@ -1072,6 +1111,18 @@ async function iniciarOptimizacion() {
                 })
             });
 
+            // Datos infactibles (analisis_previo): ningún motor los resuelve, no usar el respaldo local
+            if (resOptimizar.status === 422) {
+                const dataInfactible = await resOptimizar.json();
+                dataInfactible.analisis_previo.errores.forEach(e => {
+                    log.innerHTML += `<p class="text-red-400">[${new Date().toLocaleTimeString()}] ✗ ${e.tipo} ${e.nombre}: ${e.mensaje}</p>`;
+                });
+                log.scrollTop = log.scrollHeight;
+                appState.optimizando = false;
+                alert(dataInfactible.message);
+                return;
+            }
+
             if (!resOptimizar.ok) throw new Error('Error en optimización');
             const dataOptimizar = await resOptimizar.json();
 
@@ -1082,6 +1133,7 @@ async function iniciarOptimizacion() {
                 appState.eventos = dataOptimizar.eventos;
                 appState.solucion = dataOptimizar.solucion;
                 appState.motorUsado = dataOptimizar.motor;
+                actualizarAnalitica();
 
                 // Mostrar métricas
                 document.getElementById('conflictos-value').textContent = dataOptimizar.solucion.conflictos_duros;
@@ -1215,7 +1267,7 @@ function actualizarVisualizacion() {
         html += `<tr class="hover:bg-gray-50"><td class="px-3 py-2 text-sm font-semibold text-gray-700 bg-gray-100 sticky left-0 border-r">${horaStr}</td>`;
 
         for (let dia = 0; dia < 5; dia++) {
-            const evento = eventosGrupo.find(e => e.slot.dia === dia && e.slot.hora === hora);
+            const evento = eventosGrupo.find(e => ocupaSlot(e, dia, hora));
 
             if (evento) {
                 const color = getMateriaColor(evento.materia_id);
@@ -1376,7 +1428,7 @@ function exportarPDF() {
     for (let hora = 0; hora < 14; hora++) {
         html += `<tr><td><strong>${HORAS_RANGO[hora]}</strong></td>`;
         for (let dia = 0; dia < 5; dia++) {
-            const evento = eventosGrupo.find(e => e.slot.dia === dia && e.slot.hora === hora);
+            const evento = eventosGrupo.find(e => ocupaSlot(e, dia, hora));
             if (evento) {
                 html += `<td><div class="materia">${getMateriaNombre(evento.materia_id)}</div><div class="profesor">${getProfesorNombre(evento.profesor_id)}</div></td>`;
             } else {
@@ -1406,6 +1458,11 @@ function exportarExcel() {
         return;
     }
 
+    if (solucionEnServidor()) {
+        descargarDelServidor('grupos', 'xlsx', [grupoId]);
+        return;
+    }
+
     const grupo = appState.grupos.find(g => g.id === grupoId);
     const eventosGrupo = appState.eventos.filter(e => e.grupo_id === grupoId);
 
@@ -1415,7 +1472,7 @@ function exportarExcel() {
     for (let hora = 0; hora < 14; hora++) {
         let fila = [HORAS_RANGO[hora]];
         for (let dia = 0; dia < 5; dia++) {
-            const evento = eventosGrupo.find(e => e.slot.dia === dia && e.slot.hora === hora);
+            const evento = eventosGrupo.find(e => ocupaSlot(e, dia, hora));
             if (evento) {
                 fila.push(`"${getMateriaNombre(evento.materia_id)} - ${getProfesorNombre(evento.profesor_id)}"`);
             } else {
@@ -1429,6 +1486,12 @@ function exportarExcel() {
 }
 
 function exportarTodosGruposCSV() {
+    // El servidor genera el archivo por partes (sin armar toda la facultad en el navegador)
+    if (solucionEnServidor()) {
+        descargarDelServidor('grupos', 'csv');
+        return;
+    }
+
     let csv = 'Grupo,Materia,Profesor,Día,Hora\\n';
 
     appState.eventos.forEach(e => {
@@ -1441,6 +1504,28 @@ function exportarTodosGruposCSV() {
     alert('Exportado CSV con todos los grupos');
 }
 
+function exportarCalendario() {
+    // iCalendar con clases semanales recurrentes (grupo seleccionado o todos)
+    if (!solucionEnServidor()) {
+        alert('El calendario se genera en el servidor: optimiza con el servidor Cython primero');
+        return;
+    }
+    const grupoId = parseInt(document.getElementById('grupo-select')?.value);
+    descargarDelServidor('grupos', 'ics', isNaN(grupoId) ? [] : [grupoId]);
+}
+
+// La solución está en el servidor si se optimizó con él (no con el algoritmo JavaScript local)
+function solucionEnServidor() {
+    return USAR_CYTHON && appState.motorUsado !== 'JavaScript';
+}
+
+function descargarDelServidor(vista, formato, ids = []) {
+    const parametros = new URLSearchParams(ids.map(id => ['id', id]));
+    const link = document.createElement('a');
+    link.href = `${API_BASE}/exportar/${vista}/${formato}${ids.length ? '?' + parametros : ''}`;
+    link.click();
+}
+
 function descargarArchivo(contenido, nombre, tipo) {
     const blob = new Blob([contenido], { type: tipo + ';charset=utf-8;' });
     const url = URL.createObjectURL(blob);
@@ -1892,7 +1977,7 @@ function limpiarHorarioLocal() {
 }
 
 
-function renderGraph() {
+async function renderGraph() {
     const content = document.getElementById('screen-content');
 
     content.innerHTML = `
@@ -1937,66 +2022,45 @@ function renderGraph() {
 
     if (!appState.eventos || appState.eventos.length === 0) return;
 
-    // Generate graph data based strictly on the schedule (appState.eventos)
-    const nodes = [];
-    const edges = [];
-    const addedNodes = new Set();
-    const relationships = new Set();
-
-    // 1. Identify all active nodes from the events
-    appState.eventos.forEach(e => {
-        // Add Group Node if not exists
-        if (!addedNodes.has(`g-${e.grupo_id}`)) {
-            const grupo = appState.grupos.find(g => g.id === e.grupo_id);
-            if (grupo) {
-                nodes.push({
-                    id: `g-${e.grupo_id}`,
-                    label: grupo.nombre,
-                    group: 'grupos',
-                    color: { background: '#3B82F6', border: '#2563EB' },
-                    font: { color: 'white', size: 16 },
-                    shape: 'box',
-                    margin: 10,
-                    shadow: true
-                });
-                addedNodes.add(`g-${e.grupo_id}`);
-            }
-        }
-
-        // Add Professor Node if not exists
-        if (!addedNodes.has(`p-${e.profesor_id}`)) {
-            const prof = appState.profesores.find(p => p.id === e.profesor_id);
-            if (prof && prof.nombre !== 'Pendiente') {
-                nodes.push({
-                    id: `p-${e.profesor_id}`,
-                    label: prof.nombre,
-                    group: 'profesores',
-                    color: { background: '#10B981', border: '#059669' },
-                    font: { color: 'white', size: 14 },
-                    shape: 'ellipse',
-                    margin: 10,
-                    shadow: true
-                });
-                addedNodes.add(`p-${e.profesor_id}`);
-            }
-        }
+    // Grafo grupo-profesor: precalculado en el servidor o, sin servidor, en una sola pasada local
+    const grafo = await obtenerGrafoRecursos();
+    const visibles = new Set(
+        grafo.nodos
+            .filter(n => !(n.tipo === 'profesor' && n.etiqueta === 'Pendiente'))
+            .map(n => n.id)
+    );
 
-        // Add Edge
-        const key = `${e.grupo_id}-${e.profesor_id}`;
-        if (!relationships.has(key)) {
-            relationships.add(key);
-            if (addedNodes.has(`g-${e.grupo_id}`) && addedNodes.has(`p-${e.profesor_id}`)) {
-                edges.push({
-                    from: `g-${e.grupo_id}`,
-                    to: `p-${e.profesor_id}`,
-                    color: { color: '#94a3b8', opacity: 0.5 },
-                    width: 1.5,
-                    length: 200 // Desired length of the edge
-                });
-            }
-        }
+    const nodes = grafo.nodos.filter(n => visibles.has(n.id)).map(n => n.tipo === 'grupo' ? {
+        id: n.id,
+        label: n.etiqueta,
+        group: 'grupos',
+        color: { background: '#3B82F6', border: '#2563EB' },
+        font: { color: 'white', size: 16 },
+        shape: 'box',
+        margin: 10,
+        shadow: true
+    } : {
+        id: n.id,
+        label: n.etiqueta,
+        group: 'profesores',
+        color: { background: '#10B981', border: '#059669' },
+        font: { color: 'white', size: 14 },
+        shape: 'ellipse',
+        margin: 10,
+        shadow: true
     });
 
+    const edges = grafo.aristas
+        .filter(a => visibles.has(a.origen) && visibles.has(a.destino))
+        .map(a => ({
+            from: a.origen,
+            to: a.destino,
+            title: `${a.peso} h/semana${a.choques ? ` · ${a.choques} en conflicto` : ''}`,
+            color: a.choques ? { color: '#EF4444', opacity: 0.8 } : { color: '#94a3b8', opacity: 0.5 },
+            width: 1 + Math.min(a.peso, 8) * 0.25,
+            length: 200 // Desired length of the edge
+        }));
+
     // Configuration for vis-network
     const container = document.getElementById('mynetwork');
     const data = {
@@ -2061,6 +2125,55 @@ function renderGraph() {
     });
 }
 
+async function obtenerGrafoRecursos() {
+    // El servidor solo conoce el horario si lo generó él
+    if (USAR_CYTHON && appState.motorUsado !== 'JavaScript') {
+        try {
+            const response = await fetch(`${API_BASE}/grafo?vista=recursos`);
+            if (response.ok) {
+                return await response.json();
+            }
+        } catch (error) {
+            console.warn('[WARN] Grafo del servidor no disponible, calculando localmente...');
+        }
+    }
+    return construirGrafoRecursosLocal();
+}
+
+function construirGrafoRecursosLocal() {
+    // Misma forma que /api/grafo?vista=recursos (sin CSR), con índices en lugar de búsquedas
+    const grupos = new Map(appState.grupos.map(g => [g.id, g]));
+    const profesores = new Map(appState.profesores.map(p => [p.id, p]));
+    const nodos = [];
+    const indice = new Map();
+    const pares = new Map();
+
+    const nodo = (tipo, recursoId, nombre) => {
+        const clave = `${tipo[0]}-${recursoId}`;
+        if (!indice.has(clave)) {
+            indice.set(clave, nodos.length);
+            nodos.push({ id: nodos.length, clave, tipo, recurso_id: recursoId, etiqueta: nombre });
+        }
+        return indice.get(clave);
+    };
+
+    appState.eventos.forEach(e => {
+        const grupo = grupos.get(e.grupo_id);
+        const prof = profesores.get(e.profesor_id);
+        if (!grupo || !prof) return;
+
+        const g = nodo('grupo', e.grupo_id, grupo.nombre);
+        const p = nodo('profesor', e.profesor_id, prof.nombre);
+        const clave = `${g}-${p}`;
+        if (!pares.has(clave)) {
+            pares.set(clave, { origen: g, destino: p, peso: 0, choques: 0 });
+        }
+        pares.get(clave).peso++;
+    });
+
+    return { nodos, aristas: [...pares.values()] };
+}
+
 // ==================== INICIALIZACIÓN ====================
 
 document.addEventListener('DOMContentLoaded', () => {